@@ -67,6 +67,9 @@ class Cache(object):
     Key name is a string identifier of a data container (like a file inside a
     directory) which will hold the data.
     '''
+    # The number of keys iter_fetch_many fetches with each fetch_many call
+    FETCH_CHUNK_SIZE = 256
+
     def __init__(self, opts, cachedir=None, **kwargs):
         self.opts = opts
         if cachedir is None:
@@ -179,6 +182,85 @@ class Cache(object):
         fun = '{0}.fetch'.format(self.driver)
         return self.modules[fun](bank, key, **self._kwargs)
 
+    def store_many(self, data):
+        '''
+        Store several keys at once using the specified module. Drivers which
+        don't implement a bulk ``store_many`` are called once per key.
+
+        .. versionadded:: Sodium
+
+        :param data:
+            A dict mapping ``(bank, key)`` tuples to the data which will be
+            stored under that key.
+
+        :raises SaltCacheError:
+            Raises an exception if cache driver detected an error accessing data
+            in the cache backend (auth, permissions, etc).
+        '''
+        if not data:
+            return
+        fun = '{0}.store_many'.format(self.driver)
+        if fun in self.modules:
+            return self.modules[fun](data, **self._kwargs)
+        for (bank, key), value in six.iteritems(data):
+            self.store(bank, key, value)
+
+    def fetch_many(self, keys):
+        '''
+        Fetch several keys at once using the specified module. Drivers which
+        don't implement a bulk ``fetch_many`` are called once per key.
+
+        .. versionadded:: Sodium
+
+        :param keys:
+            An iterable of ``(bank, key)`` tuples.
+
+        :return:
+            Return a dict mapping each requested ``(bank, key)`` tuple to the
+            python object fetched from the cache, or to an empty dict if the
+            given path or key was not found.
+
+        :raises SaltCacheError:
+            Raises an exception if cache driver detected an error accessing data
+            in the cache backend (auth, permissions, etc).
+        '''
+        keys = list(keys)
+        if not keys:
+            return {}
+        fun = '{0}.fetch_many'.format(self.driver)
+        if fun in self.modules:
+            return self.modules[fun](keys, **self._kwargs)
+        return dict((item, self.fetch(*item)) for item in keys)
+
+    def iter_fetch_many(self, keys, chunk_size=None):
+        '''
+        Fetch several keys with ``fetch_many``, a chunk of keys at a time, so
+        that the data of all of the keys isn't held in memory at once.
+
+        .. versionadded:: Sodium
+
+        :param keys:
+            An iterable of ``(bank, key)`` tuples.
+
+        :param chunk_size:
+            The number of keys fetched with each ``fetch_many`` call. Defaults
+            to ``FETCH_CHUNK_SIZE``.
+
+        :return:
+            Yield ``((bank, key), data)`` tuples in the order of ``keys``.
+
+        :raises SaltCacheError:
+            Raises an exception if cache driver detected an error accessing data
+            in the cache backend (auth, permissions, etc).
+        '''
+        keys = list(keys)
+        chunk_size = chunk_size or self.FETCH_CHUNK_SIZE
+        for start in range(0, len(keys), chunk_size):
+            chunk = keys[start:start + chunk_size]
+            fetched = self.fetch_many(chunk)
+            for item in chunk:
+                yield item, fetched.get(item)
+
     def updated(self, bank, key):
         '''
         Get the last updated epoch for the specified key
@@ -224,6 +306,30 @@ class Cache(object):
         fun = '{0}.flush'.format(self.driver)
         return self.modules[fun](bank, key=key, **self._kwargs)
 
+    def flush_many(self, keys):
+        '''
+        Remove several keys at once using the specified module. Drivers which
+        don't implement a bulk ``flush_many`` are called once per key.
+
+        .. versionadded:: Sodium
+
+        :param keys:
+            An iterable of ``(bank, key)`` tuples. A key of ``None`` removes
+            the entire bank, as with :py:meth:`flush`.
+
+        :raises SaltCacheError:
+            Raises an exception if cache driver detected an error accessing data
+            in the cache backend (auth, permissions, etc).
+        '''
+        keys = list(keys)
+        if not keys:
+            return
+        fun = '{0}.flush_many'.format(self.driver)
+        if fun in self.modules:
+            return self.modules[fun](keys, **self._kwargs)
+        for bank, key in keys:
+            self.flush(bank, key)
+
     def list(self, bank):
         '''
         Lists entries stored in the specified bank.
@@ -314,10 +420,16 @@ class MemCache(Cache):
             self._storage = MemCache.data[storage_id]
         return self._storage
 
-    def fetch(self, bank, key):
+    def _evict(self):
+        if len(self.storage) >= self.max:
+            if self.cleanup:
+                MemCache.__cleanup(self.expire)
+            if len(self.storage) >= self.max:
+                self.storage.popitem(last=False)
+
+    def _hit(self, bank, key, now):
         if self.debug:
             self.call += 1
-        now = time.time()
         record = self.storage.pop((bank, key), None)
         # Have a cached value for the key
         if record is not None and record[0] + self.expire >= now:
@@ -330,28 +442,60 @@ class MemCache(Cache):
             # update atime and return
             record[0] = now
             self.storage[(bank, key)] = record
+            return record
+        return None
+
+    def fetch(self, bank, key):
+        now = time.time()
+        record = self._hit(bank, key, now)
+        if record is not None:
             return record[1]
 
         # Have no value for the key or value is expired
         data = super(MemCache, self).fetch(bank, key)
-        if len(self.storage) >= self.max:
-            if self.cleanup:
-                MemCache.__cleanup(self.expire)
-            if len(self.storage) >= self.max:
-                self.storage.popitem(last=False)
+        self._evict()
         self.storage[(bank, key)] = [now, data]
         return data
 
+    def fetch_many(self, keys):
+        now = time.time()
+        ret = {}
+        missing = []
+        for item in keys:
+            record = self._hit(item[0], item[1], now)
+            if record is not None:
+                ret[item] = record[1]
+            else:
+                missing.append(item)
+        if missing:
+            fetched = super(MemCache, self).fetch_many(missing)
+            for item, data in six.iteritems(fetched):
+                self._evict()
+                self.storage[item] = [now, data]
+            ret.update(fetched)
+        return ret
+
     def store(self, bank, key, data):
         self.storage.pop((bank, key), None)
         super(MemCache, self).store(bank, key, data)
-        if len(self.storage) >= self.max:
-            if self.cleanup:
-                MemCache.__cleanup(self.expire)
-            if len(self.storage) >= self.max:
-                self.storage.popitem(last=False)
+        self._evict()
         self.storage[(bank, key)] = [time.time(), data]
 
+    def store_many(self, data):
+        for item in data:
+            self.storage.pop(item, None)
+        super(MemCache, self).store_many(data)
+        now = time.time()
+        for item, value in six.iteritems(data):
+            self._evict()
+            self.storage[item] = [now, value]
+
     def flush(self, bank, key=None):
         self.storage.pop((bank, key), None)
         super(MemCache, self).flush(bank, key)
+
+    def flush_many(self, keys):
+        keys = list(keys)
+        for item in keys:
+            self.storage.pop(tuple(item), None)
+        super(MemCache, self).flush_many(keys)
@@ -47,6 +47,7 @@ value to ``consul``:
 
 '''
 from __future__ import absolute_import, print_function, unicode_literals
+import base64
 import logging
 try:
     import consul
@@ -59,6 +60,9 @@ from salt.exceptions import SaltCacheError
 log = logging.getLogger(__name__)
 api = None
 
+# Consul refuses transactions with more operations than this
+TXN_MAX_OPS = 64
+
 
 # Define the module's virtual name
 __virtualname__ = 'consul'
@@ -108,6 +112,76 @@ def store(bank, key, data):
         )
 
 
+def _txn(ops):
+    '''
+    Run KV operations through the Consul transaction API, in chunks of at most
+    ``TXN_MAX_OPS``, and return the list of results. Returns ``None`` if the
+    installed python-consul has no transaction support.
+    '''
+    if getattr(api, 'txn', None) is None:
+        return None
+    results = []
+    for idx in range(0, len(ops), TXN_MAX_OPS):
+        chunk = ops[idx:idx + TXN_MAX_OPS]
+        ret = api.txn.put([{'KV': op} for op in chunk])
+        results.extend(ret.get('Results') or [])
+    return results
+
+
+def store_many(data):
+    '''
+    Store several keys, given as a dict mapping ``(bank, key)`` to data, using
+    Consul transactions.
+    '''
+    ops = []
+    for (bank, key), value in data.items():
+        ops.append({
+            'Verb': 'set',
+            'Key': '{0}/{1}'.format(bank, key),
+            'Value': base64.b64encode(
+                __context__['serial'].dumps(value)).decode('ascii'),
+        })
+    try:
+        if _txn(ops) is not None:
+            return
+    except Exception as exc:  # pylint: disable=broad-except
+        raise SaltCacheError(
+            'There was an error writing {0} keys: {1}'.format(len(ops), exc)
+        )
+    for (bank, key), value in data.items():
+        store(bank, key, value)
+
+
+def fetch_many(keys):
+    '''
+    Fetch several ``(bank, key)`` pairs using Consul transactions, returning a
+    dict keyed by the pairs. A transaction fails as a whole if one of its keys
+    is missing, in which case the keys of that chunk are fetched one by one.
+    '''
+    keys = [tuple(item) for item in keys]
+    ret = {}
+    for idx in range(0, len(keys), TXN_MAX_OPS):
+        chunk = keys[idx:idx + TXN_MAX_OPS]
+        ops = [{'Verb': 'get', 'Key': '{0}/{1}'.format(bank, key)}
+               for bank, key in chunk]
+        try:
+            results = _txn(ops)
+        except Exception as exc:  # pylint: disable=broad-except
+            log.debug('Consul transaction failed, fetching keys one by one: %s', exc)
+            results = None
+        if results is None or len(results) != len(chunk):
+            for bank, key in chunk:
+                ret[(bank, key)] = fetch(bank, key)
+            continue
+        for item, result in zip(chunk, results):
+            value = (result.get('KV') or {}).get('Value')
+            if value is None:
+                ret[item] = {}
+            else:
+                ret[item] = __context__['serial'].loads(base64.b64decode(value))
+    return ret
+
+
 def fetch(bank, key):
     '''
     Fetch a key value.
@@ -144,6 +218,29 @@ def flush(bank, key=None):
         )
 
 
+def flush_many(keys):
+    '''
+    Remove several ``(bank, key)`` pairs using Consul transactions.
+    '''
+    keys = list(keys)
+    ops = []
+    for bank, key in keys:
+        if key is None:
+            ops.append({'Verb': 'delete-tree', 'Key': bank})
+        else:
+            ops.append({'Verb': 'delete', 'Key': '{0}/{1}'.format(bank, key)})
+    try:
+        if _txn(ops) is not None:
+            return True
+    except Exception as exc:  # pylint: disable=broad-except
+        raise SaltCacheError(
+            'There was an error removing {0} keys: {1}'.format(len(ops), exc)
+        )
+    for bank, key in keys:
+        flush(bank, key)
+    return True
+
+
 def list_(bank):
     '''
     Return an iterable object containing all entries stored in the specified bank.
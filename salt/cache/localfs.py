@@ -17,6 +17,7 @@ import os.path
 import errno
 import shutil
 import tempfile
+from multiprocessing.pool import ThreadPool
 
 from salt.exceptions import SaltCacheError
 import salt.utils.atomicfile
@@ -24,6 +25,10 @@ import salt.utils.files
 
 log = logging.getLogger(__name__)
 
+# Bulk operations on fewer keys than this are not worth a thread pool
+BULK_MIN_KEYS = 32
+BULK_THREADS = 8
+
 __func_alias__ = {'list_': 'list'}
 
 
@@ -100,6 +105,41 @@ def fetch(bank, key, cachedir):
         )
 
 
+def _bulk(fun, items):
+    '''
+    Apply ``fun`` to every item, using a thread pool for large batches. The
+    cache is mostly file opens and reads which release the GIL, so running a
+    handful of them concurrently hides most of the filesystem latency.
+    '''
+    if len(items) < BULK_MIN_KEYS:
+        return [fun(item) for item in items]
+    pool = ThreadPool(min(BULK_THREADS, len(items) // BULK_MIN_KEYS + 1))
+    try:
+        return pool.map(fun, items)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def store_many(data, cachedir):
+    '''
+    Store several keys, given as a dict mapping ``(bank, key)`` to data.
+    '''
+    _bulk(
+        lambda item: store(item[0][0], item[0][1], item[1], cachedir),
+        list(data.items()))
+
+
+def fetch_many(keys, cachedir):
+    '''
+    Fetch several ``(bank, key)`` pairs, returning a dict keyed by the pairs.
+    '''
+    keys = [tuple(item) for item in keys]
+    return dict(zip(
+        keys,
+        _bulk(lambda item: fetch(item[0], item[1], cachedir), keys)))
+
+
 def updated(bank, key, cachedir):
     '''
     Return the epoch of the mtime for this cache file
@@ -145,6 +185,13 @@ def flush(bank, key=None, cachedir=None):
     return True
 
 
+def flush_many(keys, cachedir=None):
+    '''
+    Remove several ``(bank, key)`` pairs from the cache.
+    '''
+    return [flush(bank, key, cachedir=cachedir) for bank, key in keys]
+
+
 def list_(bank, cachedir):
     '''
     Return an iterable object containing all entries stored in the specified bank.
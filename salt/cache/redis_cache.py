@@ -157,6 +157,7 @@ except ImportError:
     HAS_REDIS_CLUSTER = False
 
 # Import salt
+from salt.ext import six
 from salt.ext.six.moves import range
 from salt.exceptions import SaltCacheError
 
@@ -357,6 +358,59 @@ def store(bank, key, data):
         raise SaltCacheError(mesg)
 
 
+def store_many(data):
+    '''
+    Store several keys, given as a dict mapping ``(bank, key)`` to data, in a
+    single Redis pipeline.
+    '''
+    redis_server = _get_redis_server()
+    redis_pipe = redis_server.pipeline()
+    banks = set()
+    try:
+        for (bank, key), value in six.iteritems(data):
+            if bank not in banks:
+                _build_bank_hier(bank, redis_pipe)
+                banks.add(bank)
+            redis_pipe.set(_get_key_redis_key(bank, key),
+                           __context__['serial'].dumps(value))
+            redis_pipe.sadd(_get_bank_keys_redis_key(bank), key)
+        log.debug('Setting %d keys under %d banks', len(data), len(banks))
+        redis_pipe.execute()
+    except (RedisConnectionError, RedisResponseError) as rerr:
+        mesg = 'Cannot set the Redis cache keys under {rbanks}: {rerr}'.format(
+            rbanks=', '.join(sorted(banks)),
+            rerr=rerr
+        )
+        log.error(mesg)
+        raise SaltCacheError(mesg)
+
+
+def fetch_many(keys):
+    '''
+    Fetch several ``(bank, key)`` pairs from the Redis cache in a single
+    pipeline, returning a dict keyed by the pairs.
+    '''
+    keys = [tuple(item) for item in keys]
+    redis_server = _get_redis_server()
+    redis_pipe = redis_server.pipeline()
+    for bank, key in keys:
+        redis_pipe.get(_get_key_redis_key(bank, key))
+    try:
+        redis_values = redis_pipe.execute()
+    except (RedisConnectionError, RedisResponseError) as rerr:
+        mesg = 'Cannot fetch {count} Redis cache keys: {rerr}'.format(count=len(keys),
+                                                                      rerr=rerr)
+        log.error(mesg)
+        raise SaltCacheError(mesg)
+    ret = {}
+    for item, redis_value in zip(keys, redis_values):
+        if redis_value is None:
+            ret[item] = {}
+        else:
+            ret[item] = __context__['serial'].loads(redis_value)
+    return ret
+
+
 def fetch(bank, key):
     '''
     Fetch data from the Redis cache.
@@ -471,6 +525,31 @@ def flush(bank, key=None):
     return True
 
 
+def flush_many(keys):
+    '''
+    Remove several ``(bank, key)`` pairs from the cache. Single keys are removed
+    in one pipeline, whole banks (``key`` is ``None``) go through :py:func:`flush`.
+    '''
+    redis_server = _get_redis_server()
+    redis_pipe = redis_server.pipeline()
+    banks = []
+    for bank, key in keys:
+        if key is None:
+            banks.append(bank)
+            continue
+        redis_pipe.delete(_get_key_redis_key(bank, key))
+        redis_pipe.srem(_get_bank_keys_redis_key(bank), key)
+    try:
+        redis_pipe.execute()
+    except (RedisConnectionError, RedisResponseError) as rerr:
+        mesg = 'Cannot flush the Redis cache keys: {rerr}'.format(rerr=rerr)
+        log.error(mesg)
+        raise SaltCacheError(mesg)
+    for bank in banks:
+        flush(bank)
+    return True
+
+
 def list_(bank):
     '''
     Lists entries stored in the specified bank.
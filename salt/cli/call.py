@@ -52,6 +52,8 @@ class SaltCall(salt.utils.parsers.SaltCallOptionParser):
 
         if self.options.grains_run:
             caller.print_grains()
+            if self.options.profile_loader:
+                caller.print_loader_report()
             self.exit(salt.defaults.exitcodes.EX_OK)
 
         caller.run()
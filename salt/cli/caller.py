@@ -108,6 +108,15 @@ class BaseCaller(object):
         grains = self.minion.opts.get('grains') or salt.loader.grains(self.opts)
         salt.output.display_output({'local': grains}, 'grains', self.opts)
 
+    def print_loader_report(self):
+        '''
+        Print out the loader timings recorded with --profile-loader
+        '''
+        salt.output.display_output(
+            {'loader_profile': salt.utils.profile.loader_report()},
+            'nested',
+            self.opts)
+
     def run(self):
         '''
         Execute the salt call logic
@@ -133,6 +142,8 @@ class BaseCaller(object):
                     out=out,
                     opts=self.opts,
                     _retcode=ret.get('retcode', 0))
+            if self.opts.get('profile_loader', False):
+                self.print_loader_report()
             # _retcode will be available in the kwargs of the outputter function
             if self.opts.get('retcode_passthrough', False):
                 sys.exit(ret['retcode'])
@@ -286,6 +286,9 @@ VALID_OPTS = immutabletypes.freeze({
     # a master for remote execution.
     'use_master_when_local': bool,
 
+    # The number of chunk requests a minion keeps in flight when fetching a file from the master
+    'file_transfer_window': int,
+
     # A map of saltenvs and fileserver backend locations
     'file_roots': dict,
 
@@ -359,6 +362,13 @@ VALID_OPTS = immutabletypes.freeze({
     # Maximum number of concurrently active processes at any given point in time
     'process_count_max': int,
 
+    # The number of worker processes which run the jobs published to the
+    # minion with their modules already loaded. 0 forks a process per job.
+    'minion_job_workers': int,
+
+    # The number of jobs a job worker runs before it is replaced
+    'minion_job_worker_max_jobs': int,
+
     # Whether or not the salt minion should run scheduled mine updates
     'mine_enabled': bool,
 
@@ -444,6 +454,9 @@ VALID_OPTS = immutabletypes.freeze({
     # Tell the loader to attempt to import *.pyx cython files if cython is available
     'cython_enable': bool,
 
+    # Remember which modules refused to load in __virtual__ across the loaders of a process
+    'loader_virtual_cache': bool,
+
     # Whether or not to load grains for the GPU
     'enable_gpu_grains': bool,
 
@@ -477,6 +490,15 @@ VALID_OPTS = immutabletypes.freeze({
     # Fire events as state chunks are processed by the state compiler
     'state_events': bool,
 
+    # The number of states to run at the same time, in the order of their requisites
+    'state_concurrency': int,
+
+    # Reuse the data rendered from SLS files while what they read is unchanged
+    'state_render_cache': bool,
+
+    # The execution functions whose result only depends on their arguments
+    'state_render_cache_pure': list,
+
     # The number of seconds a minion should wait before retry when attempting authentication
     'acceptance_wait_time': float,
 
@@ -655,6 +677,9 @@ VALID_OPTS = immutabletypes.freeze({
     # Frequency of the proxy_keep_alive, in minutes
     'proxy_keep_alive_interval': int,
 
+    # Keep an index of the files in file_roots, refreshed on fileserver updates
+    'roots_index': bool,
+
     # Update intervals
     'roots_update_interval': int,
     'azurefs_update_interval': int,
@@ -736,6 +761,17 @@ VALID_OPTS = immutabletypes.freeze({
     # Pillar cache backend. Defaults to `disk` which stores caches in the master cache
     'pillar_cache_backend': six.string_types,
 
+    # The number of ext_pillars to run at the same time, 1 runs them one after the other
+    'ext_pillar_concurrency': int,
+
+    # The time in seconds an ext_pillar may take when they run concurrently. Either a
+    # number for all ext_pillars, or a dict of numbers by ext_pillar name
+    'ext_pillar_timeout': (int, float, dict),
+
+    # The time in seconds the result of an ext_pillar is cached per minion and grains.
+    # Either a number for all ext_pillars, or a dict of numbers by ext_pillar name
+    'ext_pillar_cache_ttl': (int, float, dict),
+
     'pillar_safe_render_error': bool,
 
     # When creating a pillar, there are several strategies to choose from when
@@ -788,6 +824,10 @@ VALID_OPTS = immutabletypes.freeze({
     'fileserver_limit_traversal': bool,
     'fileserver_verify_config': bool,
 
+    # Update the roots and minionfs fileserver backends from inotify events
+    # instead of polling them
+    'fileserver_inotify': bool,
+
     # Optionally apply '*' permissioins to any user. By default '*' is a fallback case that is
     # applied only if the user didn't matched by other matchers.
     'permissive_acl': bool,
@@ -837,12 +877,27 @@ VALID_OPTS = immutabletypes.freeze({
     # Specify whether the master should store end times for jobs as returns come in
     'job_cache_store_endtime': bool,
 
+    # Record the jobs stored by the local_cache returner in an sqlite index, used to list,
+    # filter and expire jobs without walking the job cache directory
+    'job_cache_index': bool,
+
+    # The maximum number of minion returns each master worker queues before storing them in the
+    # job cache and firing them on the event bus. 0 stores every return as it is received.
+    'master_return_batch_size': int,
+
+    # The maximum number of seconds a minion return stays queued before being stored
+    'master_return_batch_interval': float,
+
     # The minion data cache is a cache of information about the minions stored on the master.
     # This information is primarily the pillar and grains data. The data is cached in the master
     # cachedir under the name of the minion and used to predetermine what minions are expected to
     # reply from executions.
     'minion_data_cache': bool,
 
+    # Keep an in-memory index of the grains and pillar found in the minion data cache, used to
+    # resolve grain and pillar targets without fetching the cached data of every minion.
+    'minion_data_cache_index': bool,
+
     # The number of seconds between AES key rotations on the master
     'publish_session': int,
 
@@ -943,6 +998,9 @@ VALID_OPTS = immutabletypes.freeze({
     # If this is set to True the first newline after a Jinja block is removed
     'jinja_trim_blocks': bool,
 
+    # Keep the compiled Jinja templates in the cachedir and in memory
+    'jinja_bytecode_cache': bool,
+
     # Cache minion ID to file
     'minion_id_caching': bool,
 
@@ -955,6 +1013,24 @@ VALID_OPTS = immutabletypes.freeze({
     # If set, the master will sign all publications before they are sent out
     'sign_pub_messages': bool,
 
+    # Encrypt the requests of the minions and their replies with AES-GCM when
+    # both the master and the minion allow it
+    'aes_gcm': bool,
+
+    # The compression, zlib or zstd, of the large requests of the minions and
+    # their replies, when the minions can decompress it. None turns it off.
+    'payload_compression': (type(None), six.string_types),
+
+    # The compression, zlib or zstd, of the large publications. Every minion
+    # must be able to decompress it. None turns it off.
+    'publish_compression': (type(None), six.string_types),
+
+    # The size in bytes from which the payloads are compressed
+    'payload_compression_threshold': int,
+
+    # The largest size in bytes a compressed payload may decompress to
+    'payload_max_size': int,
+
     # The size of key that should be generated when creating new keys
     'keysize': int,
 
@@ -1023,6 +1099,14 @@ VALID_OPTS = immutabletypes.freeze({
     # implications in large setups.
     'max_minions': int,
 
+    # The number of worker processes which may handle minion sign in requests
+    # at the same time. 0 means no limit.
+    'auth_max_workers': int,
+
+    # The number of seconds the minions turned away by auth_max_workers are
+    # asked to wait before they sign in again
+    'auth_retry_after': int,
+
 
     'username': (type(None), six.string_types),
     'password': (type(None), six.string_types),
@@ -1210,6 +1294,9 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze({
     'master_failback_interval': 0,
     'verify_master_pubkey_sign': False,
     'sign_pub_messages': False,
+    'aes_gcm': False,
+    'payload_compression_threshold': 16384,
+    'payload_max_size': 100 * 1024 * 1024,
     'always_verify_signature': False,
     'master_sign_key_name': 'master_sign',
     'syndic_finger': '',
@@ -1232,6 +1319,7 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze({
     'renderer': 'jinja|yaml',
     'renderer_whitelist': [],
     'renderer_blacklist': [],
+    'jinja_bytecode_cache': True,
     'random_startup_delay': 0,
     'failhard': False,
     'autoload_dynamic_modules': True,
@@ -1264,6 +1352,7 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze({
     'file_client': 'remote',
     'local': False,
     'use_master_when_local': False,
+    'file_transfer_window': 1,
     'file_roots': {
         'base': [salt.syspaths.BASE_FILE_ROOTS_DIR,
                  salt.syspaths.SPM_FORMULA_PATH]
@@ -1353,6 +1442,8 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze({
     'autosign_timeout': 120,
     'multiprocessing': True,
     'process_count_max': -1,
+    'minion_job_workers': 0,
+    'minion_job_worker_max_jobs': 100,
     'mine_enabled': True,
     'mine_return_job': False,
     'mine_interval': 60,
@@ -1379,6 +1470,7 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze({
     'test': False,
     'ext_job_cache': '',
     'cython_enable': False,
+    'loader_virtual_cache': False,
     'enable_gpu_grains': True,
     'enable_zip_modules': False,
     'state_verbose': True,
@@ -1387,6 +1479,9 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze({
     'state_auto_order': True,
     'state_events': False,
     'state_aggregate': False,
+    'state_concurrency': 1,
+    'state_render_cache': False,
+    'state_render_cache_pure': [],
     'snapper_states': False,
     'snapper_states_config': 'root',
     'acceptance_wait_time': 10,
@@ -1532,6 +1627,8 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze({
     'file_client': 'local',
     'local': True,
 
+    'roots_index': False,
+
     # Update intervals
     'roots_update_interval': DEFAULT_INTERVAL,
     'azurefs_update_interval': DEFAULT_INTERVAL,
@@ -1610,6 +1707,9 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze({
     'pillar_cache': False,
     'pillar_cache_ttl': 3600,
     'pillar_cache_backend': 'disk',
+    'ext_pillar_concurrency': 1,
+    'ext_pillar_timeout': 0,
+    'ext_pillar_cache_ttl': 0,
     'ping_on_rotate': False,
     'peer': {},
     'preserve_minion_cache': False,
@@ -1644,6 +1744,7 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze({
     'fileserver_ignoresymlinks': False,
     'fileserver_limit_traversal': False,
     'fileserver_verify_config': True,
+    'fileserver_inotify': False,
     'max_open_files': 100000,
     'hash_type': 'sha256',
     'optimization_order': [0, 1, 2],
@@ -1663,7 +1764,11 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze({
     'ext_job_cache': '',
     'master_job_cache': 'local_cache',
     'job_cache_store_endtime': False,
+    'job_cache_index': False,
+    'master_return_batch_size': 0,
+    'master_return_batch_interval': 0.1,
     'minion_data_cache': True,
+    'minion_data_cache_index': False,
     'enforce_mine_cache': False,
     'ipc_mode': _DFLT_IPC_MODE,
     'ipc_write_buffer': _DFLT_IPC_WBUFFER,
@@ -1711,6 +1816,7 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze({
     'ssh_list_nodegroups': {},
     'ssh_use_home_key': False,
     'cython_enable': False,
+    'loader_virtual_cache': False,
     'enable_gpu_grains': False,
     # XXX: Remove 'key_logfile' support in 2014.1.0
     'key_logfile': os.path.join(salt.syspaths.LOGS_DIR, 'key'),
@@ -1738,11 +1844,17 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze({
     'jinja_sls_env': {},
     'jinja_lstrip_blocks': False,
     'jinja_trim_blocks': False,
+    'jinja_bytecode_cache': True,
     'tcp_keepalive': True,
     'tcp_keepalive_idle': 300,
     'tcp_keepalive_cnt': -1,
     'tcp_keepalive_intvl': -1,
     'sign_pub_messages': True,
+    'aes_gcm': False,
+    'payload_compression': None,
+    'publish_compression': None,
+    'payload_compression_threshold': 16384,
+    'payload_max_size': 100 * 1024 * 1024,
     'keysize': 2048,
     'transport': 'zeromq',
     'gather_job_timeout': 10,
@@ -1766,6 +1878,8 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze({
     'queue_dirs': [],
     'cli_summary': False,
     'max_minions': 0,
+    'auth_max_workers': 0,
+    'auth_retry_after': 10,
     'master_sign_key_name': 'master_sign',
     'master_sign_pubkey': False,
     'master_pubkey_signature': 'master_pubkey_signature',
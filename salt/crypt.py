@@ -22,10 +22,10 @@ import traceback
 import binascii
 import weakref
 import getpass
+import zlib
 import salt.ext.tornado.gen
 
 # Import third party libs
-from salt.ext.six.moves import zip  # pylint: disable=import-error,redefined-builtin
 from salt.ext import six
 
 try:
@@ -57,6 +57,19 @@ if not HAS_M2 and not HAS_CDOME:
         # No need for crypt in local mode
         pass
 
+try:
+    from cryptography.exceptions import InvalidTag
+    from cryptography.hazmat.backends import default_backend
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+    HAS_AESGCM = True
+except ImportError:
+    HAS_AESGCM = False
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
 # Import salt libs
 import salt.defaults.exitcodes
 import salt.payload
@@ -73,11 +86,17 @@ import salt.utils.user
 import salt.utils.verify
 import salt.version
 from salt.exceptions import (
-    AuthenticationError, SaltClientError, SaltReqTimeoutError, MasterExit
+    AuthenticationError, SaltClientError, SaltReqTimeoutError, MasterExit,
+    SaltDeserializationError
 )
 
 log = logging.getLogger(__name__)
 
+# The compressions of the payloads this host can decompress, by preference
+COMPRESSIONS = ['zstd', 'zlib'] if HAS_ZSTD else ['zlib']
+# The errors raised when a compressed payload is corrupt
+DECOMPRESSION_ERRORS = (zlib.error, zstandard.ZstdError) if HAS_ZSTD else (zlib.error,)
+
 
 def dropfile(cachedir, user=None):
     '''
@@ -500,6 +519,8 @@ class AsyncAuth(object):
         self.serial = salt.payload.Serial(self.opts)
         self.pub_path = os.path.join(self.opts['pki_dir'], 'minion.pub')
         self.rsa_path = os.path.join(self.opts['pki_dir'], 'minion.pem')
+        # The number of seconds the master asked to wait before signing in again
+        self._retry_after = None
         if self.opts['__role'] == 'syndic':
             self.mpub = 'syndic_master.pub'
         else:
@@ -542,6 +563,20 @@ class AsyncAuth(object):
     def crypticle(self):
         return self._crypticle
 
+    @property
+    def aead(self):
+        '''
+        Whether the master agreed to encrypt the requests with AES-GCM
+        '''
+        return self.creds.get('aead') == 'aes-gcm'
+
+    @property
+    def compress(self):
+        '''
+        The compression the master agreed to for the requests, or None
+        '''
+        return self.creds.get('compress')
+
     @property
     def authenticated(self):
         return hasattr(self, '_authenticate_future') and \
@@ -609,6 +644,11 @@ class AsyncAuth(object):
                     if self.opts.get('detect_mode') is True:
                         error = SaltClientError('Detect mode is on')
                         break
+                    retry_wait = self._retry_wait()
+                    if retry_wait:
+                        log.info('Waiting %s seconds before retry.', retry_wait)
+                        yield salt.ext.tornado.gen.sleep(retry_wait)
+                        continue
                     if self.opts.get('caller'):
                         # We have a list of masters, so we should break
                         # and try the next one in the list.
@@ -654,6 +694,33 @@ class AsyncAuth(object):
                     with salt.utils.event.get_event(self.opts.get('__role'), opts=self.opts, listen=False) as event:
                         event.fire_event({'key': key, 'creds': creds}, salt.utils.event.tagify(prefix='auth', suffix='creds'))
 
+    def _busy(self, load):
+        '''
+        Check whether the master turned the sign in away because it is busy
+        with other sign ins, and keep the time it asked to wait for
+        '''
+        if load['ret'] != 'retry' or \
+                not isinstance(load.get('retry_after'), six.integer_types + (float,)):
+            return False
+        log.info(
+            'The Salt Master is busy with other sign in requests and asked '
+            'this minion to try again in %s seconds', load['retry_after']
+        )
+        self._retry_after = load['retry_after']
+        return True
+
+    def _retry_wait(self):
+        '''
+        Return how long to wait before the next sign in when the master asked
+        for it, or None. The wait is spread over twice the time the master
+        asked for, so that the minions turned away together do not all come
+        back at once.
+        '''
+        retry_after, self._retry_after = self._retry_after, None
+        if not retry_after or retry_after < 0:
+            return None
+        return retry_after + random.uniform(0, retry_after)
+
     @salt.ext.tornado.gen.coroutine
     def sign_in(self, timeout=60, safe=True, tries=1, channel=None):
         '''
@@ -743,6 +810,8 @@ class AsyncAuth(object):
                 # has the master returned that its maxed out with minions?
                 elif payload['load']['ret'] == 'full':
                     raise salt.ext.tornado.gen.Return('full')
+                elif self._busy(payload['load']):
+                    raise salt.ext.tornado.gen.Return('retry')
                 else:
                     log.error(
                         'The Salt Master has cached the public key for this '
@@ -773,6 +842,10 @@ class AsyncAuth(object):
                 if salt.utils.crypt.pem_finger(m_pub_fn, sum_type=self.opts['hash_type']) != self.opts['master_finger']:
                     self._finger_fail(self.opts['master_finger'], m_pub_fn)
         auth['publish_port'] = payload['publish_port']
+        if payload.get('aead') in sign_in_payload.get('aead', ()):
+            auth['aead'] = payload['aead']
+        if payload.get('compress') in sign_in_payload.get('compress', ()):
+            auth['compress'] = payload['compress']
         raise salt.ext.tornado.gen.Return(auth)
 
     def get_keys(self):
@@ -836,6 +909,9 @@ class AsyncAuth(object):
             pass
         with salt.utils.files.fopen(self.pub_path) as f:
             payload['pub'] = f.read()
+        if self.opts.get('aes_gcm') and HAS_AESGCM:
+            payload['aead'] = ['aes-gcm']
+        payload['compress'] = COMPRESSIONS
         return payload
 
     def decrypt_aes(self, payload, master_pub=True):
@@ -1184,6 +1260,8 @@ class SAuth(AsyncAuth):
         self.serial = salt.payload.Serial(self.opts)
         self.pub_path = os.path.join(self.opts['pki_dir'], 'minion.pub')
         self.rsa_path = os.path.join(self.opts['pki_dir'], 'minion.pem')
+        # The number of seconds the master asked to wait before signing in again
+        self._retry_after = None
         if 'syndic_master' in self.opts:
             self.mpub = 'syndic_master.pub'
         elif 'alert_master' in self.opts:
@@ -1223,6 +1301,11 @@ class SAuth(AsyncAuth):
             while True:
                 creds = self.sign_in(channel=channel)
                 if creds == 'retry':
+                    retry_wait = self._retry_wait()
+                    if retry_wait:
+                        log.info('Waiting %s seconds before retry.', retry_wait)
+                        time.sleep(retry_wait)
+                        continue
                     if self.opts.get('caller'):
                         # We have a list of masters, so we should break
                         # and try the next one in the list.
@@ -1322,6 +1405,8 @@ class SAuth(AsyncAuth):
                 # has the master returned that its maxed out with minions?
                 elif payload['load']['ret'] == 'full':
                     return 'full'
+                elif self._busy(payload['load']):
+                    return 'retry'
                 else:
                     log.error(
                         'The Salt Master has cached the public key for this '
@@ -1355,6 +1440,10 @@ class SAuth(AsyncAuth):
                 if salt.utils.crypt.pem_finger(m_pub_fn, sum_type=self.opts['hash_type']) != self.opts['master_finger']:
                     self._finger_fail(self.opts['master_finger'], m_pub_fn)
         auth['publish_port'] = payload['publish_port']
+        if payload.get('aead') in sign_in_payload.get('aead', ()):
+            auth['aead'] = payload['aead']
+        if payload.get('compress') in sign_in_payload.get('compress', ()):
+            auth['compress'] = payload['compress']
         return auth
 
 
@@ -1364,17 +1453,30 @@ class Crypticle(object):
 
     Encryption algorithm: AES-CBC
     Signing algorithm: HMAC-SHA256
+
+    With ``aead=True``, AES-GCM is used instead, with a key derived from the
+    signing key. It needs the cryptography library.
+
+    The serialized payloads can be compressed before they are encrypted. The
+    pad in front of a payload tells how it was compressed.
     '''
 
     PICKLE_PAD = b'pickle::'
+    COMPRESS_PADS = {'zlib': b'zlib::', 'zstd': b'zstd::'}
+    COMPRESS_SAMPLE_SIZE = 16384
     AES_BLOCK_SIZE = 16
     SIG_SIZE = hashlib.sha256().digest_size
+    AEAD_NONCE_SIZE = 12
+    AEAD_TAG_SIZE = 16
 
     def __init__(self, opts, key_string, key_size=192):
         self.key_string = key_string
         self.keys = self.extract_keys(self.key_string, key_size)
         self.key_size = key_size
         self.serial = salt.payload.Serial(opts)
+        self._aead_key = None
+        self.compress_threshold = opts.get('payload_compression_threshold', 16384)
+        self.max_size = opts.get('payload_max_size', 100 * 1024 * 1024)
 
     @classmethod
     def generate_key_string(cls, key_size=192):
@@ -1394,79 +1496,210 @@ class Crypticle(object):
         assert len(key) == key_size / 8 + cls.SIG_SIZE, 'invalid key'
         return key[:-cls.SIG_SIZE], key[-cls.SIG_SIZE:]
 
-    def encrypt(self, data):
+    @staticmethod
+    def _view(data):
+        '''
+        Return a memoryview of the data, to slice it without copying it
+        '''
+        if isinstance(data, six.text_type):
+            data = salt.utils.stringutils.to_bytes(data)
+        return memoryview(data)
+
+    def _cbc_input(self, view):
+        # PyCrypto, unlike M2Crypto and PyCryptodome, wants bytes
+        if HAS_M2 or not HAS_CDOME:
+            return view.tobytes()
+        return view
+
+    def _get_aead_key(self):
+        if not HAS_AESGCM:
+            raise AuthenticationError('AES-GCM requires the cryptography library')
+        if self._aead_key is None:
+            # Derive a key of its own so that no key is used by two modes
+            self._aead_key = hmac.new(
+                self.keys[1], b'salt-aes-gcm', hashlib.sha256).digest()
+        return self._aead_key
+
+    def encrypt(self, data, aead=False):
         '''
-        encrypt data with AES-CBC and sign it with HMAC-SHA256
+        encrypt data with AES-CBC and sign it with HMAC-SHA256, or encrypt it
+        with AES-GCM when aead is True
         '''
+        return self._encrypt([data], aead)
+
+    def _encrypt(self, chunks, aead=False):
+        '''
+        Encrypt the concatenation of the chunks without concatenating them
+        '''
+        if aead:
+            nonce = os.urandom(self.AEAD_NONCE_SIZE)
+            encryptor = Cipher(algorithms.AES(self._get_aead_key()),
+                               modes.GCM(nonce),
+                               backend=default_backend()).encryptor()
+            parts = [nonce]
+            parts.extend(encryptor.update(chunk) for chunk in chunks)
+            parts.append(encryptor.finalize())
+            parts.append(encryptor.tag)
+            return b''.join(parts)
+
         aes_key, hmac_key = self.keys
-        pad = self.AES_BLOCK_SIZE - len(data) % self.AES_BLOCK_SIZE
-        if six.PY2:
-            data = data + pad * chr(pad)
-        else:
-            data = data + salt.utils.stringutils.to_bytes(pad * chr(pad))
+        size = sum(len(chunk) for chunk in chunks)
+        pad = self.AES_BLOCK_SIZE - size % self.AES_BLOCK_SIZE
+        padding = bytes(bytearray([pad] * pad))
         iv_bytes = os.urandom(self.AES_BLOCK_SIZE)
+        parts = [iv_bytes]
         if HAS_M2:
             cypher = EVP.Cipher(alg='aes_192_cbc', key=aes_key, iv=iv_bytes, op=1, padding=False)
-            encr = cypher.update(data)
-            encr += cypher.final()
+            parts.extend(cypher.update(chunk) for chunk in chunks)
+            parts.append(cypher.update(padding))
+            parts.append(cypher.final())
         else:
             cypher = AES.new(aes_key, AES.MODE_CBC, iv_bytes)
-            encr = cypher.encrypt(data)
-        data = iv_bytes + encr
-        sig = hmac.new(hmac_key, data, hashlib.sha256).digest()
-        return data + sig
+            # The cipher takes whole blocks, only the bytes of the blocks
+            # which straddle two chunks are copied
+            tail = b''
+            for chunk in chunks:
+                view = self._view(chunk)
+                if tail:
+                    fill = self.AES_BLOCK_SIZE - len(tail)
+                    tail += view[:fill].tobytes()
+                    view = view[fill:]
+                    if len(tail) < self.AES_BLOCK_SIZE:
+                        continue
+                    parts.append(cypher.encrypt(tail))
+                whole = len(view) - len(view) % self.AES_BLOCK_SIZE
+                if whole:
+                    parts.append(cypher.encrypt(self._cbc_input(view[:whole])))
+                tail = view[whole:].tobytes()
+            parts.append(cypher.encrypt(tail + padding))
+        mac = hmac.new(hmac_key, digestmod=hashlib.sha256)
+        for part in parts:
+            mac.update(part)
+        parts.append(mac.digest())
+        return b''.join(parts)
+
+    def decrypt(self, data, aead=False):
+        '''
+        verify HMAC-SHA256 signature and decrypt data with AES-CBC, or decrypt
+        and verify data with AES-GCM when aead is True
+        '''
+        return self._decrypt(data, aead).tobytes()
 
-    def decrypt(self, data):
+    def _decrypt(self, data, aead=False):
         '''
-        verify HMAC-SHA256 signature and decrypt data with AES-CBC
+        Return a memoryview of the decrypted data
         '''
-        aes_key, hmac_key = self.keys
-        sig = data[-self.SIG_SIZE:]
-        data = data[:-self.SIG_SIZE]
-        if six.PY3 and not isinstance(data, bytes):
-            data = salt.utils.stringutils.to_bytes(data)
-        mac_bytes = hmac.new(hmac_key, data, hashlib.sha256).digest()
-        if len(mac_bytes) != len(sig):
-            log.debug('Failed to authenticate message')
-            raise AuthenticationError('message authentication failed')
-        result = 0
+        view = self._view(data)
+        if aead:
+            if len(view) < self.AEAD_NONCE_SIZE + self.AEAD_TAG_SIZE:
+                log.debug('Failed to authenticate message')
+                raise AuthenticationError('message authentication failed')
+            decryptor = Cipher(
+                algorithms.AES(self._get_aead_key()),
+                modes.GCM(view[:self.AEAD_NONCE_SIZE].tobytes(),
+                          view[-self.AEAD_TAG_SIZE:].tobytes()),
+                backend=default_backend()).decryptor()
+            data = decryptor.update(view[self.AEAD_NONCE_SIZE:-self.AEAD_TAG_SIZE])
+            try:
+                final = decryptor.finalize()
+            except InvalidTag:
+                log.debug('Failed to authenticate message')
+                raise AuthenticationError('message authentication failed')
+            if final:
+                data += final
+            return memoryview(data)
 
-        if six.PY2:
-            for zipped_x, zipped_y in zip(mac_bytes, sig):
-                result |= ord(zipped_x) ^ ord(zipped_y)
-        else:
-            for zipped_x, zipped_y in zip(mac_bytes, sig):
-                result |= zipped_x ^ zipped_y
-        if result != 0:
+        aes_key, hmac_key = self.keys
+        sig = view[-self.SIG_SIZE:].tobytes()
+        view = view[:-self.SIG_SIZE]
+        mac_bytes = hmac.new(hmac_key, view, hashlib.sha256).digest()
+        if not hmac.compare_digest(mac_bytes, sig):
             log.debug('Failed to authenticate message')
             raise AuthenticationError('message authentication failed')
-        iv_bytes = data[:self.AES_BLOCK_SIZE]
-        data = data[self.AES_BLOCK_SIZE:]
+        iv_bytes = view[:self.AES_BLOCK_SIZE].tobytes()
+        view = view[self.AES_BLOCK_SIZE:]
         if HAS_M2:
             cypher = EVP.Cipher(alg='aes_192_cbc', key=aes_key, iv=iv_bytes, op=0, padding=False)
-            encr = cypher.update(data)
-            data = encr + cypher.final()
+            data = cypher.update(view.tobytes())
+            data += cypher.final()
         else:
             cypher = AES.new(aes_key, AES.MODE_CBC, iv_bytes)
-            data = cypher.decrypt(data)
-        if six.PY2:
-            return data[:-ord(data[-1])]
-        else:
-            return data[:-data[-1]]
+            data = cypher.decrypt(self._cbc_input(view))
+        return memoryview(data)[:-ord(data[-1:])]
+
+    def dumps(self, obj, aead=False, compress=None):
+        '''
+        Serialize and encrypt a python object. With ``compress`` set to one of
+        the ``COMPRESSIONS``, a payload at least as large as the compression
+        threshold is compressed before it is encrypted.
+        '''
+        serialized = self.serial.dumps(obj)
+        if compress in COMPRESSIONS and \
+                len(serialized) >= self.compress_threshold and \
+                self._compressible(serialized):
+            if compress == 'zstd':
+                compressed = zstandard.ZstdCompressor().compress(serialized)
+            else:
+                compressed = zlib.compress(serialized, 1)
+            # Incompressible payloads are sent as they are
+            if len(compressed) < len(serialized):
+                return self._encrypt([self.COMPRESS_PADS[compress], compressed], aead)
+        return self._encrypt([self.PICKLE_PAD, serialized], aead)
 
-    def dumps(self, obj):
+    def _compressible(self, serialized):
         '''
-        Serialize and encrypt a python object
+        Check whether a large payload is worth compressing, by compressing a
+        sample from its middle. Compressing an already compressed file takes
+        longer than the encryption and saves nothing.
         '''
-        return self.encrypt(self.PICKLE_PAD + self.serial.dumps(obj))
+        size = self.COMPRESS_SAMPLE_SIZE
+        if len(serialized) < 4 * size:
+            return True
+        start = (len(serialized) - size) // 2
+        sample = serialized[start:start + size]
+        return len(zlib.compress(sample, 1)) < 0.9 * size
 
-    def loads(self, data, raw=False):
+    def loads(self, data, raw=False, aead=False):
         '''
         Decrypt and un-serialize a python object
         '''
-        data = self.decrypt(data)
+        data = self._decrypt(data, aead)
         # simple integrity check to verify that we got meaningful data
-        if not data.startswith(self.PICKLE_PAD):
-            return {}
-        load = self.serial.loads(data[len(self.PICKLE_PAD):], raw=raw)
-        return load
+        if data[:len(self.PICKLE_PAD)] == self.PICKLE_PAD:
+            return self.serial.loads(data[len(self.PICKLE_PAD):], raw=raw)
+        for compress in COMPRESSIONS:
+            pad = self.COMPRESS_PADS[compress]
+            if data[:len(pad)] == pad:
+                data = self._decompress(compress, data[len(pad):].tobytes())
+                return self.serial.loads(data, raw=raw)
+        return {}
+
+    def _decompress(self, compress, data):
+        '''
+        Decompress a payload, refusing to decompress more than
+        ``payload_max_size`` bytes so that a small payload can't make the
+        receiver run out of memory
+        '''
+        try:
+            if compress == 'zstd':
+                # The output size is only capped for the frames which don't
+                # tell their content size
+                if zstandard.frame_content_size(data) > self.max_size:
+                    data = None
+                else:
+                    data = zstandard.ZstdDecompressor().decompress(
+                        data, max_output_size=self.max_size)
+            else:
+                decompressor = zlib.decompressobj()
+                data = decompressor.decompress(data, self.max_size)
+                if decompressor.unconsumed_tail:
+                    data = None
+        except DECOMPRESSION_ERRORS as exc:
+            raise SaltDeserializationError(
+                'Unable to decompress the {0} compressed payload: '
+                '{1}'.format(compress, exc))
+        if data is None:
+            raise SaltDeserializationError(
+                'The {0} compressed payload decompresses to more than {1} '
+                'bytes'.format(compress, self.max_size))
+        return data
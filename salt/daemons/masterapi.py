@@ -601,8 +601,9 @@ class RemoteFuncs(object):
                 )
         minions = _res['minions']
         minion_side_acl = {}  # Cache minion-side ACL
-        for minion in minions:
-            mine_data = self.cache.fetch('minions/{0}'.format(minion), 'mine')
+        fetched = self.cache.iter_fetch_many(
+            [('minions/{0}'.format(minion), 'mine') for minion in minions])
+        for minion, (_, mine_data) in zip(minions, fetched):
             if not isinstance(mine_data, dict):
                 continue
             for function in functions_allowed:
@@ -763,9 +764,14 @@ class RemoteFuncs(object):
                 pillar_override=load.get('pillar_override', {}))
         data = pillar.compile_pillar()
         if self.opts.get('minion_data_cache', False):
+            mdata = {'grains': load['grains'], 'pillar': data}
             self.cache.store('minions/{0}'.format(load['id']),
                              'data',
-                             {'grains': load['grains'], 'pillar': data})
+                             mdata)
+            salt.utils.minions.update_minion_data_index(self.opts,
+                                                        self.cache,
+                                                        load['id'],
+                                                        mdata)
             if self.opts.get('minion_data_cache_events') is True:
                 self.event.fire_event({'comment': 'Minion data cache refresh'}, salt.utils.event.tagify(load['id'], 'refresh', 'minion'))
         return data
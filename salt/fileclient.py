@@ -5,6 +5,7 @@ Classes that manage file clients
 from __future__ import absolute_import, print_function, unicode_literals
 
 # Import python libs
+import collections
 import contextlib
 import errno
 import logging
@@ -13,17 +14,19 @@ import string
 import shutil
 import ftplib
 from salt.ext.tornado.httputil import parse_response_start_line, HTTPHeaders, HTTPInputError
+import salt.ext.tornado.gen
 import salt.utils.atomicfile
 
 # Import salt libs
 from salt.exceptions import (
-    CommandExecutionError, MinionError
+    CommandExecutionError, MinionError, SaltClientError
 )
 import salt.client
 import salt.loader
 import salt.payload
 import salt.transport.client
 import salt.fileserver
+import salt.utils.asynchronous
 import salt.utils.data
 import salt.utils.files
 import salt.utils.gzip_util
@@ -1070,6 +1073,7 @@ class RemoteClient(Client):
                 mode_server = None
         else:
             hash_server = self.hash_file(path, saltenv)
+            stat_server = None
             mode_server = None
 
         # Check if file exists on server, before creating files and
@@ -1138,6 +1142,18 @@ class RemoteClient(Client):
             gzip = int(gzip)
             load['gzip'] = gzip
 
+        window = self.opts.get('file_transfer_window', 1)
+        if window > 1:
+            try:
+                size_server = stat_server[6]
+            except (IndexError, TypeError):
+                size_server = None
+            if size_server is not None:
+                ret = self._get_file_windowed(
+                    load, dest, makedirs, cachedir, hash_server, size_server, window)
+                if ret is not None:
+                    return ret
+
         fn_ = None
         if dest:
             destdir = os.path.dirname(dest)
@@ -1245,6 +1261,164 @@ class RemoteClient(Client):
 
         return dest
 
+    @staticmethod
+    def _decode_chunk(data):
+        '''
+        Standardize the keys of a _serve_file response on strings
+        '''
+        if six.PY3:
+            # Sometimes the source is local (eg when using
+            # 'salt.fileserver.FSChan'), in which case the keys are
+            # already strings. Sometimes the source is remote, in which
+            # case the keys are bytes due to raw mode.
+            data = decode_dict_keys_to_str(data)
+        return data
+
+    @classmethod
+    def _chunk_data(cls, data):
+        '''
+        Return the file data of a _serve_file response as bytes
+        '''
+        data = cls._decode_chunk(data)
+        if data.get('gzip', None):
+            data = salt.utils.gzip_util.uncompress(data['data'])
+        else:
+            data = data['data']
+        if six.PY3 and isinstance(data, str):
+            data = data.encode()
+        return data
+
+    @salt.ext.tornado.gen.coroutine
+    def _fetch_chunks(self, channel, load, fn_, loc, size, chunk, window):
+        '''
+        Write the file from offset ``loc`` on, keeping up to ``window`` chunk
+        requests in flight. The chunks are written in order as they complete.
+        '''
+        pending = collections.deque()
+        next_loc = loc
+        while pending or next_loc < size:
+            while len(pending) < window and next_loc < size:
+                pending.append(
+                    (next_loc, channel.send(dict(load, loc=next_loc), raw=True)))
+                next_loc += chunk
+            chunk_loc, future = pending.popleft()
+            data = self._chunk_data((yield future))
+            end = min(chunk_loc + chunk, size)
+            while True:
+                fn_.write(data)
+                chunk_loc += len(data)
+                if chunk_loc >= end:
+                    break
+                if not data:
+                    raise SaltClientError(
+                        'File {0} changed on the master during the '
+                        'transfer'.format(load['path'])
+                    )
+                # The master served a shorter chunk than expected, fill the
+                # gap before the next chunk
+                data = self._chunk_data(
+                    (yield channel.send(dict(load, loc=chunk_loc), raw=True)))
+
+    def _get_file_windowed(self, load, dest, makedirs, cachedir,
+                           hash_server, size, window):
+        '''
+        Download a file with up to ``window`` chunk requests in flight. A
+        partial download left behind by an earlier attempt is resumed if the
+        master reports the same hash for that part of the file. The whole
+        file is verified against the master's hash once it is complete.
+
+        Returns None if the file can't be transferred this way, in which case
+        the caller falls back to requesting the chunks one by one.
+        '''
+        try:
+            channel = self.channel.asynchronous
+            io_loop = self.channel.io_loop
+        except AttributeError:
+            # Not a remote channel (e.g. salt.fileserver.FSChan)
+            return None
+        # The first chunk tells the cache location and the chunk size used
+        # by the master
+        try:
+            first = self._decode_chunk(self.channel.send(dict(load, loc=0), raw=True))
+            first_data = self._chunk_data(first)
+        except (TypeError, KeyError, AttributeError):
+            return None
+        chunk = len(first_data)
+        if not first.get('dest') or (not chunk and size):
+            return None
+
+        if dest:
+            destdir = os.path.dirname(dest)
+            if not os.path.isdir(destdir):
+                if makedirs:
+                    try:
+                        os.makedirs(destdir)
+                    except OSError as exc:
+                        if exc.errno != errno.EEXIST:  # ignore if it was there already
+                            raise
+                else:
+                    return False
+        else:
+            with self._cache_loc(
+                    salt.utils.stringutils.to_unicode(first['dest']),
+                    load['saltenv'],
+                    cachedir=cachedir) as cache_dest:
+                dest = cache_dest
+            # If a directory was formerly cached at this path, then
+            # remove it to avoid a traceback trying to write the file
+            if os.path.isdir(dest):
+                salt.utils.files.rm_rf(dest)
+
+        hash_type = hash_server.get('hash_type', 'md5')
+        part = dest + '.part'
+        start = 0
+        if os.path.isfile(part) and 0 < os.path.getsize(part) <= size:
+            part_size = os.path.getsize(part)
+            try:
+                ret = self._decode_chunk(self.channel.send(
+                    dict(load, loc=0, range_hash=part_size), raw=True))
+            except (TypeError, AttributeError):
+                ret = {}
+            if ret.get('range_hsum') and salt.utils.stringutils.to_unicode(ret['range_hsum']) \
+                    == salt.utils.hashutils.get_hash(part, hash_type, size=part_size):
+                log.debug('Resuming download of %s at %d bytes', load['path'], part_size)
+                start = part_size
+
+        for attempt in range(1, 4):
+            try:
+                with salt.utils.files.fopen(part, 'r+b' if start else 'wb') as fn_:
+                    fn_.seek(start)
+                    fn_.truncate()
+                    loc = start
+                    if not start:
+                        fn_.write(first_data)
+                        loc = chunk
+                    with salt.utils.asynchronous.current_ioloop(io_loop):
+                        io_loop.run_sync(
+                            lambda: self._fetch_chunks(
+                                channel, load, fn_, loc, size, chunk, window))
+            except Exception as exc:  # pylint: disable=broad-except
+                # Everything written so far was written in order, pick up
+                # where the transfer stopped
+                log.warning(
+                    'Download of file %s interrupted, attempt %d of 3: %s',
+                    load['path'], attempt, exc
+                )
+                start = os.path.getsize(part) if os.path.isfile(part) else 0
+                continue
+            if salt.utils.hashutils.get_hash(part, hash_type) == hash_server.get('hsum'):
+                salt.utils.files.rename(part, dest)
+                log.info(
+                    'Fetching file from saltenv \'%s\', ** done ** \'%s\'',
+                    load['saltenv'], load['path']
+                )
+                return dest
+            log.warning(
+                'Bad download of file %s, attempt %d of 3', load['path'], attempt
+            )
+            start = 0
+        return False
+
     def file_list(self, saltenv='base', prefix=''):
         '''
         List the files on the master
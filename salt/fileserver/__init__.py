@@ -18,6 +18,7 @@ import time
 import salt.loader
 import salt.utils.data
 import salt.utils.files
+import salt.utils.hashutils
 import salt.utils.path
 import salt.utils.url
 import salt.utils.versions
@@ -32,6 +33,15 @@ except ImportError:
 # Import 3rd-party libs
 from salt.ext import six
 
+try:
+    import pyinotify
+    HAS_PYINOTIFY = True
+    INOTIFY_ADDED = pyinotify.IN_CREATE | pyinotify.IN_MOVED_TO
+    INOTIFY_REMOVED = pyinotify.IN_DELETE | pyinotify.IN_MOVED_FROM
+    INOTIFY_CHANGED = pyinotify.IN_CLOSE_WRITE | pyinotify.IN_ATTRIB
+except ImportError:
+    HAS_PYINOTIFY = False
+
 
 log = logging.getLogger(__name__)
 
@@ -515,6 +525,30 @@ class Fileserver(object):
                 ret[fsb] = self.servers[fstr]()
         return ret
 
+    def inotify_paths(self, back=None):
+        '''
+        Return the directories to watch for all of the enabled fileserver
+        backends which support the inotify update mode
+        '''
+        back = self.backends(back)
+        ret = {}
+        for fsb in back:
+            fstr = '{0}.inotify_paths'.format(fsb)
+            if fstr in self.servers \
+                    and '{0}.inotify_update'.format(fsb) in self.servers:
+                ret[fsb] = self.servers[fstr]()
+        return ret
+
+    def inotify_update(self, back, files):
+        '''
+        Pass the files which inotify reported as changed, added or removed to
+        the named backend
+        '''
+        fstr = '{0}.inotify_update'.format(back)
+        if fstr in self.servers:
+            log.debug('Updating %s fileserver cache from inotify', back)
+            self.servers[fstr](files)
+
     def envs(self, back=None, sources=False):
         '''
         Return the environments for the named backend or all backends
@@ -629,6 +663,11 @@ class Fileserver(object):
     def serve_file(self, load):
         '''
         Serve up a chunk of a file
+
+        The chunk starts at offset ``loc`` of the file, so chunks can be
+        requested in any order. If ``range_hash`` is passed, the hash of the
+        first ``range_hash`` bytes of the file is returned instead, which
+        clients use to check whether a partial download can be resumed.
         '''
         ret = {'data': '',
                'dest': ''}
@@ -645,11 +684,29 @@ class Fileserver(object):
         fnd = self.find_file(load['path'], load['saltenv'])
         if not fnd.get('back'):
             return ret
+        if load.get('range_hash') is not None:
+            return self.__range_hash(load, fnd)
         fstr = '{0}.serve_file'.format(fnd['back'])
         if fstr in self.servers:
             return self.servers[fstr](load, fnd)
         return ret
 
+    def __range_hash(self, load, fnd):
+        '''
+        Return the hash of the first ``range_hash`` bytes of a file
+        '''
+        ret = {'dest': fnd['rel'],
+               'hash_type': self.opts['hash_type']}
+        try:
+            size = int(load['range_hash'])
+            ret['range_hsum'] = salt.utils.hashutils.get_hash(
+                fnd['path'], self.opts['hash_type'], size=size)
+        except (IOError, OSError, TypeError, ValueError) as exc:
+            log.debug('Unable to hash %s: %s', fnd.get('path'), exc)
+            return {'data': '', 'dest': ''}
+        ret['range_size'] = size
+        return ret
+
     def __file_hash_and_stat(self, load):
         '''
         Common code for hashing and stating files
@@ -871,6 +928,153 @@ class Fileserver(object):
         return ret
 
 
+class InotifyWatcher(object):
+    '''
+    Watch the directories of the fileserver backends which support the
+    inotify update mode and pass the changed files to the backends in
+    batches, once no more events arrived for ``latency`` seconds.
+
+    A backend whose directories can't all be watched, or for which events may
+    have been lost because the inotify event queue overflowed, is fully
+    updated every ``poll_interval`` seconds instead.
+    '''
+    def __init__(self, fileserver, watch_paths, latency=0.5, poll_interval=60):
+        self.fileserver = fileserver
+        self.latency = latency
+        self.poll_interval = poll_interval
+        self.pending = {}
+        self.last_event = 0
+        self.polled = set()
+        self.last_poll = 0
+        self.roots = []
+        self.wm = pyinotify.WatchManager()
+        self.notifier = pyinotify.Notifier(self.wm, self._enqueue)
+        mask = INOTIFY_ADDED | INOTIFY_REMOVED | INOTIFY_CHANGED
+        for backend, paths in six.iteritems(watch_paths):
+            for path in sorted(paths):
+                path = os.path.normpath(path)
+                if not os.path.isdir(path):
+                    log.warning(
+                        'Unable to watch %s for the %s fileserver backend, '
+                        'the directory does not exist', path, backend
+                    )
+                    continue
+                if any(path == root or path.startswith(root + os.sep)
+                       for root, _ in self.roots):
+                    # Already watched recursively
+                    self.roots.append((path, backend))
+                    continue
+                watches = self.wm.add_watch(path, mask, rec=True, auto_add=True)
+                failed = sorted(x for x, wd in six.iteritems(watches) if wd < 0)
+                if failed:
+                    self._fallback(
+                        [backend],
+                        'unable to watch {0}'.format(', '.join(failed)))
+                self.roots.append((path, backend))
+        # Longest paths first, so nested roots map to the right backend
+        self.roots.sort(key=lambda item: len(item[0]), reverse=True)
+
+    def _backend(self, path):
+        for root, backend in self.roots:
+            if path == root or path.startswith(root + os.sep):
+                return backend
+        return None
+
+    def _fallback(self, backends, reason):
+        '''
+        Stop relying on inotify for the given backends, which are fully
+        updated from now on
+        '''
+        backends = set(backends) - self.polled
+        if not backends:
+            return
+        log.error(
+            'Falling back to updating the %s fileserver backend%s every %s '
+            'seconds: %s', ', '.join(sorted(backends)),
+            '' if len(backends) == 1 else 's', self.poll_interval, reason
+        )
+        self.polled.update(backends)
+        for backend in backends:
+            self.pending.pop(backend, None)
+        # Update them right away
+        self.last_poll = 0
+
+    def poll(self):
+        '''
+        Fully update the backends which can't rely on inotify
+        '''
+        self.last_poll = time.time()
+        try:
+            self.fileserver.update(back=sorted(self.polled))
+        except Exception:  # pylint: disable=broad-except
+            log.exception(
+                'Uncaught exception while updating %s fileserver cache',
+                ', '.join(sorted(self.polled))
+            )
+
+    def _enqueue(self, event):
+        '''
+        Record an inotify event for the next batch
+        '''
+        if event.mask & pyinotify.IN_Q_OVERFLOW:
+            self._fallback(set(x[1] for x in self.roots),
+                           'the inotify event queue overflowed')
+            return
+        backend = self._backend(event.pathname)
+        if backend is None or backend in self.polled:
+            return
+        if event.mask & INOTIFY_ADDED:
+            kind = 'added'
+        elif event.mask & INOTIFY_REMOVED:
+            kind = 'removed'
+        elif event.mask & INOTIFY_CHANGED:
+            kind = 'changed'
+        else:
+            return
+        files = self.pending.setdefault(
+            backend, {'changed': set(), 'added': set(), 'removed': set()})
+        files[kind].add(event.pathname)
+        self.last_event = time.time()
+
+    def flush(self):
+        '''
+        Pass the pending changes to the backends
+        '''
+        pending, self.pending = self.pending, {}
+        for backend, files in six.iteritems(pending):
+            try:
+                self.fileserver.inotify_update(
+                    backend,
+                    dict((kind, sorted(paths)) for kind, paths in six.iteritems(files)))
+            except Exception:  # pylint: disable=broad-except
+                log.exception(
+                    'Uncaught exception while updating %s fileserver cache '
+                    'from inotify', backend
+                )
+
+    def process(self, timeout=1.0):
+        '''
+        Wait up to ``timeout`` seconds for events and pass the changes on once
+        the events settled
+        '''
+        if self.pending:
+            timeout = min(timeout, self.latency)
+        if self.notifier.check_events(timeout=int(timeout * 1000)):
+            self.notifier.read_events()
+            self.notifier.process_events()
+        if self.pending and time.time() - self.last_event >= self.latency:
+            self.flush()
+        if self.polled and time.time() - self.last_poll >= self.poll_interval:
+            self.poll()
+
+    def run(self):
+        '''
+        Process events forever
+        '''
+        while True:
+            self.process()
+
+
 class FSChan(object):
     '''
     A class that mimics the transport channels allowing for local access to
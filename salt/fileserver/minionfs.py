@@ -32,9 +32,11 @@ from __future__ import absolute_import, print_function, unicode_literals
 # Import python libs
 import os
 import logging
+import shutil
 
 # Import salt libs
 import salt.fileserver
+import salt.utils.event
 import salt.utils.files
 import salt.utils.gzip_util
 import salt.utils.hashutils
@@ -165,6 +167,57 @@ def update():
         pass
 
 
+def inotify_paths():
+    '''
+    Return the directories to watch in the inotify fileserver update mode
+    '''
+    return [os.path.join(__opts__['cachedir'], 'minions')]
+
+
+def inotify_update(files):
+    '''
+    Drop the cached hashes of the pushed files which inotify reported as
+    changed, added or removed
+    '''
+    minions_cache_dir = os.path.join(__opts__['cachedir'], 'minions')
+    hash_cachedir = os.path.join(
+        __opts__['cachedir'], 'minionfs', 'hash', __opts__['minionfs_env'])
+    changed = {'changed': [], 'added': [], 'removed': []}
+    for kind, paths in six.iteritems(files):
+        for path in paths:
+            # <minion>/files/<pushed file>, the rest of the minion data cache
+            # is of no interest here
+            parts = os.path.relpath(path, minions_cache_dir).split(os.sep, 2)
+            if len(parts) < 3 or parts[1] != 'files' or not _is_exposed(parts[0]):
+                continue
+            changed.setdefault(kind, []).append(path)
+            prefix = os.path.join(hash_cachedir, parts[0], parts[2])
+            cache_dir, leaf = os.path.split(prefix)
+            try:
+                cache_files = os.listdir(cache_dir)
+            except OSError:
+                cache_files = []
+            for cache_file in cache_files:
+                if cache_file.startswith(leaf + '.hash.'):
+                    try:
+                        os.remove(os.path.join(cache_dir, cache_file))
+                    except OSError:
+                        pass
+            if os.path.isdir(prefix):
+                shutil.rmtree(prefix, ignore_errors=True)
+
+    if any(changed.values()) and __opts__.get('fileserver_events', False):
+        with salt.utils.event.get_event(
+                'master',
+                __opts__['sock_dir'],
+                __opts__['transport'],
+                opts=__opts__,
+                listen=False) as event:
+            event.fire_event(
+                {'changed': True, 'files': changed, 'backend': 'minionfs'},
+                salt.utils.event.tagify(['minionfs', 'update'], prefix='fileserver'))
+
+
 def file_hash(load, fnd):
     '''
     Return a file hash, the hash type is set in the master config file
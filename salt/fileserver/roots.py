@@ -14,6 +14,12 @@ be in the :conf_master:`fileserver_backend` list to enable this backend.
 
 Fileserver environments are defined using the :conf_master:`file_roots`
 configuration option.
+
+.. versionchanged:: Sodium
+    With :conf_master:`roots_index` enabled, the backend keeps an index of the
+    path, size, mtime and hash of every file in ``file_roots``, refreshed on
+    each fileserver update. File hashes and file lists are served from this
+    index.
 '''
 from __future__ import absolute_import, print_function, unicode_literals
 
@@ -21,9 +27,12 @@ from __future__ import absolute_import, print_function, unicode_literals
 import os
 import errno
 import logging
+import shutil
 
 # Import salt libs
 import salt.fileserver
+import salt.payload
+import salt.utils.atomicfile
 import salt.utils.event
 import salt.utils.files
 import salt.utils.gzip_util
@@ -36,6 +45,10 @@ from salt.ext import six
 
 log = logging.getLogger(__name__)
 
+# The on-disk index as last loaded by this process, along with the stat
+# signature of the index file it was loaded from
+_INDEX = {'stamp': None, 'data': None}
+
 
 def find_file(path, saltenv='base', **kwargs):
     '''
@@ -161,6 +174,11 @@ def update():
 
     # generate the new map
     new_mtime_map = salt.fileserver.generate_mtime_map(__opts__, __opts__['file_roots'])
+    # compare the mtimes in the form they are written to the map file
+    new_mtimes = dict(
+        (file_path, '{0}'.format(mtime))
+        for file_path, mtime in six.iteritems(new_mtime_map)
+    )
 
     old_mtime_map = {}
     # if you have an old map, load that
@@ -171,7 +189,7 @@ def update():
                 try:
                     file_path, mtime = line.replace('\n', '').split(':', 1)
                     old_mtime_map[file_path] = mtime
-                    if mtime != new_mtime_map.get(file_path, mtime):
+                    if mtime != new_mtimes.get(file_path, mtime):
                         data['files']['changed'].append(file_path)
                 except ValueError:
                     # Document the invalid entry in the log
@@ -181,7 +199,7 @@ def update():
                     )
 
     # compare the maps, set changed to the return value
-    data['changed'] = salt.fileserver.diff_mtime_map(old_mtime_map, new_mtime_map)
+    data['changed'] = salt.fileserver.diff_mtime_map(old_mtime_map, new_mtimes)
 
     # compute files that were removed and added
     old_files = set(old_mtime_map.keys())
@@ -201,6 +219,18 @@ def update():
                 )
             )
 
+    if __opts__.get('roots_index', False):
+        _update_index(data['changed'],
+                      files=data['files'],
+                      mtime_map=new_mtime_map)
+
+    _fire_update_event(data)
+
+
+def _fire_update_event(data):
+    '''
+    Fire the fileserver update event, if enabled
+    '''
     if __opts__.get('fileserver_events', False):
         # if there is a change, fire an event
         with salt.utils.event.get_event(
@@ -214,6 +244,227 @@ def update():
                 salt.utils.event.tagify(['roots', 'update'], prefix='fileserver'))
 
 
+def inotify_paths():
+    '''
+    Return the directories to watch in the inotify fileserver update mode
+    '''
+    paths = set()
+    for env_roots in six.itervalues(__opts__['file_roots']):
+        paths.update(env_roots)
+    return sorted(paths)
+
+
+def inotify_update(files):
+    '''
+    Invalidate the caches for the files which inotify reported as changed,
+    added or removed. Only the file list caches of the saltenvs in which
+    files were added or removed are dropped, and only the hash cache entries
+    below the reported paths.
+    '''
+    structural = set(files.get('added', [])) | set(files.get('removed', []))
+    affected = {}
+    for paths in six.itervalues(files):
+        for path in paths:
+            for saltenv, env_roots in six.iteritems(__opts__['file_roots']):
+                for root in env_roots:
+                    root = os.path.normpath(root)
+                    if not path.startswith(root + os.sep):
+                        continue
+                    env = affected.setdefault(
+                        saltenv, {'paths': set(), 'structural': False})
+                    env['paths'].add(_translate_sep(os.path.relpath(path, root)))
+                    if path in structural:
+                        env['structural'] = True
+    if not affected:
+        return
+
+    list_cachedir = os.path.join(__opts__['cachedir'], 'file_lists', 'roots')
+    hash_cachedir = os.path.join(__opts__['cachedir'], 'roots', 'hash')
+    for saltenv, env in six.iteritems(affected):
+        if env['structural']:
+            list_cache = os.path.join(
+                list_cachedir,
+                '{0}.p'.format(salt.utils.files.safe_filename_leaf(saltenv)))
+            try:
+                os.remove(list_cache)
+            except OSError:
+                pass
+        for rel_path in env['paths']:
+            # The hash cache of the path itself, and of everything below it
+            # if it is a directory
+            prefix = os.path.join(hash_cachedir, saltenv, os.path.normpath(rel_path))
+            cache_dir, leaf = os.path.split(prefix)
+            try:
+                cache_files = os.listdir(cache_dir)
+            except OSError:
+                cache_files = []
+            for cache_file in cache_files:
+                if cache_file.startswith(leaf + '.hash.'):
+                    try:
+                        os.remove(os.path.join(cache_dir, cache_file))
+                    except OSError:
+                        pass
+            if os.path.isdir(prefix):
+                shutil.rmtree(prefix, ignore_errors=True)
+
+    if __opts__.get('roots_index', False):
+        _update_index(True, affected)
+
+    _fire_update_event({
+        'changed': True,
+        'files': files,
+        'backend': 'roots'})
+
+
+def _index_path():
+    return os.path.join(__opts__['cachedir'], 'roots', 'index.p')
+
+
+def _index_settings():
+    '''
+    The settings the index was built with, an index built with different
+    settings is ignored
+    '''
+    return {
+        'file_roots': __opts__['file_roots'],
+        'hash_type': __opts__['hash_type'],
+        'followsymlinks': __opts__['fileserver_followsymlinks'],
+        'ignoresymlinks': __opts__['fileserver_ignoresymlinks'],
+        'ignore_regex': __opts__.get('file_ignore_regex'),
+        'ignore_glob': __opts__.get('file_ignore_glob'),
+    }
+
+
+def _load_index():
+    '''
+    Return the index, reloading it if the index file was replaced since it
+    was last read. Returns None if the index is disabled, missing or stale.
+    '''
+    if not __opts__.get('roots_index', False):
+        return None
+    index_path = _index_path()
+    try:
+        stat = os.stat(index_path)
+    except OSError:
+        return None
+    stamp = (stat.st_ino, stat.st_size, stat.st_mtime)
+    if _INDEX['stamp'] != stamp:
+        try:
+            with salt.utils.files.fopen(index_path, 'rb') as fp_:
+                data = salt.payload.Serial(__opts__).loads(fp_.read(),
+                                                           encoding='utf-8')
+        except Exception as exc:  # pylint: disable=broad-except
+            log.debug('Unable to read the roots index %s: %s', index_path, exc)
+            return None
+        _INDEX['stamp'] = stamp
+        _INDEX['data'] = data
+    data = _INDEX['data']
+    if not isinstance(data, dict) or data.get('settings') != _index_settings():
+        return None
+    return data
+
+
+def _index_env(index, saltenv):
+    '''
+    Return the index of a saltenv, honoring the __env__ file_roots mapping
+    '''
+    if saltenv not in __opts__['file_roots'] and '__env__' in __opts__['file_roots']:
+        saltenv = '__env__'
+    return index['envs'].get(saltenv)
+
+
+def _index_entry(abs_path, entry, hash_type):
+    '''
+    Return the index entry of a file, reusing the old entry if the file's
+    size and mtime did not change. Returns None if the file can't be read.
+    '''
+    try:
+        stat = os.stat(abs_path)
+    except OSError:
+        # Dangling symlink
+        return None
+    if entry is not None \
+            and entry[0] == abs_path \
+            and entry[1] == stat.st_size \
+            and entry[2] == stat.st_mtime:
+        return entry
+    try:
+        hsum = salt.utils.hashutils.get_hash(abs_path, hash_type)
+    except (IOError, OSError) as exc:
+        log.debug('roots: Unable to hash %s: %s', abs_path, exc)
+        return None
+    return [abs_path, stat.st_size, stat.st_mtime, hsum]
+
+
+def _update_index(changed, affected=None, files=None, mtime_map=None):
+    '''
+    Bring the on-disk index in line with the file_roots. Nothing is done
+    unless the mtime map changed, and then only the files whose size or mtime
+    differ from the old index are hashed again.
+
+    ``affected`` limits the update to the saltenvs reported by inotify. A
+    saltenv in which files were only modified has just these files rehashed,
+    the others are walked again.
+
+    ``files`` are the changed, added and removed files found by comparing the
+    old and new ``mtime_map`` of a fileserver update. Only these files are
+    stat'd and hashed again, and the file lists are patched with them instead
+    of walking the file_roots again.
+    '''
+    old = _load_index()
+    if old is not None and not changed:
+        return
+    settings = _index_settings()
+    index = {'settings': settings, 'envs': {}}
+    if files is not None and old is not None:
+        mtime_map = set(os.path.normpath(path) for path in mtime_map)
+    for saltenv in __opts__['file_roots']:
+        old_env = _index_env(old, saltenv) if old is not None else None
+        old_files = old_env['hashes'] if old_env else {}
+        if files is not None and old_env is not None:
+            index['envs'][saltenv] = _patch_index_env(
+                saltenv, old_env, files, mtime_map, settings['hash_type'])
+            continue
+        if affected is not None and old_env is not None:
+            if saltenv not in affected:
+                index['envs'][saltenv] = old_env
+                continue
+            if not affected[saltenv]['structural']:
+                hashes = dict(old_files)
+                for rel_path in affected[saltenv]['paths']:
+                    if rel_path not in hashes:
+                        continue
+                    entry = _index_entry(hashes[rel_path][0],
+                                         hashes[rel_path],
+                                         settings['hash_type'])
+                    if entry is None:
+                        hashes.pop(rel_path)
+                    else:
+                        hashes[rel_path] = entry
+                index['envs'][saltenv] = dict(old_env, hashes=hashes)
+                continue
+        lists, paths = _walk_file_lists(saltenv)
+        hashes = {}
+        for rel_path, abs_path in six.iteritems(paths):
+            entry = _index_entry(abs_path,
+                                 old_files.get(rel_path),
+                                 settings['hash_type'])
+            if entry is not None:
+                hashes[rel_path] = entry
+        lists['hashes'] = hashes
+        index['envs'][saltenv] = lists
+
+    index_path = _index_path()
+    index_dir = os.path.dirname(index_path)
+    if not os.path.isdir(index_dir):
+        os.makedirs(index_dir)
+    serial = salt.payload.Serial(__opts__)
+    with salt.utils.atomicfile.atomic_open(index_path, 'wb') as fp_:
+        serial.dump(index, fp_)
+    # Force the next lookup to read back what was written
+    _INDEX['stamp'] = None
+
+
 def file_hash(load, fnd):
     '''
     Return a file hash, the hash type is set in the master config file
@@ -230,6 +481,21 @@ def file_hash(load, fnd):
         saltenv = '__env__'
     ret = {}
 
+    index = _load_index()
+    if index is not None and path:
+        env_index = _index_env(index, saltenv)
+        entry = env_index['hashes'].get(_translate_sep(fnd['rel'])) \
+            if env_index else None
+        if entry is not None and entry[0] == path:
+            # The file may have changed since the index was updated
+            try:
+                stat = os.stat(path)
+            except OSError:
+                return ret
+            if entry[1] == stat.st_size and entry[2] == stat.st_mtime:
+                return {'hash_type': __opts__['hash_type'],
+                        'hsum': entry[3]}
+
     # if the file doesn't exist, we can't get a hash
     if not path or not os.path.isfile(path):
         return ret
@@ -293,6 +559,204 @@ def file_hash(load, fnd):
     return ret
 
 
+def _translate_sep(path):
+    '''
+    Translate path separators for Windows masterless minions
+    '''
+    return path.replace('\\', '/') if os.path.sep == '\\' else path
+
+
+def _patch_index_env(saltenv, env, files, mtime_map, hash_type):
+    '''
+    Return the index of a saltenv patched with the files a fileserver update
+    found changed, added or removed. ``mtime_map`` is the set of the
+    normalized paths of the files now in the file_roots.
+    '''
+    roots = __opts__['file_roots'][saltenv]
+    touched = set()
+    for paths in six.itervalues(files):
+        for path in paths:
+            path = os.path.normpath(path)
+            for root in roots:
+                if path.startswith(os.path.normpath(root) + os.sep):
+                    rel_path = _translate_sep(os.path.relpath(path, root))
+                    if not salt.fileserver.is_file_ignored(__opts__, rel_path):
+                        touched.add(rel_path)
+    if not touched:
+        return env
+
+    file_list = set(env['files'])
+    dirs = set(env['dirs'])
+    empty_dirs = set(env['empty_dirs'])
+    links = dict(env['links'])
+    hashes = dict(env['hashes'])
+    gone = set()
+    for rel_path in touched:
+        # The file is served from the first root which has it
+        for root in roots:
+            abs_path = os.path.join(root, os.path.normpath(rel_path))
+            if os.path.normpath(abs_path) in mtime_map:
+                break
+        else:
+            abs_path = None
+        is_link = abs_path is not None and salt.utils.path.islink(abs_path)
+        entry = None
+        if abs_path is not None \
+                and not (is_link and __opts__['fileserver_ignoresymlinks']):
+            entry = _index_entry(abs_path, hashes.get(rel_path), hash_type)
+        links.pop(rel_path, None)
+        if entry is None:
+            file_list.discard(rel_path)
+            hashes.pop(rel_path, None)
+            gone.add(rel_path)
+            continue
+        file_list.add(rel_path)
+        hashes[rel_path] = entry
+        if is_link:
+            link_dest = _link_dest(root, abs_path)
+            if link_dest is not None:
+                links[rel_path] = link_dest
+        parent = rel_path.rpartition('/')[0]
+        while parent:
+            dirs.add(parent)
+            empty_dirs.discard(parent)
+            parent = parent.rpartition('/')[0]
+
+    # The directories of the removed files may be empty or gone now
+    parents = set()
+    for rel_path in gone:
+        parent = rel_path.rpartition('/')[0]
+        while parent and parent not in parents:
+            parents.add(parent)
+            parent = parent.rpartition('/')[0]
+    for rel_path in parents:
+        found = empty = False
+        for root in roots:
+            try:
+                items = os.listdir(os.path.join(root, os.path.normpath(rel_path)))
+            except OSError:
+                continue
+            found = True
+            empty = empty or not items
+        if not found:
+            dirs.discard(rel_path)
+            empty_dirs.discard(rel_path)
+        elif empty:
+            empty_dirs.add(rel_path)
+
+    return dict(env,
+                files=sorted(file_list),
+                dirs=sorted(dirs),
+                empty_dirs=sorted(empty_dirs),
+                links=links,
+                hashes=hashes)
+
+
+def _link_dest(fs_root, abs_path):
+    '''
+    Return the destination of a symlink, or None if it points outside of the
+    root dir of the fileserver
+    '''
+    link_dest = salt.utils.path.readlink(abs_path)
+    log.trace(
+        'roots: %s symlink destination is %s',
+        abs_path, link_dest
+    )
+    if salt.utils.platform.is_windows() \
+            and link_dest.startswith('\\\\'):
+        # Symlink points to a network path. Since you can't
+        # join UNC and non-UNC paths, just assume the original
+        # path.
+        log.trace(
+            'roots: %s is a UNC path, using %s instead',
+            link_dest, abs_path
+        )
+        link_dest = abs_path
+    if link_dest.startswith('..'):
+        joined = os.path.join(abs_path, link_dest)
+    else:
+        joined = os.path.join(
+            os.path.dirname(abs_path), link_dest
+        )
+    rel_dest = _translate_sep(
+        os.path.relpath(
+            os.path.realpath(os.path.normpath(joined)),
+            os.path.realpath(fs_root)
+        )
+    )
+    log.trace(
+        'roots: %s relative path is %s',
+        abs_path, rel_dest
+    )
+    if rel_dest.startswith('..'):
+        # Only count the link if it does not point
+        # outside of the root dir of the fileserver
+        # (i.e. the "path" variable)
+        return None
+    return link_dest
+
+
+def _walk_file_lists(saltenv):
+    '''
+    Walk the file_roots of a saltenv and return the file lists, along with a
+    dict mapping the relative path of each file to the full path it is served
+    from.
+    '''
+    ret = {
+        'files': set(),
+        'dirs': set(),
+        'empty_dirs': set(),
+        'links': {}
+    }
+    paths = {}
+
+    def _add_to(tgt, fs_root, parent_dir, items):
+        '''
+        Add the files to the target set
+        '''
+        for item in items:
+            abs_path = os.path.join(parent_dir, item)
+            log.trace('roots: Processing %s', abs_path)
+            is_link = salt.utils.path.islink(abs_path)
+            log.trace(
+                'roots: %s is %sa link',
+                abs_path, 'not ' if not is_link else ''
+            )
+            if is_link and __opts__['fileserver_ignoresymlinks']:
+                continue
+            rel_path = _translate_sep(os.path.relpath(abs_path, fs_root))
+            log.trace('roots: %s relative path is %s', abs_path, rel_path)
+            if salt.fileserver.is_file_ignored(__opts__, rel_path):
+                continue
+            tgt.add(rel_path)
+            if tgt is ret['files']:
+                paths.setdefault(rel_path, abs_path)
+            try:
+                if not os.listdir(abs_path):
+                    ret['empty_dirs'].add(rel_path)
+            except Exception:  # pylint: disable=broad-except
+                # Generic exception because running os.listdir() on a
+                # non-directory path raises an OSError on *NIX and a
+                # WindowsError on Windows.
+                pass
+            if is_link:
+                link_dest = _link_dest(fs_root, abs_path)
+                if link_dest is not None:
+                    ret['links'][rel_path] = link_dest
+
+    for path in __opts__['file_roots'][saltenv]:
+        for root, dirs, files in salt.utils.path.os_walk(
+                path,
+                followlinks=__opts__['fileserver_followsymlinks']):
+            _add_to(ret['dirs'], path, root, dirs)
+            _add_to(ret['files'], path, root, files)
+
+    ret['files'] = sorted(ret['files'])
+    ret['dirs'] = sorted(ret['dirs'])
+    ret['empty_dirs'] = sorted(ret['empty_dirs'])
+    return ret, paths
+
+
 def _file_lists(load, form):
     '''
     Return a dict containing the file lists for files, dirs, emtydirs and symlinks
@@ -309,6 +773,10 @@ def _file_lists(load, form):
         else:
             return []
 
+    index = _load_index()
+    if index is not None and saltenv in index['envs']:
+        return index['envs'][saltenv].get(form, [])
+
     list_cachedir = os.path.join(__opts__['cachedir'], 'file_lists', 'roots')
     if not os.path.isdir(list_cachedir):
         try:
@@ -325,94 +793,7 @@ def _file_lists(load, form):
     if cache_match is not None:
         return cache_match
     if refresh_cache:
-        ret = {
-            'files': set(),
-            'dirs': set(),
-            'empty_dirs': set(),
-            'links': {}
-        }
-
-        def _add_to(tgt, fs_root, parent_dir, items):
-            '''
-            Add the files to the target set
-            '''
-            def _translate_sep(path):
-                '''
-                Translate path separators for Windows masterless minions
-                '''
-                return path.replace('\\', '/') if os.path.sep == '\\' else path
-
-            for item in items:
-                abs_path = os.path.join(parent_dir, item)
-                log.trace('roots: Processing %s', abs_path)
-                is_link = salt.utils.path.islink(abs_path)
-                log.trace(
-                    'roots: %s is %sa link',
-                    abs_path, 'not ' if not is_link else ''
-                )
-                if is_link and __opts__['fileserver_ignoresymlinks']:
-                    continue
-                rel_path = _translate_sep(os.path.relpath(abs_path, fs_root))
-                log.trace('roots: %s relative path is %s', abs_path, rel_path)
-                if salt.fileserver.is_file_ignored(__opts__, rel_path):
-                    continue
-                tgt.add(rel_path)
-                try:
-                    if not os.listdir(abs_path):
-                        ret['empty_dirs'].add(rel_path)
-                except Exception:  # pylint: disable=broad-except
-                    # Generic exception because running os.listdir() on a
-                    # non-directory path raises an OSError on *NIX and a
-                    # WindowsError on Windows.
-                    pass
-                if is_link:
-                    link_dest = salt.utils.path.readlink(abs_path)
-                    log.trace(
-                        'roots: %s symlink destination is %s',
-                        abs_path, link_dest
-                    )
-                    if salt.utils.platform.is_windows() \
-                            and link_dest.startswith('\\\\'):
-                        # Symlink points to a network path. Since you can't
-                        # join UNC and non-UNC paths, just assume the original
-                        # path.
-                        log.trace(
-                            'roots: %s is a UNC path, using %s instead',
-                            link_dest, abs_path
-                        )
-                        link_dest = abs_path
-                    if link_dest.startswith('..'):
-                        joined = os.path.join(abs_path, link_dest)
-                    else:
-                        joined = os.path.join(
-                            os.path.dirname(abs_path), link_dest
-                        )
-                    rel_dest = _translate_sep(
-                        os.path.relpath(
-                            os.path.realpath(os.path.normpath(joined)),
-                            os.path.realpath(fs_root)
-                        )
-                    )
-                    log.trace(
-                        'roots: %s relative path is %s',
-                        abs_path, rel_dest
-                    )
-                    if not rel_dest.startswith('..'):
-                        # Only count the link if it does not point
-                        # outside of the root dir of the fileserver
-                        # (i.e. the "path" variable)
-                        ret['links'][rel_path] = link_dest
-
-        for path in __opts__['file_roots'][saltenv]:
-            for root, dirs, files in salt.utils.path.os_walk(
-                    path,
-                    followlinks=__opts__['fileserver_followsymlinks']):
-                _add_to(ret['dirs'], path, root, dirs)
-                _add_to(ret['files'], path, root, files)
-
-        ret['files'] = sorted(ret['files'])
-        ret['dirs'] = sorted(ret['dirs'])
-        ret['empty_dirs'] = sorted(ret['empty_dirs'])
+        ret = _walk_file_lists(saltenv)[0]
 
         if save_cache:
             try:
@@ -30,9 +30,12 @@ import salt.utils.data
 import salt.utils.dictupdate
 import salt.utils.event
 import salt.utils.files
+import salt.utils.hashutils
+import salt.utils.json
 import salt.utils.lazy
 import salt.utils.odict
 import salt.utils.platform
+import salt.utils.profile
 import salt.utils.versions
 import salt.utils.stringutils
 from salt.exceptions import LoaderError
@@ -106,6 +109,28 @@ LIBCLOUD_FUNCS_NOT_SUPPORTED = (
 # Will be set to pyximport module at runtime if cython is enabled in config.
 pyximport = None
 
+# Process-wide caches shared by all LazyLoader instances. The file mappings
+# are keyed by the module dirs and the settings which affect the mapping, and
+# are checked against the mtimes of the scanned directories. The __virtual__
+# cache records the modules which refused to load, keyed by a fingerprint of
+# the opts and the mtime of the module file.
+_FILE_MAPPING_CACHE = {}
+_VIRTUAL_CACHE = {}
+
+# Directories modified less than this many seconds before they were scanned
+# are not cached, a later change in the same mtime tick would go unnoticed.
+_FILE_MAPPING_RACY_SECS = 2
+
+
+def clear_cache():
+    '''
+    Clear the process-wide file mapping and __virtual__ caches, so that the
+    next loaders rescan their module dirs and evaluate every __virtual__
+    function again.
+    '''
+    _FILE_MAPPING_CACHE.clear()
+    _VIRTUAL_CACHE.clear()
+
 
 def static_loader(
         opts,
@@ -805,7 +830,12 @@ def grains(opts, force_refresh=False, proxy=None):
         if not key.startswith('core.'):
             continue
         log.trace('Loading %s grain', key)
-        ret = funcs[key]()
+        fun = funcs[key]
+        start = time.time()
+        ret = fun()
+        if opts.get('profile_loader', False):
+            salt.utils.profile.record_loader_timing(
+                'grains', key, time.time() - start)
         if not isinstance(ret, dict):
             continue
         if blist:
@@ -839,7 +869,12 @@ def grains(opts, force_refresh=False, proxy=None):
                 kwargs['proxy'] = proxy
             if 'grains' in parameters:
                 kwargs['grains'] = grains_data
-            ret = funcs[key](**kwargs)
+            fun = funcs[key]
+            start = time.time()
+            ret = fun(**kwargs)
+            if opts.get('profile_loader', False):
+                salt.utils.profile.record_loader_timing(
+                    'grains', key, time.time() - start)
         except Exception:  # pylint: disable=broad-except
             if salt.utils.platform.is_proxy():
                 log.info('The following CRITICAL message may not be an error; the proxy may not be completely established yet.')
@@ -1210,6 +1245,9 @@ class LazyLoader(salt.utils.lazy.LazyDict):
         if virtual_funcs is None:
             virtual_funcs = []
         self.virtual_funcs = virtual_funcs
+        self._virtual_fingerprint = None
+        if virtual_enable and self.opts.get('loader_virtual_cache', False):
+            self._virtual_fingerprint = self._opts_fingerprint()
 
         self.disabled = set(
             self.opts.get(
@@ -1322,9 +1360,58 @@ class LazyLoader(salt.utils.lazy.LazyDict):
         else:
             self.suffix_map[''] = ('', '', imp.PKG_DIRECTORY)
 
+        cache_key = (
+            tuple(self.module_dirs),
+            tuple(sorted(self.disabled)),
+            tuple(self.suffix_order),
+            tuple(sorted(self.suffix_map)),
+            tuple(self.opts.get('optimization_order', ())),
+        )
+        cached = _FILE_MAPPING_CACHE.get(cache_key)
+        if cached is not None and self._check_dir_stamps(cached[0]):
+            self.file_mapping = salt.utils.odict.OrderedDict(cached[1])
+        else:
+            stamps = self._scan_module_dirs()
+            if stamps is not None:
+                _FILE_MAPPING_CACHE[cache_key] = (
+                    stamps, list(self.file_mapping.items()))
+            else:
+                _FILE_MAPPING_CACHE.pop(cache_key, None)
+
+        for smod in self.static_modules:
+            f_noext = smod.split('.')[-1]
+            self.file_mapping[f_noext] = (smod, '.o', 0)
+
+    @staticmethod
+    def _dir_stamp(path):
+        '''
+        Return the mtime of a directory, or None if it doesn't exist
+        '''
+        try:
+            return os.stat(path).st_mtime
+        except OSError:
+            return None
+
+    def _check_dir_stamps(self, stamps):
+        '''
+        Check that none of the directories a cached file mapping was built
+        from has changed since
+        '''
+        for path, mtime in stamps:
+            if self._dir_stamp(path) != mtime:
+                return False
+        return True
+
+    def _scan_module_dirs(self):
+        '''
+        Build the file mapping from the module dirs. Returns the mtimes of the
+        scanned directories, or None if the result should not be cached.
+        '''
         # create mapping of filename (without suffix) to (path, suffix)
         # The files are added in order of priority, so order *must* be retained.
         self.file_mapping = salt.utils.odict.OrderedDict()
+        scanned = []
+        scan_time = time.time()
 
         opt_match = []
 
@@ -1339,6 +1426,7 @@ class LazyLoader(salt.utils.lazy.LazyDict):
             return ''
 
         for mod_dir in self.module_dirs:
+            scanned.append((mod_dir, self._dir_stamp(mod_dir)))
             try:
                 # Make sure we have a sorted listdir in order to have
                 # expectable override results
@@ -1348,6 +1436,8 @@ class LazyLoader(salt.utils.lazy.LazyDict):
             except OSError:
                 continue  # Next mod_dir
             if six.PY3:
+                pycache_dir = os.path.join(mod_dir, '__pycache__')
+                scanned.append((pycache_dir, self._dir_stamp(pycache_dir)))
                 try:
                     pycache_files = [
                         os.path.join('__pycache__', x) for x in
@@ -1403,6 +1493,7 @@ class LazyLoader(salt.utils.lazy.LazyDict):
                     # if its a directory, lets allow us to load that
                     if ext == '':
                         # is there something __init__?
+                        scanned.append((fpath, self._dir_stamp(fpath)))
                         subfiles = os.listdir(fpath)
                         for suffix in self.suffix_order:
                             if '' == suffix:
@@ -1448,9 +1539,11 @@ class LazyLoader(salt.utils.lazy.LazyDict):
 
                 except OSError:
                     continue
-        for smod in self.static_modules:
-            f_noext = smod.split('.')[-1]
-            self.file_mapping[f_noext] = (smod, '.o', 0)
+
+        for _, mtime in scanned:
+            if mtime is not None and mtime >= scan_time - _FILE_MAPPING_RACY_SECS:
+                return None
+        return scanned
 
     def clear(self):
         '''
@@ -1517,11 +1610,51 @@ class LazyLoader(salt.utils.lazy.LazyDict):
                 reload_module(submodule)
                 self._reload_submodules(submodule)
 
+    def _opts_fingerprint(self):
+        '''
+        Return a digest of the opts (including the grains and pillar) which
+        identifies the __virtual__ results of this loader in the process-wide
+        cache, or None if the opts can't be serialized
+        '''
+        try:
+            data = salt.utils.json.dumps(
+                [self.tag, self.virtual_funcs, self.opts],
+                sort_keys=True,
+                default=repr)
+        except (TypeError, ValueError):
+            return None
+        return salt.utils.hashutils.sha256_digest(data)
+
+    def _virtual_cache_key(self, name):
+        '''
+        Return the key of a module in the __virtual__ cache, or None if its
+        __virtual__ result is not cached
+        '''
+        if self._virtual_fingerprint is None:
+            return None
+        fpath, suffix = self.file_mapping[name][:2]
+        if suffix == '.o':
+            return None
+        try:
+            stat = os.stat(fpath)
+        except OSError:
+            return None
+        return (self._virtual_fingerprint, fpath, stat.st_mtime, stat.st_size)
+
     def _load_module(self, name):
         mod = None
         fpath, suffix = self.file_mapping[name][:2]
         self.loaded_files.add(name)
+        virtual_key = self._virtual_cache_key(name)
+        if virtual_key is not None and virtual_key in _VIRTUAL_CACHE:
+            # The module refused to load with the same opts before, don't
+            # import it again
+            module_name, virtual_err = _VIRTUAL_CACHE[virtual_key]
+            self.missing_modules[module_name] = virtual_err
+            self.missing_modules[name] = virtual_err
+            return False
         fpath_dirname = os.path.dirname(fpath)
+        start = time.time()
         try:
             sys.path.append(fpath_dirname)
             if suffix == '.pyx':
@@ -1645,6 +1778,9 @@ class LazyLoader(salt.utils.lazy.LazyDict):
             return False
         finally:
             sys.path.remove(fpath_dirname)
+            if self.opts.get('profile_loader', False):
+                salt.utils.profile.record_loader_timing(
+                    'import', '{0}.{1}'.format(self.tag, name), time.time() - start)
 
         if hasattr(mod, '__opts__'):
             mod.__opts__.update(self.opts)
@@ -1693,6 +1829,8 @@ class LazyLoader(salt.utils.lazy.LazyDict):
                     # If a module has information about why it could not be loaded, record it
                     self.missing_modules[module_name] = virtual_err
                     self.missing_modules[name] = virtual_err
+                    if virtual_key is not None:
+                        _VIRTUAL_CACHE[virtual_key] = (module_name, virtual_err)
                     return False
         else:
             virtual_aliases = ()
@@ -1881,6 +2019,11 @@ class LazyLoader(salt.utils.lazy.LazyDict):
                 try:
                     start = time.time()
                     virtual = getattr(mod, virtual_func)()
+                    if self.opts.get('profile_loader', False):
+                        salt.utils.profile.record_loader_timing(
+                            'virtual',
+                            '{0}.{1}'.format(self.tag, module_name),
+                            time.time() - start)
                     if isinstance(virtual, tuple):
                         error_reason = virtual[1]
                         virtual = virtual[0]
@@ -367,6 +367,15 @@ class FileserverUpdate(salt.utils.process.SignalHandlingProcess):
         # Avoid circular import
         import salt.fileserver
         self.fileserver = salt.fileserver.Fileserver(self.opts)
+        self.watch_paths = {}
+        if self.opts.get('fileserver_inotify', False):
+            if salt.fileserver.HAS_PYINOTIFY:
+                self.watch_paths = self.fileserver.inotify_paths()
+            else:
+                log.error(
+                    'fileserver_inotify is enabled but pyinotify is not '
+                    'installed, falling back to polling the fileserver backends'
+                )
         self.fill_buckets()
 
     # __setstate__ and __getstate__ are only used on Windows.
@@ -392,6 +401,12 @@ class FileserverUpdate(salt.utils.process.SignalHandlingProcess):
         update_intervals = self.fileserver.update_intervals()
         self.buckets = {}
         for backend in self.fileserver.backends():
+            if backend in self.watch_paths:
+                log.debug(
+                    'The %s fileserver backend is updated from inotify',
+                    backend
+                )
+                continue
             fstr = '{0}.update'.format(backend)
             try:
                 update_func = self.fileserver.servers[fstr]
@@ -485,6 +500,21 @@ class FileserverUpdate(salt.utils.process.SignalHandlingProcess):
         # Clean out the fileserver backend cache
         salt.daemons.masterapi.clean_fsbackend(self.opts)
 
+        if self.watch_paths:
+            # Bring the caches of the watched backends up to date once, from
+            # then on they are updated as inotify reports changes
+            self.fileserver.update(back=list(self.watch_paths))
+            # The backends which can't rely on inotify are polled as often
+            # as they would be without it
+            poll_interval = min(
+                self.opts.get('{0}_update_interval'.format(backend)) or DEFAULT_INTERVAL
+                for backend in self.watch_paths)
+            watcher = salt.fileserver.InotifyWatcher(
+                self.fileserver, self.watch_paths, poll_interval=poll_interval)
+            self.update_threads['inotify'] = threading.Thread(
+                target=watcher.run)
+            self.update_threads['inotify'].start()
+
         for interval in self.buckets:
             self.update_threads[interval] = threading.Thread(
                 target=self.update_fileserver,
@@ -1019,6 +1049,9 @@ class MWorker(salt.utils.process.SignalHandlingProcess):
     def _handle_signals(self, signum, sigframe):
         for channel in getattr(self, 'req_channels', ()):
             channel.close()
+        if hasattr(self, 'aes_funcs'):
+            # Do not lose the returns still waiting to be written
+            self.aes_funcs.flush_return_batch()
         super(MWorker, self)._handle_signals(signum, sigframe)
 
     def __bind(self):
@@ -1029,6 +1062,8 @@ class MWorker(salt.utils.process.SignalHandlingProcess):
         install_zmq()
         self.io_loop = ZMQDefaultLoop()
         self.io_loop.make_current()
+        if self.opts.get('master_return_batch_size', 0) > 0:
+            self.aes_funcs.start_return_batch(self.io_loop)
         for req_channel in self.req_channels:
             req_channel.post_fork(self._handle_payload, io_loop=self.io_loop)  # TODO: cleaner? Maybe lazily?
         try:
@@ -1062,6 +1097,7 @@ class MWorker(salt.utils.process.SignalHandlingProcess):
         key = payload['enc']
         load = payload['load']
         ret = {'aes': self._handle_aes,
+               'aes-gcm': self._handle_aes,
                'clear': self._handle_clear}[key](load)
         raise salt.ext.tornado.gen.Return(ret)
 
@@ -1174,6 +1210,34 @@ class AESFuncs(object):
         )
         self.__setup_fileserver()
         self.masterapi = salt.daemons.masterapi.RemoteFuncs(opts)
+        self.io_loop = None
+        self.return_batch = None
+        self.return_batch_timeout = None
+
+    def start_return_batch(self, io_loop):
+        '''
+        Queue the minion returns and store them in batches from the given
+        ioloop, instead of storing each return as it is received
+
+        :param IOLoop io_loop: The ioloop of the worker
+        '''
+        self.io_loop = io_loop
+        self.return_batch = []
+
+    def flush_return_batch(self):
+        '''
+        Store the queued minion returns in the job cache and fire them on the
+        master event bus
+        '''
+        if self.return_batch_timeout is not None:
+            self.io_loop.remove_timeout(self.return_batch_timeout)
+            self.return_batch_timeout = None
+        if not self.return_batch:
+            return
+        loads, self.return_batch = self.return_batch, []
+        log.trace('Storing a batch of %s returns', len(loads))
+        salt.utils.job.store_jobs(
+            self.opts, loads, event=self.event, mminion=self.mminion)
 
     def __setup_fileserver(self):
         '''
@@ -1544,10 +1608,14 @@ class AESFuncs(object):
         data = pillar.compile_pillar()
         self.fs_.update_opts()
         if self.opts.get('minion_data_cache', False):
+            mdata = {'grains': load['grains'], 'pillar': data}
             self.masterapi.cache.store('minions/{0}'.format(load['id']),
                                        'data',
-                                       {'grains': load['grains'],
-                                        'pillar': data})
+                                       mdata)
+            salt.utils.minions.update_minion_data_index(self.opts,
+                                                        self.masterapi.cache,
+                                                        load['id'],
+                                                        mdata)
             if self.opts.get('minion_data_cache_events') is True:
                 self.event.fire_event({'Minion data cache refresh': load['id']}, tagify(load['id'], 'refresh', 'minion'))
         return data
@@ -1633,6 +1701,16 @@ class AESFuncs(object):
                     log.info('But \'drop_message_signature_fail\' is disabled, so message is still accepted.')
             load['sig'] = sig
 
+        if self.return_batch is not None:
+            self.return_batch.append(load)
+            if len(self.return_batch) >= self.opts['master_return_batch_size']:
+                self.flush_return_batch()
+            elif self.return_batch_timeout is None:
+                self.return_batch_timeout = self.io_loop.call_later(
+                    self.opts['master_return_batch_interval'],
+                    self.flush_return_batch)
+            return
+
         try:
             salt.utils.job.store_job(
                 self.opts, load, event=self.event, mminion=self.mminion)
@@ -1097,6 +1097,112 @@ class MinionManager(MinionBase):
             minion.destroy()
 
 
+class JobWorker(SignalHandlingProcess):
+    '''
+    A process which runs the jobs published to the minion, with the
+    execution modules and returners loaded once for all of its jobs instead
+    of once for each job. See the ``minion_job_workers`` option.
+
+    The workers take the jobs from a queue shared with the minion, and count
+    themselves in ``idle`` while they wait for one. The minion only queues a
+    job when it can reserve an idle worker, so that jobs never wait for each
+    other. When the modules or the pillar of the minion are refreshed, the
+    minion increments ``generation``, and the workers started before exit
+    after their current job, to be started again by the process manager
+    with the new data. A job taken from the queue is always run by the
+    worker which took it, even when it was reserved in another generation.
+    '''
+    def __init__(self, minion, queue, idle, generation, **kwargs):
+        super(JobWorker, self).__init__(**kwargs)
+        self.minion = minion
+        self.queue = queue
+        self.idle = idle
+        self.generation = generation
+        # The worker is forked from the minion as it is now, so it belongs
+        # to the current generation
+        self.worker_generation = generation.value
+        self.max_jobs = minion.opts.get('minion_job_worker_max_jobs', 0)
+        self._after_fork_methods.append((salt.utils.crypt.reinit_crypto, [], {}))
+
+    def _ready(self):
+        '''
+        Count the worker as idle, unless the minion's data changed since it
+        was started
+        '''
+        with self.idle.get_lock():
+            if self.generation.value != self.worker_generation:
+                return False
+            self.idle.value += 1
+        return True
+
+    def _take_reservation(self, job_generation):
+        '''
+        Fix the idle count for a job which was reserved in another generation
+        than the one of this worker
+        '''
+        with self.idle.get_lock():
+            if self.generation.value != job_generation:
+                # The reservation was dropped with the idle count when the
+                # workers were recycled, so this worker is not idle anymore
+                if self.idle.value > 0 and self.generation.value == self.worker_generation:
+                    self.idle.value -= 1
+            else:
+                # The job was reserved for a worker of the new generation,
+                # which is still waiting for a job
+                self.idle.value += 1
+
+    def run(self):
+        salt.utils.process.appendproctitle(
+            '{0}-{1}'.format(self.__class__.__name__, self.worker_generation))
+        self.minion.gen_modules()
+        # The loaders are already set up for the jobs of this worker
+        self.minion.preloaded_modules = True
+        jobs = 0
+        if not self._ready():
+            return
+        while True:
+            job = self.queue.get()
+            if job is None:
+                # Sent when the minion's data changed, to stop the idle
+                # workers started before
+                if self.generation.value != self.worker_generation:
+                    return
+                continue
+            data, connected, job_generation = job
+            if job_generation != self.worker_generation:
+                self._take_reservation(job_generation)
+            self.run_job(data, connected)
+            jobs += 1
+            if self.max_jobs and jobs >= self.max_jobs:
+                log.debug('%s ran %s jobs, exiting', self.name, jobs)
+                return
+            if not self._ready():
+                return
+
+    def run_job(self, data, connected):
+        '''
+        Run a job the way a job process of the minion would
+        '''
+        minion = self.minion
+        title = None
+        if salt.utils.process.HAS_SETPROCTITLE:
+            title = salt.utils.process.setproctitle.getproctitle()
+        minion.connected = connected
+        try:
+            minion._target(minion, minion.opts, data, connected)
+        except Exception:  # pylint: disable=broad-except
+            log.exception('Unhandled error running job %s', data.get('jid'))
+        finally:
+            if title is not None:
+                salt.utils.process.setproctitle.setproctitle(title)
+            # The job is not running anymore, but this process is, so the
+            # proc file has to be removed here
+            try:
+                os.remove(os.path.join(minion.proc_dir, data['jid']))
+            except (OSError, IOError):
+                pass
+
+
 class Minion(MinionBase):
     '''
     This class instantiates a minion, runs connections for a minion,
@@ -1122,6 +1228,8 @@ class Minion(MinionBase):
         self.ready = False
         self.jid_queue = [] if jid_queue is None else jid_queue
         self.periodic_callbacks = {}
+        # The queue, idle count and generation of the job workers
+        self._job_workers = None
 
         if io_loop is None:
             install_zmq()
@@ -1335,6 +1443,57 @@ class Minion(MinionBase):
             self.schedule.delete_job(master_event(type='alive', master=self.opts['master']), persist=True)
             self.schedule.delete_job(master_event(type='failback'), persist=True)
 
+        self._start_job_workers()
+
+    def _start_job_workers(self):
+        '''
+        Start the job workers, if enabled, or recycle them if they are
+        already started
+        '''
+        workers = self.opts.get('minion_job_workers', 0)
+        if not workers or not self.opts.get('multiprocessing', True) \
+                or salt.utils.platform.is_windows():
+            return
+        if self._job_workers is not None:
+            self._recycle_job_workers()
+            return
+        self._job_workers = (multiprocessing.Queue(),
+                             multiprocessing.Value('i', 0),
+                             multiprocessing.RawValue('i', 0))
+        log.info('Starting %s job workers', workers)
+        for _ in range(workers):
+            self.process_manager.add_process(JobWorker, args=[self] + list(self._job_workers))
+
+    def _recycle_job_workers(self):
+        '''
+        Replace the job workers, after the modules or the pillar changed
+        '''
+        if self._job_workers is None:
+            return
+        queue, idle, generation = self._job_workers
+        log.debug('Recycling the job workers')
+        with idle.get_lock():
+            generation.value += 1
+            # The idle workers belong to the previous generation now
+            idle.value = 0
+        for _ in range(self.opts['minion_job_workers']):
+            queue.put(None)
+
+    def _dispatch_job(self, data):
+        '''
+        Send the job to an idle job worker. Returns False if there is none.
+        '''
+        if self._job_workers is None:
+            return False
+        queue, idle, generation = self._job_workers
+        with idle.get_lock():
+            if idle.value < 1:
+                return False
+            idle.value -= 1
+            job_generation = generation.value
+        queue.put((data, self.connected, job_generation))
+        return True
+
     def _prep_mod_opts(self):
         '''
         Returns a copy of the opts with key bits stripped out
@@ -1512,6 +1671,7 @@ class Minion(MinionBase):
                 self.functions, self.returners, self.function_errors, self.executors = self._load_modules()
                 self.schedule.functions = self.functions
                 self.schedule.returners = self.returners
+                self._recycle_job_workers()
 
         process_count_max = self.opts.get('process_count_max')
         if process_count_max > 0:
@@ -1521,6 +1681,10 @@ class Minion(MinionBase):
                 yield salt.ext.tornado.gen.sleep(10)
                 process_count = len(salt.utils.minion.running(self.opts))
 
+        if self._dispatch_job(data):
+            log.debug('Sent job %s to a job worker', data['jid'])
+            return
+
         # We stash an instance references to allow for the socket
         # communication in Windows. You can't pickle functions, and thus
         # python needs to be able to reconstruct the reference on the other
@@ -1611,7 +1775,8 @@ class Minion(MinionBase):
         This method should be used as a threading target, start the actual
         minion side execution.
         '''
-        minion_instance.gen_modules()
+        if not getattr(minion_instance, 'preloaded_modules', False):
+            minion_instance.gen_modules()
         fn_ = os.path.join(minion_instance.proc_dir, data['jid'])
 
         salt.utils.process.appendproctitle('{0}._thread_return {1}'.format(cls.__name__, data['jid']))
@@ -1826,7 +1991,8 @@ class Minion(MinionBase):
         This method should be used as a threading target, start the actual
         minion side execution.
         '''
-        minion_instance.gen_modules()
+        if not getattr(minion_instance, 'preloaded_modules', False):
+            minion_instance.gen_modules()
         fn_ = os.path.join(minion_instance.proc_dir, data['jid'])
 
         salt.utils.process.appendproctitle('{0}._thread_multi_return {1}'.format(cls.__name__, data['jid']))
@@ -2176,10 +2342,14 @@ class Minion(MinionBase):
         Refresh the functions and returners.
         '''
         log.debug('Refreshing modules. Notify=%s', notify)
+        # Modules may load now that refused to before, e.g. because the
+        # package they depend on was installed
+        salt.loader.clear_cache()
         self.functions, self.returners, _, self.executors = self._load_modules(force_refresh, notify=notify)
 
         self.schedule.functions = self.functions
         self.schedule.returners = self.returners
+        self._recycle_job_workers()
 
     def beacons_refresh(self):
         '''
@@ -2222,6 +2392,9 @@ class Minion(MinionBase):
                           'One or more masters may be down!')
             finally:
                 async_pillar.destroy()
+            # The workers recycled by the module refresh may have been
+            # started with the previous pillar
+            self._recycle_job_workers()
         self.matchers_refresh()
         self.beacons_refresh()
         evt = salt.utils.event.get_event('minion', opts=self.opts)
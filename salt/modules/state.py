@@ -2378,12 +2378,12 @@ def event(tagmatch='*',
     .. versionadded:: 2016.3.0
     .. versionchanged:: 2019.2.0
         ``tagmatch`` can now be either a glob or regular expression.
+    .. versionchanged:: Sodium
+        The event bus only sends the events matching ``tagmatch``.
 
     This is useful for utilizing Salt's event bus from shell scripts or for
     taking simple actions directly from the CLI.
 
-    Enable debug logging to see ignored events.
-
     :param tagmatch: the event is written to stdout for each tag that matches
         this glob or regular expression.
     :param count: this number is decremented for each event that matches the
@@ -2407,6 +2407,11 @@ def event(tagmatch='*',
             opts=__opts__,
             listen=True) as sevent:
 
+        if isinstance(tagmatch, six.string_types) and tagmatch != '*':
+            # The same matches as expr_match
+            sevent.set_tag_filters([(tagmatch, 'fnmatch'),
+                                    (r'\A{0}\Z'.format(tagmatch), 'regex')])
+
         while True:
             ret = sevent.get_event(full=True, auto_reconnect=True)
             if ret is None:
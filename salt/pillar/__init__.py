@@ -12,8 +12,12 @@ import collections
 import logging
 import salt.ext.tornado.gen
 import sys
+import threading
+import time
 import traceback
 import inspect
+from multiprocessing import TimeoutError as PoolTimeoutError
+from multiprocessing.pool import ThreadPool
 
 # Import salt libs
 import salt.loader
@@ -25,6 +29,8 @@ import salt.utils.cache
 import salt.utils.crypt
 import salt.utils.data
 import salt.utils.dictupdate
+import salt.utils.hashutils
+import salt.utils.json
 import salt.utils.url
 from salt.exceptions import SaltClientError
 from salt.template import compile_template
@@ -40,6 +46,33 @@ from salt.ext import six
 
 log = logging.getLogger(__name__)
 
+# Results of the ext_pillars with a cache TTL, see
+# Pillar._cached_external_pillar_data
+_EXT_PILLAR_CACHE = {}
+_EXT_PILLAR_CACHE_LOCK = threading.Lock()
+# Thread pools running the ext_pillars concurrently, by process ID and size,
+# see Pillar._ext_pillar_concurrent. They are shared by all the pillars a
+# process compiles, so the ext_pillars still running after their timeout
+# cannot hold more threads than a pool has.
+_EXT_PILLAR_POOLS = {}
+_EXT_PILLAR_POOLS_LOCK = threading.Lock()
+
+
+def _ext_pillar_pool(size):
+    '''
+    Return the thread pool of the current process running the ext_pillars
+    concurrently
+    '''
+    pool_key = (os.getpid(), size)
+    with _EXT_PILLAR_POOLS_LOCK:
+        pool = _EXT_PILLAR_POOLS.get(pool_key)
+        if pool is None:
+            # The pools of the parent process have no threads after a fork
+            for stale in [x for x in _EXT_PILLAR_POOLS if x[0] != pool_key[0]]:
+                del _EXT_PILLAR_POOLS[stale]
+            pool = _EXT_PILLAR_POOLS[pool_key] = ThreadPool(size)
+    return pool
+
 
 def get_pillar(opts, grains, minion_id, saltenv=None, ext=None, funcs=None,
                pillar_override=None, pillarenv=None, extra_minion_data=None):
@@ -813,7 +846,8 @@ class Pillar(object):
                                                 nstate,
                                                 self.merge_strategy,
                                                 self.opts.get('renderer', 'yaml'),
-                                                self.opts.get('pillar_merge_lists', False))
+                                                self.opts.get('pillar_merge_lists', False),
+                                                copy_on_write=True)
                                     if err:
                                         errors += err
                         if not self.opts.get('pillar_includes_override_sls', False):
@@ -831,7 +865,8 @@ class Pillar(object):
                                         s,
                                         self.merge_strategy,
                                         self.opts.get('renderer', 'yaml'),
-                                        self.opts.get('pillar_merge_lists', False))
+                                        self.opts.get('pillar_merge_lists', False),
+                                        copy_on_write=True)
         return state, mods, errors
 
     def render_pillar(self, matches, errors=None):
@@ -839,7 +874,9 @@ class Pillar(object):
         Extract the sls pillar files from the matches and render them into the
         pillar
         '''
-        pillar = copy.copy(self.pillar_override)
+        # The SLS are merged into the pillar without copying it each time, so
+        # it must not share any values with the pillar override
+        pillar = copy.deepcopy(self.pillar_override)
         if errors is None:
             errors = []
         for saltenv, pstates in six.iteritems(matches):
@@ -881,7 +918,8 @@ class Pillar(object):
                         pstate,
                         self.merge_strategy,
                         self.opts.get('renderer', 'yaml'),
-                        self.opts.get('pillar_merge_lists', False))
+                        self.opts.get('pillar_merge_lists', False),
+                        copy_on_write=True)
 
         return pillar, errors
 
@@ -921,6 +959,169 @@ class Pillar(object):
                                             val)
         return ext
 
+    def _ext_pillar_setting(self, name, key):
+        '''
+        Return the value of an ext_pillar_timeout or ext_pillar_cache_ttl
+        setting for an ext_pillar, either of which can be a single value for
+        all ext_pillars or a dict of values by ext_pillar name
+        '''
+        value = self.opts.get(name) or 0
+        if isinstance(value, dict):
+            value = value.get(key) or 0
+        return value
+
+    def _cached_external_pillar_data(self, pillar, val, key, index):
+        '''
+        Return the data of an ext_pillar, from the cache if the ext_pillar has
+        a cache TTL and a result for the same minion, grains, environments,
+        extra minion data and input pillar hasn't expired yet
+        '''
+        ttl = self._ext_pillar_setting('ext_pillar_cache_ttl', key)
+        if not ttl:
+            return self._external_pillar_data(pillar, val, key)
+        pillar_digest = salt.utils.hashutils.sha256_digest(
+            salt.utils.json.dumps(pillar, sort_keys=True, default=repr)
+        )
+        cache_key = salt.utils.hashutils.sha256_digest(
+            salt.utils.json.dumps(
+                [self.minion_id,
+                 self.opts.get('grains', {}),
+                 self.opts.get('pillarenv'),
+                 self.saltenv,
+                 self.extra_minion_data,
+                 pillar_digest,
+                 index,
+                 key,
+                 val],
+                sort_keys=True,
+                default=repr
+            )
+        )
+        now = time.time()
+        with _EXT_PILLAR_CACHE_LOCK:
+            cached = _EXT_PILLAR_CACHE.get(cache_key)
+        if cached is not None and cached[0] > now:
+            log.debug('Using cached data of ext_pillar %s for %s', key, self.minion_id)
+            return copy.deepcopy(cached[1])
+        ext = self._external_pillar_data(pillar, val, key)
+        with _EXT_PILLAR_CACHE_LOCK:
+            for expired in [x for x, y in six.iteritems(_EXT_PILLAR_CACHE) if y[0] <= now]:
+                del _EXT_PILLAR_CACHE[expired]
+            _EXT_PILLAR_CACHE[cache_key] = (now + ttl, copy.deepcopy(ext))
+        return ext
+
+    def _ext_pillar_concurrent(self, pillar, errors, concurrency):
+        '''
+        Run the ext_pillars in a thread pool. Each ext_pillar gets the pillar
+        data from before the ext_pillars ran, and their results are merged in
+        the order of the ext_pillar option.
+
+        An ext_pillar which times out keeps running in its thread, so the pool
+        is shared by the process and an ext_pillar is given up if no thread is
+        free to run it within its timeout.
+        '''
+        tasks = []
+        for index, run in enumerate(self.opts['ext_pillar']):
+            if not isinstance(run, dict):
+                errors.append('The "ext_pillar" option is malformed')
+                log.critical(errors[-1])
+                return {}, errors
+            if next(six.iterkeys(run)) in self.opts.get('exclude_ext_pillar', []):
+                continue
+            for key, val in six.iteritems(run):
+                if key not in self.ext_pillars:
+                    log.critical(
+                        'Specified ext_pillar interface %s is unavailable',
+                        key
+                    )
+                    continue
+                tasks.append((index, key, val))
+        if not tasks:
+            return pillar, errors
+
+        started = {}
+        cancelled = set()
+
+        def _run(task_id, index, key, val):
+            if task_id in cancelled:
+                return None, None
+            started[task_id] = time.time()
+            try:
+                return self._cached_external_pillar_data(
+                    copy.deepcopy(pillar), val, key, index), None
+            except Exception as exc:  # pylint: disable=broad-except
+                log.error(
+                    'Exception caught loading ext_pillar \'%s\':\n%s',
+                    key, ''.join(traceback.format_tb(sys.exc_info()[2]))
+                )
+                return None, exc
+
+        pool = _ext_pillar_pool(concurrency)
+        results = [
+            pool.apply_async(_run, (task_id,) + task)
+            for task_id, task in enumerate(tasks)
+        ]
+
+        exts = {}
+        for task_id, (index, key, _) in enumerate(tasks):
+            timeout = self._ext_pillar_setting('ext_pillar_timeout', key)
+            result = results[task_id]
+            exc = None
+            waiting = time.time()
+            while True:
+                if not timeout:
+                    ext, exc = result.get()
+                    break
+                # The timeout counts from when the ext_pillar started, or
+                # from when it was waited for if it has not started yet
+                start = started.get(task_id)
+                deadline = (waiting if start is None else start) + timeout
+                try:
+                    ext, exc = result.get(max(deadline - time.time(), 0))
+                    break
+                except PoolTimeoutError:
+                    start = started.get(task_id)
+                    if start is None and time.time() >= waiting + timeout:
+                        cancelled.add(task_id)
+                        error = 'no thread was free to run it within {0} ' \
+                                'seconds'.format(timeout)
+                    elif start is not None and time.time() >= start + timeout:
+                        log.warning(
+                            'Abandoning ext_pillar %s, it keeps one of the %s '
+                            'ext_pillar threads of this process busy until it '
+                            'returns', key, concurrency
+                        )
+                        error = 'timed out after {0} seconds'.format(timeout)
+                    else:
+                        continue
+                    ext = None
+                    errors.append(
+                        'Failed to load ext_pillar {0}: {1}'.format(key, error)
+                    )
+                    log.error(errors[-1])
+                    break
+            if exc is not None:
+                errors.append(
+                    'Failed to load ext_pillar {0}: {1}'.format(
+                        key,
+                        exc.__str__(),
+                    )
+                )
+            # As when running them in order, only the data of the last
+            # ext_pillar of an entry is used
+            exts[index] = ext
+
+        for index in sorted(exts):
+            if exts[index]:
+                pillar = merge(
+                    pillar,
+                    exts[index],
+                    self.merge_strategy,
+                    self.opts.get('renderer', 'yaml'),
+                    self.opts.get('pillar_merge_lists', False),
+                    copy_on_write=True)
+        return pillar, errors
+
     def ext_pillar(self, pillar, errors=None):
         '''
         Render the external pillar data
@@ -962,7 +1163,11 @@ class Pillar(object):
                 self.opts.get('renderer', 'yaml'),
                 self.opts.get('pillar_merge_lists', False))
 
-        for run in self.opts['ext_pillar']:
+        concurrency = self.opts.get('ext_pillar_concurrency', 1)
+        if concurrency > 1:
+            return self._ext_pillar_concurrent(pillar, errors, concurrency)
+
+        for index, run in enumerate(self.opts['ext_pillar']):
             if not isinstance(run, dict):
                 errors.append('The "ext_pillar" option is malformed')
                 log.critical(errors[-1])
@@ -977,9 +1182,10 @@ class Pillar(object):
                     )
                     continue
                 try:
-                    ext = self._external_pillar_data(pillar,
-                                                     val,
-                                                     key)
+                    ext = self._cached_external_pillar_data(pillar,
+                                                            val,
+                                                            key,
+                                                            index)
                 except Exception as exc:  # pylint: disable=broad-except
                     errors.append(
                         'Failed to load ext_pillar {0}: {1}'.format(
@@ -997,7 +1203,8 @@ class Pillar(object):
                     ext,
                     self.merge_strategy,
                     self.opts.get('renderer', 'yaml'),
-                    self.opts.get('pillar_merge_lists', False))
+                    self.opts.get('pillar_merge_lists', False),
+                    copy_on_write=True)
                 ext = None
         return pillar, errors
 
@@ -2,6 +2,12 @@
 '''
 Return data to local job cache
 
+.. versionchanged:: Sodium
+
+    When :conf_master:`job_cache_index` is enabled, the jid, function, target,
+    user and start time of every job are also recorded in an SQLite index in
+    the master cachedir. Listing, filtering and expiring jobs then query the
+    index instead of walking the jobs directory.
 '''
 from __future__ import absolute_import, print_function, unicode_literals
 
@@ -13,6 +19,9 @@ import os
 import shutil
 import time
 import bisect
+import contextlib
+import sqlite3
+import threading
 
 # Import salt libs
 import salt.payload
@@ -44,6 +53,14 @@ RETURN_P = 'return.p'
 OUT_P = 'out.p'
 # endtime is the end time for a job, not stored as msgpack
 ENDTIME = 'endtime'
+# the sqlite index of the job cache, stored in the cachedir
+INDEX_DB = 'job_index.db'
+# marks the job cache index as out of date with the jobs directory, stored in
+# the cachedir
+INDEX_STALE = 'job_index.stale'
+
+# The connection to the job cache index of the current process and thread
+_INDEX_LOCAL = threading.local()
 
 
 def _job_dir():
@@ -84,6 +101,205 @@ def _walk_through(job_dir):
                 yield jid, job, t_path, final
 
 
+def _index_enabled():
+    '''
+    Return whether the jobs are recorded in the job cache index
+    '''
+    return __opts__.get('job_cache_index', False)
+
+
+def _index_connect(index_path):
+    '''
+    Open a connection to the job cache index and set up its schema, creating
+    it from the contents of the jobs directory if it does not exist yet
+    '''
+    populate = not os.path.exists(index_path)
+    con = sqlite3.connect(index_path, timeout=30)
+    try:
+        con.execute('PRAGMA journal_mode=WAL')
+        with con:
+            con.execute(
+                'CREATE TABLE IF NOT EXISTS jobs ('
+                'jid TEXT PRIMARY KEY, '
+                'fun TEXT, '
+                'tgt TEXT, '
+                'user TEXT, '
+                'created REAL NOT NULL, '
+                'load BLOB)'
+            )
+            con.execute(
+                'CREATE INDEX IF NOT EXISTS jobs_created ON jobs (created)'
+            )
+        if populate:
+            _populate_index(con)
+    except Exception:
+        con.close()
+        raise
+    return con
+
+
+@contextlib.contextmanager
+def _index():
+    '''
+    Return the connection to the job cache index, which is opened once per
+    process and thread and kept open between calls
+    '''
+    index_path = os.path.join(__opts__['cachedir'], INDEX_DB)
+    pid = os.getpid()
+    con = getattr(_INDEX_LOCAL, 'con', None)
+    if con is not None and (_INDEX_LOCAL.pid != pid
+                            or _INDEX_LOCAL.path != index_path
+                            or not os.path.exists(index_path)):
+        # A connection is never used across a fork, and the index is
+        # rebuilt if it was removed while it was open
+        if _INDEX_LOCAL.pid == pid:
+            con.close()
+        con = _INDEX_LOCAL.con = None
+    if con is None:
+        con = _index_connect(index_path)
+        _INDEX_LOCAL.con = con
+        _INDEX_LOCAL.pid = pid
+        _INDEX_LOCAL.path = index_path
+    try:
+        yield con
+    except sqlite3.Error:
+        # Start over with a new connection on the next call
+        _INDEX_LOCAL.con = None
+        con.close()
+        raise
+
+
+def _index_job(con, jid, load=None, created=None):
+    '''
+    Record a job in the job cache index
+    '''
+    if created is None:
+        created = time.time()
+    with con:
+        con.execute(
+            'INSERT OR IGNORE INTO jobs (jid, created) VALUES (?, ?)',
+            (jid, created)
+        )
+        if load is not None:
+            serial = salt.payload.Serial(__opts__)
+            tgt = load.get('tgt')
+            if tgt is not None and not isinstance(tgt, six.string_types):
+                tgt = ','.join(six.text_type(item) for item in tgt)
+            con.execute(
+                'UPDATE jobs SET fun = ?, tgt = ?, user = ?, load = ? WHERE jid = ?',
+                (load.get('fun'),
+                 tgt,
+                 load.get('user'),
+                 sqlite3.Binary(serial.dumps(load)),
+                 jid)
+            )
+
+
+def _read_job_dir(serial, f_path):
+    '''
+    Return the jid, creation time and load of the job in a jid directory, or
+    None if the directory has no jid file
+    '''
+    jid_file = os.path.join(f_path, 'jid')
+    if not os.path.isfile(jid_file):
+        return None
+    try:
+        with salt.utils.files.fopen(jid_file, 'rb') as rfh:
+            jid = salt.utils.stringutils.to_unicode(rfh.read())
+        created = os.stat(jid_file).st_ctime
+    except (IOError, OSError) as exc:
+        log.error('Unable to read %s: %s', jid_file, exc)
+        return None
+    load = None
+    load_path = os.path.join(f_path, LOAD_P)
+    if os.path.isfile(load_path):
+        try:
+            with salt.utils.files.fopen(load_path, 'rb') as rfh:
+                load = serial.load(rfh)
+        except Exception:  # pylint: disable=broad-except
+            log.exception('Failed to deserialize %s', load_path)
+    return jid, created, load or None
+
+
+def _populate_index(con):
+    '''
+    Record the jobs already present in the jobs directory in the index
+    '''
+    job_dir = _job_dir()
+    if not os.path.exists(job_dir):
+        return
+    log.info('Building the job cache index from %s', job_dir)
+    serial = salt.payload.Serial(__opts__)
+    for top in os.listdir(job_dir):
+        t_path = os.path.join(job_dir, top)
+        if not os.path.isdir(t_path):
+            continue
+        for final in os.listdir(t_path):
+            job = _read_job_dir(serial, os.path.join(t_path, final))
+            if job is not None:
+                jid, created, load = job
+                _index_job(con, jid, load=load, created=created)
+
+
+def _index_stale():
+    '''
+    Mark the job cache index as out of date, so that the next cleaning of the
+    job cache reconciles it with the jobs directory
+    '''
+    stale_path = os.path.join(__opts__['cachedir'], INDEX_STALE)
+    if os.path.exists(stale_path):
+        return
+    try:
+        with salt.utils.files.fopen(stale_path, 'w'):
+            pass
+    except (IOError, OSError) as exc:
+        log.error('Unable to write %s: %s', stale_path, exc)
+
+
+def _index_add(jid, load=None):
+    '''
+    Record a job in the job cache index, if enabled
+    '''
+    if not _index_enabled():
+        if os.path.exists(os.path.join(__opts__['cachedir'], INDEX_DB)):
+            # The job is missing from the index when it is enabled again
+            _index_stale()
+        return
+    try:
+        with _index() as con:
+            _index_job(con, jid, load=load)
+    except sqlite3.Error as exc:
+        log.error('Unable to record job %s in the job cache index: %s', jid, exc)
+        _index_stale()
+
+
+def _index_walk(where='', params=(), order=''):
+    '''
+    Return a list of the jid and job load of the indexed jobs matching the
+    query, or None if the index can't be read
+    '''
+    serial = salt.payload.Serial(__opts__)
+    try:
+        with _index() as con:
+            rows = con.execute(
+                'SELECT jid, load FROM jobs WHERE load IS NOT NULL {0} {1}'.format(where, order),
+                params
+            ).fetchall()
+    except sqlite3.Error as exc:
+        log.error('Unable to read the job cache index, walking the job cache '
+                  'instead: %s', exc)
+        return None
+    ret = []
+    for jid, load in rows:
+        try:
+            job = serial.loads(bytes(load))
+        except Exception:  # pylint: disable=broad-except
+            log.exception('Failed to deserialize the indexed load of job %s', jid)
+            continue
+        ret.append((jid, job))
+    return ret
+
+
 #TODO: add to returner docs-- this is a new one
 def prep_jid(nocache=False, passed_jid=None, recurse_count=0):
     '''
@@ -127,6 +343,10 @@ def prep_jid(nocache=False, passed_jid=None, recurse_count=0):
         return prep_jid(passed_jid=jid, nocache=nocache,
                         recurse_count=recurse_count+1)
 
+    if passed_jid is None:
+        # A passed jid is recorded in the index with its load by save_load,
+        # there is no need to write to the index for every return of the job
+        _index_add(jid)
     return jid
 
 
@@ -135,13 +355,37 @@ def returner(load):
     Return data to the local job cache
     '''
     serial = salt.payload.Serial(__opts__)
+    return _save_return(serial, load, {})
+
+
+def returner_batch(loads):
+    '''
+    Return the data of several minions to the local job cache
+
+    .. versionadded:: Sodium
+    '''
+    serial = salt.payload.Serial(__opts__)
+    jid_dirs = {}
+    for load in loads:
+        _save_return(serial, load, jid_dirs)
 
+
+def _save_return(serial, load, jid_dirs):
+    '''
+    Write a minion return to the job cache. ``jid_dirs`` maps the jids seen so
+    far to their job directory, or to ``None`` when the job is not cached.
+    '''
     # if a minion is returning a standalone job, get a jobid
     if load['jid'] == 'req':
         load['jid'] = prep_jid(nocache=load.get('nocache', False))
 
-    jid_dir = salt.utils.jid.jid_dir(load['jid'], _job_dir(), __opts__['hash_type'])
-    if os.path.exists(os.path.join(jid_dir, 'nocache')):
+    if load['jid'] not in jid_dirs:
+        jid_dir = salt.utils.jid.jid_dir(load['jid'], _job_dir(), __opts__['hash_type'])
+        if os.path.exists(os.path.join(jid_dir, 'nocache')):
+            jid_dir = None
+        jid_dirs[load['jid']] = jid_dir
+    jid_dir = jid_dirs[load['jid']]
+    if jid_dir is None:
         return
 
     hn_dir = os.path.join(jid_dir, load['id'])
@@ -224,6 +468,8 @@ def save_load(jid, clear_load, minions=None, recurse_count=0):
         return save_load(jid=jid, clear_load=clear_load,
                          recurse_count=recurse_count+1)
 
+    _index_add(jid, clear_load)
+
     # if you have a tgt, save that for the UI etc
     if 'tgt' in clear_load and clear_load['tgt'] != '':
         if minions is None:
@@ -376,7 +622,10 @@ def get_jids():
     Return a dict mapping all job ids to job information
     '''
     ret = {}
-    for jid, job, _, _ in _walk_through(_job_dir()):
+    jobs = _index_walk() if _index_enabled() else None
+    if jobs is None:
+        jobs = ((jid, job) for jid, job, _, _ in _walk_through(_job_dir()))
+    for jid, job in jobs:
         ret[jid] = salt.utils.jid.format_jid_instance(jid, job)
 
         if __opts__.get('job_cache_store_endtime'):
@@ -393,6 +642,17 @@ def get_jids_filter(count, filter_find_job=True):
     :param int count: show not more than the count of most recent jobs
     :param bool filter_find_jobs: filter out 'saltutil.find_job' jobs
     '''
+    if _index_enabled():
+        where = ''
+        params = ()
+        if filter_find_job:
+            where = 'AND (fun IS NULL OR fun != ?)'
+            params = ('saltutil.find_job',)
+        jobs = _index_walk(where, params + (count,), 'ORDER BY jid DESC LIMIT ?')
+        if jobs is not None:
+            return [salt.utils.jid.format_jid_instance_ext(jid, job)
+                    for jid, job in reversed(jobs)]
+
     keys = []
     ret = []
     for jid, job, _, _ in _walk_through(_job_dir()):
@@ -420,6 +680,13 @@ def clean_old_jobs():
         if not os.path.exists(jid_root):
             return
 
+        if _index_enabled():
+            try:
+                _clean_old_indexed_jobs()
+                return
+            except sqlite3.Error as exc:
+                log.error('Unable to clean the job cache index: %s', exc)
+
         # Keep track of any empty t_path dirs that need to be removed later
         dirs_to_remove = set()
 
@@ -466,6 +733,94 @@ def clean_old_jobs():
                     shutil.rmtree(t_path)
 
 
+def _clean_old_indexed_jobs():
+    '''
+    Clean out the jobs recorded in the job cache index before ``keep_jobs``.
+    The jobs directory is only walked when the index is out of date.
+    '''
+    expire = time.time() - __opts__['keep_jobs'] * 3600.0
+    with _index() as con:
+        stale_path = os.path.join(__opts__['cachedir'], INDEX_STALE)
+        if os.path.exists(stale_path):
+            # Jobs recorded from now on mark the index stale again
+            os.remove(stale_path)
+            _reconcile_index(con, expire)
+        jids = [row[0] for row in con.execute(
+            'SELECT jid FROM jobs WHERE created < ?', (expire,)
+        )]
+        removed = []
+        for jid in jids:
+            f_path = salt.utils.jid.jid_dir(jid, _job_dir(), __opts__['hash_type'])
+            if os.path.exists(f_path):
+                try:
+                    shutil.rmtree(f_path)
+                except OSError as err:
+                    log.error('Unable to remove %s: %s', f_path, err)
+                    continue
+                try:
+                    # Remove the parent JID dir if it is now empty
+                    os.rmdir(os.path.dirname(f_path))
+                except OSError:
+                    pass
+            removed.append((jid,))
+        with con:
+            con.executemany('DELETE FROM jobs WHERE jid = ?', removed)
+
+
+def _reconcile_index(con, expire):
+    '''
+    Bring the job cache index in line with the jobs directory: the jobs
+    missing from the index are added to it, corrupted job directories are
+    scrubbed and the jobs whose directory is gone are dropped from the index
+    '''
+    jid_root = _job_dir()
+    log.info('Reconciling the job cache index with %s', jid_root)
+    serial = salt.payload.Serial(__opts__)
+    indexed = {}
+    for (jid,) in con.execute('SELECT jid FROM jobs'):
+        indexed[salt.utils.jid.jid_dir(jid, jid_root, __opts__['hash_type'])] = jid
+    # Keep track of any empty t_path dirs that need to be removed later
+    dirs_to_remove = set()
+
+    for top in os.listdir(jid_root):
+        t_path = os.path.join(jid_root, top)
+        if not os.path.isdir(t_path):
+            continue
+        t_path_dirs = os.listdir(t_path)
+        if not t_path_dirs:
+            dirs_to_remove.add(t_path)
+            continue
+        for final in t_path_dirs:
+            f_path = os.path.join(t_path, final)
+            if indexed.pop(f_path, None) is not None:
+                continue
+            job = _read_job_dir(serial, f_path)
+            if job is None:
+                # No jid file means corrupted cache entry, scrub it
+                # by removing the entire f_path directory
+                shutil.rmtree(f_path, ignore_errors=True)
+                continue
+            # The job was stored while the index was disabled or could not
+            # be written to, it is expired with the indexed jobs
+            jid, created, load = job
+            _index_job(con, jid, load=load, created=created)
+
+    # The jobs left were removed from the jobs directory behind the index's
+    # back
+    with con:
+        con.executemany('DELETE FROM jobs WHERE jid = ?',
+                        [(jid,) for jid in six.itervalues(indexed)])
+
+    # Remove empty JID dirs from job cache, if they're old enough, the jid
+    # file of a JID dir which was only recently made may not be written yet
+    for t_path in dirs_to_remove:
+        try:
+            if os.stat(t_path).st_ctime < expire:
+                shutil.rmtree(t_path)
+        except OSError:
+            pass
+
+
 def update_endtime(jid, time):
     '''
     Update (or store) the end time for a given job
@@ -260,12 +260,12 @@ def event(tagmatch='*',
     .. versionadded:: 2014.7.0
     .. versionchanged:: 2019.2.0
         ``tagmatch`` can now be either a glob or regular expression.
+    .. versionchanged:: Sodium
+        The event bus only sends the events matching ``tagmatch``.
 
     This is useful for utilizing Salt's event bus from shell scripts or for
     taking simple actions directly from the CLI.
 
-    Enable debug logging to see ignored events.
-
     :param tagmatch: the event is written to stdout for each tag that matches
         this glob or regular expression.
     :param count: this number is decremented for each event that matches the
@@ -43,6 +43,7 @@ import salt.utils.immutabletypes as immutabletypes
 import salt.utils.msgpack
 import salt.utils.platform
 import salt.utils.process
+import salt.utils.slscache
 import salt.utils.url
 import salt.syspaths as syspaths
 import salt.transport.client
@@ -128,6 +129,15 @@ STATE_RUNTIME_KEYWORDS = frozenset([
 
 STATE_INTERNAL_KEYWORDS = STATE_REQUISITE_KEYWORDS.union(STATE_REQUISITE_IN_KEYWORDS).union(STATE_RUNTIME_KEYWORDS)
 
+# These states take a system wide lock while they run, so the concurrent state
+# scheduler never runs two of them at the same time
+STATE_CONCURRENCY_SERIAL = frozenset([
+    'chocolatey',
+    'pkg',
+    'pkgrepo',
+    'ports',
+    ])
+
 
 def _odict_hashable(self):
     return id(self)
@@ -227,21 +237,70 @@ def state_args(id_, state, high):
     return args
 
 
-def find_name(name, state, high):
+def _has_glob(pattern):
+    '''
+    Return True if a requisite value is a glob rather than a plain name
+    '''
+    return any(x in pattern for x in ('*', '?', '['))
+
+
+def index_high(high):
+    '''
+    Index the high data for find_name and find_sls_ids, so that looking up a
+    name or an SLS doesn't need to scan all of the high data. The index must
+    be rebuilt when the high data changes.
+    '''
+    index = {'sls': {}, 'arg': {}, 'name': {}}
+    for nid, item in six.iteritems(high):
+        if not isinstance(item, dict):
+            continue
+        index['sls'].setdefault(item.get('__sls__'), []).append(nid)
+        for state, args in six.iteritems(item):
+            if state.startswith('__') or not isinstance(args, list):
+                continue
+            for arg in args:
+                if not isinstance(arg, dict):
+                    continue
+                try:
+                    if len(arg) == 1:
+                        index['arg'].setdefault(
+                            (state, arg[next(iter(arg))]), []).append(nid)
+                    if 'name' in arg:
+                        index['name'].setdefault(arg['name'], (state, nid))
+                except TypeError:
+                    # Unhashable value, it can't be a name
+                    continue
+    return index
+
+
+def find_name(name, state, high, index=None):
     '''
     Scan high data for the id referencing the given name and return a list of (IDs, state) tuples that match
 
     Note: if `state` is sls, then we are looking for all IDs that match the given SLS
+
+    Pass an ``index`` from :py:func:`index_high` to look the name up instead
+    of scanning the high data.
     '''
     ext_id = []
     if name in high:
         ext_id.append((name, state))
     # if we are requiring an entire SLS, then we need to add ourselves to everything in that SLS
     elif state == 'sls':
+        if index is not None:
+            for nid in index['sls'].get(name, ()):
+                ext_id.append((nid, next(iter(high[nid]))))
+            return ext_id
         for nid, item in six.iteritems(high):
             if item['__sls__'] == name:
                 ext_id.append((nid, next(iter(item))))
     # otherwise we are requiring a single state, lets find it
+    elif index is not None:
+        try:
+            for nid in index['arg'].get((state, name), ()):
+                ext_id.append((nid, state))
+        except TypeError:
+            return find_name(name, state, high)
     else:
         # We need to scan for the name
         for nid in high:
@@ -257,11 +316,21 @@ def find_name(name, state, high):
     return ext_id
 
 
-def find_sls_ids(sls, high):
+def find_sls_ids(sls, high, index=None):
     '''
     Scan for all ids in the given sls and return them in a dict; {name: state}
+
+    Pass an ``index`` from :py:func:`index_high` to look the SLS up instead of
+    scanning the high data.
     '''
     ret = []
+    if index is not None:
+        for nid in index['sls'].get(sls, ()):
+            for st_ in high[nid]:
+                if st_.startswith('__'):
+                    continue
+                ret.append((nid, st_))
+        return ret
     for nid, item in six.iteritems(high):
         try:
             sls_tgt = item['__sls__']
@@ -753,6 +822,7 @@ class State(object):
         self.mod_init = set()
         self.pre = {}
         self.__run_num = 0
+        self.__chunk_index = None
         self.jid = jid
         self.instance_id = six.text_type(id(self))
         self.inject_globals = {}
@@ -1573,6 +1643,8 @@ class State(object):
         req_in_all = req_in.union({'require', 'watch', 'onfail', 'onfail_stop', 'onchanges'})
         extend = {}
         errors = []
+        # The high data isn't changed until the extends are reconciled below
+        index = index_high(high)
         for id_, body in six.iteritems(high):
             if not isinstance(body, dict):
                 continue
@@ -1646,25 +1718,18 @@ class State(object):
                                                      if not x.startswith('__')]
                                         ind = {_ind_high[0]: ind}
                                     else:
-                                        found = False
-                                        for _id in iter(high):
-                                            for state in [state for state
-                                                          in iter(high[_id])
-                                                          if not state.startswith('__')]:
-                                                for j in iter(high[_id][state]):
-                                                    if isinstance(j, dict) and 'name' in j:
-                                                        if j['name'] == ind:
-                                                            ind = {state: _id}
-                                                            found = True
-                                        if not found:
+                                        try:
+                                            _state, _id = index['name'][ind]
+                                        except (KeyError, TypeError):
                                             continue
+                                        ind = {_state: _id}
                                 if len(ind) < 1:
                                     continue
                                 pstate = next(iter(ind))
                                 pname = ind[pstate]
                                 if pstate == 'sls':
                                     # Expand hinges here
-                                    hinges = find_sls_ids(pname, high)
+                                    hinges = find_sls_ids(pname, high, index)
                                 else:
                                     hinges.append((pname, pstate))
                                 if '.' in pstate:
@@ -1694,7 +1759,7 @@ class State(object):
                                                 )
                                     if key == 'prereq':
                                         # Add prerequired to prereqs
-                                        ext_ids = find_name(name, _state, high)
+                                        ext_ids = find_name(name, _state, high, index)
                                         for ext_id, _req_state in ext_ids:
                                             if ext_id not in extend:
                                                 extend[ext_id] = OrderedDict()
@@ -1707,7 +1772,7 @@ class State(object):
                                     if key == 'use_in':
                                         # Add the running states args to the
                                         # use_in states
-                                        ext_ids = find_name(name, _state, high)
+                                        ext_ids = find_name(name, _state, high, index)
                                         for ext_id, _req_state in ext_ids:
                                             if not ext_id:
                                                 continue
@@ -1734,7 +1799,7 @@ class State(object):
                                     if key == 'use':
                                         # Add the use state's args to the
                                         # running state
-                                        ext_ids = find_name(name, _state, high)
+                                        ext_ids = find_name(name, _state, high, index)
                                         for ext_id, _req_state in ext_ids:
                                             if not ext_id:
                                                 continue
@@ -1814,7 +1879,13 @@ class State(object):
         # duration in milliseconds.microseconds
         duration = (delta.seconds * 1000000 + delta.microseconds) / 1000.0
         ret['duration'] = duration
+        self._write_parallel_ret(tag, ret)
 
+    def _write_parallel_ret(self, tag, ret):
+        '''
+        Write the return of a state run in a separate process to the cache,
+        for the parent process to read
+        '''
         troot = os.path.join(self.opts['cachedir'], self.jid)
         tfile = os.path.join(
             troot,
@@ -1829,6 +1900,28 @@ class State(object):
         with salt.utils.files.fopen(tfile, 'wb+') as fp_:
             fp_.write(msgpack_serialize(ret))
 
+    def _read_parallel_ret(self, tag, name):
+        '''
+        Read the return of a state run in a separate process from the cache
+        '''
+        ret_cache = os.path.join(
+            self.opts['cachedir'],
+            self.jid,
+            salt.utils.hashutils.sha1_digest(tag))
+        if not os.path.isfile(ret_cache):
+            return {'result': False,
+                    'comment': 'Parallel process failed to return',
+                    'name': name,
+                    'changes': {}}
+        try:
+            with salt.utils.files.fopen(ret_cache, 'rb') as fp_:
+                return msgpack_deserialize(fp_.read())
+        except (OSError, IOError):
+            return {'result': False,
+                    'comment': 'Parallel cache failure',
+                    'name': name,
+                    'changes': {}}
+
     def call_parallel(self, cdata, low):
         '''
         Call the state defined in the given cdata in parallel
@@ -2258,20 +2351,26 @@ class State(object):
                         chunks.remove(low)
                         break
         running = {}
-        for low in chunks:
-            if '__FAILHARD__' in running:
-                running.pop('__FAILHARD__')
+        concurrency = self._state_concurrency(chunks)
+        if concurrency > 1:
+            running, stopped = self.call_chunks_concurrent(chunks, concurrency)
+            if stopped:
                 return running
-            tag = _gen_tag(low)
-            if tag not in running:
-                # Check if this low chunk is paused
-                action = self.check_pause(low)
-                if action == 'kill':
-                    break
-                running = self.call_chunk(low, running, chunks)
-                if self.check_failhard(low, running):
+        else:
+            for low in chunks:
+                if '__FAILHARD__' in running:
+                    running.pop('__FAILHARD__')
                     return running
-            self.active = set()
+                tag = _gen_tag(low)
+                if tag not in running:
+                    # Check if this low chunk is paused
+                    action = self.check_pause(low)
+                    if action == 'kill':
+                        break
+                    running = self.call_chunk(low, running, chunks)
+                    if self.check_failhard(low, running):
+                        return running
+                self.active = set()
         while True:
             if self.reconcile_procs(running):
                 break
@@ -2279,6 +2378,182 @@ class State(object):
         ret = dict(list(disabled.items()) + list(running.items()))
         return ret
 
+    def _state_concurrency(self, chunks):
+        '''
+        Return how many states the concurrent state scheduler may run at the
+        same time, 1 means that the chunks are run in order
+        '''
+        try:
+            concurrency = int(self.opts.get('state_concurrency', 1))
+        except (TypeError, ValueError):
+            log.error(
+                'Invalid state_concurrency value %r, running the states in order',
+                self.opts.get('state_concurrency')
+            )
+            return 1
+        if concurrency < 2:
+            return 1
+        if not self.jid:
+            log.debug('The concurrent state scheduler needs a jid, running '
+                      'the states in order')
+            return 1
+        for low in chunks:
+            if 'prereq' in low or 'prerequired' in low:
+                log.debug('Found a prereq requisite in %s, running the '
+                          'states in order', low['__id__'])
+                return 1
+        return concurrency
+
+    def _chunk_requisites(self, low, chunks):
+        '''
+        Return the tags of the chunks which have to finish before the low
+        chunk can run. Requisites which can't be found are left for
+        call_chunk to report.
+        '''
+        tags = set()
+        for requisite in ('require', 'require_any', 'watch', 'watch_any',
+                          'onfail', 'onfail_any', 'onchanges', 'onchanges_any'):
+            for req in low.get(requisite) or ():
+                if isinstance(req, six.string_types):
+                    req = {'id': req}
+                req = trim_req(req)
+                req_key = next(iter(req))
+                req_val = req[req_key]
+                if not isinstance(req_val, six.string_types):
+                    continue
+                try:
+                    found = self.find_requisite_chunks(req_key, req_val, chunks)
+                except KeyError:
+                    continue
+                tags.update(_gen_tag(chunk) for chunk in found)
+        return tags
+
+    def _call_chunk_target(self, low, chunks, running):
+        '''
+        The target function of the processes started by the concurrent state
+        scheduler
+        '''
+        tag = _gen_tag(low)
+        low = low.copy()
+        # This is already a separate process
+        low.pop('parallel', None)
+        try:
+            ret = self.call(low, chunks, running)
+        except Exception:  # pylint: disable=broad-except
+            trb = traceback.format_exc()
+            ret = {'result': False,
+                   'name': low['name'],
+                   'changes': {},
+                   'comment': 'An exception occurred in this state: {0}'.format(trb)}
+        self._write_parallel_ret(tag, ret)
+
+    def _start_chunk(self, low, running, chunks):
+        '''
+        Start the low chunk in a separate process if its requisites are met.
+        Returns the process, or None if the chunk has to be run by call_chunk
+        because it is skipped, failed or watches a chunk which changed.
+        '''
+        if any(low.get(key) for key in ('reload_modules',
+                                         'reload_grains',
+                                         'reload_pillar',
+                                         'force_reload_modules')):
+            # These have to refresh this process
+            return None
+        low = self._mod_aggregate(low, running, chunks)
+        self._mod_init(low)
+        status, _ = self.check_requisite(low, running, chunks)
+        if status != 'met':
+            return None
+        proc = salt.utils.process.Process(
+                target=self._call_chunk_target,
+                args=(low, chunks, running))
+        proc.start()
+        return proc
+
+    def call_chunks_concurrent(self, chunks, concurrency):
+        '''
+        Run each chunk as soon as the chunks it requires have finished, with
+        up to ``concurrency`` states running at the same time in their own
+        processes. Chunks which are ready at the same time start in the order
+        of the chunks, and chunks which can't be started because of recursive
+        requisites are run in order by call_chunk.
+
+        Returns the running dict and whether failhard or a kill stopped the
+        run.
+        '''
+        running = {}
+        pending = [(low, self._chunk_requisites(low, chunks)) for low in chunks]
+        procs = OrderedDict()
+        stopped = False
+        while pending or procs:
+            for tag, (proc, low) in list(procs.items()):
+                if proc.is_alive():
+                    continue
+                procs.pop(tag)
+                ret = self._read_parallel_ret(tag, low['name'])
+                ret['__run_num__'] = self.__run_num
+                self.__run_num += 1
+                running[tag] = ret
+                self.check_refresh(low, ret)
+                self.event(ret, len(chunks), fire_event=low.get('fire_event'))
+                if self.check_failhard(low, running):
+                    stopped = True
+            if stopped:
+                if procs:
+                    time.sleep(0.01)
+                    continue
+                return running, True
+
+            serial = any(low['state'] in STATE_CONCURRENCY_SERIAL
+                         for _, low in six.itervalues(procs))
+            started = False
+            for item in list(pending):
+                if len(procs) >= concurrency:
+                    break
+                low, reqs = item
+                tag = _gen_tag(low)
+                if tag in running:
+                    pending.remove(item)
+                    continue
+                if not reqs.issubset(running):
+                    continue
+                if serial and low['state'] in STATE_CONCURRENCY_SERIAL:
+                    continue
+                pending.remove(item)
+                started = True
+                if self.check_pause(low) == 'kill':
+                    del pending[:]
+                    break
+                proc = self._start_chunk(low, running, chunks)
+                if proc is not None:
+                    procs[tag] = (proc, low)
+                    serial = serial or low['state'] in STATE_CONCURRENCY_SERIAL
+                    continue
+                running = self.call_chunk(low, running, chunks)
+                self.active = set()
+                if self.check_failhard(low, running) or '__FAILHARD__' in running:
+                    running.pop('__FAILHARD__', None)
+                    stopped = True
+                    break
+            if not started and not procs and pending:
+                # Nothing can start, the remaining chunks have recursive
+                # requisites. Run the next one in order so that call_chunk
+                # resolves them the same way as it does without concurrency.
+                low, _ = pending.pop(0)
+                if _gen_tag(low) in running:
+                    continue
+                if self.check_pause(low) == 'kill':
+                    del pending[:]
+                    continue
+                running = self.call_chunk(low, running, chunks)
+                self.active = set()
+                if self.check_failhard(low, running) or '__FAILHARD__' in running:
+                    running.pop('__FAILHARD__', None)
+                    stopped = True
+            elif not started:
+                time.sleep(0.01)
+        return running, stopped
+
     def check_failhard(self, low, running):
         '''
         Check if the low data chunk should send a failhard signal
@@ -2346,29 +2621,62 @@ class State(object):
             proc = running[tag].get('proc')
             if proc:
                 if not proc.is_alive():
-                    ret_cache = os.path.join(
-                        self.opts['cachedir'],
-                        self.jid,
-                        salt.utils.hashutils.sha1_digest(tag))
-                    if not os.path.isfile(ret_cache):
-                        ret = {'result': False,
-                               'comment': 'Parallel process failed to return',
-                               'name': running[tag]['name'],
-                               'changes': {}}
-                    try:
-                        with salt.utils.files.fopen(ret_cache, 'rb') as fp_:
-                            ret = msgpack_deserialize(fp_.read())
-                    except (OSError, IOError):
-                        ret = {'result': False,
-                               'comment': 'Parallel cache failure',
-                               'name': running[tag]['name'],
-                               'changes': {}}
+                    ret = self._read_parallel_ret(tag, running[tag]['name'])
                     running[tag].update(ret)
                     running[tag].pop('proc')
                 else:
                     retset.add(False)
         return False not in retset
 
+    def _chunk_index(self, chunks):
+        '''
+        Return the index of the low chunks by ID, name and SLS, building it
+        if the chunks changed since it was last built
+        '''
+        cached = self.__chunk_index
+        if cached is not None and cached[0] is chunks and cached[1] == len(chunks):
+            return cached[2]
+        index = {'__id__': {}, 'name': {}, '__sls__': {}}
+        for pos, chunk in enumerate(chunks):
+            for key, by_key in six.iteritems(index):
+                val = chunk.get(key)
+                if isinstance(val, six.string_types):
+                    val = os.path.normcase(val)
+                try:
+                    by_key.setdefault(val, []).append(pos)
+                except TypeError:
+                    continue
+        self.__chunk_index = (chunks, len(chunks), index)
+        return index
+
+    def find_requisite_chunks(self, req_key, req_val, chunks):
+        '''
+        Return the chunks matched by a requisite, in the order of ``chunks``.
+        Globs are matched against every chunk, plain names are looked up in
+        the chunk index.
+        '''
+        if req_key == 'sls':
+            # Allow requisite tracking of entire sls files
+            if _has_glob(req_val):
+                return [chunk for chunk in chunks
+                        if fnmatch.fnmatch(chunk['__sls__'], req_val)]
+            index = self._chunk_index(chunks)
+            positions = index['__sls__'].get(os.path.normcase(req_val), [])
+        else:
+            if _has_glob(req_val):
+                return [chunk for chunk in chunks
+                        if (fnmatch.fnmatch(chunk['name'], req_val) or
+                            fnmatch.fnmatch(chunk['__id__'], req_val)) and
+                        (req_key == 'id' or chunk['state'] == req_key)]
+            index = self._chunk_index(chunks)
+            req_val = os.path.normcase(req_val)
+            positions = sorted(
+                set(index['name'].get(req_val, ())).union(
+                    index['__id__'].get(req_val, ())))
+            if req_key != 'id':
+                positions = [x for x in positions if chunks[x]['state'] == req_key]
+        return [chunks[x] for x in positions]
+
     def check_requisite(self, low, running, chunks, pre=False):
         '''
         Look into the running data to check the status of all requisite
@@ -2429,40 +2737,23 @@ class State(object):
                     if isinstance(req, six.string_types):
                         req = {'id': req}
                     req = trim_req(req)
-                    found = False
-                    for chunk in chunks:
-                        req_key = next(iter(req))
-                        req_val = req[req_key]
-                        if req_val is None:
-                            continue
-                        if req_key == 'sls':
-                            # Allow requisite tracking of entire sls files
-                            if fnmatch.fnmatch(chunk['__sls__'], req_val):
-                                found = True
-                                reqs[r_state].append(chunk)
-                            continue
-                        try:
-                            if isinstance(req_val, six.string_types):
-                                if (fnmatch.fnmatch(chunk['name'], req_val) or
-                                    fnmatch.fnmatch(chunk['__id__'], req_val)):
-                                    if req_key == 'id' or chunk['state'] == req_key:
-                                        found = True
-                                        reqs[r_state].append(chunk)
-                            else:
-                                raise KeyError
-                        except KeyError as exc:
-                            raise SaltRenderError(
-                                'Could not locate requisite of [{0}] present in state with name [{1}]'.format(
-                                    req_key, chunk['name']))
-                        except TypeError:
-                            # On Python 2, the above req_val, being an OrderedDict, will raise a KeyError,
-                            # however on Python 3 it will raise a TypeError
-                            # This was found when running tests.unit.test_state.StateCompilerTestCase.test_render_error_on_invalid_requisite
-                            raise SaltRenderError(
-                                'Could not locate requisite of [{0}] present in state with name [{1}]'.format(
-                                    req_key, chunk['name']))
+                    req_key = next(iter(req))
+                    req_val = req[req_key]
+                    if req_val is None or not chunks:
+                        return 'unmet', ()
+                    if not isinstance(req_val, six.string_types):
+                        raise SaltRenderError(
+                            'Could not locate requisite of [{0}] present in state with name [{1}]'.format(
+                                req_key, chunks[0]['name']))
+                    try:
+                        found = self.find_requisite_chunks(req_key, req_val, chunks)
+                    except KeyError:
+                        raise SaltRenderError(
+                            'Could not locate requisite of [{0}] present in state with name [{1}]'.format(
+                                req_key, low['name']))
                     if not found:
                         return 'unmet', ()
+                    reqs[r_state].extend(found)
         fun_stats = set()
         for r_state, chunks in six.iteritems(reqs):
             req_stats = set()
@@ -2618,26 +2909,14 @@ class State(object):
                     found = False
                     req_key = next(iter(req))
                     req_val = req[req_key]
-                    for chunk in chunks:
-                        if req_val is None:
-                            continue
-                        if req_key == 'sls':
-                            # Allow requisite tracking of entire sls files
-                            if fnmatch.fnmatch(chunk['__sls__'], req_val):
-                                if requisite == 'prereq':
-                                    chunk['__prereq__'] = True
-                                reqs.append(chunk)
-                                found = True
-                            continue
-                        if (fnmatch.fnmatch(chunk['name'], req_val) or
-                            fnmatch.fnmatch(chunk['__id__'], req_val)):
-                            if req_key == 'id' or chunk['state'] == req_key:
-                                if requisite == 'prereq':
-                                    chunk['__prereq__'] = True
-                                elif requisite == 'prerequired':
-                                    chunk['__prerequired__'] = True
-                                reqs.append(chunk)
-                                found = True
+                    if req_val is not None:
+                        for chunk in self.find_requisite_chunks(req_key, req_val, chunks):
+                            if requisite == 'prereq':
+                                chunk['__prereq__'] = True
+                            elif requisite == 'prerequired' and req_key != 'sls':
+                                chunk['__prerequired__'] = True
+                            reqs.append(chunk)
+                            found = True
                     if not found:
                         lost[requisite].append(req)
             if lost['require'] or lost['watch'] or lost['prereq'] \
@@ -3057,6 +3336,7 @@ class BaseHighState(object):
         self.avail = self.__gather_avail()
         self.serial = salt.payload.Serial(self.opts)
         self.building_highstate = OrderedDict()
+        self._render_cache = None
 
     def __gather_avail(self):
         '''
@@ -3567,6 +3847,17 @@ class BaseHighState(object):
             self.state.opts['pillar'] = self.state._gather_pillar()
         self.state.module_refresh()
 
+    def _sls_render_cache(self):
+        '''
+        Return the SLS render cache, or None if state_render_cache is disabled
+        '''
+        if not self.state.opts.get('state_render_cache'):
+            return None
+        if self._render_cache is None:
+            self._render_cache = salt.utils.slscache.SLSCache(
+                self.state.opts, self.client)
+        return self._render_cache
+
     def render_state(self, sls, saltenv, mods, matches, local=False):
         '''
         Render a state file and retrieve all of the include states
@@ -3590,16 +3881,22 @@ class BaseHighState(object):
                 'fileserver'.format(sls, saltenv)
             )
         else:
+            cache = None if local else self._sls_render_cache()
             try:
-                state = compile_template(fn_,
-                                         self.state.rend,
-                                         self.state.opts['renderer'],
-                                         self.state.opts['renderer_blacklist'],
-                                         self.state.opts['renderer_whitelist'],
-                                         saltenv,
-                                         sls,
-                                         rendered_sls=mods
-                                         )
+                if cache is not None:
+                    state = cache.get(fn_, saltenv, sls)
+                if state is None:
+                    state = compile_template(fn_,
+                                             self.state.rend,
+                                             self.state.opts['renderer'],
+                                             self.state.opts['renderer_blacklist'],
+                                             self.state.opts['renderer_whitelist'],
+                                             saltenv,
+                                             sls,
+                                             rendered_sls=mods
+                                             )
+                    if cache is not None and isinstance(state, dict):
+                        cache.store(fn_, saltenv, sls, state)
             except SaltRenderError as exc:
                 msg = 'Rendering SLS \'{0}:{1}\' failed: {2}'.format(
                     saltenv, sls, exc
@@ -77,8 +77,9 @@ class ThorState(salt.state.HighState):
                 minions = self.cache.list('minions')
                 if not minions:
                     return cache
-                for minion in minions:
-                    total = self.cache.fetch('minions/{0}'.format(minion), 'data')
+                fetched = self.cache.iter_fetch_many(
+                    [('minions/{0}'.format(minion), 'data') for minion in minions])
+                for minion, (_, total) in zip(minions, fetched):
 
                     if 'pillar' in total:
                         if self.pillar_keys:
@@ -7,7 +7,9 @@ IPC transport classes
 from __future__ import absolute_import, print_function, unicode_literals
 import sys
 import errno
+import fnmatch
 import logging
+import re
 import socket
 import time
 
@@ -23,11 +25,38 @@ from salt.ext.tornado.iostream import IOStream, StreamClosedError
 import salt.utils.msgpack
 import salt.transport.client
 import salt.transport.frame
+import salt.utils.stringutils
 from salt.ext import six
 
 log = logging.getLogger(__name__)
 
 
+def _tag_matcher(tag, match_type):
+    '''
+    Return a function checking whether a tag matches the passed tag filter,
+    with the same semantics as the match types of SaltEvent. None is returned
+    for the filters which can't match anything.
+    '''
+    tag = salt.utils.stringutils.to_str(tag)
+    match_type = salt.utils.stringutils.to_str(match_type)
+    if match_type == 'startswith':
+        return lambda event_tag: event_tag.startswith(tag)
+    if match_type == 'endswith':
+        return lambda event_tag: event_tag.endswith(tag)
+    if match_type == 'find':
+        return lambda event_tag: event_tag.find(tag) >= 0
+    if match_type == 'fnmatch':
+        return lambda event_tag: fnmatch.fnmatch(event_tag, tag)
+    if match_type == 'regex':
+        try:
+            regex = re.compile('^{0}'.format(tag))
+        except re.error:
+            return None
+        return lambda event_tag: regex.search(event_tag) is not None
+    log.error('Invalid tag filter match type: %s', match_type)
+    return None
+
+
 # 'tornado.concurrent.Future' doesn't support
 # remove_done_callback() which we would have called
 # in the timeout case. Due to this, we have this
@@ -481,6 +510,8 @@ class IPCMessagePublisher(object):
         self.io_loop = io_loop or IOLoop.current()
         self._closing = False
         self.streams = set()
+        # The tag filters of the subscribers which sent some, by stream
+        self.tag_filters = {}
 
     def start(self):
         '''
@@ -513,16 +544,70 @@ class IPCMessagePublisher(object):
             yield stream.write(pack)
         except StreamClosedError:
             log.trace('Client disconnected from IPC %s', self.socket_path)
-            self.streams.discard(stream)
+            self._discard(stream)
         except Exception as exc:  # pylint: disable=broad-except
             log.error('Exception occurred while handling stream: %s', exc)
             if not stream.closed():
                 stream.close()
-            self.streams.discard(stream)
+            self._discard(stream)
+
+    def _discard(self, stream):
+        self.streams.discard(stream)
+        self.tag_filters.pop(stream, None)
+
+    @salt.ext.tornado.gen.coroutine
+    def _read_tag_filters(self, stream):
+        '''
+        Read the tag filters a subscriber sends. Subscribers which never send
+        any get every message.
+        '''
+        # msgpack deprecated `encoding` starting with version 0.5.2
+        if salt.utils.msgpack.version >= (0, 5, 2):
+            # Under Py2 we still want raw to be set to True
+            msgpack_kwargs = {'raw': six.PY2}
+        else:
+            if six.PY2:
+                msgpack_kwargs = {'encoding': None}
+            else:
+                msgpack_kwargs = {'encoding': 'utf-8'}
+        unpacker = salt.utils.msgpack.Unpacker(**msgpack_kwargs)
+        while not stream.closed():
+            try:
+                wire_bytes = yield stream.read_bytes(4096, partial=True)
+            except StreamClosedError:
+                break
+            except Exception as exc:  # pylint: disable=broad-except
+                log.error('Exception occurred while reading tag filters: %s', exc)
+                break
+            unpacker.feed(wire_bytes)
+            for framed_msg in unpacker:
+                body = framed_msg['body']
+                if isinstance(body, dict) and 'tag_filters' in body:
+                    self.set_tag_filters(stream, body['tag_filters'])
+
+    def set_tag_filters(self, stream, tag_filters):
+        '''
+        Only send the messages whose tag matches one of the ``[tag,
+        match_type]`` pairs to the stream, or every message when
+        ``tag_filters`` is None
+        '''
+        if stream not in self.streams:
+            return
+        if tag_filters is None:
+            self.tag_filters.pop(stream, None)
+            return
+        matchers = []
+        for tag, match_type in tag_filters:
+            matcher = _tag_matcher(tag, match_type)
+            if matcher is not None:
+                matchers.append(matcher)
+        self.tag_filters[stream] = matchers
 
-    def publish(self, msg):
+    def publish(self, msg, tag=None):
         '''
-        Send message to all connected sockets
+        Send message to all connected sockets. When the tag of the message is
+        passed, the subscribers with tag filters only get the message if one
+        of their filters matches it.
         '''
         if not self.streams:
             return
@@ -530,6 +615,9 @@ class IPCMessagePublisher(object):
         pack = salt.transport.frame.frame_msg_ipc(msg, raw_body=True)
 
         for stream in self.streams:
+            if tag is not None and stream in self.tag_filters:
+                if not any(match(tag) for match in self.tag_filters[stream]):
+                    continue
             self.io_loop.spawn_callback(self._write, stream, pack)
 
     def handle_connection(self, connection, address):
@@ -547,9 +635,10 @@ class IPCMessagePublisher(object):
             self.streams.add(stream)
 
             def discard_after_closed():
-                self.streams.discard(stream)
+                self._discard(stream)
 
             stream.set_close_callback(discard_after_closed)
+            self.io_loop.spawn_callback(self._read_tag_filters, stream)
         except Exception as exc:  # pylint: disable=broad-except
             log.error('IPC streaming error: %s', exc)
 
@@ -565,6 +654,7 @@ class IPCMessagePublisher(object):
         for stream in self.streams:
             stream.close()
         self.streams.clear()
+        self.tag_filters.clear()
         if hasattr(self.sock, 'close'):
             self.sock.close()
 
@@ -618,6 +708,47 @@ class IPCMessageSubscriber(IPCClient):
         self._read_stream_future = None
         self._saved_data = []
         self._read_in_progress = Lock()
+        self._tag_filters = None
+
+    def connect(self, callback=None, timeout=None):
+        '''
+        Connect to the IPC socket, and send the tag filters to the publisher
+        once connected
+        '''
+        future = super(IPCMessageSubscriber, self).connect(
+            callback=callback, timeout=timeout)
+        if self._tag_filters is not None:
+            future.add_done_callback(lambda future: self._send_tag_filters())
+        return future
+
+    def set_tag_filters(self, tag_filters):
+        '''
+        Ask the publisher to only send the messages whose tag matches one of
+        the ``[tag, match_type]`` pairs, or every message when
+        ``tag_filters`` is None. The match types are the ones of SaltEvent.
+
+        The filters only narrow down what the publisher sends once it has
+        received them, so the messages have to be checked again on reception.
+        '''
+        if tag_filters is not None:
+            tag_filters = [list(tag_filter) for tag_filter in tag_filters]
+        if tag_filters == self._tag_filters:
+            return
+        self._tag_filters = tag_filters
+        self._send_tag_filters()
+
+    def _send_tag_filters(self):
+        if not self.connected():
+            return
+        pack = salt.transport.frame.frame_msg_ipc(
+            {'tag_filters': self._tag_filters}, raw_body=True)
+        try:
+            future = self.stream.write(pack)
+        except StreamClosedError:
+            # The filters are sent again on the next connection
+            return
+        # Retrieve the exception of a failed write so that it isn't logged
+        future.add_done_callback(lambda future: future.exception())
 
     @salt.ext.tornado.gen.coroutine
     def _read(self, timeout, callback=None):
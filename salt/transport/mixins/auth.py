@@ -9,6 +9,7 @@ import os
 import hashlib
 import shutil
 import binascii
+import time
 
 # Import Salt Libs
 import salt.crypt
@@ -66,6 +67,41 @@ class AESPubClientMixin(object):
         raise salt.ext.tornado.gen.Return(payload)
 
 
+class AuthSlots(object):
+    '''
+    Bound the number of worker processes of the master which handle sign in
+    requests at the same time, so that a sign in storm leaves the other
+    workers to the jobs of the minions
+    '''
+    def __init__(self, size, timeout=60):
+        self.timeout = timeout
+        # The time each slot was taken at, 0 when the slot is free
+        self.slots = multiprocessing.Array(ctypes.c_double, size)
+
+    def acquire(self):
+        '''
+        Take a free slot and return its index, or None if all of the slots
+        are taken
+        '''
+        now = time.time()
+        with self.slots.get_lock():
+            slots = self.slots.get_obj()
+            for index, taken in enumerate(slots):
+                # A slot held for longer than the timeout was left behind by
+                # a worker which died while handling a sign in
+                if not taken or now - taken > self.timeout:
+                    slots[index] = now
+                    return index
+        return None
+
+    def release(self, index):
+        '''
+        Free a slot taken with acquire
+        '''
+        with self.slots.get_lock():
+            self.slots.get_obj()[index] = 0
+
+
 # TODO: rename?
 class AESReqServerMixin(object):
     '''
@@ -87,6 +123,8 @@ class AESReqServerMixin(object):
                 ),
                 'reload': salt.crypt.Crypticle.generate_key_string
             }
+        if self.opts.get('auth_max_workers', 0) > 0:
+            self.auth_slots = AuthSlots(self.opts['auth_max_workers'])
 
     def post_fork(self, _, __):
         self.serial = salt.payload.Serial(self.opts)
@@ -107,7 +145,58 @@ class AESReqServerMixin(object):
 
         self.master_key = salt.crypt.MasterKeys(self.opts)
 
-    def _encrypt_private(self, ret, dictkey, target):
+        # The parsed public keys of the minions, by path, along with the
+        # stat of the file they were read from
+        self.pub_keys = {}
+        # The last signatures of the AES key and of the master public key
+        self._aes_sig = (None, None)
+        self._pub_sig = (None, None)
+
+    def _read_pub_key(self, pubfn):
+        '''
+        Return the cache entry of a minion public key file, reading the file
+        again only if it has changed
+        '''
+        stat = os.stat(pubfn)
+        stamp = (stat.st_mtime, stat.st_size, stat.st_ino)
+        entry = self.pub_keys.get(pubfn)
+        if entry is None or entry['stamp'] != stamp:
+            with salt.utils.files.fopen(pubfn, 'r') as pubfn_handle:
+                entry = {'stamp': stamp, 'pub': pubfn_handle.read(), 'key': None}
+            self.pub_keys[pubfn] = entry
+        return entry
+
+    def _get_pub_key(self, pubfn):
+        '''
+        Return the parsed public key of a minion
+        '''
+        entry = self._read_pub_key(pubfn)
+        if entry['key'] is None:
+            entry['key'] = salt.crypt.get_rsa_pub_key(pubfn)
+        return entry['key']
+
+    def _sign_aes(self, aes):
+        '''
+        Sign the digest of the AES key sent to a minion. Unless the key is
+        mixed with a token, every minion gets the same signature until the
+        key is rotated.
+        '''
+        if self._aes_sig[0] != aes:
+            digest = salt.utils.stringutils.to_bytes(hashlib.sha256(aes).hexdigest())
+            self._aes_sig = (aes, salt.crypt.private_encrypt(self.master_key.key, digest))
+        return self._aes_sig[1]
+
+    def _reply_compression(self, payload):
+        '''
+        Return the compression the minion which sent a payload agreed to for
+        the replies, or None
+        '''
+        compress = payload.get('compress')
+        if compress in salt.crypt.COMPRESSIONS:
+            return compress
+        return None
+
+    def _encrypt_private(self, ret, dictkey, target, compress=None):
         '''
         The server equivalent of ReqChannel.crypted_transfer_decode_dictentry
         '''
@@ -120,10 +209,10 @@ class AESReqServerMixin(object):
             self.opts,
             key)
         try:
-            pub = salt.crypt.get_rsa_pub_key(pubfn)
+            pub = self._get_pub_key(pubfn)
         except (ValueError, IndexError, TypeError):
             return self.crypticle.dumps({})
-        except IOError:
+        except (IOError, OSError):
             log.error('AES key not found')
             return {'error': 'AES key not found'}
 
@@ -136,7 +225,8 @@ class AESReqServerMixin(object):
             cipher = PKCS1_OAEP.new(pub)
             pret['key'] = cipher.encrypt(key)
         pret[dictkey] = pcrypt.dumps(
-            ret if ret is not False else {}
+            ret if ret is not False else {},
+            compress=compress,
         )
         return pret
 
@@ -152,16 +242,39 @@ class AESReqServerMixin(object):
 
     def _decode_payload(self, payload):
         # we need to decrypt it
-        if payload['enc'] == 'aes':
+        if payload['enc'] in ('aes', 'aes-gcm'):
+            aead = payload['enc'] == 'aes-gcm'
             try:
-                payload['load'] = self.crypticle.loads(payload['load'])
+                payload['load'] = self.crypticle.loads(payload['load'], aead=aead)
             except salt.crypt.AuthenticationError:
                 if not self._update_aes():
                     raise
-                payload['load'] = self.crypticle.loads(payload['load'])
+                payload['load'] = self.crypticle.loads(payload['load'], aead=aead)
         return payload
 
     def _auth(self, load):
+        '''
+        Authenticate the client, unless too many workers are already handling
+        sign in requests. The minions which are turned away are told when to
+        try again.
+        '''
+        auth_slots = getattr(self, 'auth_slots', None)
+        if auth_slots is None:
+            return self._sign_in(load)
+        slot = auth_slots.acquire()
+        if slot is None:
+            retry_after = self.opts['auth_retry_after']
+            log.debug('Too many sign in requests, asking %s to retry in %s '
+                      'seconds', load.get('id'), retry_after)
+            return {'enc': 'clear',
+                    'load': {'ret': 'retry',
+                             'retry_after': retry_after}}
+        try:
+            return self._sign_in(load)
+        finally:
+            auth_slots.release(slot)
+
+    def _sign_in(self, load):
         '''
         Authenticate the client, use the sent public key to encrypt the AES key
         which was generated at start up.
@@ -248,24 +361,23 @@ class AESReqServerMixin(object):
 
         elif os.path.isfile(pubfn):
             # The key has been accepted, check it
-            with salt.utils.files.fopen(pubfn, 'r') as pubfn_handle:
-                if pubfn_handle.read().strip() != load['pub'].strip():
-                    log.error(
-                        'Authentication attempt from %s failed, the public '
-                        'keys did not match. This may be an attempt to compromise '
-                        'the Salt cluster.', load['id']
-                    )
-                    # put denied minion key into minions_denied
-                    with salt.utils.files.fopen(pubfn_denied, 'w+') as fp_:
-                        fp_.write(load['pub'])
-                    eload = {'result': False,
-                             'id': load['id'],
-                             'act': 'denied',
-                             'pub': load['pub']}
-                    if self.opts.get('auth_events') is True:
-                        self.event.fire_event(eload, salt.utils.event.tagify(prefix='auth'))
-                    return {'enc': 'clear',
-                            'load': {'ret': False}}
+            if self._read_pub_key(pubfn)['pub'].strip() != load['pub'].strip():
+                log.error(
+                    'Authentication attempt from %s failed, the public '
+                    'keys did not match. This may be an attempt to compromise '
+                    'the Salt cluster.', load['id']
+                )
+                # put denied minion key into minions_denied
+                with salt.utils.files.fopen(pubfn_denied, 'w+') as fp_:
+                    fp_.write(load['pub'])
+                eload = {'result': False,
+                         'id': load['id'],
+                         'act': 'denied',
+                         'pub': load['pub']}
+                if self.opts.get('auth_events') is True:
+                    self.event.fire_event(eload, salt.utils.event.tagify(prefix='auth'))
+                return {'enc': 'clear',
+                        'load': {'ret': False}}
 
         elif not os.path.isfile(pubfn_pend):
             # The key has not been accepted, this is a new minion
@@ -433,7 +545,7 @@ class AESReqServerMixin(object):
         # The key payload may sometimes be corrupt when using auto-accept
         # and an empty request comes in
         try:
-            pub = salt.crypt.get_rsa_pub_key(pubfn)
+            pub = self._get_pub_key(pubfn)
         except (ValueError, IndexError, TypeError) as err:
             log.error('Corrupt public key "%s": %s', pubfn, err)
             return {'enc': 'clear',
@@ -445,6 +557,25 @@ class AESReqServerMixin(object):
                'pub_key': self.master_key.get_pub_str(),
                'publish_port': self.opts['publish_port']}
 
+        # Encrypt the requests of the minion with AES-GCM if both ends can
+        if self.opts.get('aes_gcm') and salt.crypt.HAS_AESGCM and \
+                'aes-gcm' in load.get('aead', ()):
+            ret['aead'] = 'aes-gcm'
+
+        # Compress the large requests and replies of the minion if both ends
+        # can
+        compress = self.opts.get('payload_compression')
+        if compress in salt.crypt.COMPRESSIONS and \
+                compress in load.get('compress', ()):
+            ret['compress'] = compress
+        if self.opts.get('publish_compression') and \
+                self.opts['publish_compression'] not in load.get('compress', ()):
+            log.warning(
+                'Minion %s cannot decompress the publishes, which are '
+                'compressed with %s. Upgrade the minion or turn off '
+                'publish_compression.', load['id'], self.opts['publish_compression']
+            )
+
         # sign the master's pubkey (if enabled) before it is
         # sent to the minion that was just authenticated
         if self.opts['master_sign_pubkey']:
@@ -456,14 +587,15 @@ class AESReqServerMixin(object):
             else:
                 # the master has its own signing-keypair, compute the master.pub's
                 # signature and append that to the auth-reply
+                if self._pub_sig[0] != ret['pub_key']:
+                    # get the key_pass for the signing key
+                    key_pass = salt.utils.sdb.sdb_get(self.opts['signing_key_pass'], self.opts)
 
-                # get the key_pass for the signing key
-                key_pass = salt.utils.sdb.sdb_get(self.opts['signing_key_pass'], self.opts)
-
-                log.debug("Signing master public key before sending")
-                pub_sign = salt.crypt.sign_message(self.master_key.get_sign_paths()[1],
-                                                   ret['pub_key'], key_pass)
-                ret.update({'pub_sig': binascii.b2a_base64(pub_sign)})
+                    log.debug("Signing master public key before sending")
+                    pub_sign = salt.crypt.sign_message(self.master_key.get_sign_paths()[1],
+                                                       ret['pub_key'], key_pass)
+                    self._pub_sig = (ret['pub_key'], binascii.b2a_base64(pub_sign))
+                ret.update({'pub_sig': self._pub_sig[1]})
 
         if not HAS_M2:
             mcipher = PKCS1_OAEP.new(self.master_key.key)
@@ -509,8 +641,7 @@ class AESReqServerMixin(object):
             else:
                 ret['aes'] = cipher.encrypt(aes)
         # Be aggressive about the signature
-        digest = salt.utils.stringutils.to_bytes(hashlib.sha256(aes).hexdigest())
-        ret['sig'] = salt.crypt.private_encrypt(self.master_key.key, digest)
+        ret['sig'] = self._sign_aes(aes)
         eload = {'result': True,
                  'act': 'accept',
                  'id': load['id'],
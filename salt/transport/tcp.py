@@ -9,8 +9,10 @@ Wire protocol: "len(payload) msgpack({'head': SOMEHEADER, 'body': SOMEBODY})"
 # Import Python Libs
 from __future__ import absolute_import, print_function, unicode_literals
 import errno
+import fnmatch
 import logging
 import os
+import re
 import socket
 import sys
 import time
@@ -337,17 +339,35 @@ class AsyncTCPReqChannel(salt.transport.client.ReqChannel):
                 raise
     # pylint: enable=W1701
 
-    def _package_load(self, load):
-        return {
-            'enc': self.crypt,
+    def _package_load(self, load, aead=False, compress=None):
+        ret = {
+            'enc': 'aes-gcm' if aead else self.crypt,
             'load': load,
         }
+        if compress:
+            # Tell the master the replies can be compressed too
+            ret['compress'] = compress
+        return ret
+
+    def _package_crypted(self, load, aead):
+        '''
+        Encrypt and package a load, compressing it if the master agreed to
+        '''
+        compress = self.auth.compress
+        return self._package_load(
+            self.auth.crypticle.dumps(load, aead=aead, compress=compress),
+            aead=aead,
+            compress=compress,
+        )
 
     @salt.ext.tornado.gen.coroutine
     def crypted_transfer_decode_dictentry(self, load, dictkey=None, tries=3, timeout=60):
         if not self.auth.authenticated:
             yield self.auth.authenticate()
-        ret = yield self.message_client.send(self._package_load(self.auth.crypticle.dumps(load)), timeout=timeout)
+        aead = self.auth.aead
+        ret = yield self.message_client.send(
+            self._package_crypted(load, aead),
+            timeout=timeout)
         key = self.auth.get_keys()
         if HAS_M2:
             aes = key.private_decrypt(ret['key'], RSA.pkcs1_oaep_padding)
@@ -370,15 +390,17 @@ class AsyncTCPReqChannel(salt.transport.client.ReqChannel):
         '''
         @salt.ext.tornado.gen.coroutine
         def _do_transfer():
-            data = yield self.message_client.send(self._package_load(self.auth.crypticle.dumps(load)),
-                                                  timeout=timeout,
-                                                  )
+            aead = self.auth.aead
+            data = yield self.message_client.send(
+                self._package_crypted(load, aead),
+                timeout=timeout,
+            )
             # we may not have always data
             # as for example for saltcall ret submission, this is a blind
             # communication, we do not subscribe to return events, we just
             # upload the results to the master
             if data:
-                data = self.auth.crypticle.loads(data)
+                data = self.auth.crypticle.loads(data, aead=aead)
                 if six.PY3:
                     data = salt.transport.frame.decode_embedded_strs(data)
             raise salt.ext.tornado.gen.Return(data)
@@ -740,11 +762,16 @@ class TCPReqServerChannel(salt.transport.mixins.auth.AESReqServerMixin, salt.tra
             if req_fun == 'send_clear':
                 stream.write(salt.transport.frame.frame_msg(ret, header=header))
             elif req_fun == 'send':
-                stream.write(salt.transport.frame.frame_msg(self.crypticle.dumps(ret), header=header))
+                stream.write(salt.transport.frame.frame_msg(
+                    self.crypticle.dumps(ret,
+                                         aead=payload['enc'] == 'aes-gcm',
+                                         compress=self._reply_compression(payload)),
+                    header=header))
             elif req_fun == 'send_private':
                 stream.write(salt.transport.frame.frame_msg(self._encrypt_private(ret,
                                                              req_opts['key'],
                                                              req_opts['tgt'],
+                                                             self._reply_compression(payload),
                                                              ), header=header))
             else:
                 log.error('Unknown req_fun %s', req_fun)
@@ -1403,6 +1430,21 @@ class PubServer(salt.ext.tornado.tcpserver.TCPServer, object):
         self.clients.add(client)
         self.io_loop.spawn_callback(self._stream_read, client)
 
+    def _match_present(self, topic_match):
+        '''
+        Return the ids of the connected minions a glob or pcre target
+        matches, the way the matchers of the minions would, or None if the
+        target cannot be matched here
+        '''
+        tgt = topic_match['tgt']
+        if topic_match['tgt_type'] == 'glob':
+            return fnmatch.filter(self.present, tgt)
+        try:
+            regex = re.compile(tgt)
+        except re.error:
+            return None
+        return [id_ for id_ in self.present if regex.match(id_)]
+
     # TODO: ACK the publish through IPC
     @salt.ext.tornado.gen.coroutine
     def publish_payload(self, package, _):
@@ -1410,8 +1452,10 @@ class PubServer(salt.ext.tornado.tcpserver.TCPServer, object):
         payload = salt.transport.frame.frame_msg(package['payload'])
 
         to_remove = []
-        if 'topic_lst' in package:
-            topic_lst = package['topic_lst']
+        topic_lst = package.get('topic_lst')
+        if topic_lst is None and 'topic_match' in package:
+            topic_lst = self._match_present(package['topic_match'])
+        if topic_lst is not None:
             for topic in topic_lst:
                 if topic in self.present:
                     # This will rarely be a list of more than 1 item. It will
@@ -1530,7 +1574,7 @@ class TCPPubServerChannel(salt.transport.server.PubServerChannel):
         payload = {'enc': 'aes'}
 
         crypticle = salt.crypt.Crypticle(self.opts, salt.master.SMaster.secrets['aes']['secret'].value)
-        payload['load'] = crypticle.dumps(load)
+        payload['load'] = crypticle.dumps(load, compress=self.opts.get('publish_compression'))
         if self.opts['sign_pub_messages']:
             master_pem_path = os.path.join(self.opts['pki_dir'], 'master.pem')
             log.debug("Signing data packet")
@@ -1563,5 +1607,13 @@ class TCPPubServerChannel(salt.transport.server.PubServerChannel):
                 int_payload['topic_lst'] = match_ids
             else:
                 int_payload['topic_lst'] = load['tgt']
+        elif load['tgt_type'] in ('glob', 'pcre') and \
+                isinstance(load['tgt'], six.string_types) and \
+                load['tgt'] not in ('*', '.*') and \
+                not self.opts.get('order_masters', False):
+            # Only the publisher knows which minions are connected, so the
+            # target is matched against their ids there
+            int_payload['topic_match'] = {'tgt': load['tgt'],
+                                          'tgt_type': load['tgt_type']}
         # Send it over IPC!
         pub_sock.send(int_payload)
@@ -276,11 +276,26 @@ class AsyncZeroMQReqChannel(salt.transport.client.ReqChannel):
         # if we've reached here something is very abnormal
         raise SaltException('ReqChannel: missing master_uri/master_ip in self.opts')
 
-    def _package_load(self, load):
-        return {
-            'enc': self.crypt,
+    def _package_load(self, load, aead=False, compress=None):
+        ret = {
+            'enc': 'aes-gcm' if aead else self.crypt,
             'load': load,
         }
+        if compress:
+            # Tell the master the replies can be compressed too
+            ret['compress'] = compress
+        return ret
+
+    def _package_crypted(self, load, aead):
+        '''
+        Encrypt and package a load, compressing it if the master agreed to
+        '''
+        compress = self.auth.compress
+        return self._package_load(
+            self.auth.crypticle.dumps(load, aead=aead, compress=compress),
+            aead=aead,
+            compress=compress,
+        )
 
     @salt.ext.tornado.gen.coroutine
     def crypted_transfer_decode_dictentry(self, load, dictkey=None, tries=3, timeout=60):
@@ -288,8 +303,9 @@ class AsyncZeroMQReqChannel(salt.transport.client.ReqChannel):
             # Return control back to the caller, continue when authentication succeeds
             yield self.auth.authenticate()
         # Return control to the caller. When send() completes, resume by populating ret with the Future.result
+        aead = self.auth.aead
         ret = yield self.message_client.send(
-            self._package_load(self.auth.crypticle.dumps(load)),
+            self._package_crypted(load, aead),
             timeout=timeout,
             tries=tries,
         )
@@ -297,8 +313,9 @@ class AsyncZeroMQReqChannel(salt.transport.client.ReqChannel):
         if 'key' not in ret:
             # Reauth in the case our key is deleted on the master side.
             yield self.auth.authenticate()
+            aead = self.auth.aead
             ret = yield self.message_client.send(
-                self._package_load(self.auth.crypticle.dumps(load)),
+                self._package_crypted(load, aead),
                 timeout=timeout,
                 tries=tries,
             )
@@ -332,8 +349,9 @@ class AsyncZeroMQReqChannel(salt.transport.client.ReqChannel):
         @salt.ext.tornado.gen.coroutine
         def _do_transfer():
             # Yield control to the caller. When send() completes, resume by populating data with the Future.result
+            aead = self.auth.aead
             data = yield self.message_client.send(
-                self._package_load(self.auth.crypticle.dumps(load)),
+                self._package_crypted(load, aead),
                 timeout=timeout,
                 tries=tries,
             )
@@ -342,7 +360,7 @@ class AsyncZeroMQReqChannel(salt.transport.client.ReqChannel):
             # communication, we do not subscribe to return events, we just
             # upload the results to the master
             if data:
-                data = self.auth.crypticle.loads(data, raw)
+                data = self.auth.crypticle.loads(data, raw, aead=aead)
             if six.PY3 and not raw:
                 data = salt.transport.frame.decode_embedded_strs(data)
             raise salt.ext.tornado.gen.Return(data)
@@ -781,11 +799,15 @@ class ZeroMQReqServerChannel(salt.transport.mixins.auth.AESReqServerMixin,
         if req_fun == 'send_clear':
             stream.send(self.serial.dumps(ret))
         elif req_fun == 'send':
-            stream.send(self.serial.dumps(self.crypticle.dumps(ret)))
+            stream.send(self.serial.dumps(self.crypticle.dumps(
+                ret,
+                aead=payload['enc'] == 'aes-gcm',
+                compress=self._reply_compression(payload))))
         elif req_fun == 'send_private':
             stream.send(self.serial.dumps(self._encrypt_private(ret,
                                                                 req_opts['key'],
                                                                 req_opts['tgt'],
+                                                                self._reply_compression(payload),
                                                                 )))
         else:
             log.error('Unknown req_fun %s', req_fun)
@@ -1029,7 +1051,7 @@ class ZeroMQPubServerChannel(salt.transport.server.PubServerChannel):
         '''
         payload = {'enc': 'aes'}
         crypticle = salt.crypt.Crypticle(self.opts, salt.master.SMaster.secrets['aes']['secret'].value)
-        payload['load'] = crypticle.dumps(load)
+        payload['load'] = crypticle.dumps(load, compress=self.opts.get('publish_compression'))
         if self.opts['sign_pub_messages']:
             master_pem_path = os.path.join(self.opts['pki_dir'], 'master.pem')
             log.debug("Signing data packet")
@@ -82,6 +82,35 @@ def update(dest, upd, recursive_update=True, merge_lists=False):
     return dest
 
 
+def _update_copy_on_write(dest, upd, merge_lists=False, copy_dest=False):
+    '''
+    Version of update which leaves dest and upd unchanged and returns the
+    result. Only the mappings on the paths to the values which change are
+    copied, the rest of the result is shared with dest and upd.
+    '''
+    ret = copy.copy(dest) if copy_dest else None
+    for key in upd:
+        val = upd[key]
+        try:
+            dest_subkey = dest.get(key, None)
+        except AttributeError:
+            dest_subkey = None
+        if isinstance(dest_subkey, Mapping) \
+                and isinstance(val, Mapping):
+            val = _update_copy_on_write(dest_subkey, val, merge_lists=merge_lists)
+            if val is dest_subkey:
+                continue
+        elif merge_lists and isinstance(dest_subkey, list) \
+                and isinstance(val, list):
+            merged = copy.copy(dest_subkey)
+            merged.extend([x for x in val if x not in merged])
+            val = merged
+        if ret is None:
+            ret = copy.copy(dest)
+        ret[key] = val
+    return dest if ret is None else ret
+
+
 def merge_list(obj_a, obj_b):
     ret = {}
     for key, val in six.iteritems(obj_a):
@@ -92,7 +121,20 @@ def merge_list(obj_a, obj_b):
     return ret
 
 
-def merge_recurse(obj_a, obj_b, merge_lists=False):
+def merge_recurse(obj_a, obj_b, merge_lists=False, copy_on_write=False):
+    '''
+    Merge obj_b into a copy of obj_a
+
+    If copy_on_write=True, obj_a is not deep-copied. The result then shares
+    the values which obj_b does not change with obj_a, so neither must be
+    changed in place afterwards.
+    '''
+    if copy_on_write:
+        if (not isinstance(obj_a, Mapping)) \
+                or (not isinstance(obj_b, Mapping)):
+            raise TypeError('Cannot update using non-dict types in dictupdate.update()')
+        return _update_copy_on_write(obj_a, obj_b, merge_lists=merge_lists,
+                                     copy_dest=True)
     copied = copy.deepcopy(obj_a)
     return update(copied, obj_b, merge_lists=merge_lists)
 
@@ -102,14 +144,25 @@ def merge_aggregate(obj_a, obj_b):
     return _yamlex_merge_recursive(obj_a, obj_b, level=1)
 
 
-def merge_overwrite(obj_a, obj_b, merge_lists=False):
+def merge_overwrite(obj_a, obj_b, merge_lists=False, copy_on_write=False):
     for obj in obj_b:
         if obj in obj_a:
             obj_a[obj] = obj_b[obj]
-    return merge_recurse(obj_a, obj_b, merge_lists=merge_lists)
+    return merge_recurse(obj_a, obj_b, merge_lists=merge_lists,
+                         copy_on_write=copy_on_write)
 
 
-def merge(obj_a, obj_b, strategy='smart', renderer='yaml', merge_lists=False):
+def merge(obj_a, obj_b, strategy='smart', renderer='yaml', merge_lists=False,
+          copy_on_write=False):
+    '''
+    Merge obj_b into obj_a with the given strategy, and return the result
+
+    If copy_on_write=True, the ``recurse`` and ``overwrite`` strategies copy
+    only the parts of obj_a which obj_b changes, instead of all of it. This
+    is meant for accumulating many merges into data which nothing else
+    refers to, such as when compiling the pillar, as the result shares the
+    rest of its values with obj_a.
+    '''
     if strategy == 'smart':
         if renderer.split('|')[-1] == 'yamlex' or renderer.startswith('yamlex_'):
             strategy = 'aggregate'
@@ -119,22 +172,24 @@ def merge(obj_a, obj_b, strategy='smart', renderer='yaml', merge_lists=False):
     if strategy == 'list':
         merged = merge_list(obj_a, obj_b)
     elif strategy == 'recurse':
-        merged = merge_recurse(obj_a, obj_b, merge_lists)
+        merged = merge_recurse(obj_a, obj_b, merge_lists,
+                               copy_on_write=copy_on_write)
     elif strategy == 'aggregate':
         #: level = 1 merge at least root data
         merged = merge_aggregate(obj_a, obj_b)
     elif strategy == 'overwrite':
-        merged = merge_overwrite(obj_a, obj_b, merge_lists)
+        merged = merge_overwrite(obj_a, obj_b, merge_lists,
+                                 copy_on_write=copy_on_write)
     elif strategy == 'none':
         # If we do not want to merge, there is only one pillar passed, so we can safely use the default recurse,
         # we just do not want to log an error
-        merged = merge_recurse(obj_a, obj_b)
+        merged = merge_recurse(obj_a, obj_b, copy_on_write=copy_on_write)
     else:
         log.warning(
             'Unknown merging strategy \'%s\', fallback to recurse',
             strategy
         )
-        merged = merge_recurse(obj_a, obj_b)
+        merged = merge_recurse(obj_a, obj_b, copy_on_write=copy_on_write)
 
     return merged
 
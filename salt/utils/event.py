@@ -200,6 +200,20 @@ def tagify(suffix='', prefix='', base=SALT):
     return TAGPARTER.join([part for part in parts if part])
 
 
+def _get_tag(package, publisher):
+    '''
+    Return the tag of a packed event for the publisher to filter it on, or
+    None when none of its subscribers have tag filters or the tag can't be read
+    '''
+    if not publisher.tag_filters:
+        return None
+    try:
+        return salt.utils.stringutils.to_str(
+            package.partition(salt.utils.stringutils.to_bytes(TAGEND))[0])
+    except (AttributeError, TypeError, UnicodeDecodeError):
+        return None
+
+
 class SaltEvent(object):
     '''
     Warning! Use the get_event function or the code will not be
@@ -252,6 +266,7 @@ class SaltEvent(object):
         self.puburi, self.pulluri = self.__load_uri(sock_dir, node)
         self.pending_tags = []
         self.pending_events = []
+        self.tag_filters = None
         self.__load_cache_regex()
         if listen and not self.cpub:
             # Only connect to the publisher at initialization time if
@@ -325,6 +340,7 @@ class SaltEvent(object):
             return
         match_func = self._get_match_func(match_type)
         self.pending_tags.append([tag, match_func])
+        self._send_tag_filters()
 
     def unsubscribe(self, tag, match_type=None):
         '''
@@ -335,6 +351,7 @@ class SaltEvent(object):
         match_func = self._get_match_func(match_type)
 
         self.pending_tags.remove([tag, match_func])
+        self._send_tag_filters()
 
         old_events = self.pending_events
         self.pending_events = []
@@ -342,6 +359,40 @@ class SaltEvent(object):
             if any(pmatch_func(evt['tag'], ptag) for ptag, pmatch_func in self.pending_tags):
                 self.pending_events.append(evt)
 
+    def set_tag_filters(self, tags):
+        '''
+        Ask the event publisher to only send the events whose tag matches one
+        of the passed ``(tag, match_type)`` pairs, or one of the subscribed
+        tags. Pass None to get every event again.
+
+        The publisher only drops events once it has received the filters, so
+        get_event still checks the tag of every event. Set the filters before
+        the events of interest can be fired, a subscription added later only
+        gets the events the publisher sends after it learns about it.
+        '''
+        if tags is not None:
+            tags = [(tag, match_type or self.opts['event_match_type'])
+                    for tag, match_type in tags]
+        self.tag_filters = tags
+        self._send_tag_filters()
+
+    def _send_tag_filters(self):
+        '''
+        Send the tag filters and the subscribed tags to the publisher
+        '''
+        if self.subscriber is None:
+            return
+        if self.tag_filters is None:
+            self.subscriber.set_tag_filters(None)
+            return
+        tag_filters = list(self.tag_filters)
+        for ptag, pmatch_func in self.pending_tags:
+            if pmatch_func is None:
+                continue
+            # The match functions are named after their match type
+            tag_filters.append((ptag, pmatch_func.__name__[len('_match_tag_'):]))
+        self.subscriber.set_tag_filters(tag_filters)
+
     def connect_pub(self, timeout=None):
         '''
         Establish the publish connection
@@ -356,6 +407,7 @@ class SaltEvent(object):
                         self.puburi,
                         io_loop=self.io_loop
                     )
+                    self._send_tag_filters()
                 try:
                     self.io_loop.run_sync(
                         lambda: self.subscriber.connect(timeout=timeout))
@@ -368,6 +420,7 @@ class SaltEvent(object):
                     self.puburi,
                     io_loop=self.io_loop
                 )
+                self._send_tag_filters()
 
             # For the asynchronous case, the connect will be defered to when
             # set_event_handler() is invoked.
@@ -1042,7 +1095,7 @@ class AsyncEventPublisher(object):
         Get something from epull, publish it out epub, and return the package (or None)
         '''
         try:
-            self.publisher.publish(package)
+            self.publisher.publish(package, tag=_get_tag(package, self.publisher))
             return package
         # Add an extra fallback in case a forked process leeks through
         except Exception:  # pylint: disable=broad-except
@@ -1146,7 +1199,7 @@ class EventPublisher(salt.utils.process.SignalHandlingProcess):
         Get something from epull, publish it out epub, and return the package (or None)
         '''
         try:
-            self.publisher.publish(package)
+            self.publisher.publish(package, tag=_get_tag(package, self.publisher))
             return package
         # Add an extra fallback in case a forked process leeks through
         except Exception:  # pylint: disable=broad-except
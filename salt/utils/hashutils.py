@@ -172,7 +172,7 @@ def random_hash(size=9999999999, hash_type=None):
 
 
 @jinja_filter('file_hashsum')
-def get_hash(path, form='sha256', chunk_size=65536):
+def get_hash(path, form='sha256', chunk_size=65536, size=None):
     '''
     Get the hash sum of a file
 
@@ -181,6 +181,9 @@ def get_hash(path, form='sha256', chunk_size=65536):
         - It does not return a string on error. The returned value of
             ``get_sum`` cannot really be trusted since it is vulnerable to
             collisions: ``get_sum(..., 'xyz') == 'Hash xyz not supported'``
+
+    .. versionchanged:: Sodium
+        If ``size`` is given, only the first ``size`` bytes are hashed.
     '''
     hash_type = hasattr(hashlib, form) and getattr(hashlib, form) or None
     if hash_type is None:
@@ -188,9 +191,17 @@ def get_hash(path, form='sha256', chunk_size=65536):
 
     with salt.utils.files.fopen(path, 'rb') as ifile:
         hash_obj = hash_type()
-        # read the file in in chunks, not the entire file
-        for chunk in iter(lambda: ifile.read(chunk_size), b''):
-            hash_obj.update(chunk)
+        if size is None:
+            # read the file in in chunks, not the entire file
+            for chunk in iter(lambda: ifile.read(chunk_size), b''):
+                hash_obj.update(chunk)
+        else:
+            while size > 0:
+                chunk = ifile.read(min(chunk_size, size))
+                if not chunk:
+                    break
+                hash_obj.update(chunk)
+                size -= len(chunk)
         return hash_obj.hexdigest()
 
 
@@ -28,8 +28,10 @@ from jinja2.ext import Extension
 # Import salt libs
 from salt.exceptions import TemplateError
 import salt.fileclient
+import salt.utils.atomicfile
 import salt.utils.data
 import salt.utils.files
+import salt.utils.hashutils
 import salt.utils.json
 import salt.utils.stringutils
 import salt.utils.url
@@ -40,6 +42,7 @@ from salt.utils.odict import OrderedDict
 log = logging.getLogger(__name__)
 
 __all__ = [
+    'SaltBytecodeCache',
     'SaltCacheLoader',
     'SerializerExtension'
 ]
@@ -196,6 +199,107 @@ class SaltCacheLoader(BaseLoader):
 atexit.register(SaltCacheLoader.shutdown)
 
 
+class SaltBytecodeCache(jinja2.BytecodeCache):
+    '''
+    Cache the compiled Jinja templates in a directory, and in memory for the
+    rest of the process. Jinja checks the checksum of the template source
+    stored with the code, so a changed template is compiled again.
+
+    The code compiled from the same source differs with the environment
+    options, so the fingerprint of the options is part of the cache key.
+    '''
+    # The compiled code shared by all of the caches in this process
+    _memory = {}
+    # How many templates to keep in memory
+    memory_size = 1000
+
+    def __init__(self, directory, fingerprint=''):
+        self.directory = directory
+        self.fingerprint = fingerprint
+
+    def get_cache_key(self, name, filename=None):
+        return super(SaltBytecodeCache, self).get_cache_key(
+            '{0}|{1}'.format(self.fingerprint, name), filename)
+
+    def _cache_path(self, bucket):
+        return os.path.join(self.directory, '{0}.cache'.format(bucket.key))
+
+    def load_bytecode(self, bucket):
+        cached = self._memory.get(bucket.key)
+        if cached is not None and cached[0] == bucket.checksum:
+            bucket.code = cached[1]
+            return
+        try:
+            with salt.utils.files.fopen(self._cache_path(bucket), 'rb') as fp_:
+                bucket.load_bytecode(fp_)
+        except (IOError, OSError):
+            return
+        except Exception:  # pylint: disable=broad-except
+            # A truncated or corrupt cache file
+            bucket.reset()
+            return
+        if bucket.code is not None:
+            self._remember(bucket)
+
+    def dump_bytecode(self, bucket):
+        self._remember(bucket)
+        try:
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory)
+            with salt.utils.atomicfile.atomic_open(self._cache_path(bucket), 'wb') as fp_:
+                bucket.write_bytecode(fp_)
+        except (IOError, OSError) as exc:
+            log.debug('Failed to write the Jinja bytecode cache: %s', exc)
+
+    def _remember(self, bucket):
+        if len(self._memory) >= self.memory_size:
+            self._memory.clear()
+        self._memory[bucket.key] = (bucket.checksum, bucket.code)
+
+    def clear(self):
+        self._memory.clear()
+        for fn_ in os.listdir(self.directory) if os.path.isdir(self.directory) else ():
+            if fn_.endswith('.cache'):
+                try:
+                    os.remove(os.path.join(self.directory, fn_))
+                except OSError:
+                    pass
+
+
+def get_bytecode_cache(opts, env_args):
+    '''
+    Return the bytecode cache for a Jinja environment created with the given
+    arguments, or None if :conf_minion:`jinja_bytecode_cache` is disabled
+    '''
+    if not opts.get('jinja_bytecode_cache', False) or not opts.get('cachedir'):
+        return None
+    options = sorted(
+        (key, repr(val)) for key, val in six.iteritems(env_args)
+        if key not in ('loader', 'bytecode_cache')
+    )
+    fingerprint = salt.utils.hashutils.sha1_digest(
+        repr((jinja2.__version__, opts.get('allow_undefined', False), options)))
+    return SaltBytecodeCache(
+        os.path.join(opts['cachedir'], 'jinja'), fingerprint)
+
+
+def template_from_string(environment, source, name=None):
+    '''
+    Load a template from a string like ``Environment.from_string``, taking
+    the compiled code from the bytecode cache of the environment. The name,
+    e.g. the path of the template file, is used as the cache key.
+    '''
+    bcc = environment.bytecode_cache
+    if bcc is None or not name:
+        return environment.from_string(source)
+    bucket = bcc.get_bucket(environment, name, None, source)
+    if bucket.code is None:
+        bucket.code = environment.compile(source)
+        bcc.set_bucket(bucket)
+    return environment.template_class.from_code(
+        environment, bucket.code, environment.make_globals(None), None)
+
+
 class PrintableDict(OrderedDict):
     '''
     Ensures that dict str() and repr() are YAML friendly.
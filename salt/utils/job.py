@@ -8,6 +8,7 @@ from __future__ import absolute_import, unicode_literals
 import logging
 
 # Import Salt libs
+import salt.exceptions
 import salt.minion
 import salt.utils.jid
 import salt.utils.event
@@ -16,9 +17,13 @@ import salt.utils.verify
 log = logging.getLogger(__name__)
 
 
-def store_job(opts, load, event=None, mminion=None):
+def store_job(opts, load, event=None, mminion=None, batch=None):
     '''
     Store job information using the configured master_job_cache
+
+    If ``batch`` is a list, the return is appended to it instead of being
+    passed to the ``returner`` function of the job cache, so that it can be
+    written later with ``returner_batch``.
     '''
     # Generate EndTime
     endtime = salt.utils.jid.jid_to_time(salt.utils.jid.gen_jid(opts))
@@ -109,13 +114,45 @@ def store_job(opts, load, event=None, mminion=None):
         except KeyError as e:
             log.error("Load does not contain 'jid': %s", e)
 
-    mminion.returners[fstr](load)
+    if batch is None:
+        mminion.returners[fstr](load)
+    else:
+        batch.append(load)
 
     if (opts.get('job_cache_store_endtime')
             and updateetfstr in mminion.returners):
         mminion.returners[updateetfstr](load['jid'], endtime)
 
 
+def store_jobs(opts, loads, event=None, mminion=None):
+    '''
+    Store the information of several job returns using the configured
+    master_job_cache. If the job cache provides a ``returner_batch`` function
+    the returns are written with a single call to it, otherwise they are
+    passed to ``returner`` one at a time.
+    '''
+    if mminion is None:
+        mminion = salt.minion.MasterMinion(opts, states=False, rend=False)
+
+    batchfstr = '{0}.returner_batch'.format(opts['master_job_cache'])
+    batch = [] if batchfstr in mminion.returners else None
+    # A return which fails to be stored must not lose the rest of the batch
+    for load in loads:
+        try:
+            store_job(opts, load, event=event, mminion=mminion, batch=batch)
+        except salt.exceptions.SaltCacheError:
+            log.error('Could not store job information for load: %s', load)
+        except Exception:  # pylint: disable=broad-except
+            log.exception('Could not store job information for load: %s', load)
+    if batch:
+        try:
+            mminion.returners[batchfstr](batch)
+        except salt.exceptions.SaltCacheError:
+            log.error('Could not store job information for %s returns', len(batch))
+        except Exception:  # pylint: disable=broad-except
+            log.exception('Could not store job information for %s returns', len(batch))
+
+
 def store_minions(opts, jid, minions, mminion=None, syndic_id=None):
     '''
     Store additional minions matched on lower-level masters using the configured
@@ -201,10 +201,11 @@ class MasterPillarUtil(object):
             return mine_data
         if not minion_ids:
             minion_ids = self.cache.list('minions')
-        for minion_id in minion_ids:
-            if not salt.utils.verify.valid_id(self.opts, minion_id):
-                continue
-            mdata = self.cache.fetch('minions/{0}'.format(minion_id), 'mine')
+        minion_ids = [minion_id for minion_id in minion_ids
+                      if salt.utils.verify.valid_id(self.opts, minion_id)]
+        fetched = self.cache.iter_fetch_many(
+            [('minions/{0}'.format(minion_id), 'mine') for minion_id in minion_ids])
+        for minion_id, (_, mdata) in zip(minion_ids, fetched):
             if isinstance(mdata, dict):
                 mine_data[minion_id] = mdata
         return mine_data
@@ -220,10 +221,11 @@ class MasterPillarUtil(object):
             return grains, pillars
         if not minion_ids:
             minion_ids = self.cache.list('minions')
-        for minion_id in minion_ids:
-            if not salt.utils.verify.valid_id(self.opts, minion_id):
-                continue
-            mdata = self.cache.fetch('minions/{0}'.format(minion_id), 'data')
+        minion_ids = [minion_id for minion_id in minion_ids
+                      if salt.utils.verify.valid_id(self.opts, minion_id)]
+        fetched = self.cache.iter_fetch_many(
+            [('minions/{0}'.format(minion_id), 'data') for minion_id in minion_ids])
+        for minion_id, (_, mdata) in zip(minion_ids, fetched):
             if not isinstance(mdata, dict):
                 log.warning(
                     'cache.fetch should always return a dict. ReturnedType: %s, MinionId: %s',
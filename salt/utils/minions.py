@@ -10,6 +10,8 @@ import os
 import fnmatch
 import re
 import logging
+import threading
+import time
 
 # Import salt libs
 import salt.payload
@@ -24,6 +26,7 @@ from salt.exceptions import CommandExecutionError, SaltCacheError
 import salt.auth.ldap
 import salt.cache
 from salt.ext import six
+from salt.utils.odict import OrderedDict
 
 # Import 3rd-party libs
 from salt._compat import ipaddress
@@ -119,6 +122,32 @@ def get_minion_data(minion, opts):
     return minion if minion else None, grains, pillar
 
 
+def _iter_minions(cache, ids, key='data'):
+    '''
+    Fetch ``key`` for several minions with bulk cache calls of
+    ``salt.cache.Cache.FETCH_CHUNK_SIZE`` minions each, and yield the minion
+    ids with their data. If a bulk fetch fails the minions of that chunk are
+    fetched one by one, and those which can't be read are yielded with None.
+    '''
+    ids = list(ids)
+    chunk_size = salt.cache.Cache.FETCH_CHUNK_SIZE
+    for start in range(0, len(ids), chunk_size):
+        chunk = ids[start:start + chunk_size]
+        try:
+            fetched = cache.fetch_many(
+                [('minions/{0}'.format(id_), key) for id_ in chunk])
+        except SaltCacheError:
+            fetched = None
+        for id_ in chunk:
+            if fetched is not None:
+                yield id_, fetched.get(('minions/{0}'.format(id_), key))
+                continue
+            try:
+                yield id_, cache.fetch('minions/{0}'.format(id_), key)
+            except SaltCacheError:
+                yield id_, None
+
+
 def nodegroup_comp(nodegroup, nodegroups, skip=None, first_call=True):
     '''
     Recursively expand ``nodegroup`` from ``nodegroups``; ignore nodegroups in ``skip``
@@ -190,6 +219,459 @@ def nodegroup_comp(nodegroup, nodegroups, skip=None, first_call=True):
         return ret
 
 
+def _index_value(value):
+    '''
+    Normalize a value the same way ``salt.utils.data.subdict_match`` does
+    before comparing it against a target pattern
+    '''
+    try:
+        return six.text_type(value).lower()
+    except UnicodeDecodeError:
+        return salt.utils.stringutils.to_unicode(value).lower()
+
+
+def _flatten_minion_data(data, path=()):
+    '''
+    Yield ``(kind, path, item)`` tuples describing every node of ``data`` that
+    ``salt.utils.data.subdict_match`` may look at when matching a target
+    '''
+    if isinstance(data, dict):
+        if data:
+            yield 'dict', path, None
+        for key, val in six.iteritems(data):
+            yield 'key', path, key
+            if isinstance(key, six.string_types):
+                for entry in _flatten_minion_data(val, path + (key,)):
+                    yield entry
+    elif isinstance(data, (list, tuple)):
+        yield 'list', path, None
+        for member in data:
+            if isinstance(member, dict):
+                yield 'dict_list', path, None
+            yield 'value', path, _index_value(member)
+    else:
+        yield 'value', path, _index_value(data)
+
+
+class _Unindexable(Exception):
+    '''
+    Raised when a target expression cannot be answered from the index
+    '''
+
+
+class MinionDataIndex(object):
+    '''
+    Inverted index over the grains and pillar stored in the minion data cache
+
+    The index maps flattened key paths to the minions holding each value, so
+    that glob and exact grain/pillar targets can be resolved without fetching
+    and deserializing the cached data of every minion. It is kept in sync
+    with the cache by comparing the ``updated`` timestamp of each minion's
+    ``data`` key, so only the minions whose data changed since the last
+    lookup are fetched again.
+
+    Nodes which ``subdict_match`` can reach through list indexes or through
+    dicts embedded in lists are not flattened. Minions holding such a node on
+    the path of a target are reported as uncertain and need to be checked
+    against their cached data by the caller.
+    '''
+    search_types = ('grains', 'pillar')
+    kinds = ('value', 'key', 'dict', 'list', 'dict_list')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # {<minion id>: (<updated stamp>, <indexed at>, <entries>)}
+        self.minions = {}
+        # {<search type>: {<kind>: {<path>: {<item>: set(<minion ids>)}}}}
+        self.index = dict(
+            (search_type, dict((kind, {}) for kind in self.kinds))
+            for search_type in self.search_types
+        )
+
+    def _add(self, id_, mdata):
+        entries = set()
+        if isinstance(mdata, dict):
+            for search_type in self.search_types:
+                for kind, path, item in _flatten_minion_data(mdata.get(search_type)):
+                    entry = (search_type, kind, path, item)
+                    if entry in entries:
+                        continue
+                    entries.add(entry)
+                    self.index[search_type][kind].setdefault(
+                        path, {}).setdefault(item, set()).add(id_)
+        return entries
+
+    def _remove(self, id_):
+        record = self.minions.pop(id_, None)
+        if record is None:
+            return
+        for search_type, kind, path, item in record[2]:
+            paths = self.index[search_type][kind]
+            items = paths[path]
+            items[item].discard(id_)
+            if not items[item]:
+                del items[item]
+                if not items:
+                    del paths[path]
+
+    def update(self, id_, mdata, updated=None):
+        '''
+        Replace the indexed data of a single minion
+        '''
+        with self.lock:
+            self._remove(id_)
+            if mdata is None:
+                entries = None
+            else:
+                entries = self._add(id_, mdata)
+            self.minions[id_] = (updated, int(time.time()), entries)
+
+    def refresh(self, cache, cminions):
+        '''
+        Bring the index in line with the minion data cache. ``cminions`` is
+        the list of minions currently present in the cache.
+        '''
+        cminions = set(cminions)
+        for id_ in set(self.minions) - cminions:
+            with self.lock:
+                self._remove(id_)
+        changed = {}
+        for id_ in cminions:
+            updated = cache.updated('minions/{0}'.format(id_), 'data')
+            record = self.minions.get(id_)
+            # The cache timestamps have a granularity of one second, data
+            # written in the second it was indexed may have been missed.
+            if record is not None \
+                    and updated is not None \
+                    and record[0] == updated \
+                    and updated < record[1]:
+                continue
+            changed[id_] = updated
+        if not changed:
+            return
+        for id_, mdata in _iter_minions(cache, changed):
+            self.update(id_, mdata, changed[id_])
+
+    def has_data(self, id_):
+        '''
+        Return whether the minion had data in the cache when it was indexed
+        '''
+        record = self.minions.get(id_)
+        return record is not None and record[2] is not None
+
+    def _paths(self, search_type, kind, path):
+        return self.index[search_type][kind].get(path, {})
+
+    def _ids(self, search_type, kind, path):
+        return self._paths(search_type, kind, path).get(None, set())
+
+    def _match_values(self, search_type, path, pattern, exact_match):
+        values = self._paths(search_type, 'value', path)
+        pattern = _index_value(pattern)
+        if exact_match or not any(char in pattern for char in '*?['):
+            return set(values.get(pattern, ()))
+        ret = set()
+        for value, ids in six.iteritems(values):
+            if fnmatch.fnmatch(value, pattern):
+                ret.update(ids)
+        return ret
+
+    def _match(self, search_type, base, expr, delimiter, exact_match):
+        '''
+        Mirror ``salt.utils.data.subdict_match`` for the data found at the
+        ``base`` path. Return a tuple of the matching minion ids and of the
+        minion ids which need to be checked against their cached data.
+        '''
+        matched = set()
+        uncertain = set()
+        splits = expr.split(delimiter)
+        for idx in range(len(splits) - 1, 0, -1):
+            key = splits[:idx]
+            if delimiter.join(key) == '*':
+                raise _Unindexable()
+            matchstr = delimiter.join(splits[idx:])
+            path = base + tuple(key)
+            # Lists along the path are traversed by index or through the
+            # dicts embedded in them, which is not flattened in the index
+            for end in range(len(path)):
+                uncertain.update(self._ids(search_type, 'list', path[:end]))
+            uncertain.update(self._ids(search_type, 'dict_list', path))
+            matched.update(
+                self._match_values(search_type, path, matchstr, exact_match))
+            # The node at the path is a dict
+            if matchstr.startswith('*:'):
+                raise _Unindexable()
+            if matchstr == '*':
+                matched.update(self._ids(search_type, 'dict', path))
+            matched.update(self._paths(search_type, 'key', path).get(matchstr, ()))
+            if DEFAULT_TARGET_DELIM in matchstr:
+                sub_matched, sub_uncertain = self._match(
+                    search_type, path, matchstr, DEFAULT_TARGET_DELIM, exact_match)
+                matched.update(sub_matched)
+                uncertain.update(sub_uncertain)
+        return matched, uncertain
+
+    def match(self, search_type, expr, delimiter, exact_match=False):
+        '''
+        Return a tuple of the ids of the minions whose ``search_type`` data
+        match ``expr`` and of the ids which could not be decided from the
+        index, or ``None`` if the expression cannot be answered by the index
+        '''
+        if search_type not in self.search_types:
+            return None
+        with self.lock:
+            try:
+                return self._match(search_type, (), expr, delimiter, exact_match)
+            except _Unindexable:
+                return None
+
+
+_MINION_DATA_INDEXES = {}
+
+
+def minion_data_index(opts, cache):
+    '''
+    Return the process-wide :py:class:`MinionDataIndex` for the minion data
+    cache, or ``None`` if the index is disabled or the cache driver cannot
+    report when its data was updated
+    '''
+    if not opts.get('minion_data_cache', False) \
+            or not opts.get('minion_data_cache_index', False):
+        return None
+    if '{0}.updated'.format(cache.driver) not in cache.modules:
+        return None
+    storage = (cache.driver, cache.cachedir)
+    if storage not in _MINION_DATA_INDEXES:
+        _MINION_DATA_INDEXES[storage] = MinionDataIndex()
+    return _MINION_DATA_INDEXES[storage]
+
+
+def update_minion_data_index(opts, cache, minion, mdata):
+    '''
+    Update the index of the minion data cache after ``mdata`` was stored for
+    ``minion``
+    '''
+    index = minion_data_index(opts, cache)
+    if index is None:
+        return
+    try:
+        updated = cache.updated('minions/{0}'.format(minion), 'data')
+    except SaltCacheError:
+        updated = None
+    index.update(minion, mdata, updated)
+
+
+_NODEGROUP_CACHE = {}
+_COMPOUND_CACHE = OrderedDict()
+_COMPOUND_CACHE_MAX = 1024
+
+COMPOUND_ENGINES = ('G', 'P', 'I', 'J', 'L', 'S', 'E', 'R')
+
+
+def _nodegroups_key(nodegroups):
+    '''
+    Return a hashable representation of the nodegroups configuration
+    '''
+    return tuple(sorted(
+        (six.text_type(name), repr(definition))
+        for name, definition in six.iteritems(nodegroups)
+    ))
+
+
+def cached_nodegroup_comp(nodegroup, nodegroups):
+    '''
+    Memoized version of :py:func:`nodegroup_comp`, keyed by the nodegroup name
+    and the nodegroups configuration it was expanded from
+    '''
+    key = (nodegroup, _nodegroups_key(nodegroups))
+    if key not in _NODEGROUP_CACHE:
+        _NODEGROUP_CACHE[key] = nodegroup_comp(nodegroup, nodegroups)
+    expanded = _NODEGROUP_CACHE[key]
+    if isinstance(expanded, (list, tuple)):
+        return list(expanded)
+    return expanded
+
+
+class CompoundTarget(object):
+    '''
+    A compound target expression compiled once into a code object over
+    bitsets. ``terms`` lists the ``(engine, pattern, delimiter,
+    ignore_missing)`` tuples whose results are bound to ``t0``, ``t1``, ...
+    and ``ALL`` is bound to the set of all known minions when evaluating
+    ``code``.
+    '''
+    def __init__(self, expr, terms):
+        self.expr = expr
+        self.terms = terms
+        self.code = compile(expr, '<compound target>', 'eval')
+
+
+class MinionBits(object):
+    '''
+    Dense numbering of minion ids, used to represent sets of minions as
+    integer bitsets
+    '''
+    def __init__(self, minions):
+        self.ids = list(minions)
+        self.index = dict((id_, idx) for idx, id_ in enumerate(self.ids))
+        self.all = self.bits(self.ids)
+
+    def bits(self, minions):
+        '''
+        Return the bitset of the given minion ids
+        '''
+        idxs = []
+        for id_ in minions:
+            idx = self.index.get(id_)
+            if idx is None:
+                idx = self.index[id_] = len(self.ids)
+                self.ids.append(id_)
+            idxs.append(idx)
+        size = len(self.ids)
+        chars = ['0'] * size
+        for idx in idxs:
+            chars[size - 1 - idx] = '1'
+        return int(''.join(chars) or '0', 2)
+
+    def minions(self, bits):
+        '''
+        Return the list of minion ids in the bitset
+        '''
+        return [self.ids[idx]
+                for idx, char in enumerate(reversed(bin(bits)[2:]))
+                if char == '1']
+
+
+def compile_compound(expr, nodegroups):
+    '''
+    Parse a compound target into a :py:class:`CompoundTarget`, expanding
+    nodegroups in-place. Return ``None`` if the expression is invalid.
+    Compiled targets are cached by expression.
+    '''
+    if isinstance(expr, six.string_types):
+        words = expr.split()
+    else:
+        words = list(expr)
+    key = (tuple(words),
+           _nodegroups_key(nodegroups)
+           if any('N@' in six.text_type(word) for word in words) else None)
+    if key in _COMPOUND_CACHE:
+        return _COMPOUND_CACHE[key]
+
+    results = []
+    unmatched = []
+    terms = []
+    opers = ['and', 'or', 'not', '(', ')']
+
+    def _add_term(term):
+        results.append('t{0}'.format(len(terms)))
+        terms.append(term)
+        if unmatched and unmatched[-1] == '-':
+            results.append(')')
+            unmatched.pop()
+
+    def _compile():
+        while words:
+            word = words.pop(0)
+            target_info = parse_target(word)
+
+            # Easy check first
+            if word in opers:
+                if results:
+                    if results[-1] == '(' and word in ('and', 'or'):
+                        log.error('Invalid beginning operator after "(": %s', word)
+                        return None
+                    if word == 'not':
+                        if not results[-1] in ('&', '|', '('):
+                            results.append('&')
+                        results.append('(')
+                        results.append('ALL')
+                        results.append('&~')
+                        unmatched.append('-')
+                    elif word == 'and':
+                        results.append('&')
+                    elif word == 'or':
+                        results.append('|')
+                    elif word == '(':
+                        results.append(word)
+                        unmatched.append(word)
+                    elif word == ')':
+                        if not unmatched or unmatched[-1] != '(':
+                            log.error('Invalid compound expr (unexpected '
+                                      'right parenthesis): %s',
+                                      expr)
+                            return None
+                        results.append(word)
+                        unmatched.pop()
+                        if unmatched and unmatched[-1] == '-':
+                            results.append(')')
+                            unmatched.pop()
+                    else:  # Won't get here, unless oper is added
+                        log.error('Unhandled oper in compound expr: %s',
+                                  expr)
+                        return None
+                else:
+                    # seq start with oper, fail
+                    if word == 'not':
+                        results.append('(')
+                        results.append('ALL')
+                        results.append('&~')
+                        unmatched.append('-')
+                    elif word == '(':
+                        results.append(word)
+                        unmatched.append(word)
+                    else:
+                        log.error(
+                            'Expression may begin with'
+                            ' binary operator: %s', word
+                        )
+                        return None
+
+            elif target_info and target_info['engine']:
+                if 'N' == target_info['engine']:
+                    # if we encounter a node group, just evaluate it in-place
+                    decomposed = cached_nodegroup_comp(target_info['pattern'], nodegroups)
+                    if decomposed:
+                        words[:0] = decomposed
+                    continue
+
+                if target_info['engine'] not in COMPOUND_ENGINES:
+                    # If an unknown engine is called at any time, fail out
+                    log.error(
+                        'Unrecognized target engine "%s" for'
+                        ' target expression "%s"',
+                        target_info['engine'],
+                        word,
+                    )
+                    return None
+
+                # ignore missing minions for lists if we exclude them with
+                # a 'not'
+                _add_term((target_info['engine'],
+                           target_info['pattern'],
+                           target_info['delimiter'] or ':',
+                           bool(results and results[-1] == '&~')))
+
+            else:
+                # The match is not explicitly defined, evaluate as a glob
+                _add_term((None, word, None, False))
+
+        # Add a closing ')' for each item left in unmatched
+        results.extend([')' for item in unmatched])
+
+        try:
+            return CompoundTarget(' '.join(results), terms)
+        except SyntaxError:
+            log.error('Invalid compound target: %s', expr)
+            return None
+
+    compiled = _compile()
+    _COMPOUND_CACHE[key] = compiled
+    while len(_COMPOUND_CACHE) > _COMPOUND_CACHE_MAX:
+        _COMPOUND_CACHE.popitem(last=False)
+    return compiled
+
+
 class CkMinions(object):
     '''
     Used to check what minions should respond from a target
@@ -213,7 +695,7 @@ class CkMinions(object):
         '''
         Return minions found by looking at nodegroups
         '''
-        return self._check_compound_minions(nodegroup_comp(expr, self.opts['nodegroups']),
+        return self._check_compound_minions(cached_nodegroup_comp(expr, self.opts['nodegroups']),
             DEFAULT_TARGET_DELIM,
             greedy)
 
@@ -312,10 +794,27 @@ class CkMinions(object):
                 return {'minions': minions,
                         'missing': []}
             minions = set(minions)
+            indexed = None
+            index = None if regex_match else minion_data_index(self.opts, self.cache)
+            if index is not None:
+                index.refresh(self.cache, cminions)
+                indexed = index.match(search_type,
+                                      expr,
+                                      delimiter,
+                                      exact_match=exact_match)
+            fetch = []
             for id_ in cminions:
                 if greedy and id_ not in minions:
                     continue
-                mdata = self.cache.fetch('minions/{0}'.format(id_), 'data')
+                if indexed is not None and id_ not in indexed[1]:
+                    if not index.has_data(id_):
+                        if not greedy:
+                            minions.remove(id_)
+                    elif id_ not in indexed[0]:
+                        minions.remove(id_)
+                    continue
+                fetch.append(id_)
+            for id_, mdata in _iter_minions(self.cache, fetch):
                 if mdata is None:
                     if not greedy:
                         minions.remove(id_)
@@ -411,8 +910,7 @@ class CkMinions(object):
             proto = 'ipv{0}'.format(tgt.version)
 
             minions = set(minions)
-            for id_ in cminions:
-                mdata = self.cache.fetch('minions/{0}'.format(id_), 'data')
+            for id_, mdata in _iter_minions(self.cache, cminions):
                 if mdata is None:
                     if not greedy:
                         minions.remove(id_)
@@ -496,7 +994,6 @@ class CkMinions(object):
                    'I': self._check_pillar_minions,
                    'J': self._check_pillar_pcre_minions,
                    'L': self._check_list_minions,
-                   'N': None,    # nodegroups should already be expanded
                    'S': self._check_ipcidr_minions,
                    'E': self._check_pcre_minions,
                    'R': self._all_minions}
@@ -504,125 +1001,37 @@ class CkMinions(object):
                 ref['I'] = self._check_pillar_exact_minions
                 ref['J'] = self._check_pillar_exact_minions
 
-            results = []
-            unmatched = []
-            opers = ['and', 'or', 'not', '(', ')']
-            missing = []
+            compiled = compile_compound(expr, nodegroups)
+            if compiled is None:
+                return {'minions': [], 'missing': []}
 
-            if isinstance(expr, six.string_types):
-                words = expr.split()
-            else:
-                # we make a shallow copy in order to not affect the passed in arg
-                words = expr[:]
-
-            while words:
-                word = words.pop(0)
-                target_info = parse_target(word)
-
-                # Easy check first
-                if word in opers:
-                    if results:
-                        if results[-1] == '(' and word in ('and', 'or'):
-                            log.error('Invalid beginning operator after "(": %s', word)
-                            return {'minions': [], 'missing': []}
-                        if word == 'not':
-                            if not results[-1] in ('&', '|', '('):
-                                results.append('&')
-                            results.append('(')
-                            results.append(six.text_type(set(minions)))
-                            results.append('-')
-                            unmatched.append('-')
-                        elif word == 'and':
-                            results.append('&')
-                        elif word == 'or':
-                            results.append('|')
-                        elif word == '(':
-                            results.append(word)
-                            unmatched.append(word)
-                        elif word == ')':
-                            if not unmatched or unmatched[-1] != '(':
-                                log.error('Invalid compound expr (unexpected '
-                                          'right parenthesis): %s',
-                                          expr)
-                                return {'minions': [], 'missing': []}
-                            results.append(word)
-                            unmatched.pop()
-                            if unmatched and unmatched[-1] == '-':
-                                results.append(')')
-                                unmatched.pop()
-                        else:  # Won't get here, unless oper is added
-                            log.error('Unhandled oper in compound expr: %s',
-                                      expr)
-                            return {'minions': [], 'missing': []}
+            bits = MinionBits(salt.utils.data.sorted_ignorecase(minions))
+            namespace = {'ALL': bits.all}
+            missing = []
+            evaluated = {}
+            for idx, term in enumerate(compiled.terms):
+                if term not in evaluated:
+                    engine, pattern, engine_delimiter, ignore_missing = term
+                    if engine is None:
+                        _results = self._check_glob_minions(pattern, True)
                     else:
-                        # seq start with oper, fail
-                        if word == 'not':
-                            results.append('(')
-                            results.append(six.text_type(set(minions)))
-                            results.append('-')
-                            unmatched.append('-')
-                        elif word == '(':
-                            results.append(word)
-                            unmatched.append(word)
-                        else:
-                            log.error(
-                                'Expression may begin with'
-                                ' binary operator: %s', word
-                            )
-                            return {'minions': [], 'missing': []}
-
-                elif target_info and target_info['engine']:
-                    if 'N' == target_info['engine']:
-                        # if we encounter a node group, just evaluate it in-place
-                        decomposed = nodegroup_comp(target_info['pattern'], nodegroups)
-                        if decomposed:
-                            words = decomposed + words
-                        continue
+                        engine_args = [pattern]
+                        if engine in ('G', 'P', 'I', 'J'):
+                            engine_args.append(engine_delimiter)
+                        engine_args.append(greedy)
+                        if 'L' == engine:
+                            engine_args.append(ignore_missing)
+                        _results = ref[engine](*engine_args)
+                    evaluated[term] = (bits.bits(_results['minions']),
+                                       _results['missing'])
+                namespace['t{0}'.format(idx)] = evaluated[term][0]
+                missing.extend(evaluated[term][1])
 
-                    engine = ref.get(target_info['engine'])
-                    if not engine:
-                        # If an unknown engine is called at any time, fail out
-                        log.error(
-                            'Unrecognized target engine "%s" for'
-                            ' target expression "%s"',
-                            target_info['engine'],
-                            word,
-                        )
-                        return {'minions': [], 'missing': []}
-
-                    engine_args = [target_info['pattern']]
-                    if target_info['engine'] in ('G', 'P', 'I', 'J'):
-                        engine_args.append(target_info['delimiter'] or ':')
-                    engine_args.append(greedy)
-
-                    # ignore missing minions for lists if we exclude them with
-                    # a 'not'
-                    if 'L' == target_info['engine']:
-                        engine_args.append(results and results[-1] == '-')
-                    _results = engine(*engine_args)
-                    results.append(six.text_type(set(_results['minions'])))
-                    missing.extend(_results['missing'])
-                    if unmatched and unmatched[-1] == '-':
-                        results.append(')')
-                        unmatched.pop()
-
-                else:
-                    # The match is not explicitly defined, evaluate as a glob
-                    _results = self._check_glob_minions(word, True)
-                    results.append(six.text_type(set(_results['minions'])))
-                    if unmatched and unmatched[-1] == '-':
-                        results.append(')')
-                        unmatched.pop()
-
-            # Add a closing ')' for each item left in unmatched
-            results.extend([')' for item in unmatched])
-
-            results = ' '.join(results)
             log.debug('Evaluating final compound matching expr: %s',
-                      results)
+                      compiled.expr)
             try:
-                minions = list(eval(results))  # pylint: disable=W0123
-                return {'minions': minions, 'missing': missing}
+                result = eval(compiled.code, {'__builtins__': {}}, namespace)  # pylint: disable=W0123
+                return {'minions': bits.minions(result), 'missing': missing}
             except Exception:  # pylint: disable=broad-except
                 log.error('Invalid compound target: %s', expr)
                 return {'minions': [], 'missing': []}
@@ -663,15 +1072,11 @@ class CkMinions(object):
                 addrs.update(set(salt.utils.network.ip_addrs6(include_loopback=False)))
             if subset:
                 search = subset
-            for id_ in search:
-                try:
-                    mdata = self.cache.fetch('minions/{0}'.format(id_), 'data')
-                except SaltCacheError:
-                    # If a SaltCacheError is explicitly raised during the fetch operation,
-                    # permission was denied to open the cached data.p file. Continue on as
-                    # in the releases <= 2016.3. (An explicit error raise was added in PR
-                    # #35388. See issue #36867 for more information.
-                    continue
+            # If a SaltCacheError is explicitly raised during the fetch operation,
+            # permission was denied to open the cached data.p file. Continue on as
+            # in the releases <= 2016.3. (An explicit error raise was added in PR
+            # #35388. See issue #36867 for more information.
+            for id_, mdata in _iter_minions(self.cache, search):
                 if mdata is None:
                     continue
                 grains = mdata.get('grains', {})
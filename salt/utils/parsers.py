@@ -2729,6 +2729,14 @@ class SaltCallOptionParser(six.with_metaclass(OptionParserMeta,
             action='store_true',
             help=('Force a refresh of the grains cache.')
         )
+        self.add_option(
+            '--profile-loader',
+            default=False,
+            dest='profile_loader',
+            action='store_true',
+            help=('Print the time spent importing each module, running its '
+                  '__virtual__ function and running each grain function.')
+        )
         self.add_option(
             '-t', '--timeout',
             default=60,
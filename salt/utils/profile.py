@@ -15,11 +15,17 @@ import subprocess
 # Import Salt libs
 import salt.utils.files
 import salt.utils.hashutils
+import salt.utils.odict
 import salt.utils.path
 import salt.utils.stringutils
 
 log = logging.getLogger(__name__)
 
+# Time spent by the loader, in seconds, recorded when the profile_loader
+# option is set: module imports and __virtual__ functions are keyed by
+# <loader tag>.<module name>, grain functions by <module>.<function>.
+LOADER_TIMINGS = {'import': {}, 'virtual': {}, 'grains': {}}
+
 try:
     import cProfile
     HAS_CPROFILE = True
@@ -101,3 +107,41 @@ def output_profile(pr, stats_path='/tmp/stats', stop=False, id_=None):
             if not stop:
                 pr.enable()
     return pr
+
+
+def record_loader_timing(kind, name, seconds):
+    '''
+    Add the time spent importing a module, running its __virtual__ function
+    or running a grain function to the loader timings
+    '''
+    timings = LOADER_TIMINGS[kind]
+    timings[name] = timings.get(name, 0) + seconds
+
+
+def clear_loader_timings():
+    '''
+    Forget the loader timings recorded so far
+    '''
+    for timings in LOADER_TIMINGS.values():
+        timings.clear()
+
+
+def loader_report(limit=None):
+    '''
+    Return the loader timings in milliseconds, slowest first, along with a
+    summary of the totals. Pass ``limit`` to only report the slowest entries
+    of each kind.
+    '''
+    summary = salt.utils.odict.OrderedDict()
+    ret = salt.utils.odict.OrderedDict([('summary', summary)])
+    for kind in ('import', 'virtual', 'grains'):
+        timings = sorted(
+            LOADER_TIMINGS[kind].items(), key=lambda x: x[1], reverse=True)
+        summary['{0}_ms'.format(kind)] = round(
+            sum(x[1] for x in timings) * 1000, 3)
+        summary['{0}_count'.format(kind)] = len(timings)
+        ret[kind] = salt.utils.odict.OrderedDict(
+            (name, round(seconds * 1000, 3))
+            for name, seconds in timings[:limit]
+        )
+    return ret
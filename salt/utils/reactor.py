@@ -6,9 +6,12 @@ Functions which implement running reactor jobs
 
 # Import python libs
 from __future__ import absolute_import, print_function, unicode_literals
+import copy
 import fnmatch
 import glob
 import logging
+import os
+import re
 
 # Import salt libs
 import salt.client
@@ -19,12 +22,17 @@ import salt.utils.cache
 import salt.utils.data
 import salt.utils.event
 import salt.utils.files
+import salt.utils.jinja
 import salt.utils.process
+import salt.utils.stringutils
 import salt.utils.yaml
 import salt.wheel
 import salt.defaults.exitcodes
 
 # Import 3rd-party libs
+import jinja2
+import jinja2.meta
+import jinja2.nodes
 from salt.ext import six
 
 log = logging.getLogger(__name__)
@@ -38,6 +46,8 @@ REACTOR_INTERNAL_KEYWORDS = frozenset([
     'state',
 ])
 
+GLOB_CHARS = ('*', '?', '[')
+
 
 class Reactor(salt.utils.process.SignalHandlingProcess, salt.state.Compiler):
     '''
@@ -56,6 +66,11 @@ class Reactor(salt.utils.process.SignalHandlingProcess, salt.state.Compiler):
         local_minion_opts['file_client'] = 'local'
         self.minion = salt.minion.MasterMinion(local_minion_opts)
         salt.state.Compiler.__init__(self, opts, self.minion.rend)
+        # The compiled reactor map, see list_reactors
+        self._dispatch = None
+        # Reaction files which render the same for every event, see
+        # render_reaction
+        self._render_cache = {}
 
     # We need __setstate__ and __getstate__ to avoid pickling errors since
     # 'self.rend' (from salt.state.Compiler) contains a function reference
@@ -90,10 +105,7 @@ class Reactor(salt.utils.process.SignalHandlingProcess, salt.state.Compiler):
             log.error('Can not render SLS %s for tag %s. File missing or not found.', glob_ref, tag)
         for fn_ in globbed_ref:
             try:
-                res = self.render_template(
-                    fn_,
-                    tag=tag,
-                    data=data)
+                res = self._render_cached(fn_, tag, data)
 
                 # for #20841, inject the sls name here since verify_high()
                 # assumes it exists in case there are any errors
@@ -105,35 +117,150 @@ class Reactor(salt.utils.process.SignalHandlingProcess, salt.state.Compiler):
                 log.exception('Failed to render "%s": ', fn_)
         return react
 
-    def list_reactors(self, tag):
+    def _render_cached(self, fn_, tag, data):
         '''
-        Take in the tag from an event and return a list of the reactors to
-        process
+        Render a reaction file, reusing the result of an earlier render if the
+        file is unchanged and renders the same for every event
         '''
-        log.debug('Gathering reactors for tag %s', tag)
-        reactors = []
-        if isinstance(self.opts['reactor'], six.string_types):
-            try:
-                with salt.utils.files.fopen(self.opts['reactor']) as fp_:
-                    react_map = salt.utils.yaml.safe_load(fp_)
-            except (OSError, IOError):
-                log.error('Failed to read reactor map: "%s"', self.opts['reactor'])
-            except Exception:  # pylint: disable=broad-except
-                log.error('Failed to parse YAML in reactor map: "%s"', self.opts['reactor'])
+        try:
+            stat = os.stat(fn_)
+            sig = (stat.st_ino, stat.st_size, stat.st_mtime)
+        except OSError:
+            sig = None
+        cached = self._render_cache.get(fn_)
+        if sig is not None and cached is not None and cached[0] == sig:
+            static = cached[1]
+            if static:
+                return copy.deepcopy(cached[2])
         else:
-            react_map = self.opts['reactor']
-        for ropt in react_map:
+            static = sig is not None and self._static_template(fn_)
+        res = self.render_template(fn_, tag=tag, data=data)
+        if sig is not None:
+            self._render_cache[fn_] = (
+                sig, static, copy.deepcopy(res) if static else None)
+        return res
+
+    def _static_template(self, fn_):
+        '''
+        Return True if the reaction file renders the same for every event. This
+        is the case for files rendered by the default jinja renderer which
+        don't reference any variables (e.g. tag or data), other templates or
+        call anything.
+        '''
+        if not self.opts['renderer'].split('|')[0].strip().startswith('jinja'):
+            return False
+        try:
+            with salt.utils.files.fopen(fn_, 'r') as fp_:
+                source = salt.utils.stringutils.to_unicode(fp_.read())
+        except (OSError, IOError):
+            return False
+        if source.startswith('#!'):
+            # The file picks its own renderer
+            return False
+        try:
+            ast = jinja2.Environment(
+                extensions=[salt.utils.jinja.SerializerExtension, 'jinja2.ext.do']
+            ).parse(source)
+        except Exception:  # pylint: disable=broad-except
+            return False
+        if jinja2.meta.find_undeclared_variables(ast):
+            return False
+        if any(jinja2.meta.find_referenced_templates(ast)):
+            return False
+        for _ in ast.find_all((jinja2.nodes.Call, jinja2.nodes.Filter)):
+            return False
+        return True
+
+    def _read_react_map(self):
+        '''
+        Return the reactor map, reading it from the reactor file if one is
+        configured
+        '''
+        if not isinstance(self.opts['reactor'], six.string_types):
+            return self.opts['reactor']
+        try:
+            with salt.utils.files.fopen(self.opts['reactor']) as fp_:
+                return salt.utils.yaml.safe_load(fp_) or []
+        except (OSError, IOError):
+            log.error('Failed to read reactor map: "%s"', self.opts['reactor'])
+        except Exception:  # pylint: disable=broad-except
+            log.error('Failed to parse YAML in reactor map: "%s"', self.opts['reactor'])
+        return []
+
+    @staticmethod
+    def _compile_react_map(react_map):
+        '''
+        Compile the reactor map into a dispatch table. Tags without globs are
+        looked up directly, the globs are grouped by the literal prefix before
+        their first glob character so that only the globs whose prefix matches
+        the start of the tag need to be tried.
+        '''
+        exact = {}
+        globs = {}
+        for idx, ropt in enumerate(react_map):
             if not isinstance(ropt, dict):
                 continue
             if len(ropt) != 1:
                 continue
             key = next(six.iterkeys(ropt))
             val = ropt[key]
-            if fnmatch.fnmatch(tag, key):
-                if isinstance(val, six.string_types):
-                    reactors.append(val)
-                elif isinstance(val, list):
-                    reactors.extend(val)
+            if not isinstance(key, six.string_types):
+                continue
+            if isinstance(val, six.string_types):
+                reactors = [val]
+            elif isinstance(val, list):
+                reactors = val
+            else:
+                continue
+            # Same semantics as fnmatch.fnmatch
+            pattern = os.path.normcase(key)
+            wildcards = [pattern.index(x) for x in GLOB_CHARS if x in pattern]
+            if not wildcards:
+                exact.setdefault(pattern, []).append((idx, reactors))
+                continue
+            prefix = pattern[:min(wildcards)]
+            globs.setdefault(prefix, []).append(
+                (idx, re.compile(fnmatch.translate(pattern)).match, reactors))
+        return exact, globs, sorted(set(len(x) for x in globs))
+
+    def _react_map_sig(self):
+        '''
+        Return a signature of the reactor map which changes when it has to be
+        compiled again, or None if it can't be cached
+        '''
+        reactor = self.opts['reactor']
+        if not isinstance(reactor, six.string_types):
+            return list(reactor)
+        try:
+            stat = os.stat(reactor)
+        except OSError:
+            return None
+        return (reactor, stat.st_ino, stat.st_size, stat.st_mtime)
+
+    def list_reactors(self, tag):
+        '''
+        Take in the tag from an event and return a list of the reactors to
+        process
+        '''
+        log.debug('Gathering reactors for tag %s', tag)
+        sig = self._react_map_sig()
+        if sig is None or self._dispatch is None or self._dispatch[0] != sig:
+            self._dispatch = (sig, self._compile_react_map(self._read_react_map()))
+        exact, globs, prefix_lens = self._dispatch[1]
+
+        tag = os.path.normcase(tag)
+        matches = list(exact.get(tag, ()))
+        for prefix_len in prefix_lens:
+            if prefix_len > len(tag):
+                break
+            for idx, match, reactors in globs.get(tag[:prefix_len], ()):
+                if match(tag):
+                    matches.append((idx, reactors))
+        # Keep the order of the reactor map
+        matches.sort(key=lambda x: x[0])
+        reactors = []
+        for _, matched in matches:
+            reactors.extend(matched)
         return reactors
 
     def list_all(self):
@@ -168,6 +295,7 @@ class Reactor(salt.utils.process.SignalHandlingProcess, salt.state.Compiler):
                 return {'status': False, 'comment': 'Reactor already exists.'}
 
         self.minion.opts['reactor'].append({tag: reaction})
+        self._dispatch = None
         return {'status': True, 'comment': 'Reactor added.'}
 
     def delete_reactor(self, tag):
@@ -179,6 +307,7 @@ class Reactor(salt.utils.process.SignalHandlingProcess, salt.state.Compiler):
             _tag = next(six.iterkeys(reactor))
             if _tag == tag:
                 self.minion.opts['reactor'].remove(reactor)
+                self._dispatch = None
                 return {'status': True, 'comment': 'Reactor deleted.'}
 
         return {'status': False, 'comment': 'Reactor does not exists.'}
@@ -140,6 +140,8 @@ class Schedule(object):
         self.skip_during_range = None
         self.splay = None
         self.enabled = True
+        # Jobs which cannot fire before a known time, see _defer_until
+        self._deferred = {}
         if isinstance(intervals, dict):
             self.intervals = intervals
         else:
@@ -288,6 +290,7 @@ class Schedule(object):
         '''
         Deletes a job from the scheduler. Ignore jobs from pillar
         '''
+        self._deferred.pop(name, None)
         # ensure job exists, then delete it
         if name in self.opts['schedule']:
             del self.opts['schedule'][name]
@@ -316,6 +319,7 @@ class Schedule(object):
         self.enabled = True
         self.splay = None
         self.opts['schedule'] = {}
+        self._deferred = {}
 
     def delete_job_prefix(self, name, persist=True):
         '''
@@ -389,6 +393,7 @@ class Schedule(object):
         '''
         Enable a job in the scheduler. Ignores jobs from pillar
         '''
+        self._deferred.pop(name, None)
         # ensure job exists, then enable it
         if name in self.opts['schedule']:
             self.opts['schedule'][name]['enabled'] = True
@@ -409,6 +414,7 @@ class Schedule(object):
         '''
         Disable a job in the scheduler. Ignores jobs from pillar
         '''
+        self._deferred.pop(name, None)
         # ensure job exists, then disable it
         if name in self.opts['schedule']:
             self.opts['schedule'][name]['enabled'] = False
@@ -515,6 +521,7 @@ class Schedule(object):
         '''
         # Remove all jobs from self.intervals
         self.intervals = {}
+        self._deferred = {}
 
         if 'schedule' in schedule:
             schedule = schedule['schedule']
@@ -556,6 +563,7 @@ class Schedule(object):
         new_time = data['new_time']
         time_fmt = data.get('time_fmt', '%Y-%m-%dT%H:%M:%S')
 
+        self._deferred.pop(name, None)
         # ensure job exists, then disable it
         if name in self.opts['schedule']:
             if 'skip_explicit' not in self.opts['schedule'][name]:
@@ -585,6 +593,7 @@ class Schedule(object):
         time = data['time']
         time_fmt = data.get('time_fmt', '%Y-%m-%dT%H:%M:%S')
 
+        self._deferred.pop(name, None)
         # ensure job exists, then disable it
         if name in self.opts['schedule']:
             if 'skip_explicit' not in self.opts['schedule'][name]:
@@ -1321,6 +1330,8 @@ class Schedule(object):
         schedule = self._get_schedule()
         if not isinstance(schedule, dict):
             raise ValueError('Schedule must be of type dict.')
+        if not now:
+            now = datetime.datetime.now()
         if 'skip_function' in schedule:
             self.skip_function = schedule['skip_function']
         if 'skip_during_range' in schedule:
@@ -1340,6 +1351,13 @@ class Schedule(object):
             if job in _hidden:
                 continue
 
+            # Nothing about the job has changed and it is not due yet
+            deferred = self._deferred.get(job)
+            if deferred is not None:
+                if deferred[1] is data and now < deferred[0]:
+                    continue
+                del self._deferred[job]
+
             # Clear these out between runs
             for item in ['_continue',
                          '_error',
@@ -1387,9 +1405,6 @@ class Schedule(object):
                     '_run_on_start' not in data:
                 data['_run_on_start'] = True
 
-            if not now:
-                now = datetime.datetime.now()
-
             # Used for quick lookups when detecting invalid option
             # combinations.
             schedule_keys = set(data.keys())
@@ -1618,6 +1633,40 @@ class Schedule(object):
                     elif run:
                         data['_next_fire_time'] = now + datetime.timedelta(seconds=data['_seconds'])
 
+            until = self._defer_until(data, now)
+            if until is not None:
+                self._deferred[job] = (until, data)
+
+        # Forget the jobs which are no longer in the schedule
+        for job in [job for job in self._deferred if job not in schedule]:
+            del self._deferred[job]
+
+    def _defer_until(self, data, now):
+        '''
+        Return the time before which evaluating the job again cannot run it or
+        change its state, so that eval can skip it until then. Only the jobs
+        which run on an interval or a cron expression, without any option that
+        is checked on every evaluation, can be deferred.
+        '''
+        if self.standalone or not self.enabled:
+            return None
+        if not data.get('enabled', True) or data.get('_error') or data.get('_continue'):
+            return None
+        if '_seconds' not in data and 'cron' not in data:
+            return None
+        if any(key in data for key in ('once', 'when', 'run_explicit')):
+            return None
+        if self.splay or data.get('splay') or data.get('_splay') or data.get('_run_on_start'):
+            return None
+        next_fire_time = data.get('_next_fire_time')
+        if not isinstance(next_fire_time, datetime.datetime):
+            return None
+        # The job runs once the second it is due in has started
+        until = next_fire_time - datetime.timedelta(microseconds=next_fire_time.microsecond)
+        if until <= now:
+            return None
+        return until
+
     def _run_job(self, func, data):
         job_dry_run = data.get('dry_run', False)
         if job_dry_run:
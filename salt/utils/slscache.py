@@ -0,0 +1,467 @@
+# -*- coding: utf-8 -*-
+'''
+Cache the data rendered from SLS files between state runs
+
+A rendered SLS file is reused while the SLS file, the templates it imports,
+and the grains, pillar and minion config keys it reads are unchanged. What an
+SLS file reads is found by parsing its Jinja template, and SLS files which do
+something that can't be tracked this way are always rendered. These include
+calling an execution function which isn't a known lookup function or declared
+pure in :conf_minion:`state_render_cache_pure`, using a renderer other than
+``jinja``, ``yaml`` and ``json``, and importing a template with a name only
+known while rendering.
+
+.. versionadded:: Sodium
+'''
+
+# Import Python libs
+from __future__ import absolute_import, print_function, unicode_literals
+import fnmatch
+import logging
+import os
+
+# Import Salt libs
+import salt.template
+import salt.utils.atomicfile
+import salt.utils.files
+import salt.utils.hashutils
+import salt.utils.jinja
+import salt.utils.json
+import salt.utils.msgpack
+import salt.utils.stringutils
+# Importing salt.utils.templates registers the salt jinja filters
+import salt.utils.templates  # pylint: disable=unused-import
+import salt.utils.url
+import salt.version
+from salt.utils.decorators.jinja import JinjaFilter, JinjaTest, JinjaGlobal
+from salt.utils.odict import OrderedDict
+
+# Import 3rd-party libs
+import jinja2
+import jinja2.meta
+import jinja2.nodes
+from salt.ext import six
+
+log = logging.getLogger(__name__)
+
+# The renderers whose output only depends on their input
+PURE_RENDERERS = frozenset(['jinja', 'yaml', 'json'])
+
+# The variables Jinja renders SLS files with which only depend on the SLS
+# file, its saltenv and the template being rendered
+CONTEXT_VARS = frozenset([
+    'saltenv',
+    'sls',
+    'sls_path',
+    'slsdotpath',
+    'slscolonpath',
+    'slspath',
+    'tpldir',
+    'tpldot',
+    'tplfile',
+    'tplpath',
+    'tplroot',
+    ])
+
+# The variables which are tracked by key
+TRACKED_VARS = ('grains', 'pillar', 'opts')
+
+# The lookup functions which read the tracked variables, and which of them
+# they read
+LOOKUP_FUNCS = {
+    'grains.get': ('grains',),
+    'grains.item': ('grains',),
+    'pillar.get': ('pillar',),
+    'pillar.item': ('pillar',),
+    'config.get': ('opts', 'grains', 'pillar'),
+    'config.option': ('opts', 'grains', 'pillar'),
+}
+
+# Jinja globals and filters which don't always return the same output for
+# the same input
+IMPURE_NAMES = frozenset([
+    'lipsum',
+    'show_full_context',
+    ])
+IMPURE_FILTERS = frozenset([
+    'date_format',
+    'dns_check',
+    'file_hashsum',
+    'gen_mac',
+    'get_uid',
+    'http_query',
+    'is_bin_file',
+    'is_empty',
+    'is_text_file',
+    'list_files',
+    'rand_str',
+    'random',
+    'random_hash',
+    'random_sample',
+    'random_shuffle',
+    'random_str',
+    'strftime',
+    'uuid',
+    'which',
+    ])
+
+# The dict methods which read all of the keys
+_ALL_KEYS_ATTRS = frozenset(['items', 'iteritems', 'keys', 'iterkeys',
+                             'values', 'itervalues', 'copy'])
+
+
+class Uncacheable(Exception):
+    '''
+    Raised when a template reads something the render cache can't track
+    '''
+
+
+def _parse(source):
+    '''
+    Parse a Jinja template the way the jinja renderer does, and find the
+    variables it reads from its context
+    '''
+    env = jinja2.Environment(extensions=['jinja2.ext.do',
+                                         'jinja2.ext.loopcontrols',
+                                         salt.utils.jinja.SerializerExtension])
+    env.tests.update(JinjaTest.salt_jinja_tests)
+    env.filters.update(JinjaFilter.salt_jinja_filters)
+    env.globals.update(JinjaGlobal.salt_jinja_globals)
+    try:
+        ast = env.parse(source)
+        # This also checks that the filters and tests exist
+        undeclared = jinja2.meta.find_undeclared_variables(ast)
+    except Exception as exc:  # pylint: disable=broad-except
+        raise Uncacheable('the template does not parse: {0}'.format(exc))
+    return ast, undeclared
+
+
+def _const(node):
+    '''
+    Return the value of a constant string node, or None
+    '''
+    if isinstance(node, jinja2.nodes.Const) and isinstance(node.value, six.string_types):
+        return node.value
+    return None
+
+
+def _func_name(node, parents):
+    '''
+    Return the name of the execution function the ``salt`` variable is used
+    to look up, and the node which looks it up
+    '''
+    parent = parents[-1] if parents else None
+    if isinstance(parent, jinja2.nodes.Getitem) and parent.node is node:
+        name = _const(parent.arg)
+        if name and '.' in name:
+            return name, parent
+    elif isinstance(parent, jinja2.nodes.Getattr) and parent.node is node:
+        grandparent = parents[-2] if len(parents) > 1 else None
+        if isinstance(grandparent, jinja2.nodes.Getattr) and grandparent.node is parent:
+            return '{0}.{1}'.format(parent.attr, grandparent.attr), grandparent
+    raise Uncacheable('the salt variable is used to look up a function by a '
+                      'name only known while rendering')
+
+
+def _lookup_keys(call, fun):
+    '''
+    Return the top level keys a lookup function is called with. The ``item``
+    functions look up each of their positional arguments, the others only
+    their first one. A key of None means that a key is only known while
+    rendering.
+    '''
+    if not isinstance(call, jinja2.nodes.Call) or not call.args or call.dyn_args:
+        return [None]
+    args = call.args if fun.endswith('.item') else call.args[:1]
+    delimiter = ':'
+    for kwarg in call.kwargs:
+        if kwarg.key == 'delimiter':
+            delimiter = _const(kwarg.value)
+            if not delimiter:
+                return [None]
+    keys = []
+    for arg in args:
+        key = _const(arg)
+        if key is None:
+            return [None]
+        keys.append(key.split(delimiter, 1)[0])
+    return keys
+
+
+def analyze(source, pure=()):
+    '''
+    Return what a Jinja template reads as a dict of the templates it imports
+    and the keys of the grains, pillar and opts it reads. A key of ``None``
+    means that the template reads all of them. Raises :py:class:`Uncacheable`
+    if the rendered data may depend on anything else.
+    '''
+    ast, undeclared = _parse(source)
+    ret = {'templates': set(), 'functions': set()}
+    for var in TRACKED_VARS:
+        ret[var] = set()
+    for name in undeclared:
+        if name not in CONTEXT_VARS and name not in TRACKED_VARS and name != 'salt':
+            raise Uncacheable('the template reads the {0} variable'.format(name))
+    for template in jinja2.meta.find_referenced_templates(ast):
+        if template is None:
+            raise Uncacheable('the template imports a template with a name '
+                              'only known while rendering')
+        ret['templates'].add(template)
+
+    def _walk(node, parents):
+        if isinstance(node, jinja2.nodes.Filter) and node.name in IMPURE_FILTERS:
+            raise Uncacheable('the template uses the {0} filter'.format(node.name))
+        if isinstance(node, jinja2.nodes.Name) and node.ctx == 'load':
+            if node.name in IMPURE_NAMES:
+                raise Uncacheable('the template uses {0}'.format(node.name))
+            if node.name == 'salt':
+                fun, lookup = _func_name(node, parents)
+                if fun in LOOKUP_FUNCS:
+                    call = parents[-2] if lookup is parents[-1] else parents[-3]
+                    keys = [None]
+                    if isinstance(call, jinja2.nodes.Call) and call.node is lookup:
+                        keys = _lookup_keys(call, fun)
+                    for var in LOOKUP_FUNCS[fun]:
+                        ret[var].update(keys)
+                    if fun.startswith('config.'):
+                        # config.get also reads the master config from the pillar
+                        ret['pillar'].add('master')
+                elif any(fnmatch.fnmatch(fun, pat) for pat in pure):
+                    ret['functions'].add(fun)
+                else:
+                    raise Uncacheable('the template calls {0}'.format(fun))
+            elif node.name in TRACKED_VARS:
+                parent = parents[-1] if parents else None
+                key = None
+                if isinstance(parent, jinja2.nodes.Getitem) and parent.node is node:
+                    key = _const(parent.arg)
+                elif isinstance(parent, jinja2.nodes.Getattr) and parent.node is node:
+                    if parent.attr == 'get':
+                        grandparent = parents[-2] if len(parents) > 1 else None
+                        if isinstance(grandparent, jinja2.nodes.Call) and \
+                                grandparent.node is parent and grandparent.args:
+                            key = _const(grandparent.args[0])
+                    elif parent.attr not in _ALL_KEYS_ATTRS:
+                        key = parent.attr
+                ret[node.name].add(key)
+        parents.append(node)
+        for child in node.iter_child_nodes():
+            _walk(child, parents)
+        parents.pop()
+
+    _walk(ast, [])
+    return ret
+
+
+def _tpldir(fn_, sls):
+    '''
+    Return the directory relative imports in an SLS file are resolved from,
+    the same way as the jinja renderer finds it
+    '''
+    template = fn_.replace('\\', '/')
+    i = template.rfind(sls.replace('.', '/'))
+    if i != -1:
+        template = template[i:]
+    return os.path.dirname(template)
+
+
+def render_pipe(path, opts):
+    '''
+    Return the names of the renderers an SLS file is rendered with
+    '''
+    with salt.utils.files.fopen(path, 'r') as ifile:
+        line = salt.utils.stringutils.to_unicode(ifile.readline())
+    if line.startswith('#!') and not line.startswith('#!/'):
+        pipestr = line.strip()[2:]
+    else:
+        pipestr = opts['renderer']
+    pipestr = salt.template.OLD_STYLE_RENDERERS.get(pipestr, pipestr)
+    return [(part.strip() + ' ').split(' ', 1)[0] for part in pipestr.split('|')]
+
+
+def _digest(data):
+    '''
+    Return a digest of the data, which needs to be serializable as JSON
+    '''
+    try:
+        return salt.utils.hashutils.sha256_digest(
+            salt.utils.json.dumps(data, sort_keys=True, default=repr))
+    except (TypeError, ValueError):
+        raise Uncacheable('the data read by the template is not serializable')
+
+
+def _key_digest(data, key):
+    '''
+    Return a digest of a key of the data, which tells a missing key apart
+    from any value
+    '''
+    if key is None:
+        return _digest(data)
+    if not isinstance(data, dict) or key not in data:
+        return _digest([False])
+    return _digest([True, data[key]])
+
+
+class SLSCache(object):
+    '''
+    Cache the data rendered from SLS files in the minion cache directory
+    '''
+    def __init__(self, opts, client):
+        self.opts = opts
+        self.client = client
+        self.cachedir = os.path.join(opts['cachedir'], 'sls_cache')
+        self.pure = opts.get('state_render_cache_pure') or ()
+
+    def _cache_path(self, fn_, saltenv, sls):
+        '''
+        Return the path of the cache file for an SLS file
+        '''
+        key = salt.utils.hashutils.sha1_digest('\n'.join(
+            (saltenv, sls, fn_, self.opts['renderer'])))
+        return os.path.join(self.cachedir, key + '.p')
+
+    def _cache_template(self, name, saltenv):
+        '''
+        Cache an imported template from the fileserver and return its path
+        '''
+        path = self.client.cache_file(salt.utils.url.create(name), saltenv)
+        if not path:
+            raise Uncacheable('the template {0} was not found'.format(name))
+        return path
+
+    def _file_hash(self, path):
+        return salt.utils.hashutils.get_hash(path)
+
+    def _dependencies(self, fn_, saltenv, sls):
+        '''
+        Return the dependencies of an SLS file as the hashes of the files and
+        the digests of the grains, pillar and opts keys it reads
+        '''
+        pipe = render_pipe(fn_, self.opts)
+        if not set(pipe).issubset(PURE_RENDERERS):
+            raise Uncacheable('the SLS file is rendered with {0}'.format('|'.join(pipe)))
+        deps = {'files': {fn_: self._file_hash(fn_)}}
+        if 'jinja' not in pipe:
+            return deps
+        reads = {'functions': set()}
+        for var in TRACKED_VARS:
+            reads[var] = set()
+        # The jinja loader resolves relative imports from the directory of the
+        # last template imported by name, so they are only tracked when all
+        # of the imports are relative to the SLS file
+        tpldir = _tpldir(fn_, sls)
+        imports = {'relative': False, 'absolute': False}
+        queue = [fn_]
+        seen = set()
+        while queue:
+            with salt.utils.files.fopen(queue.pop(), 'rb') as ifile:
+                source = salt.utils.stringutils.to_unicode(ifile.read())
+            found = analyze(source, self.pure)
+            for key in reads:
+                reads[key].update(found[key])
+            for template in found['templates']:
+                if template.split('/', 1)[0] in ('.', '..'):
+                    imports['relative'] = True
+                    template = os.path.normpath('/'.join((tpldir, template))).replace('\\', '/')
+                    if template.split('/', 1)[0] == '..':
+                        raise Uncacheable('the template {0} is outside of '
+                                          'the fileserver'.format(template))
+                else:
+                    imports['absolute'] = True
+                if imports['relative'] and imports['absolute']:
+                    raise Uncacheable('the templates are imported both by name '
+                                      'and relative to the SLS file')
+                if template in seen:
+                    continue
+                seen.add(template)
+                tpl_path = self._cache_template(template, saltenv)
+                deps['files'][template] = self._file_hash(tpl_path)
+                queue.append(tpl_path)
+        for var in TRACKED_VARS:
+            data = self.opts.get(var) if var != 'opts' else self.opts
+            if None in reads[var]:
+                deps[var] = {None: _key_digest(data, None)}
+            else:
+                deps[var] = dict((key, _key_digest(data, key)) for key in reads[var])
+        deps['functions'] = sorted(reads['functions'])
+        return deps
+
+    def _valid(self, entry, fn_, saltenv):
+        '''
+        Check that nothing the cached render depended on has changed
+        '''
+        deps = entry['deps']
+        if entry.get('version') != salt.version.__version__:
+            return False
+        for fun in deps.get('functions', ()):
+            if not any(fnmatch.fnmatch(fun, pat) for pat in self.pure):
+                return False
+        for name, hsum in six.iteritems(deps['files']):
+            path = fn_ if name == fn_ else self._cache_template(name, saltenv)
+            if self._file_hash(path) != hsum:
+                return False
+        for var in TRACKED_VARS:
+            data = self.opts.get(var) if var != 'opts' else self.opts
+            for key, digest in six.iteritems(deps.get(var, {})):
+                if key == '':
+                    key = None
+                if _key_digest(data, key) != digest:
+                    return False
+        return True
+
+    def get(self, fn_, saltenv, sls):
+        '''
+        Return the cached data rendered from an SLS file, or None if it has
+        to be rendered
+        '''
+        path = self._cache_path(fn_, saltenv, sls)
+        if not os.path.isfile(path):
+            return None
+        try:
+            with salt.utils.files.fopen(path, 'rb') as fp_:
+                entry = salt.utils.msgpack.load(
+                    fp_, raw=False, object_pairs_hook=OrderedDict)
+            if not self._valid(entry, fn_, saltenv):
+                return None
+        except Uncacheable:
+            return None
+        except Exception as exc:  # pylint: disable=broad-except
+            log.debug('Failed to read the render cache of %s: %s', sls, exc)
+            return None
+        log.debug('Using the cached render of %s:%s', saltenv, sls)
+        return entry['data']
+
+    def store(self, fn_, saltenv, sls, data):
+        '''
+        Cache the data rendered from an SLS file, if it can be reused
+        '''
+        try:
+            deps = self._dependencies(fn_, saltenv, sls)
+        except Uncacheable as exc:
+            log.debug('Not caching the render of %s:%s, %s', saltenv, sls, exc)
+            return False
+        except (IOError, OSError) as exc:
+            log.debug('Not caching the render of %s:%s: %s', saltenv, sls, exc)
+            return False
+        for var in TRACKED_VARS:
+            # msgpack can't store None as a key
+            deps[var] = dict(('' if key is None else key, digest)
+                             for key, digest in six.iteritems(deps[var]))
+        entry = {'version': salt.version.__version__, 'deps': deps, 'data': data}
+        try:
+            payload = salt.utils.msgpack.dumps(entry, use_bin_type=True)
+        except Exception as exc:  # pylint: disable=broad-except
+            log.debug('Not caching the render of %s:%s, it is not '
+                      'serializable: %s', saltenv, sls, exc)
+            return False
+        path = self._cache_path(fn_, saltenv, sls)
+        try:
+            if not os.path.isdir(self.cachedir):
+                os.makedirs(self.cachedir)
+            with salt.utils.atomicfile.atomic_open(path, 'wb') as fp_:
+                fp_.write(payload)
+        except (IOError, OSError) as exc:
+            log.error('Failed to write the render cache of %s:%s: %s',
+                      saltenv, sls, exc)
+            return False
+        return True
@@ -351,6 +351,8 @@ def render_jinja_tmpl(tmplstr, context, tmplpath=None):
     else:
         opt_jinja_env_helper(opt_jinja_env, 'jinja_env')
 
+    env_args['bytecode_cache'] = salt.utils.jinja.get_bytecode_cache(opts, env_args)
+
     if opts.get('allow_undefined', False):
         jinja_env = jinja2.Environment(**env_args)
     else:
@@ -387,7 +389,7 @@ def render_jinja_tmpl(tmplstr, context, tmplpath=None):
             decoded_context[key] = salt.utils.data.decode(value)
 
     try:
-        template = jinja_env.from_string(tmplstr)
+        template = salt.utils.jinja.template_from_string(jinja_env, tmplstr, tmplpath)
         template.globals.update(decoded_context)
         output = template.render(**decoded_context)
     except jinja2.exceptions.UndefinedError as exc:
@@ -8,8 +8,15 @@ from __future__ import absolute_import, print_function, unicode_literals
 import warnings
 
 import yaml  # pylint: disable=blacklisted-import
+import yaml.error
+import yaml.loader
 from yaml.nodes import MappingNode, SequenceNode
-from yaml.constructor import ConstructorError
+from yaml.constructor import ConstructorError, SafeConstructor
+try:
+    from yaml.cyaml import CSafeLoader
+    HAS_LIBYAML = True
+except ImportError:
+    HAS_LIBYAML = False
 try:
     yaml.Loader = yaml.CLoader
     yaml.Dumper = yaml.CDumper
@@ -19,9 +26,10 @@ except Exception:  # pylint: disable=broad-except
     pass
 
 import salt.utils.stringutils
+from salt.ext import six
 
 
-__all__ = ['SaltYamlSafeLoader', 'load', 'safe_load']
+__all__ = ['SaltYamlSafeLoader', 'SaltYamlSafePyLoader', 'load', 'safe_load']
 
 
 class DuplicateKeyWarning(RuntimeWarning):
@@ -34,32 +42,41 @@ warnings.simplefilter('always', category=DuplicateKeyWarning)
 
 
 # with code integrated from https://gist.github.com/844388
-class SaltYamlSafeLoader(yaml.SafeLoader):
+class SaltYamlSafeLoaderMixin(object):
     '''
     Create a custom YAML loader that uses the custom constructor. This allows
     for the YAML loading defaults to be manipulated based on needs within salt
     to make things like sls file more intuitive.
+
+    The constructors are shared by the pure Python loader and the loader
+    backed by libyaml, which only differ in how the stream is parsed.
     '''
     def __init__(self, stream, dictclass=dict):
-        super(SaltYamlSafeLoader, self).__init__(stream)
-        if dictclass is not dict:
-            # then assume ordered dict and use it for both !map and !omap
-            self.add_constructor(
-                'tag:yaml.org,2002:map',
-                type(self).construct_yaml_map)
-            self.add_constructor(
-                'tag:yaml.org,2002:omap',
-                type(self).construct_yaml_map)
-        self.add_constructor(
+        super(SaltYamlSafeLoaderMixin, self).__init__(stream)
+        self.dictclass = dictclass
+
+    @classmethod
+    def add_salt_constructors(cls):
+        '''
+        Register the custom constructors on the loader class. This is done
+        once for each class, instead of for each loader, so that loading with
+        one dictclass does not change how another loader builds its data.
+        '''
+        cls.add_constructor(
+            'tag:yaml.org,2002:map',
+            cls.construct_yaml_map)
+        cls.add_constructor(
+            'tag:yaml.org,2002:omap',
+            cls.construct_yaml_omap)
+        cls.add_constructor(
             'tag:yaml.org,2002:str',
-            type(self).construct_yaml_str)
-        self.add_constructor(
+            cls.construct_yaml_str)
+        cls.add_constructor(
             'tag:yaml.org,2002:python/unicode',
-            type(self).construct_unicode)
-        self.add_constructor(
+            cls.construct_unicode)
+        cls.add_constructor(
             'tag:yaml.org,2002:timestamp',
-            type(self).construct_scalar)
-        self.dictclass = dictclass
+            cls.construct_scalar)
 
     def construct_yaml_map(self, node):
         data = self.dictclass()
@@ -67,6 +84,12 @@ class SaltYamlSafeLoader(yaml.SafeLoader):
         value = self.construct_mapping(node)
         data.update(value)
 
+    def construct_yaml_omap(self, node):
+        if self.dictclass is dict:
+            return SafeConstructor.construct_yaml_omap(self, node)
+        # Assume an ordered dict and use it for both !map and !omap
+        return self.construct_yaml_map(node)
+
     def construct_unicode(self, node):
         return node.value
 
@@ -119,7 +142,7 @@ class SaltYamlSafeLoader(yaml.SafeLoader):
                 # an empty string. Change it to '0'.
                 if node.value == '':
                     node.value = '0'
-        return super(SaltYamlSafeLoader, self).construct_scalar(node)
+        return super(SaltYamlSafeLoaderMixin, self).construct_scalar(node)
 
     def construct_yaml_str(self, node):
         value = self.construct_scalar(node)
@@ -167,8 +190,56 @@ class SaltYamlSafeLoader(yaml.SafeLoader):
             node.value = mergeable_items + node.value
 
 
+class SaltYamlSafePyLoader(SaltYamlSafeLoaderMixin, yaml.loader.SafeLoader):
+    '''
+    The custom YAML loader, parsing in pure Python
+    '''
+
+
+SaltYamlSafePyLoader.add_salt_constructors()
+
+
+if HAS_LIBYAML:
+    class SaltYamlSafeCLoader(SaltYamlSafeLoaderMixin, CSafeLoader):
+        '''
+        The custom YAML loader, parsing with libyaml
+        '''
+
+    SaltYamlSafeCLoader.add_salt_constructors()
+    __all__.append('SaltYamlSafeCLoader')
+    SaltYamlSafeLoader = SaltYamlSafeCLoader
+else:
+    SaltYamlSafeLoader = SaltYamlSafePyLoader
+
+
+def _add_error_buffer(exc, stream):
+    '''
+    The marks of the errors raised by libyaml do not hold the parsed
+    document, which is needed to show where the error is. Replace them with
+    marks which do, when the document is a string.
+    '''
+    if isinstance(stream, bytes):
+        try:
+            stream = stream.decode('utf-8')
+        except UnicodeDecodeError:
+            return
+    if not isinstance(stream, six.text_type):
+        return
+    for attr in ('context_mark', 'problem_mark'):
+        mark = getattr(exc, attr, None)
+        if mark is None or mark.buffer is not None:
+            continue
+        setattr(exc, attr, yaml.error.Mark(mark.name, mark.index, mark.line,
+                                           mark.column, stream + '\0',
+                                           mark.index))
+
+
 def load(stream, Loader=SaltYamlSafeLoader):
-    return yaml.load(stream, Loader=Loader)
+    try:
+        return yaml.load(stream, Loader=Loader)
+    except yaml.MarkedYAMLError as exc:
+        _add_error_buffer(exc, stream)
+        raise
 
 
 def safe_load(stream, Loader=SaltYamlSafeLoader):
@@ -177,4 +248,4 @@ def safe_load(stream, Loader=SaltYamlSafeLoader):
 
     Helper function which automagically uses our custom loader.
     '''
-    return yaml.load(stream, Loader=Loader)
+    return load(stream, Loader=Loader)
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+'''
+Measure how long a master worker takes to handle the sign in requests of
+many minions, with the public key and signature caches of the worker cold,
+as they were before they were added, and warm
+
+Usage:
+
+.. code-block:: bash
+
+    python tests/benchmarks/bench_auth.py -m 50
+    python tests/benchmarks/bench_auth.py -m 20 -k 4096
+'''
+
+# Import Python libs
+from __future__ import absolute_import, print_function
+import optparse
+import os
+import shutil
+import tempfile
+import time
+
+# Import Salt libs
+import salt.config
+import salt.crypt
+import salt.daemons.masterapi
+import salt.utils.files
+from salt.transport.mixins.auth import AESReqServerMixin
+
+
+def parse():
+    '''
+    Parse the script command line inputs
+    '''
+    parser = optparse.OptionParser()
+    parser.add_option(
+        '-m',
+        '--minions',
+        dest='minions',
+        type='int',
+        default=20,
+        help='The number of minions signing in (Default: 20)'
+    )
+    parser.add_option(
+        '-k',
+        '--keysize',
+        dest='keysize',
+        type='int',
+        default=2048,
+        help='The size of the RSA keys (Default: 2048)'
+    )
+    options, _ = parser.parse_args()
+    return options
+
+
+def make_server(pki_dir, keysize):
+    '''
+    Set up the auth side of a master worker, without the transport
+    '''
+    opts = salt.config.master_config(None)
+    opts['pki_dir'] = pki_dir
+    opts['keysize'] = keysize
+    opts['auth_events'] = False
+    server = AESReqServerMixin()
+    server.opts = opts
+    server.pre_fork(None)
+    server.crypticle = None
+    server.auto_key = salt.daemons.masterapi.AutoKey(opts)
+    server.cache_cli = False
+    server.master_key = salt.crypt.MasterKeys(opts)
+    server.pub_keys = {}
+    server._aes_sig = server._pub_sig = (None, None)
+    return server
+
+
+def make_loads(pki_dir, options):
+    '''
+    Generate the keys of the minions, accept them and build their sign in
+    requests
+    '''
+    key_dir = os.path.join(pki_dir, 'keys')
+    os.makedirs(key_dir)
+    os.makedirs(os.path.join(pki_dir, 'minions'))
+    master_pub = salt.crypt.get_rsa_pub_key(os.path.join(pki_dir, 'master.pub'))
+    loads = []
+    for num in range(options.minions):
+        minion_id = 'minion{0}'.format(num)
+        salt.crypt.gen_keys(key_dir, minion_id, options.keysize)
+        with salt.utils.files.fopen(os.path.join(key_dir, minion_id + '.pub')) as fp_:
+            pub = fp_.read()
+        shutil.copy(os.path.join(key_dir, minion_id + '.pub'),
+                    os.path.join(pki_dir, 'minions', minion_id))
+        token = salt.crypt.Crypticle.generate_key_string().encode()
+        if salt.crypt.HAS_M2:
+            token = master_pub.public_encrypt(token, salt.crypt.RSA.pkcs1_oaep_padding)
+        else:
+            token = salt.crypt.PKCS1_OAEP.new(master_pub).encrypt(token)
+        loads.append({'cmd': '_auth', 'id': minion_id, 'pub': pub, 'token': token})
+    return loads
+
+
+def run(options):
+    '''
+    Sign in every minion with cold and warm caches and print the timings
+    '''
+    pki_dir = tempfile.mkdtemp()
+    try:
+        server = make_server(pki_dir, options.keysize)
+        loads = make_loads(pki_dir, options)
+        for name, cold in (('cold', True), ('cached', False)):
+            start = time.time()
+            for load in loads:
+                if cold:
+                    server.pub_keys = {}
+                    server._aes_sig = (None, None)
+                ret = server._auth(load)
+                if ret.get('enc') != 'pub':
+                    print('Sign in failed: {0}'.format(ret))
+            elapsed = time.time() - start
+            print('{0:<8} {1:8.2f} ms per sign in'.format(
+                name, elapsed * 1000 / len(loads)))
+    finally:
+        shutil.rmtree(pki_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    run(parse())
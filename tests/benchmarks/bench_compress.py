@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+'''
+Measure the time it takes to encrypt and decrypt publications and returns
+with each payload compression, against the bytes it saves
+
+Usage:
+
+.. code-block:: bash
+
+    python tests/benchmarks/bench_compress.py -n 20
+    python tests/benchmarks/bench_compress.py -k 50000 -f 4194304
+'''
+
+# Import Python libs
+from __future__ import absolute_import, print_function
+import optparse
+import os
+import time
+
+# Import Salt libs
+import salt.crypt
+
+
+def parse():
+    '''
+    Parse the script command line inputs
+    '''
+    parser = optparse.OptionParser()
+    parser.add_option(
+        '-n',
+        '--iterations',
+        dest='iterations',
+        type='int',
+        default=10,
+        help='The number of times to encrypt each payload (Default: 10)'
+    )
+    parser.add_option(
+        '-k',
+        '--pillar-keys',
+        dest='pillar_keys',
+        type='int',
+        default=5000,
+        help='The number of keys in the pillar override of the state.apply '
+             'publication (Default: 5000)'
+    )
+    parser.add_option(
+        '-f',
+        '--file-size',
+        dest='file_size',
+        type='int',
+        default=1024 * 1024,
+        help='The size in bytes of the file sent with cp.recv (Default: 1 MiB)'
+    )
+    options, _ = parser.parse_args()
+    return options
+
+
+def make_loads(options):
+    '''
+    Build the payloads: a state.apply publication with a pillar override,
+    a cp.recv publication of a text file and of a binary file, and the
+    return of a highstate
+    '''
+    pillar = dict(
+        ('key{0}'.format(num),
+         {'name': 'user{0}'.format(num), 'uid': 2000 + num, 'shell': '/bin/bash'})
+        for num in range(options.pillar_keys))
+    lines = []
+    while sum(len(line) for line in lines) < options.file_size:
+        lines.append('option{0} = value{0}  # set by salt\n'.format(len(lines)))
+    highstate = dict(
+        ('file_|-/etc/file{0}_|-/etc/file{0}_|-managed'.format(num),
+         {'result': True, 'comment': 'File /etc/file{0} is in the correct state'.format(num),
+          'changes': {}, 'duration': 1.5, '__run_num__': num, '__sls__': 'files'})
+        for num in range(options.pillar_keys // 5))
+    return [
+        ('state.apply', {'fun': 'state.apply', 'tgt': '*', 'tgt_type': 'glob',
+                         'arg': [{'pillar': pillar, '__kwarg__': True}], 'jid': '1'}),
+        ('cp.recv text', {'fun': 'cp.recv', 'tgt': '*', 'tgt_type': 'glob',
+                          'arg': [{'/etc/app.conf': ''.join(lines)}, '/etc/app.conf'],
+                          'jid': '1'}),
+        ('cp.recv binary', {'fun': 'cp.recv', 'tgt': '*', 'tgt_type': 'glob',
+                            'arg': [{'/opt/app.bin': os.urandom(options.file_size)},
+                                    '/opt/app.bin'],
+                            'jid': '1'}),
+        ('highstate return', {'cmd': '_return', 'id': 'minion', 'jid': '1',
+                              'fun': 'state.apply', 'return': highstate}),
+    ]
+
+
+def run(options):
+    '''
+    Encrypt and decrypt every payload with each compression and print the
+    timings and the sizes
+    '''
+    crypticle = salt.crypt.Crypticle(
+        {'payload_compression_threshold': 0},
+        salt.crypt.Crypticle.generate_key_string())
+    compressions = [None] + salt.crypt.COMPRESSIONS
+    if not salt.crypt.HAS_ZSTD:
+        print('zstandard is not available, zstd is left out')
+
+    for name, load in make_loads(options):
+        plain = None
+        for compress in compressions:
+            start = time.time()
+            for _ in range(options.iterations):
+                data = crypticle.dumps(load, compress=compress)
+            dumps = (time.time() - start) / options.iterations
+            start = time.time()
+            for _ in range(options.iterations):
+                crypticle.loads(data)
+            loads = (time.time() - start) / options.iterations
+            if plain is None:
+                plain = len(data)
+            print('{0:<17} {1:<5} {2:10.1f} KiB  saved: {3:5.1f}%  '
+                  'dumps: {4:8.2f} ms  loads: {5:8.2f} ms'.format(
+                      name, compress or 'none', len(data) / 1024.0,
+                      100.0 * (plain - len(data)) / plain,
+                      dumps * 1000, loads * 1000))
+
+
+if __name__ == '__main__':
+    run(parse())
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+'''
+Measure how long it takes to encrypt and decrypt payloads of several sizes
+with the AES session key, using AES-CBC with HMAC-SHA256 and AES-GCM
+
+Usage:
+
+.. code-block:: bash
+
+    python tests/benchmarks/bench_crypt.py -n 50
+    python tests/benchmarks/bench_crypt.py -s 1024 -s 1048576
+'''
+
+# Import Python libs
+from __future__ import absolute_import, print_function
+import optparse
+import os
+import time
+
+# Import Salt libs
+import salt.crypt
+
+
+def parse():
+    '''
+    Parse the script command line inputs
+    '''
+    parser = optparse.OptionParser()
+    parser.add_option(
+        '-n',
+        '--iterations',
+        dest='iterations',
+        type='int',
+        default=20,
+        help='The number of times to encrypt each payload (Default: 20)'
+    )
+    parser.add_option(
+        '-s',
+        '--size',
+        dest='sizes',
+        type='int',
+        action='append',
+        default=[],
+        help='The size of a payload in bytes, may be passed more than once '
+             '(Default: 1 KiB, 100 KiB and 10 MiB)'
+    )
+    options, _ = parser.parse_args()
+    if not options.sizes:
+        options.sizes = [1024, 100 * 1024, 10 * 1024 * 1024]
+    return options
+
+
+def time_it(func, iterations):
+    '''
+    Run the function the given number of times and return the mean time
+    '''
+    # Leave the first call, which sets up the ciphers, out of the timing
+    func()
+    start = time.time()
+    for _ in range(iterations):
+        ret = func()
+    return ret, (time.time() - start) / iterations
+
+
+def run(options):
+    '''
+    Encrypt and decrypt every payload with each cipher and print the timings
+    '''
+    crypticle = salt.crypt.Crypticle({}, salt.crypt.Crypticle.generate_key_string())
+    ciphers = [('aes-cbc', False)]
+    if salt.crypt.HAS_AESGCM:
+        ciphers.append(('aes-gcm', True))
+    else:
+        print('cryptography is not available, AES-GCM is left out')
+
+    for size in options.sizes:
+        data = os.urandom(size)
+        for name, aead in ciphers:
+            crypted, encrypt = time_it(
+                lambda: crypticle.encrypt(data, aead=aead), options.iterations)
+            plain, decrypt = time_it(
+                lambda: crypticle.decrypt(crypted, aead=aead), options.iterations)
+            if plain != data:
+                print('Mismatch: {0} did not return the payload'.format(name))
+            print('{0:>10} bytes  {1:<8} encrypt: {2:9.3f} ms  '
+                  'decrypt: {3:9.3f} ms  {4:8.1f} MiB/s'.format(
+                      size, name, encrypt * 1000, decrypt * 1000,
+                      2 * size / (encrypt + decrypt) / 1024.0 / 1024.0))
+
+
+if __name__ == '__main__':
+    run(parse())
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+'''
+Measure how long it takes, and how much memory is needed, to merge the data
+of many pillar SLS files into one pillar, with and without copy-on-write
+merging
+
+Usage:
+
+.. code-block:: bash
+
+    python tests/benchmarks/bench_dictupdate.py -s 50 -k 1000
+    python tests/benchmarks/bench_dictupdate.py -s 100 --strategy overwrite
+    python tests/benchmarks/bench_dictupdate.py -s 100 --merge-lists
+'''
+
+# Import Python libs
+from __future__ import absolute_import, print_function
+import copy
+import optparse
+import time
+
+try:
+    import tracemalloc
+    HAS_TRACEMALLOC = True
+except ImportError:
+    HAS_TRACEMALLOC = False
+
+# Import Salt libs
+import salt.utils.dictupdate
+from salt.utils.odict import OrderedDict
+
+
+def parse():
+    '''
+    Parse the script command line inputs
+    '''
+    parser = optparse.OptionParser()
+    parser.add_option(
+        '-s',
+        '--sls',
+        dest='sls',
+        type='int',
+        default=100,
+        help='The number of pillar SLS files to merge (Default: 100)'
+    )
+    parser.add_option(
+        '-k',
+        '--keys',
+        dest='keys',
+        type='int',
+        default=200,
+        help='The number of keys each SLS file adds (Default: 200)'
+    )
+    parser.add_option(
+        '--strategy',
+        dest='strategy',
+        default='smart',
+        help='The merge strategy (Default: smart)'
+    )
+    parser.add_option(
+        '--merge-lists',
+        dest='merge_lists',
+        default=False,
+        action='store_true',
+        help='Merge the lists, as with pillar_merge_lists'
+    )
+    options, _ = parser.parse_args()
+    return options
+
+
+def make_sls(options):
+    '''
+    Build the rendered data of the SLS files. Each one adds its own keys, and
+    overrides some of the keys of a few shared structures
+    '''
+    slses = []
+    for num in range(options.sls):
+        data = OrderedDict()
+        data['sls{0}'.format(num)] = OrderedDict(
+            ('key{0}'.format(key), {'value': key, 'list': [key, num]})
+            for key in range(options.keys)
+        )
+        data['common'] = OrderedDict([
+            ('owner', 'sls{0}'.format(num)),
+            ('settings', {'setting{0}'.format(num % 10): num}),
+            ('members', ['sls{0}'.format(num)]),
+        ])
+        slses.append(data)
+    return slses
+
+
+def compile_pillar(slses, options, copy_on_write):
+    '''
+    Merge the SLS data the way Pillar.render_pillar does
+    '''
+    pillar = {}
+    for pstate in slses:
+        pillar = salt.utils.dictupdate.merge(
+            pillar,
+            pstate,
+            options.strategy,
+            'yaml',
+            options.merge_lists,
+            copy_on_write=copy_on_write)
+    return pillar
+
+
+def run(options):
+    '''
+    Merge the SLS data with each kind of merge and print the timings
+    '''
+    slses = make_sls(options)
+    results = []
+    for name, copy_on_write in (('deepcopy', False), ('copy-on-write', True)):
+        # The overwrite strategy changes obj_a, so merge copies of the data
+        data = copy.deepcopy(slses)
+        start = time.time()
+        results.append(compile_pillar(data, options, copy_on_write))
+        elapsed = time.time() - start
+        if not HAS_TRACEMALLOC:
+            print('{0:<14} {1:10.2f} ms'.format(name, elapsed * 1000))
+            continue
+        # Tracing the allocations slows the merges down, so the memory is
+        # measured in a second run
+        data = copy.deepcopy(slses)
+        tracemalloc.start()
+        compile_pillar(data, options, copy_on_write)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print('{0:<14} {1:10.2f} ms  peak: {2:8.2f} MiB'.format(
+            name, elapsed * 1000, peak / 1024.0 / 1024.0))
+    if results[0] != results[1]:
+        print('Mismatch: the merges returned different data')
+
+
+if __name__ == '__main__':
+    run(parse())
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+'''
+Measure how long it takes the event publisher to deliver events to a growing
+number of subscribers, when every subscriber gets every event and when each
+subscriber asks the publisher for the tags of its own jobs only
+
+Usage:
+
+.. code-block:: bash
+
+    python tests/benchmarks/bench_event.py -e 2000
+    python tests/benchmarks/bench_event.py -s 1 -s 10 -s 50 -b 4096
+'''
+
+# Import Python libs
+from __future__ import absolute_import, print_function
+import optparse
+import os
+import shutil
+import tempfile
+import time
+
+# Import Salt libs
+import salt.ext.tornado.gen
+import salt.ext.tornado.ioloop
+import salt.payload
+import salt.transport.ipc
+import salt.utils.asynchronous
+import salt.utils.event
+import salt.utils.stringutils
+from salt.ext import six
+
+
+def parse():
+    '''
+    Parse the script command line inputs
+    '''
+    parser = optparse.OptionParser()
+    parser.add_option(
+        '-e',
+        '--events',
+        dest='events',
+        type='int',
+        default=1000,
+        help='The number of events to publish (Default: 1000)'
+    )
+    parser.add_option(
+        '-s',
+        '--subscribers',
+        dest='subscribers',
+        type='int',
+        action='append',
+        default=[],
+        help='The number of subscribers, may be passed more than once '
+             '(Default: 1, 5, 20 and 50)'
+    )
+    parser.add_option(
+        '-b',
+        '--bytes',
+        dest='size',
+        type='int',
+        default=1024,
+        help='The size of the data of each event (Default: 1024)'
+    )
+    options, _ = parser.parse_args()
+    if not options.subscribers:
+        options.subscribers = [1, 5, 20, 50]
+    return options
+
+
+def make_events(options, subscribers):
+    '''
+    Pack job return events the way SaltEvent.fire_event does, spread over the
+    jobs of the subscribers
+    '''
+    serial = salt.payload.Serial({'serial': 'msgpack'})
+    packages = []
+    for num in range(options.events):
+        tag = 'salt/job/{0}/ret/minion{1}'.format(num % subscribers, num)
+        data = {'jid': num % subscribers, 'return': 'x' * options.size}
+        packages.append(b''.join([
+            salt.utils.stringutils.to_bytes(tag),
+            salt.utils.stringutils.to_bytes(salt.utils.event.TAGEND),
+            serial.dumps(data, use_bin_type=six.PY3)]))
+    return packages
+
+
+def publish(options, subscribers, filtered, sock):
+    '''
+    Publish the events and return how long it took until every subscriber had
+    unpacked the events it got
+    '''
+    io_loop = salt.ext.tornado.ioloop.IOLoop()
+    packages = make_events(options, subscribers)
+    expected = options.events if filtered else options.events * subscribers
+    received = []
+
+    def handler(raw):
+        salt.utils.event.SaltEvent.unpack(raw)
+        received.append(1)
+        if len(received) == expected:
+            io_loop.stop()
+
+    with salt.utils.asynchronous.current_ioloop(io_loop):
+        publisher = salt.transport.ipc.IPCMessagePublisher(
+            {'ipc_write_buffer': 0}, sock, io_loop=io_loop)
+        publisher.start()
+        clients = []
+        for num in range(subscribers):
+            client = salt.transport.ipc.IPCMessageSubscriber(sock, io_loop=io_loop)
+            io_loop.run_sync(client.connect)
+            if filtered:
+                client.set_tag_filters([('salt/job/{0}/'.format(num), 'startswith')])
+            clients.append(client)
+        # Wait for the publisher to have every subscriber and its filters
+        while (len(publisher.streams) < subscribers or
+               filtered and len(publisher.tag_filters) < subscribers):
+            io_loop.run_sync(lambda: salt.ext.tornado.gen.sleep(0.01))
+        for client in clients:
+            io_loop.spawn_callback(client.read_async, handler)
+
+        start = time.time()
+        for package in packages:
+            publisher.publish(
+                package, tag=salt.utils.event._get_tag(package, publisher))
+        io_loop.start()
+        elapsed = time.time() - start
+
+        for client in clients:
+            client.close()
+        publisher.close()
+    io_loop.close(all_fds=True)
+    os.unlink(sock)
+    return elapsed
+
+
+def run(options):
+    '''
+    Publish the events to each number of subscribers and print the timings
+    '''
+    sock_dir = tempfile.mkdtemp()
+    try:
+        sock = os.path.join(sock_dir, 'bench_event.ipc')
+        for subscribers in options.subscribers:
+            every = publish(options, subscribers, False, sock)
+            filtered = publish(options, subscribers, True, sock)
+            print('{0:>4} subscribers  every event: {1:10.2f} ms  '
+                  'filtered: {2:10.2f} ms'.format(
+                      subscribers, every * 1000, filtered * 1000))
+    finally:
+        shutil.rmtree(sock_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    run(parse())
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+'''
+Measure how long it takes to create loaders and to look up a function
+
+Usage:
+
+.. code-block:: bash
+
+    python tests/benchmarks/bench_loader.py -n 20
+    python tests/benchmarks/bench_loader.py -n 20 --virtual-cache
+    python tests/benchmarks/bench_loader.py -n 20 --no-cache
+'''
+
+# Import Python libs
+from __future__ import absolute_import, print_function
+import optparse
+import time
+
+# Import Salt libs
+import salt.config
+import salt.loader
+
+
+def parse():
+    '''
+    Parse the script command line inputs
+    '''
+    parser = optparse.OptionParser()
+    parser.add_option(
+        '-n',
+        '--iterations',
+        dest='iterations',
+        type='int',
+        default=10,
+        help='The number of loaders to create of each kind (Default: 10)'
+    )
+    parser.add_option(
+        '-f',
+        '--function',
+        dest='function',
+        default='test.ping',
+        help='The function to look up in each execution module loader'
+    )
+    parser.add_option(
+        '--virtual-cache',
+        dest='virtual_cache',
+        default=False,
+        action='store_true',
+        help='Enable the loader_virtual_cache option'
+    )
+    parser.add_option(
+        '--no-cache',
+        dest='no_cache',
+        default=False,
+        action='store_true',
+        help='Clear the process-wide loader caches before each loader'
+    )
+    options, _ = parser.parse_args()
+    return options
+
+
+def run(options):
+    '''
+    Create the loaders and print the timings
+    '''
+    opts = salt.config.minion_config(None)
+    opts['file_client'] = 'local'
+    opts['grains'] = salt.loader.grains(opts)
+    opts['loader_virtual_cache'] = options.virtual_cache
+    utils = salt.loader.utils(opts)
+
+    def _minion_mods():
+        mods = salt.loader.minion_mods(opts, utils=utils)
+        # Force the module to be found, which loads the modules whose name
+        # matches and evaluates their __virtual__ functions
+        mods[options.function]  # pylint: disable=pointless-statement
+        return mods
+
+    benchmarks = (
+        ('utils', lambda: salt.loader.utils(opts)),
+        ('minion_mods', _minion_mods),
+        ('states', lambda: salt.loader.states(opts, {}, utils, {})),
+        ('returners', lambda: salt.loader.returners(opts, {})),
+    )
+    for name, func in benchmarks:
+        timings = []
+        for _ in range(options.iterations):
+            if options.no_cache:
+                salt.loader.clear_cache()
+            start = time.time()
+            func()
+            timings.append(time.time() - start)
+        print(
+            '{0:<12} first: {1:8.2f} ms  mean of rest: {2:8.2f} ms'.format(
+                name,
+                timings[0] * 1000,
+                sum(timings[1:]) * 1000 / max(len(timings) - 1, 1),
+            )
+        )
+
+
+if __name__ == '__main__':
+    run(parse())
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+'''
+Measure how long it takes the scheduler to evaluate a large schedule of
+interval and cron jobs every second, with and without deferring the jobs
+which are not due
+
+Usage:
+
+.. code-block:: bash
+
+    python tests/benchmarks/bench_schedule.py -j 1000
+    python tests/benchmarks/bench_schedule.py -j 500 -t 600
+'''
+
+# Import Python libs
+from __future__ import absolute_import, print_function
+import datetime
+import optparse
+import shutil
+import tempfile
+import time
+
+# Import Salt libs
+import salt.config
+import salt.utils.schedule
+
+try:
+    import croniter  # pylint: disable=W0611
+    HAS_CRONITER = True
+except ImportError:
+    HAS_CRONITER = False
+
+
+def parse():
+    '''
+    Parse the script command line inputs
+    '''
+    parser = optparse.OptionParser()
+    parser.add_option(
+        '-j',
+        '--jobs',
+        dest='jobs',
+        type='int',
+        default=500,
+        help='The number of scheduled jobs (Default: 500)'
+    )
+    parser.add_option(
+        '-t',
+        '--ticks',
+        dest='ticks',
+        type='int',
+        default=300,
+        help='The number of one second ticks to evaluate (Default: 300)'
+    )
+    options, _ = parser.parse_args()
+    return options
+
+
+def make_schedule(options):
+    '''
+    Build a schedule of jobs running every few minutes, every tenth of them on
+    a cron expression when croniter is available
+    '''
+    schedule = {}
+    for num in range(options.jobs):
+        job = {'function': 'test.ping', 'dry_run': True}
+        if HAS_CRONITER and num % 10 == 0:
+            job['cron'] = '{0} * * * *'.format(num % 60)
+        else:
+            job['seconds'] = 60 + num % 240
+        schedule['job{0}'.format(num)] = job
+    return schedule
+
+
+def run(options):
+    '''
+    Evaluate the schedule with and without deferring and print the timings
+    '''
+    cachedir = tempfile.mkdtemp()
+    try:
+        opts = salt.config.minion_config(None)
+        opts['cachedir'] = cachedir
+        opts['loop_interval'] = 1
+        start_time = datetime.datetime(2019, 1, 1, 12)
+        for name, defer in (('every job', False), ('deferred', True)):
+            opts['schedule'] = make_schedule(options)
+            schedule = salt.utils.schedule.Schedule(
+                opts, {'test.ping': lambda: True}, returners={}, new_instance=True)
+            start = time.time()
+            for tick in range(options.ticks):
+                if not defer:
+                    schedule._deferred.clear()
+                schedule.eval(now=start_time + datetime.timedelta(seconds=tick))
+            elapsed = time.time() - start
+            print('{0:<10} total: {1:10.2f} ms  per tick: {2:8.2f} ms'.format(
+                name, elapsed * 1000, elapsed * 1000 / options.ticks))
+    finally:
+        shutil.rmtree(cachedir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    run(parse())
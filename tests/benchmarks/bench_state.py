@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+'''
+Measure how long it takes to resolve requisites in a large synthetic
+highstate, with and without the requisite indexes
+
+Usage:
+
+.. code-block:: bash
+
+    python tests/benchmarks/bench_state.py -n 5000
+    python tests/benchmarks/bench_state.py -n 5000 -r 3
+'''
+
+# Import Python libs
+from __future__ import absolute_import, print_function
+import copy
+import optparse
+import time
+
+# Import Salt libs
+import salt.config
+import salt.state
+from salt.utils.odict import OrderedDict
+
+
+def parse():
+    '''
+    Parse the script command line inputs
+    '''
+    parser = optparse.OptionParser()
+    parser.add_option(
+        '-n',
+        '--states',
+        dest='states',
+        type='int',
+        default=2000,
+        help='The number of states in the synthetic highstate (Default: 2000)'
+    )
+    parser.add_option(
+        '-r',
+        '--requisites',
+        dest='requisites',
+        type='int',
+        default=2,
+        help='The number of requisites on each state (Default: 2)'
+    )
+    parser.add_option(
+        '-s',
+        '--sls',
+        dest='sls',
+        type='int',
+        default=50,
+        help='The number of SLS files the states are spread over (Default: 50)'
+    )
+    options, _ = parser.parse_args()
+    return options
+
+
+def make_high(options):
+    '''
+    Build high data where every state requires some of the states before it,
+    and every SLS after the first requires the previous SLS
+    '''
+    high = OrderedDict()
+    for num in range(options.states):
+        sls = 'sls{0}'.format(num % options.sls)
+        args = ['run', {'name': 'echo {0}'.format(num)}]
+        reqs = [{'cmd': 'state{0}'.format(num - dep)}
+                for dep in range(1, options.requisites + 1) if num - dep >= 0]
+        if num < options.sls and num > 0:
+            reqs.append({'sls': 'sls{0}'.format(num - 1)})
+        if reqs:
+            args.append({'require': reqs})
+        if num % 10 == 0 and num > 0:
+            args.append({'watch_in': [{'cmd': 'echo {0}'.format(num - 1)}]})
+        high['state{0}'.format(num)] = OrderedDict([
+            ('cmd', args),
+            ('__sls__', sls),
+            ('__env__', 'base'),
+        ])
+    return high
+
+
+def scan_chunk_reqs(chunks):
+    '''
+    Resolve every requisite of every chunk by scanning all of the chunks,
+    the way the requisites were resolved before they were indexed
+    '''
+    import fnmatch
+    found = 0
+    for low in chunks:
+        for req in low.get('require', []):
+            req_key = next(iter(req))
+            req_val = req[req_key]
+            for chunk in chunks:
+                if req_key == 'sls':
+                    if fnmatch.fnmatch(chunk['__sls__'], req_val):
+                        found += 1
+                    continue
+                if (fnmatch.fnmatch(chunk['name'], req_val) or
+                        fnmatch.fnmatch(chunk['__id__'], req_val)):
+                    if req_key == 'id' or chunk['state'] == req_key:
+                        found += 1
+    return found
+
+
+def index_chunk_reqs(state, chunks):
+    '''
+    Resolve every requisite of every chunk with the chunk index
+    '''
+    found = 0
+    for low in chunks:
+        for req in low.get('require', []):
+            req_key = next(iter(req))
+            found += len(
+                state.find_requisite_chunks(req_key, req[req_key], chunks))
+    return found
+
+
+def time_it(name, func):
+    '''
+    Run the function once and print how long it took
+    '''
+    start = time.time()
+    ret = func()
+    print('{0:<24} {1:10.2f} ms'.format(name, (time.time() - start) * 1000))
+    return ret
+
+
+def run(options):
+    '''
+    Compile the highstate and print the timings
+    '''
+    opts = salt.config.minion_config(None)
+    opts['file_client'] = 'local'
+    opts['grains'] = {}
+    opts['pillar'] = {}
+    state = salt.state.State(opts)
+    high = make_high(options)
+
+    time_it('index_high', lambda: salt.state.index_high(high))
+    high = time_it('requisite_in', lambda: state.requisite_in(copy.deepcopy(high)))[0]
+    chunks = state.order_chunks(state.compile_high_data(high))
+
+    scanned = time_it('requisites (scan)', lambda: scan_chunk_reqs(chunks))
+    indexed = time_it('requisites (index)', lambda: index_chunk_reqs(state, chunks))
+    if scanned != indexed:
+        print('Mismatch: the scan found {0} requisites, the index found {1}'.format(
+            scanned, indexed))
+
+
+if __name__ == '__main__':
+    run(parse())
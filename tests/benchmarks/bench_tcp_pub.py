@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+'''
+Measure how many bytes the TCP publisher writes, and how long it takes, to
+publish a job targeted at a few minions out of many connected ones
+
+Usage:
+
+.. code-block:: bash
+
+    python tests/benchmarks/bench_tcp_pub.py -m 20000 -t 5
+    python tests/benchmarks/bench_tcp_pub.py -m 20000 -s 65536
+'''
+
+# Import Python libs
+from __future__ import absolute_import, print_function
+import optparse
+import os
+import time
+
+# Import Salt libs
+import salt.config
+import salt.transport.tcp
+from tests.support.mock import MagicMock, patch
+
+
+class Stream(object):
+    '''
+    A connection to a minion which counts the bytes written to it
+    '''
+    def __init__(self):
+        self.written = 0
+
+    def write(self, data):
+        self.written += len(data)
+
+    def closed(self):
+        return False
+
+    def close(self):
+        pass
+
+
+def parse():
+    '''
+    Parse the script command line inputs
+    '''
+    parser = optparse.OptionParser()
+    parser.add_option(
+        '-m',
+        '--minions',
+        dest='minions',
+        type='int',
+        default=20000,
+        help='The number of connected minions (Default: 20000)'
+    )
+    parser.add_option(
+        '-t',
+        '--targets',
+        dest='targets',
+        type='int',
+        default=5,
+        help='The number of minions the job targets (Default: 5)'
+    )
+    parser.add_option(
+        '-s',
+        '--size',
+        dest='size',
+        type='int',
+        default=1024,
+        help='The size of the encrypted publish in bytes (Default: 1024)'
+    )
+    options, _ = parser.parse_args()
+    return options
+
+
+def make_server(options):
+    '''
+    Set up a publisher with the minions connected to it
+    '''
+    opts = salt.config.master_config(None)
+    with patch('salt.master.AESFuncs'):
+        server = salt.transport.tcp.PubServer(opts, io_loop=MagicMock())
+    for num in range(options.minions):
+        client = salt.transport.tcp.Subscriber(Stream(), ('127.0.0.1', num))
+        client.id_ = 'minion{0}'.format(num)
+        server.clients.add(client)
+        server._add_client_present(client)
+    return server
+
+
+def run(options):
+    '''
+    Publish the job with each kind of delivery and print the results
+    '''
+    server = make_server(options)
+    targets = ['minion{0}'.format(num) for num in range(options.targets)]
+    payload = os.urandom(options.size)
+    packages = [
+        ('broadcast', {}),
+        ('list', {'topic_lst': targets}),
+        ('pcre', {'topic_match': {'tgt': '({0})$'.format('|'.join(targets)),
+                                  'tgt_type': 'pcre'}}),
+    ]
+    if options.targets == 1:
+        packages.append(('glob', {'topic_match': {'tgt': targets[0],
+                                                  'tgt_type': 'glob'}}))
+    for name, package in packages:
+        for client in server.clients:
+            client.stream.written = 0
+        package['payload'] = payload
+        start = time.time()
+        server.publish_payload(package, None)
+        elapsed = time.time() - start
+        written = [client.stream.written for client in server.clients
+                   if client.stream.written]
+        print('{0:<10} {1:8.2f} ms  {2:6} minions  {3:10.1f} KiB'.format(
+            name, elapsed * 1000, len(written), sum(written) / 1024.0))
+
+
+if __name__ == '__main__':
+    run(parse())
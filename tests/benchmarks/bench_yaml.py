@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+'''
+Measure how long it takes to parse SLS and pillar YAML with the pure Python
+loader and with the loader backed by libyaml
+
+Usage:
+
+.. code-block:: bash
+
+    python tests/benchmarks/bench_yaml.py -n 20
+    python tests/benchmarks/bench_yaml.py -k 50000
+    python tests/benchmarks/bench_yaml.py -p '/srv/salt/*.sls' -p '/srv/pillar/*/*.sls'
+'''
+
+# Import Python libs
+from __future__ import absolute_import, print_function
+import glob
+import optparse
+import os
+import time
+
+# Import Salt libs
+import salt.utils.files
+import salt.utils.yamlloader
+from salt.utils.odict import OrderedDict
+
+BASE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'integration', 'files')
+
+
+def parse():
+    '''
+    Parse the script command line inputs
+    '''
+    parser = optparse.OptionParser()
+    parser.add_option(
+        '-n',
+        '--iterations',
+        dest='iterations',
+        type='int',
+        default=10,
+        help='The number of times to parse the corpus (Default: 10)'
+    )
+    parser.add_option(
+        '-p',
+        '--path',
+        dest='paths',
+        action='append',
+        default=[],
+        help='A glob of YAML files to parse, may be passed more than once '
+             '(Default: the SLS and pillar files of the integration tests)'
+    )
+    parser.add_option(
+        '-k',
+        '--pillar-keys',
+        dest='pillar_keys',
+        type='int',
+        default=20000,
+        help='The number of keys in the synthetic pillar document, 0 to '
+             'leave it out (Default: 20000)'
+    )
+    options, _ = parser.parse_args()
+    if not options.paths:
+        options.paths = [os.path.join(BASE, env, 'base', depth)
+                         for env in ('file', 'pillar')
+                         for depth in ('*.sls', os.path.join('*', '*.sls'))]
+    return options
+
+
+def make_pillar(keys):
+    '''
+    Build a pillar document of nested users and their settings
+    '''
+    lines = ['users:']
+    for num in range(keys // 10):
+        lines.extend([
+            '  user{0}:'.format(num),
+            '    fullname: User Number {0}'.format(num),
+            '    uid: {0}'.format(2000 + num),
+            '    shell: /bin/bash',
+            '    groups: [users, wheel, "group-{0}"]'.format(num % 7),
+            '    ssh_keys:',
+            '      - ssh-rsa AAAAB3NzaC1yc2EAAAADAQABAAABAQC{0} user{0}@host'.format(num),
+            '    settings: &settings{0}'.format(num),
+            '      umask: 0022',
+            '      home: /home/user{0}'.format(num),
+        ])
+    return '\n'.join(lines) + '\n'
+
+
+def load_corpus(options):
+    '''
+    Read the YAML documents, leaving out the templates which are not valid
+    YAML before they are rendered
+    '''
+    corpus = []
+    for pattern in options.paths:
+        for path in glob.glob(pattern):
+            with salt.utils.files.fopen(path) as fp_:
+                data = fp_.read()
+            try:
+                salt.utils.yamlloader.load(
+                    data, Loader=salt.utils.yamlloader.SaltYamlSafePyLoader)
+            except Exception:  # pylint: disable=broad-except
+                continue
+            corpus.append(data)
+    if options.pillar_keys:
+        corpus.append(make_pillar(options.pillar_keys))
+    return corpus
+
+
+def run(options):
+    '''
+    Parse the corpus with each loader and print the timings
+    '''
+    corpus = load_corpus(options)
+    print('{0} documents, {1:.1f} KiB'.format(
+        len(corpus), sum(len(data) for data in corpus) / 1024.0))
+
+    loaders = [('python', salt.utils.yamlloader.SaltYamlSafePyLoader)]
+    if salt.utils.yamlloader.HAS_LIBYAML:
+        loaders.append(('libyaml', salt.utils.yamlloader.SaltYamlSafeCLoader))
+    else:
+        print('libyaml is not available')
+
+    results = []
+    for name, loader in loaders:
+        def _loader(stream, loader=loader):
+            return loader(stream, dictclass=OrderedDict)
+        timings = []
+        for _ in range(options.iterations):
+            start = time.time()
+            ret = [salt.utils.yamlloader.load(data, Loader=_loader)
+                   for data in corpus]
+            timings.append(time.time() - start)
+        results.append(ret)
+        print('{0:<8} min: {1:8.2f} ms  mean: {2:8.2f} ms'.format(
+            name,
+            min(timings) * 1000,
+            sum(timings) * 1000 / len(timings),
+        ))
+    if len(results) > 1 and results[0] != results[1]:
+        print('Mismatch: the loaders returned different data')
+
+
+if __name__ == '__main__':
+    run(parse())
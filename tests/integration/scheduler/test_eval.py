@@ -971,3 +971,53 @@ class SchedulerEvalTest(ModuleCase, SaltReturnAssertsMixin):
         ret = self.schedule.job_status(job_name)
         self.assertNotIn('_last_run', ret)
         self.assertEqual(ret['_next_fire_time'], None)
+
+    def test_eval_seconds_deferred(self):
+        '''
+        verify that a job with seconds is not evaluated again until it is due
+        or it changes
+        '''
+        job_name = 'job_eval_seconds_deferred'
+        job = {
+          'schedule': {
+            job_name: {
+              'function': 'test.ping',
+              'seconds': '30',
+              'dry_run': True,
+            }
+          }
+        }
+
+        # Add job to schedule
+        self.schedule.opts.update(job)
+
+        # eval at 2:00pm to prime, simulate minion start up.
+        run_time = dateutil_parser.parse('11/29/2017 2:00pm')
+        self.schedule.eval(now=run_time)
+
+        defer_until = MagicMock(side_effect=self.schedule._defer_until)
+        with patch.object(self.schedule, '_defer_until', defer_until):
+            # eval at 2:00:01pm, the job is skipped.
+            run_time = dateutil_parser.parse('11/29/2017 2:00:01pm')
+            self.schedule.eval(now=run_time)
+            defer_until.assert_not_called()
+
+            # eval at 2:00:30pm, will run.
+            run_time = dateutil_parser.parse('11/29/2017 2:00:30pm')
+            self.schedule.eval(now=run_time)
+            self.assertEqual(defer_until.call_count, 1)
+            ret = self.schedule.job_status(job_name)
+            self.assertEqual(ret['_last_run'], run_time)
+
+            # Replace the job, it is evaluated again
+            self.schedule.opts['schedule'][job_name] = dict(ret, seconds='10')
+            run_time = dateutil_parser.parse('11/29/2017 2:00:31pm')
+            self.schedule.eval(now=run_time)
+            self.assertEqual(defer_until.call_count, 2)
+
+            # Disable the job, it is evaluated again and not deferred
+            self.schedule.disable_job(job_name, persist=False)
+            run_time = dateutil_parser.parse('11/29/2017 2:00:32pm')
+            self.schedule.eval(now=run_time)
+            self.schedule.eval(now=run_time)
+            self.assertEqual(defer_until.call_count, 4)
@@ -9,7 +9,7 @@ from __future__ import absolute_import, print_function, unicode_literals
 # Import Salt Testing libs
 # import integration
 from tests.support.unit import TestCase
-from tests.support.mock import patch
+from tests.support.mock import MagicMock, patch
 
 # Import Salt libs
 import salt.payload
@@ -37,6 +37,55 @@ class CacheFunctionsTest(TestCase):
         self.assertIsInstance(ret, salt.cache.MemCache)
 
 
+class CacheBulkTest(TestCase):
+    '''
+    Validate the bulk methods of the Cache class
+    '''
+    def setUp(self):
+        self.opts = {'cache': 'fake_driver'}
+        self.cache = salt.cache.Cache(self.opts)
+
+    def test_fetch_many_driver(self):
+        fetch_many = MagicMock(return_value={('bank', 'key'): 'data'})
+        with patch('salt.loader.cache', return_value={'fake_driver.fetch_many': fetch_many}):
+            ret = self.cache.fetch_many(iter([('bank', 'key')]))
+        self.assertEqual(ret, {('bank', 'key'): 'data'})
+        fetch_many.assert_called_once_with([('bank', 'key')])
+
+    def test_fetch_many_fallback(self):
+        fetch = MagicMock(side_effect=lambda bank, key: bank + key)
+        with patch('salt.loader.cache', return_value={'fake_driver.fetch': fetch}):
+            ret = self.cache.fetch_many([('bank', 'a'), ('bank', 'b')])
+            self.assertEqual(self.cache.fetch_many([]), {})
+        self.assertEqual(ret, {('bank', 'a'): 'banka', ('bank', 'b'): 'bankb'})
+        self.assertEqual(fetch.call_count, 2)
+
+    def test_iter_fetch_many(self):
+        fetch_many = MagicMock(side_effect=lambda keys: dict((item, item[1]) for item in keys))
+        keys = [('bank', num) for num in range(5)]
+        with patch('salt.loader.cache', return_value={'fake_driver.fetch_many': fetch_many}):
+            ret = list(self.cache.iter_fetch_many(iter(keys), chunk_size=2))
+        self.assertEqual(ret, [(item, item[1]) for item in keys])
+        self.assertEqual([call[0][0] for call in fetch_many.call_args_list],
+                         [keys[0:2], keys[2:4], keys[4:5]])
+
+    def test_store_many_fallback(self):
+        store = MagicMock()
+        with patch('salt.loader.cache', return_value={'fake_driver.store': store}):
+            self.cache.store_many({('bank', 'a'): 1, ('bank', 'b'): 2})
+        self.assertEqual(
+            sorted(call[0] for call in store.call_args_list),
+            [('bank', 'a', 1), ('bank', 'b', 2)])
+
+    def test_flush_many_fallback(self):
+        flush = MagicMock()
+        with patch('salt.loader.cache', return_value={'fake_driver.flush': flush}):
+            self.cache.flush_many([('bank', 'a'), ('other', None)])
+        self.assertEqual(
+            [(call[0], call[1]['key']) for call in flush.call_args_list],
+            [(('bank',), 'a'), (('other',), None)])
+
+
 class MemCacheTest(TestCase):
     '''
     Validate Cache class methods
@@ -212,3 +261,39 @@ class MemCacheTest(TestCase):
         # Check debug data
         self.assertEqual(self.cache.call, 6)
         self.assertEqual(self.cache.hit, 3)
+
+    @patch('salt.cache.Cache.fetch_many')
+    @patch('salt.loader.cache', return_value={})
+    def test_fetch_many(self, loader_mock, cache_fetch_many_mock):
+        cache_fetch_many_mock.return_value = {('bank', 'key2'): 'fake_data2'}
+        with patch('time.time', return_value=0):
+            self.cache.storage[('bank', 'key1')] = [0, 'fake_data1']
+            ret = self.cache.fetch_many([('bank', 'key1'), ('bank', 'key2')])
+        self.assertEqual(ret, {('bank', 'key1'): 'fake_data1',
+                               ('bank', 'key2'): 'fake_data2'})
+        # Only the miss is fetched from the driver and it is kept in memory
+        cache_fetch_many_mock.assert_called_once_with([('bank', 'key2')])
+        self.assertDictEqual(salt.cache.MemCache.data, {
+            'fake_driver': {
+                ('bank', 'key1'): [0, 'fake_data1'],
+                ('bank', 'key2'): [0, 'fake_data2'],
+                }})
+
+    @patch('salt.cache.Cache.store_many')
+    @patch('salt.cache.Cache.flush_many')
+    @patch('salt.loader.cache', return_value={})
+    def test_store_many_flush_many(self, loader_mock, cache_flush_many_mock, cache_store_many_mock):
+        with patch('time.time', return_value=0):
+            self.cache.store_many({('bank', 'key1'): 'fake_data1',
+                                   ('bank', 'key2'): 'fake_data2'})
+        self.assertDictEqual(salt.cache.MemCache.data, {
+            'fake_driver': {
+                ('bank', 'key1'): [0, 'fake_data1'],
+                ('bank', 'key2'): [0, 'fake_data2'],
+                }})
+        self.cache.flush_many([('bank', 'key1')])
+        self.assertDictEqual(salt.cache.MemCache.data, {
+            'fake_driver': {
+                ('bank', 'key2'): [0, 'fake_data2'],
+                }})
+        cache_flush_many_mock.assert_called_once_with([('bank', 'key1')])
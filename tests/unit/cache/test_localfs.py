@@ -265,3 +265,39 @@ class LocalFSTest(TestCase, LoaderModuleMockMixin):
         # Now test the return of the contains function when key='key'
         with patch.dict(localfs.__opts__, {'cachedir': tmp_dir}):
             self.assertTrue(localfs.contains(bank='bank', key='key', cachedir=tmp_dir))
+
+    # bulk function tests: 2
+
+    def test_store_many_fetch_many(self):
+        '''
+        Test that keys stored with store_many are returned by fetch_many, both
+        below and above the thread pool threshold.
+        '''
+        tmp_dir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        for count in (2, localfs.BULK_MIN_KEYS * 3):
+            data = dict(
+                (('minions/minion{0}'.format(idx), 'data'), {'idx': idx, 'count': count})
+                for idx in range(count))
+            with patch.dict(localfs.__context__, {'serial': salt.payload.Serial(self)}):
+                localfs.store_many(data, cachedir=tmp_dir)
+                keys = list(data) + [('minions/missing', 'data')]
+                ret = localfs.fetch_many(keys, cachedir=tmp_dir)
+            expected = dict(data)
+            expected[('minions/missing', 'data')] = {}
+            self.assertEqual(ret, expected)
+
+    def test_flush_many(self):
+        '''
+        Test that flush_many removes keys and whole banks.
+        '''
+        tmp_dir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self._create_tmp_cache_file(tmp_dir, salt.payload.Serial(self))
+        with patch.dict(localfs.__context__, {'serial': salt.payload.Serial(self)}):
+            localfs.store(bank='other', key='key', data='payload data', cachedir=tmp_dir)
+        self.assertEqual(
+            localfs.flush_many([('bank', 'key'), ('other', None), ('bank', 'missing')],
+                               cachedir=tmp_dir),
+            [True, True, False])
+        self.assertFalse(localfs.contains(bank='bank', key='key', cachedir=tmp_dir))
+        self.assertFalse(localfs.contains(bank='other', key=None, cachedir=tmp_dir))
@@ -559,6 +559,13 @@ class FakeCache(object):
     def fetch(self, bank, key):
         return self.data[bank, key]
 
+    def fetch_many(self, keys):
+        return dict((item, self.data[item]) for item in keys)
+
+    def iter_fetch_many(self, keys):
+        for item in keys:
+            yield item, self.data[item]
+
 
 class RemoteFuncsTestCase(TestCase):
     '''
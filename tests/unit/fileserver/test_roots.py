@@ -192,3 +192,152 @@ class RootsTest(TestCase, AdaptedConfigurationTestCaseMixin, LoaderModuleMockMix
         self.assertEqual('dynamo.sls', ret1['rel'])
         self.assertIn('top.sls', ret2)
         self.assertIn('dynamo.sls', ret2)
+
+    def test_index(self):
+        root_dir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.addCleanup(salt.utils.files.rm_rf, root_dir)
+        os.makedirs(os.path.join(root_dir, 'sub', 'empty'))
+        for rel, content in (('top.sls', 'top'), ('sub/foo.sls', 'foo')):
+            with salt.utils.files.fopen(os.path.join(root_dir, rel), 'w') as fp_:
+                fp_.write(content)
+        cachedir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.addCleanup(salt.utils.files.rm_rf, cachedir)
+        opts = {'file_roots': {'base': [root_dir]},
+                'cachedir': cachedir,
+                'roots_index': True}
+        load = {'saltenv': 'base', 'path': 'sub/foo.sls'}
+        fnd = {'path': os.path.join(root_dir, 'sub', 'foo.sls'),
+               'rel': os.path.join('sub', 'foo.sls')}
+        with patch.dict(roots.__opts__, opts):
+            roots.update()
+            with patch('salt.utils.hashutils.get_hash') as get_hash, \
+                    patch('salt.utils.path.os_walk') as os_walk:
+                self.assertEqual(roots.file_list(load), ['sub/foo.sls', 'top.sls'])
+                self.assertEqual(roots.dir_list(load), ['sub', 'sub/empty'])
+                self.assertEqual(roots.file_list_emptydirs(load), ['sub/empty'])
+                self.assertEqual(
+                    roots.file_hash(load, fnd),
+                    {'hash_type': 'sha256',
+                     'hsum': salt.utils.hashutils.sha256_digest('foo')})
+                get_hash.assert_not_called()
+                os_walk.assert_not_called()
+
+            # A file changed since the index was updated is hashed again, and
+            # a removed one has no hash
+            with salt.utils.files.fopen(fnd['path'], 'w') as fp_:
+                fp_.write('changed foo')
+            self.assertEqual(
+                roots.file_hash(load, fnd)['hsum'],
+                salt.utils.hashutils.sha256_digest('changed foo'))
+            os.rename(fnd['path'], fnd['path'] + '.bak')
+            self.assertEqual(roots.file_hash(load, fnd), {})
+            os.rename(fnd['path'] + '.bak', fnd['path'])
+            with salt.utils.files.fopen(fnd['path'], 'w') as fp_:
+                fp_.write('foo')
+            roots.update()
+
+            # Nothing is walked or hashed when the mtime map is unchanged
+            with patch.object(roots, '_walk_file_lists') as walk:
+                roots.update()
+            walk.assert_not_called()
+
+            # Only the changed file is hashed again
+            fname = os.path.join(root_dir, 'top.sls')
+            with salt.utils.files.fopen(fname, 'w') as fp_:
+                fp_.write('new top')
+            os.utime(fname, (1, 1))
+            with patch('salt.utils.hashutils.get_hash',
+                       side_effect=salt.utils.hashutils.get_hash) as get_hash:
+                roots.update()
+            self.assertEqual([call[0][0] for call in get_hash.call_args_list], [fname])
+            self.assertEqual(
+                roots.file_hash(load, {'path': fname, 'rel': 'top.sls'})['hsum'],
+                salt.utils.hashutils.sha256_digest('new top'))
+
+            # Added and removed files are patched into the file lists, the
+            # file_roots are not walked again
+            new_dir = os.path.join(root_dir, 'new', 'deep')
+            os.makedirs(new_dir)
+            with salt.utils.files.fopen(os.path.join(new_dir, 'bar.sls'), 'w') as fp_:
+                fp_.write('bar')
+            os.remove(os.path.join(root_dir, 'sub', 'foo.sls'))
+            with patch.object(roots, '_walk_file_lists') as walk, \
+                    patch('salt.utils.hashutils.get_hash',
+                          side_effect=salt.utils.hashutils.get_hash) as get_hash:
+                roots.update()
+            walk.assert_not_called()
+            self.assertEqual([call[0][0] for call in get_hash.call_args_list],
+                             [os.path.join(new_dir, 'bar.sls')])
+            load = {'saltenv': 'base'}
+            self.assertEqual(roots.file_list(load), ['new/deep/bar.sls', 'top.sls'])
+            self.assertEqual(roots.dir_list(load), ['new', 'new/deep', 'sub', 'sub/empty'])
+            self.assertEqual(roots.file_list_emptydirs(load), ['sub/empty'])
+            self.assertEqual(
+                roots.file_hash({'saltenv': 'base', 'path': 'new/deep/bar.sls'},
+                                {'path': os.path.join(new_dir, 'bar.sls'),
+                                 'rel': 'new/deep/bar.sls'})['hsum'],
+                salt.utils.hashutils.sha256_digest('bar'))
+            salt.utils.files.rm_rf(os.path.join(root_dir, 'new'))
+            with salt.utils.files.fopen(fnd['path'], 'w') as fp_:
+                fp_.write('foo')
+            roots.update()
+            self.assertEqual(roots.file_list(load), ['sub/foo.sls', 'top.sls'])
+            self.assertEqual(roots.dir_list(load), ['sub', 'sub/empty'])
+            self.assertEqual(roots.file_list_emptydirs(load), ['sub/empty'])
+            load = {'saltenv': 'base', 'path': 'sub/foo.sls'}
+
+            # The index is not used when it was built with other settings
+            with patch.dict(roots.__opts__, {'hash_type': 'md5'}):
+                self.assertEqual(
+                    roots.file_hash(load, fnd),
+                    {'hash_type': 'md5',
+                     'hsum': salt.utils.hashutils.md5_digest('foo')})
+
+    def test_inotify_update(self):
+        root_dir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.addCleanup(salt.utils.files.rm_rf, root_dir)
+        other_dir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.addCleanup(salt.utils.files.rm_rf, other_dir)
+        os.makedirs(os.path.join(root_dir, 'sub'))
+        for rel, content in (('top.sls', 'top'), ('sub/foo.sls', 'foo')):
+            with salt.utils.files.fopen(os.path.join(root_dir, rel), 'w') as fp_:
+                fp_.write(content)
+        cachedir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.addCleanup(salt.utils.files.rm_rf, cachedir)
+        opts = {'file_roots': {'base': [root_dir], 'other': [other_dir]},
+                'cachedir': cachedir,
+                'roots_index': True}
+        list_cache = os.path.join(cachedir, 'file_lists', 'roots', '{0}.p')
+        fname = os.path.join(root_dir, 'sub', 'foo.sls')
+        fnd = {'path': fname, 'rel': os.path.join('sub', 'foo.sls')}
+        load = {'saltenv': 'base', 'path': 'sub/foo.sls'}
+        with patch.dict(roots.__opts__, opts):
+            self.assertEqual(roots.inotify_paths(), sorted([root_dir, other_dir]))
+            roots.update()
+            with patch.dict(roots.__opts__, {'roots_index': False}):
+                for saltenv in ('base', 'other'):
+                    roots.file_list({'saltenv': saltenv})
+                roots.file_hash(load, fnd)
+            hash_cache = os.path.join(cachedir, 'roots', 'hash', 'base', 'sub',
+                                      'foo.sls.hash.sha256')
+            self.assertTrue(os.path.exists(hash_cache))
+
+            # A modified file is rehashed in place, the file lists are kept
+            with salt.utils.files.fopen(fname, 'w') as fp_:
+                fp_.write('new foo')
+            with patch.object(roots, '_walk_file_lists') as walk:
+                roots.inotify_update({'changed': [fname], 'added': [], 'removed': []})
+            walk.assert_not_called()
+            self.assertFalse(os.path.exists(hash_cache))
+            self.assertTrue(os.path.exists(list_cache.format('base')))
+            self.assertEqual(roots.file_hash(load, fnd)['hsum'],
+                             salt.utils.hashutils.sha256_digest('new foo'))
+
+            # A removed directory drops the file list of its saltenv only
+            salt.utils.files.rm_rf(os.path.join(root_dir, 'sub'))
+            roots.inotify_update({'changed': [],
+                                  'added': [],
+                                  'removed': [os.path.join(root_dir, 'sub')]})
+            self.assertFalse(os.path.exists(list_cache.format('base')))
+            self.assertTrue(os.path.exists(list_cache.format('other')))
+            self.assertEqual(roots.file_list({'saltenv': 'base'}), ['top.sls'])
@@ -349,3 +349,155 @@ class Local_CacheTest(TestCase, AdaptedConfigurationTestCaseMixin, LoaderModuleM
         self._check_dir_files('new_jid_dir was not removed',
                               self.EMPTY_JID_DIR,
                               status='removed')
+
+
+class LocalCacheIndexTestCase(TestCase, LoaderModuleMockMixin):
+    '''
+    Tests for the local_cache job index
+    '''
+    def setup_loader_modules(self):
+        self.tmp_cache_dir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.addCleanup(shutil.rmtree, self.tmp_cache_dir, ignore_errors=True)
+        return {local_cache: {'__opts__': {'cachedir': self.tmp_cache_dir,
+                                           'hash_type': 'sha256',
+                                           'keep_jobs': 24,
+                                           'job_cache_index': True}}}
+
+    def _save_job(self, jid, fun='test.ping'):
+        local_cache.prep_jid(passed_jid=jid)
+        local_cache.save_load(jid, {'jid': jid,
+                                    'fun': fun,
+                                    'arg': [],
+                                    'tgt': 'minion',
+                                    'tgt_type': 'glob',
+                                    'user': 'root'},
+                              minions=['minion'])
+
+    def test_get_jids(self):
+        self._save_job('20200101000000000001')
+        self._save_job('20200101000000000002', fun='saltutil.find_job')
+        # The jobs are listed from the index, not from the job directories
+        with patch.object(local_cache, '_walk_through', MagicMock(side_effect=AssertionError)):
+            ret = local_cache.get_jids()
+            self.assertEqual(sorted(ret), ['20200101000000000001', '20200101000000000002'])
+            self.assertEqual(ret['20200101000000000001']['Function'], 'test.ping')
+
+            ret = local_cache.get_jids_filter(5)
+            self.assertEqual([job['JID'] for job in ret], ['20200101000000000001'])
+
+            ret = local_cache.get_jids_filter(5, filter_find_job=False)
+            self.assertEqual([job['JID'] for job in ret],
+                             ['20200101000000000001', '20200101000000000002'])
+
+    def test_get_jids_index_error(self):
+        self._save_job('20200101000000000001')
+        with patch('sqlite3.connect', MagicMock(side_effect=local_cache.sqlite3.DatabaseError)), \
+                patch.object(local_cache, '_INDEX_LOCAL', local_cache.threading.local()):
+            self.assertEqual(list(local_cache.get_jids()), ['20200101000000000001'])
+            self.assertEqual([job['JID'] for job in local_cache.get_jids_filter(5)],
+                             ['20200101000000000001'])
+
+    def test_get_jids_filter_count(self):
+        for idx in range(5):
+            self._save_job('2020010100000000000{0}'.format(idx))
+        ret = local_cache.get_jids_filter(2)
+        self.assertEqual([job['JID'] for job in ret],
+                         ['20200101000000000003', '20200101000000000004'])
+
+    def test_index_populated_from_job_dir(self):
+        with patch.dict(local_cache.__opts__, {'job_cache_index': False}):
+            self._save_job('20200101000000000001')
+        self.assertFalse(os.path.exists(
+            os.path.join(self.tmp_cache_dir, local_cache.INDEX_DB)))
+        self.assertEqual(list(local_cache.get_jids()), ['20200101000000000001'])
+
+    def test_clean_old_jobs(self):
+        self._save_job('20200101000000000001')
+        jid_dir = salt.utils.jid.jid_dir('20200101000000000001',
+                                         os.path.join(self.tmp_cache_dir, 'jobs'),
+                                         'sha256')
+        local_cache.clean_old_jobs()
+        self.assertTrue(os.path.isdir(jid_dir))
+
+        with patch('time.time', MagicMock(return_value=time.time() + 25 * 3600)):
+            local_cache.clean_old_jobs()
+        self.assertFalse(os.path.exists(jid_dir))
+        self.assertFalse(os.path.exists(os.path.dirname(jid_dir)))
+        self.assertEqual(local_cache.get_jids(), {})
+
+    def test_clean_old_jobs_range(self):
+        self._save_job('20200101000000000001')
+        # Without a stale index, the jobs directory is not walked
+        with patch('os.listdir', MagicMock(side_effect=AssertionError)):
+            local_cache.clean_old_jobs()
+        self.assertEqual(list(local_cache.get_jids()), ['20200101000000000001'])
+
+    def test_clean_old_jobs_reconcile(self):
+        self._save_job('20200101000000000001')
+        stale_path = os.path.join(self.tmp_cache_dir, local_cache.INDEX_STALE)
+        self.assertFalse(os.path.exists(stale_path))
+        with patch.dict(local_cache.__opts__, {'job_cache_index': False}):
+            self._save_job('20200101000000000002')
+        # The job stored while the index was disabled marked it stale
+        self.assertTrue(os.path.exists(stale_path))
+        job_dir = os.path.join(self.tmp_cache_dir, 'jobs')
+        corrupt_dir = os.path.join(job_dir, 'aa', 'corrupt')
+        os.makedirs(corrupt_dir)
+        shutil.rmtree(salt.utils.jid.jid_dir('20200101000000000001', job_dir, 'sha256'))
+        local_cache.clean_old_jobs()
+        self.assertFalse(os.path.exists(stale_path))
+        self.assertFalse(os.path.exists(corrupt_dir))
+        self.assertEqual(list(local_cache.get_jids()), ['20200101000000000002'])
+
+    def test_index_add_error(self):
+        stale_path = os.path.join(self.tmp_cache_dir, local_cache.INDEX_STALE)
+        with patch.object(local_cache, '_index_job',
+                          MagicMock(side_effect=local_cache.sqlite3.OperationalError)):
+            self._save_job('20200101000000000001')
+        self.assertTrue(os.path.exists(stale_path))
+        jid_dir = salt.utils.jid.jid_dir('20200101000000000001',
+                                         os.path.join(self.tmp_cache_dir, 'jobs'),
+                                         'sha256')
+        # The job missing from the index is indexed, then expired with it
+        with patch('time.time', MagicMock(return_value=time.time() + 25 * 3600)):
+            local_cache.clean_old_jobs()
+        self.assertFalse(os.path.exists(jid_dir))
+        self.assertEqual(local_cache.get_jids(), {})
+
+    def test_index_connection(self):
+        with patch('sqlite3.connect', MagicMock(wraps=local_cache.sqlite3.connect)) as connect:
+            self._save_job('20200101000000000001')
+            self._save_job('20200101000000000002')
+            local_cache.get_jids()
+            self.assertEqual(connect.call_count, 1)
+
+    def test_prep_jid_passed_jid(self):
+        with patch.object(local_cache, '_index_add') as index_add:
+            local_cache.prep_jid(passed_jid='20200101000000000001')
+            index_add.assert_not_called()
+            jid = local_cache.prep_jid()
+            index_add.assert_called_once_with(jid)
+
+
+class LocalCacheReturnerBatchTestCase(TestCase, LoaderModuleMockMixin):
+    '''
+    Tests for local_cache.returner_batch
+    '''
+    def setup_loader_modules(self):
+        self.tmp_cache_dir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.addCleanup(shutil.rmtree, self.tmp_cache_dir, ignore_errors=True)
+        return {local_cache: {'__opts__': {'cachedir': self.tmp_cache_dir,
+                                           'hash_type': 'sha256'}}}
+
+    def test_returner_batch(self):
+        jid = local_cache.prep_jid()
+        nocache_jid = local_cache.prep_jid(nocache=True)
+        local_cache.returner_batch([
+            {'jid': jid, 'id': 'minion1', 'return': True},
+            {'jid': jid, 'id': 'minion2', 'return': False},
+            {'jid': nocache_jid, 'id': 'minion1', 'return': True},
+        ])
+        self.assertEqual(local_cache.get_jid(jid),
+                         {'minion1': {'return': True},
+                          'minion2': {'return': False}})
+        self.assertEqual(local_cache.get_jid(nocache_jid), {})
@@ -19,6 +19,7 @@ from tests.support.mock import (
 from salt.ext import six
 import salt.utils.files
 from salt import crypt
+from salt.exceptions import SaltDeserializationError
 
 # third-party libs
 try:
@@ -309,3 +310,83 @@ class TestM2CryptoRegression47124(TestCase):
         with patch('salt.crypt.get_rsa_key', return_value=key):
             signature = salt.crypt.sign_message('/keydir/keyname.pem', message, passphrase='password')
         self.assertEqual(signature, self.SIGNATURE)
+
+
+class CrypticleTestCase(TestCase):
+    '''
+    Test the encryption of the messages between the master and the minions
+    '''
+    def setUp(self):
+        self.crypticle = salt.crypt.Crypticle({}, salt.crypt.Crypticle.generate_key_string())
+
+    def test_encrypt_decrypt(self):
+        for size in (0, 1, 15, 16, 17, 100000):
+            data = os.urandom(size)
+            self.assertEqual(self.crypticle.decrypt(self.crypticle.encrypt(data)), data)
+
+    def test_dumps_loads(self):
+        load = {'cmd': '_return', 'id': 'minion', 'return': 'x' * 1000}
+        self.assertEqual(self.crypticle.loads(self.crypticle.dumps(load)), load)
+        # Messages encrypted before the buffers were used still decrypt
+        data = self.crypticle.decrypt(self.crypticle.dumps(load))
+        self.assertTrue(data.startswith(salt.crypt.Crypticle.PICKLE_PAD))
+
+    def test_decrypt_tampered(self):
+        data = bytearray(self.crypticle.encrypt(b'message'))
+        data[20] ^= 1
+        self.assertRaises(salt.crypt.AuthenticationError,
+                          self.crypticle.decrypt, bytes(data))
+
+    @skipIf(not salt.crypt.HAS_AESGCM, 'cryptography is not installed')
+    def test_aead(self):
+        load = {'cmd': '_return', 'id': 'minion', 'return': 'x' * 1000}
+        data = self.crypticle.dumps(load, aead=True)
+        self.assertEqual(self.crypticle.loads(data, aead=True), load)
+        # AES-GCM messages don't pass for AES-CBC ones
+        self.assertRaises(salt.crypt.AuthenticationError, self.crypticle.loads, data)
+
+        data = bytearray(data)
+        data[20] ^= 1
+        self.assertRaises(salt.crypt.AuthenticationError,
+                          self.crypticle.loads, bytes(data), aead=True)
+
+    def test_dumps_loads_compressed(self):
+        crypticle = salt.crypt.Crypticle({'payload_compression_threshold': 1024},
+                                         self.crypticle.key_string)
+        load = {'cmd': '_return', 'id': 'minion', 'return': 'x' * 100000}
+        for compress in salt.crypt.COMPRESSIONS:
+            data = crypticle.dumps(load, compress=compress)
+            self.assertLess(len(data), len(crypticle.dumps(load)))
+            self.assertTrue(crypticle.decrypt(data).startswith(
+                salt.crypt.Crypticle.COMPRESS_PADS[compress]))
+            self.assertEqual(crypticle.loads(data), load)
+
+        # Small and incompressible payloads are not compressed
+        for load in ({'return': 'x' * 100}, {'return': os.urandom(10000)}):
+            data = crypticle.decrypt(crypticle.dumps(load, compress='zlib'))
+            self.assertTrue(data.startswith(salt.crypt.Crypticle.PICKLE_PAD))
+
+    def test_loads_compressed_max_size(self):
+        crypticle = salt.crypt.Crypticle({'payload_compression_threshold': 1024,
+                                          'payload_max_size': 10000},
+                                         self.crypticle.key_string)
+        for size in (1000, 100000):
+            load = {'return': 'x' * size}
+            for compress in salt.crypt.COMPRESSIONS:
+                data = crypticle.dumps(load, compress=compress)
+                if size < 10000:
+                    self.assertEqual(crypticle.loads(data), load)
+                else:
+                    self.assertRaises(SaltDeserializationError, crypticle.loads, data)
+        if salt.crypt.HAS_ZSTD:
+            # A zstd frame which does not tell its content size
+            compressed = salt.crypt.zstandard.ZstdCompressor(
+                write_content_size=False).compress(b'x' * 100000)
+            data = crypticle.encrypt(salt.crypt.Crypticle.COMPRESS_PADS['zstd'] + compressed)
+            self.assertRaises(SaltDeserializationError, crypticle.loads, data)
+
+    def test_loads_compressed_corrupt(self):
+        for compress in salt.crypt.COMPRESSIONS:
+            data = self.crypticle.encrypt(
+                salt.crypt.Crypticle.COMPRESS_PADS[compress] + b'not compressed')
+            self.assertRaises(SaltDeserializationError, self.crypticle.loads, data)
@@ -9,6 +9,7 @@ import errno
 import logging
 import os
 import shutil
+import tempfile
 
 # Import Salt Testing libs
 from tests.support.mixins import AdaptedConfigurationTestCaseMixin, LoaderModuleMockMixin
@@ -17,7 +18,12 @@ from tests.support.unit import TestCase
 from tests.support.runtests import RUNTIME_VARS
 
 # Import Salt libs
+import salt.ext.tornado.concurrent
+import salt.ext.tornado.ioloop
 import salt.utils.files
+import salt.utils.hashutils
+import salt.utils.stringutils
+from salt.exceptions import SaltClientError
 from salt.ext.six.moves import range
 from salt import fileclient
 from salt.ext import six
@@ -408,3 +414,98 @@ class FileclientCacheTest(TestCase, AdaptedConfigurationTestCaseMixin, LoaderMod
                 log.debug('cache_loc = %s', cache_loc)
                 log.debug('content = %s', content)
                 self.assertTrue(saltenv in content)
+
+
+class RemoteClientWindowTest(TestCase):
+    '''
+    Tests for the windowed transfer in RemoteClient.get_file
+    '''
+    CHUNK = 4
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.addCleanup(shutil.rmtree, self.tmpdir, ignore_errors=True)
+        self.content = b''.join(
+            salt.utils.stringutils.to_bytes('{0:04d}'.format(x)) for x in range(25)
+        ) + b'end'
+        self.src = os.path.join(self.tmpdir, 'src')
+        with salt.utils.files.fopen(self.src, 'wb') as fp_:
+            fp_.write(self.content)
+        self.dest = os.path.join(self.tmpdir, 'dest')
+        self.locs = []
+        self.io_loop = salt.ext.tornado.ioloop.IOLoop()
+        self.addCleanup(self.io_loop.close)
+
+    def _serve(self, load, raw=False):
+        if load.get('range_hash') is not None:
+            return {'range_hsum': salt.utils.hashutils.get_hash(
+                self.src, 'sha256', size=load['range_hash'])}
+        self.locs.append(load['loc'])
+        with salt.utils.files.fopen(self.src, 'rb') as fp_:
+            fp_.seek(load['loc'])
+            return {'data': fp_.read(self.CHUNK), 'dest': 'foo.txt'}
+
+    def _serve_async(self, load, raw=False):
+        future = salt.ext.tornado.concurrent.Future()
+        future.set_result(self._serve(load, raw))
+        return future
+
+    def _get_file(self, window=3):
+        client = fileclient.RemoteClient.__new__(fileclient.RemoteClient)
+        client.opts = {'file_transfer_window': window, 'cachedir': self.tmpdir}
+        client._closing = True
+        client.channel = MagicMock(io_loop=self.io_loop)
+        client.channel.send.side_effect = self._serve
+        client.channel.asynchronous.send.side_effect = self._serve_async
+        hash_server = {
+            'hsum': salt.utils.hashutils.get_hash(self.src, 'sha256'),
+            'hash_type': 'sha256',
+        }
+        stat_server = list(os.stat(self.src))
+        with patch.object(client, 'hash_and_stat_file',
+                          MagicMock(return_value=(hash_server, stat_server))), \
+                patch('salt.utils.platform.is_windows', MagicMock(return_value=False)):
+            return client.get_file('salt://foo.txt', self.dest)
+
+    def _check_dest(self):
+        with salt.utils.files.fopen(self.dest, 'rb') as fp_:
+            self.assertEqual(fp_.read(), self.content)
+        self.assertFalse(os.path.exists(self.dest + '.part'))
+
+    def test_get_file_windowed(self):
+        self.assertEqual(self._get_file(), self.dest)
+        self._check_dest()
+        self.assertEqual(
+            sorted(self.locs),
+            list(range(0, len(self.content), self.CHUNK)))
+
+    def test_get_file_resume(self):
+        with salt.utils.files.fopen(self.dest + '.part', 'wb') as fp_:
+            fp_.write(self.content[:40])
+        self.assertEqual(self._get_file(), self.dest)
+        self._check_dest()
+        # Only the first chunk and the chunks after the partial file are
+        # requested
+        self.assertEqual(
+            sorted(self.locs),
+            [0] + list(range(40, len(self.content), self.CHUNK)))
+
+    def test_get_file_resume_mismatch(self):
+        with salt.utils.files.fopen(self.dest + '.part', 'wb') as fp_:
+            fp_.write(b'x' * 40)
+        self.assertEqual(self._get_file(), self.dest)
+        self._check_dest()
+
+    def test_get_file_interrupted(self):
+        serve_async = self._serve_async
+        calls = []
+
+        def _flaky(load, raw=False):
+            calls.append(load['loc'])
+            if len(calls) == 5:
+                raise SaltClientError('Timed out')
+            return serve_async(load, raw)
+
+        self._serve_async = _flaky
+        self.assertEqual(self._get_file(), self.dest)
+        self._check_dest()
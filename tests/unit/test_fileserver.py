@@ -5,11 +5,19 @@
 
 # Import Python libs
 from __future__ import absolute_import, print_function, unicode_literals
+import os
+import shutil
+import tempfile
+import time
 
 # Import Salt Testing libs
-from tests.support.unit import TestCase
+from tests.support.mock import MagicMock, patch
+from tests.support.runtests import RUNTIME_VARS
+from tests.support.unit import TestCase, skipIf
 
 from salt import fileserver
+import salt.utils.files
+import salt.utils.hashutils
 
 
 class MapDiffTestCase(TestCase):
@@ -28,3 +36,101 @@ class MapDiffTestCase(TestCase):
         map1 = {'file1': 12345}
         map2 = {'file1': 1234}
         assert fileserver.diff_mtime_map(map1, map2) is True
+
+
+class ServeFileTestCase(TestCase):
+    def test_range_hash(self):
+        '''
+        Test that the hash of the start of the file is returned for range_hash
+        '''
+        root = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        path = os.path.join(root, 'foo.txt')
+        with salt.utils.files.fopen(path, 'wb') as fp_:
+            fp_.write(b'0123456789')
+        opts = {'fileserver_backend': ['roots'], 'hash_type': 'sha256'}
+        with patch('salt.loader.fileserver', MagicMock(return_value={})):
+            fs_ = fileserver.Fileserver(opts)
+        fnd = {'path': path, 'rel': 'foo.txt', 'back': 'roots'}
+        load = {'path': 'foo.txt', 'saltenv': 'base', 'loc': 0, 'range_hash': 4}
+        with patch.object(fs_, 'find_file', MagicMock(return_value=fnd)):
+            ret = fs_.serve_file(load)
+        self.assertEqual(ret['range_size'], 4)
+        self.assertEqual(
+            ret['range_hsum'],
+            salt.utils.hashutils.sha256_digest(b'0123'))
+
+@skipIf(not fileserver.HAS_PYINOTIFY, 'pyinotify is not installed')
+class InotifyWatcherTestCase(TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        os.makedirs(os.path.join(self.root, 'sub'))
+        self.fileserver = MagicMock()
+        self.watcher = fileserver.InotifyWatcher(
+            self.fileserver, {'roots': [self.root]}, latency=0.1)
+        self.addCleanup(self.watcher.notifier.stop)
+
+    def _process(self):
+        deadline = time.time() + 5
+        while not self.fileserver.inotify_update.called and time.time() < deadline:
+            self.watcher.process(timeout=0.1)
+
+    def test_batches(self):
+        '''
+        Test that the changes are passed to the backend in one batch
+        '''
+        fname = os.path.join(self.root, 'sub', 'foo.sls')
+        with salt.utils.files.fopen(fname, 'w') as fp_:
+            fp_.write('foo')
+        os.remove(os.path.join(self.root, 'sub', 'foo.sls'))
+        self._process()
+        self.fileserver.inotify_update.assert_called_once_with(
+            'roots', {'added': [fname], 'changed': [fname], 'removed': [fname]})
+
+    def test_new_directory(self):
+        '''
+        Test that directories created after the watch was set are watched
+        '''
+        new_dir = os.path.join(self.root, 'new')
+        os.makedirs(new_dir)
+        self._process()
+        self.fileserver.inotify_update.reset_mock()
+        fname = os.path.join(new_dir, 'bar.sls')
+        with salt.utils.files.fopen(fname, 'w') as fp_:
+            fp_.write('bar')
+        self._process()
+        self.fileserver.inotify_update.assert_called_once_with(
+            'roots', {'added': [fname], 'changed': [fname], 'removed': []})
+
+    def test_queue_overflow(self):
+        '''
+        Test that the backends are polled once inotify events were lost
+        '''
+        fname = os.path.join(self.root, 'foo.sls')
+        with salt.utils.files.fopen(fname, 'w') as fp_:
+            fp_.write('foo')
+        self.watcher.process(timeout=0.1)
+        self.watcher._enqueue(MagicMock(mask=fileserver.pyinotify.IN_Q_OVERFLOW))
+        self.watcher.process(timeout=0.1)
+        self.fileserver.update.assert_called_once_with(back=['roots'])
+        # The changes are not passed on from inotify anymore
+        time.sleep(0.2)
+        self.watcher.process(timeout=0.1)
+        self.fileserver.inotify_update.assert_not_called()
+        self.assertEqual(self.fileserver.update.call_count, 1)
+
+    def test_watch_failed(self):
+        '''
+        Test that the backends whose directories can't be watched are polled
+        '''
+        with patch('pyinotify.WatchManager.add_watch',
+                   MagicMock(return_value={self.root: 1, os.path.join(self.root, 'sub'): -2})):
+            watcher = fileserver.InotifyWatcher(
+                self.fileserver, {'roots': [self.root]}, poll_interval=60)
+        self.addCleanup(watcher.notifier.stop)
+        self.assertEqual(watcher.polled, set(['roots']))
+        watcher.process(timeout=0)
+        self.fileserver.update.assert_called_once_with(back=['roots'])
+        watcher.process(timeout=0)
+        self.assertEqual(self.fileserver.update.call_count, 1)
@@ -30,6 +30,7 @@ from tests.support.mock import patch
 import salt.config
 import salt.loader
 import salt.utils.files
+import salt.utils.profile
 import salt.utils.stringutils
 # pylint: disable=import-error,no-name-in-module,redefined-builtin
 from salt.ext import six
@@ -1381,3 +1382,129 @@ class LoaderLoadCachedGrainsTest(TestCase):
         grains = salt.loader.grains(self.opts)
         osrelease_info = grains['osrelease_info']
         assert isinstance(osrelease_info, tuple), osrelease_info
+
+
+class LazyLoaderCacheTest(TestCase):
+    '''
+    Test the process-wide file mapping and __virtual__ caches
+    '''
+
+    @classmethod
+    def setUpClass(cls):
+        cls.opts = salt.config.minion_config(None)
+        if not os.path.isdir(RUNTIME_VARS.TMP):
+            os.makedirs(RUNTIME_VARS.TMP)
+
+    @classmethod
+    def tearDownClass(cls):
+        del cls.opts
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+        self.addCleanup(salt.loader.clear_cache)
+        self.counter = os.path.join(self.tmp_dir, 'counter')
+
+    def _write_module(self, name, content):
+        with salt.utils.files.fopen(os.path.join(self.tmp_dir, name + '.py'), 'w') as fh:
+            fh.write(content)
+        # Backdate the directory, a change within the same mtime tick
+        # isn't cached
+        past = os.stat(self.tmp_dir).st_mtime - 60
+        os.utime(self.tmp_dir, (past, past))
+
+    def _loader(self, **opts):
+        loader_opts = copy.deepcopy(self.opts)
+        loader_opts.update(opts)
+        return salt.loader.LazyLoader([self.tmp_dir], loader_opts, tag='module')
+
+    def test_file_mapping_cache(self):
+        self._write_module('foo', 'def bar():\n    return True\n')
+        self.assertIn('foo', self._loader().file_mapping)
+
+        listdir = os.listdir
+        with patch('os.listdir', side_effect=listdir) as listdir_mock:
+            self.assertIn('foo', self._loader().file_mapping)
+            listdir_mock.assert_not_called()
+
+            # Adding a module changes the mtime of the directory
+            self._write_module('baz', 'def bar():\n    return True\n')
+            self.assertIn('baz', self._loader().file_mapping)
+            self.assertTrue(listdir_mock.called)
+
+    def test_virtual_cache(self):
+        self._write_module('novirt', textwrap.dedent('''\
+            with open({0!r}, 'a') as fh:
+                fh.write('x')
+
+            def __virtual__():
+                return (False, 'not today')
+
+            def bar():
+                return True
+            '''.format(self.counter)))
+
+        def _imports():
+            with salt.utils.files.fopen(self.counter) as fh:
+                return len(fh.read())
+
+        for _ in range(2):
+            loader = self._loader(loader_virtual_cache=True)
+            self.assertNotIn('novirt.bar', loader)
+            self.assertEqual(loader.missing_modules['novirt'], 'not today')
+        self.assertEqual(_imports(), 1)
+
+        # Without the option the module is imported every time
+        self.assertNotIn('novirt.bar', self._loader())
+        self.assertEqual(_imports(), 2)
+
+        salt.loader.clear_cache()
+        self.assertNotIn('novirt.bar', self._loader(loader_virtual_cache=True))
+        self.assertEqual(_imports(), 3)
+
+
+class LazyLoaderProfileTest(TestCase):
+    '''
+    Test the loader timings recorded with profile_loader
+    '''
+
+    @classmethod
+    def setUpClass(cls):
+        cls.opts = salt.config.minion_config(None)
+        cls.opts['profile_loader'] = True
+        if not os.path.isdir(RUNTIME_VARS.TMP):
+            os.makedirs(RUNTIME_VARS.TMP)
+
+    @classmethod
+    def tearDownClass(cls):
+        del cls.opts
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+        salt.utils.profile.clear_loader_timings()
+        self.addCleanup(salt.utils.profile.clear_loader_timings)
+
+    def test_profile_loader(self):
+        for name in ('fast', 'slow'):
+            with salt.utils.files.fopen(os.path.join(self.tmp_dir, name + '.py'), 'w') as fh:
+                fh.write(textwrap.dedent('''\
+                    import time
+                    time.sleep({0})
+
+                    def __virtual__():
+                        return True
+
+                    def bar():
+                        return True
+                    '''.format(0.05 if name == 'slow' else 0)))
+        loader = salt.loader.LazyLoader([self.tmp_dir], copy.deepcopy(self.opts), tag='module')
+        self.assertTrue(loader['fast.bar']())
+        self.assertTrue(loader['slow.bar']())
+
+        report = salt.utils.profile.loader_report()
+        self.assertEqual(list(report['import']), ['module.slow', 'module.fast'])
+        self.assertGreaterEqual(report['import']['module.slow'], 50)
+        self.assertEqual(sorted(report['virtual']), ['module.fast', 'module.slow'])
+        self.assertEqual(report['summary']['import_count'], 2)
+        self.assertEqual(list(salt.utils.profile.loader_report(limit=1)['import']), ['module.slow'])
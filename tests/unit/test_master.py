@@ -331,3 +331,95 @@ class ClearFuncsTestCase(TestCase):
                 patch('salt.utils.master.get_values_of_matching_keys', MagicMock(return_value=['test'])), \
                 patch('salt.utils.minions.CkMinions.auth_check', MagicMock(return_value=False)):
             self.assertEqual(mock_ret, self.clear_funcs.publish(load))
+
+
+class AESFuncsReturnBatchTestCase(TestCase):
+    '''
+    TestCase for the batched return handling of salt.master.AESFuncs
+    '''
+    def setUp(self):
+        opts = salt.config.master_config(None)
+        opts['master_return_batch_size'] = 3
+        with patch.object(salt.master.AESFuncs, '__init__', MagicMock(return_value=None)):
+            self.aes_funcs = salt.master.AESFuncs(opts)
+        self.aes_funcs.opts = opts
+        self.aes_funcs.event = MagicMock()
+        self.aes_funcs.mminion = MagicMock()
+        self.aes_funcs.return_batch = None
+        self.aes_funcs.return_batch_timeout = None
+        self.io_loop = MagicMock()
+        self.aes_funcs.start_return_batch(self.io_loop)
+
+    def _return(self, minion):
+        self.aes_funcs._return({'id': minion, 'jid': '20200101000000000000', 'return': True})
+
+    def test_return_batch_size(self):
+        with patch('salt.utils.job.store_jobs', MagicMock()) as store_jobs:
+            self._return('minion1')
+            self._return('minion2')
+            self.assertFalse(store_jobs.called)
+            self.assertEqual(self.io_loop.call_later.call_count, 1)
+
+            self._return('minion3')
+            self.assertEqual(store_jobs.call_count, 1)
+            loads = store_jobs.call_args[0][1]
+            self.assertEqual([load['id'] for load in loads],
+                             ['minion1', 'minion2', 'minion3'])
+            self.io_loop.remove_timeout.assert_called_once_with(
+                self.io_loop.call_later.return_value)
+            self.assertEqual(self.aes_funcs.return_batch, [])
+
+    def test_return_batch_interval(self):
+        with patch('salt.utils.job.store_jobs', MagicMock()) as store_jobs:
+            self._return('minion1')
+            interval, callback = self.io_loop.call_later.call_args[0]
+            self.assertEqual(interval, self.aes_funcs.opts['master_return_batch_interval'])
+            callback()
+            self.assertEqual(store_jobs.call_count, 1)
+            # Nothing left to store
+            self.aes_funcs.flush_return_batch()
+            self.assertEqual(store_jobs.call_count, 1)
+
+    def test_return_batch_store_error(self):
+        returner_batch = MagicMock(side_effect=OSError)
+        self.aes_funcs.mminion.returners = {
+            '{0}.returner_batch'.format(self.aes_funcs.opts['master_job_cache']): returner_batch
+        }
+
+        def _store_job(opts, load, event=None, mminion=None, batch=None):
+            if load['id'] == 'minion1':
+                raise ValueError
+            batch.append(load)
+
+        with patch('salt.utils.job.store_job', MagicMock(side_effect=_store_job)):
+            self._return('minion1')
+            self._return('minion2')
+            self._return('minion3')
+        # The return which failed did not keep the others from being stored,
+        # and the failed batch write did not escape the worker
+        returner_batch.assert_called_once_with(
+            [{'id': 'minion2', 'jid': '20200101000000000000', 'return': True},
+             {'id': 'minion3', 'jid': '20200101000000000000', 'return': True}])
+        self.assertEqual(self.aes_funcs.return_batch, [])
+
+
+class FileserverUpdateTestCase(TestCase):
+    '''
+    TestCase for salt.master.FileserverUpdate
+    '''
+    def test_run(self):
+        opts = salt.config.master_config(None)
+        with patch('salt.fileserver.Fileserver', MagicMock()):
+            fs_update = salt.master.FileserverUpdate(opts)
+        fs_update.watch_paths = {'roots': ['/srv/salt']}
+        fs_update.buckets = {60: {}}
+        with patch('salt.daemons.masterapi.clean_fsbackend', MagicMock()), \
+                patch('salt.fileserver.InotifyWatcher', MagicMock()) as watcher, \
+                patch('threading.Thread', MagicMock()) as thread, \
+                patch('time.sleep', MagicMock(side_effect=StopIteration)):
+            self.assertRaises(StopIteration, fs_update.run)
+        fs_update.fileserver.update.assert_called_once_with(back=['roots'])
+        watcher.assert_called_once_with(fs_update.fileserver,
+                                        fs_update.watch_paths,
+                                        poll_interval=60)
+        self.assertEqual(thread.call_count, 2)
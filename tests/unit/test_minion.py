@@ -7,12 +7,15 @@
 from __future__ import absolute_import
 import copy
 import os
+import shutil
+import tempfile
 
 # Import Salt Testing libs
-from tests.support.unit import TestCase
+from tests.support.unit import TestCase, skipIf
 from tests.support.mock import patch, MagicMock
 from tests.support.mixins import AdaptedConfigurationTestCaseMixin
 from tests.support.helpers import skip_if_not_root
+from tests.support.runtests import RUNTIME_VARS
 # Import salt libs
 import salt.minion
 import salt.utils.event as event
@@ -22,6 +25,8 @@ import salt.ext.tornado
 import salt.ext.tornado.testing
 from salt.ext.six.moves import range
 import salt.utils.crypt
+import salt.utils.files
+import salt.utils.platform
 import salt.utils.process
 
 
@@ -235,6 +240,81 @@ class MinionTestCase(TestCase, AdaptedConfigurationTestCaseMixin):
             finally:
                 minion.destroy()
 
+    @skipIf(salt.utils.platform.is_windows(), 'Job workers are not available on Windows')
+    def test_job_workers(self):
+        '''
+        Tests that the jobs are sent to the idle job workers, which run them
+        until they are replaced
+        '''
+        with patch('salt.minion.Minion.ctx', MagicMock(return_value={})), \
+                patch('salt.minion.Minion._target', MagicMock()) as target_mock, \
+                patch('salt.minion.Minion.gen_modules', MagicMock()), \
+                patch('salt.utils.process.SignalHandlingProcess.start', MagicMock(return_value=True)):
+            mock_opts = salt.config.DEFAULT_MINION_OPTS.copy()
+            mock_opts['minion_job_workers'] = 2
+            mock_opts['minion_job_worker_max_jobs'] = 2
+            io_loop = salt.ext.tornado.ioloop.IOLoop()
+            minion = salt.minion.Minion(mock_opts, jid_queue=[], io_loop=io_loop)
+            minion.proc_dir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+            self.addCleanup(shutil.rmtree, minion.proc_dir, ignore_errors=True)
+            try:
+                with patch.object(minion.process_manager, 'add_process') as add_mock:
+                    minion._start_job_workers()
+                self.assertEqual(add_mock.call_count, 2)
+                self.assertIs(add_mock.call_args[0][0], salt.minion.JobWorker)
+                queue, idle, _ = minion._job_workers
+
+                # No worker is idle yet, so the job runs in its own process
+                io_loop.run_sync(lambda: minion._handle_decoded_payload({'fun': 'test.ping', 'jid': '1'}))
+                self.assertEqual(salt.utils.process.SignalHandlingProcess.start.call_count, 1)
+
+                worker = salt.minion.JobWorker(minion, *minion._job_workers)
+                idle.value = 1
+                for jid in ('2', '3'):
+                    io_loop.run_sync(lambda jid=jid: minion._handle_decoded_payload({'fun': 'test.ping', 'jid': jid}))
+                    idle.value = 1
+                self.assertEqual(salt.utils.process.SignalHandlingProcess.start.call_count, 1)
+                idle.value = 0
+                with salt.utils.files.fopen(os.path.join(minion.proc_dir, '2'), 'w'):
+                    pass
+                # The worker runs the queued jobs, and exits after the second
+                worker.run()
+                self.assertEqual([call[0][2]['jid'] for call in target_mock.call_args_list], ['2', '3'])
+                self.assertFalse(os.path.exists(os.path.join(minion.proc_dir, '2')))
+                self.assertEqual(idle.value, 2)
+
+                # After a refresh the workers started before exit
+                minion._recycle_job_workers()
+                self.assertEqual(idle.value, 0)
+                worker.run()
+                new_worker = salt.minion.JobWorker(minion, *minion._job_workers)
+                with patch.object(worker, '_ready', MagicMock(return_value=True)):
+                    # The workers which were idle get the sentinels
+                    worker.run()
+                    worker.run()
+                # A worker started before which takes a job reserved for a
+                # new worker runs it, and gives the reservation back
+                idle.value = 1
+                io_loop.run_sync(lambda: minion._handle_decoded_payload({'fun': 'test.ping', 'jid': '4'}))
+                self.assertEqual(idle.value, 0)
+                with patch.object(worker, '_ready', MagicMock(side_effect=[True, False])):
+                    worker.run()
+                self.assertEqual(idle.value, 1)
+                # A new worker which takes a job reserved before the refresh
+                # is not idle anymore while it runs it
+                queue.put(({'fun': 'test.ping', 'jid': '5'}, True, 0))
+                io_loop.run_sync(lambda: minion._handle_decoded_payload({'fun': 'test.ping', 'jid': '6'}))
+                self.assertEqual(idle.value, 0)
+                idle_counts = []
+                with patch.object(minion, '_target', MagicMock(side_effect=lambda *args: idle_counts.append(idle.value))):
+                    new_worker.run()
+                self.assertEqual(len(idle_counts), 2)
+                self.assertEqual(idle_counts[0], 0)
+                self.assertEqual(salt.utils.process.SignalHandlingProcess.start.call_count, 1)
+                self.assertEqual([call[0][2]['jid'] for call in target_mock.call_args_list], ['2', '3', '4'])
+            finally:
+                minion.destroy()
+
     def test_beacons_before_connect(self):
         '''
         Tests that the 'beacons_before_connect' option causes the beacons to be initialized before connect.
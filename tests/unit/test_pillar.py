@@ -11,6 +11,8 @@
 from __future__ import absolute_import
 import shutil
 import tempfile
+import threading
+import time
 
 # Import Salt Testing libs
 from tests.support.runtests import RUNTIME_VARS
@@ -122,6 +124,114 @@ class PillarTestCase(TestCase):
                                                      'fake_pillar',
                                                      arg='foo')
 
+    def _ext_pillar_opts(self, **kwargs):
+        opts = {
+            'optimization_order': [0, 1, 2],
+            'renderer': 'json',
+            'renderer_blacklist': [],
+            'renderer_whitelist': [],
+            'state_top': '',
+            'pillar_roots': {'base': []},
+            'file_roots': {'base': []},
+            'extension_modules': '',
+            'ext_pillar': [
+                {'slow': {'key': 'slow', 'delay': 0.3}},
+                {'fast': {'key': 'fast', 'delay': 0}},
+                {'slow': {'key': 'last', 'delay': 0.2}},
+            ],
+        }
+        opts.update(kwargs)
+        return opts
+
+    def _ext_pillars(self, calls):
+        def _ext_pillar(minion_id, pillar, key, delay):  # pylint: disable=unused-argument
+            calls.append(key)
+            time.sleep(delay)
+            return {'order': key, key: True}
+        return {'slow': _ext_pillar, 'fast': _ext_pillar}
+
+    def test_ext_pillar_concurrency(self):
+        calls = []
+        opts = self._ext_pillar_opts(ext_pillar_concurrency=3)
+        with patch('salt.loader.pillars', MagicMock(return_value=self._ext_pillars(calls))):
+            pillar = salt.pillar.Pillar(opts, {}, 'mocked-minion', 'base')
+        start = time.time()
+        ret, errors = pillar.ext_pillar({})
+        self.assertLess(time.time() - start, 0.5)
+        self.assertEqual(errors, [])
+        # Merged in the order of the ext_pillar option
+        self.assertEqual(ret, {'order': 'last', 'slow': True, 'fast': True, 'last': True})
+        self.assertEqual(sorted(calls), ['fast', 'last', 'slow'])
+
+    def test_ext_pillar_timeout(self):
+        calls = []
+        opts = self._ext_pillar_opts(ext_pillar_concurrency=2,
+                                     ext_pillar_timeout={'slow': 0.1})
+        with patch('salt.loader.pillars', MagicMock(return_value=self._ext_pillars(calls))):
+            pillar = salt.pillar.Pillar(opts, {}, 'mocked-minion', 'base')
+        ret, errors = pillar.ext_pillar({})
+        self.assertEqual(ret, {'order': 'fast', 'fast': True})
+        self.assertEqual(
+            errors,
+            ['Failed to load ext_pillar slow: timed out after 0.1 seconds'] * 2)
+
+    def test_ext_pillar_timeout_busy(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        opts = self._ext_pillar_opts(ext_pillar=[{'hang': {}}],
+                                     ext_pillar_concurrency=2,
+                                     ext_pillar_timeout=0.1)
+        ext_pillars = {'hang': lambda minion_id, pillar: release.wait()}
+        with patch('salt.loader.pillars', MagicMock(return_value=ext_pillars)):
+            pillar = salt.pillar.Pillar(opts, {}, 'mocked-minion', 'base')
+        pools = patch.dict(salt.pillar._EXT_PILLAR_POOLS, clear=True)
+        pools.start()
+        self.addCleanup(pools.stop)
+        for _ in range(2):
+            ret, errors = pillar.ext_pillar({})
+            self.assertEqual(errors, ['Failed to load ext_pillar hang: '
+                                      'timed out after 0.1 seconds'])
+        # The abandoned ext_pillars hold both threads of the pool of the
+        # process, instead of new threads being started for every compilation
+        ret, errors = pillar.ext_pillar({})
+        self.assertEqual(errors, ['Failed to load ext_pillar hang: no thread '
+                                  'was free to run it within 0.1 seconds'])
+        release.set()
+
+    def test_ext_pillar_cache_ttl(self):
+        calls = []
+        opts = self._ext_pillar_opts(ext_pillar_cache_ttl={'fast': 60})
+        with patch('salt.loader.pillars', MagicMock(return_value=self._ext_pillars(calls))), \
+                patch.dict(salt.pillar._EXT_PILLAR_CACHE, clear=True):
+            for grains in ({'os': 'Ubuntu'}, {'os': 'Ubuntu'}, {'os': 'CentOS'}):
+                pillar = salt.pillar.Pillar(opts, grains, 'mocked-minion', 'base')
+                ret, errors = pillar.ext_pillar({})
+                self.assertEqual(errors, [])
+                self.assertEqual(ret, {'order': 'last', 'slow': True, 'fast': True, 'last': True})
+        # The fast ext_pillar ran again only once the grains changed
+        self.assertEqual(calls, ['slow', 'fast', 'last', 'slow', 'last', 'slow', 'fast', 'last'])
+
+    def test_ext_pillar_cache_key(self):
+        calls = []
+        opts = self._ext_pillar_opts(ext_pillar=[{'fast': {'key': 'fast', 'delay': 0}}],
+                                     ext_pillar_cache_ttl=60)
+        with patch('salt.loader.pillars', MagicMock(return_value=self._ext_pillars(calls))), \
+                patch.dict(salt.pillar._EXT_PILLAR_CACHE, clear=True):
+            for saltenv, extra_minion_data, pillar_data in (
+                    ('base', None, {}),
+                    ('base', None, {}),
+                    ('dev', None, {}),
+                    ('dev', {'role': 'web'}, {}),
+                    ('dev', {'role': 'web'}, {'foo': 'bar'}),
+                    ('dev', {'role': 'web'}, {'foo': 'bar'})):
+                opts['pillarenv'] = saltenv
+                pillar = salt.pillar.Pillar(opts, {}, 'mocked-minion', saltenv,
+                                            extra_minion_data=extra_minion_data)
+                pillar.ext_pillar(pillar_data)
+        # The ext_pillar ran again whenever its environment, extra minion
+        # data or input pillar changed
+        self.assertEqual(calls, ['fast'] * 4)
+
     def test_ext_pillar_no_extra_minion_data_val_list(self):
         opts = {
             'optimization_order': [0, 1, 2],
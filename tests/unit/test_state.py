@@ -8,6 +8,8 @@ from __future__ import absolute_import, print_function, unicode_literals
 import os
 import shutil
 import tempfile
+import textwrap
+import time
 
 # Import Salt Testing libs
 from tests.support.unit import TestCase, skipIf
@@ -72,6 +74,107 @@ class StateCompilerTestCase(TestCase, AdaptedConfigurationTestCaseMixin):
             with self.assertRaises(salt.exceptions.SaltRenderError):
                 state_obj.call_high(high_data)
 
+    def test_find_requisite_chunks(self):
+        '''
+        Test that requisites are looked up in the chunk index, and that globs
+        still match every chunk
+        '''
+        chunks = [
+            {'state': 'pkg', '__id__': 'vim', 'name': 'vim', '__sls__': 'editors'},
+            {'state': 'file', '__id__': 'vimrc', 'name': '/etc/vimrc', '__sls__': 'editors'},
+            {'state': 'service', '__id__': 'nginx', 'name': 'nginx', '__sls__': 'web'},
+            {'state': 'pkg', '__id__': 'web-pkg', 'name': 'nginx', '__sls__': 'web'},
+        ]
+        with patch('salt.state.State._gather_pillar'):
+            state_obj = salt.state.State(self.get_temp_config('minion'))
+            find = state_obj.find_requisite_chunks
+            self.assertEqual(find('pkg', 'vim', chunks), [chunks[0]])
+            self.assertEqual(find('file', '/etc/vimrc', chunks), [chunks[1]])
+            self.assertEqual(find('id', 'nginx', chunks), [chunks[2], chunks[3]])
+            self.assertEqual(find('pkg', 'nginx', chunks), [chunks[3]])
+            self.assertEqual(find('sls', 'editors', chunks), chunks[:2])
+            self.assertEqual(find('pkg', 'missing', chunks), [])
+            self.assertEqual(find('id', 'vim*', chunks), chunks[:2])
+            self.assertEqual(find('sls', 'w*', chunks), chunks[2:])
+            # The index is rebuilt when the chunks change
+            chunks.append(
+                {'state': 'pkg', '__id__': 'emacs', 'name': 'emacs', '__sls__': 'editors'})
+            self.assertEqual(find('pkg', 'emacs', chunks), [chunks[4]])
+            self.assertEqual(find('sls', 'editors', chunks),
+                             chunks[:2] + [chunks[4]])
+
+    @skipIf(salt.utils.platform.is_windows(), 'Patches are not inherited by spawned processes')
+    def test_call_chunks_concurrent(self):
+        '''
+        Test that independent chunks run at the same time, and that a chunk
+        waits for the chunks it requires
+        '''
+        def _call(self, low, chunks=None, running=None, retries=1):
+            start = time.time()
+            time.sleep(0.5)
+            return {'name': low['name'], 'result': True, 'changes': {},
+                    'comment': '', '__id__': low['__id__'],
+                    'start': start, 'end': time.time()}
+
+        def _low(id_, **kwargs):
+            low = {'state': 'test', 'fun': 'succeed_without_changes',
+                   'name': id_, '__id__': id_, '__sls__': 'concurrent',
+                   '__env__': 'base'}
+            low.update(kwargs)
+            return low
+
+        chunks = [_low('a1'), _low('b', require=[{'test': 'a1'}]),
+                  _low('a2'), _low('a3')]
+        minion_opts = self.get_temp_config('minion')
+        minion_opts['state_concurrency'] = 4
+        with patch('salt.state.State._gather_pillar'):
+            state_obj = salt.state.State(minion_opts, jid='20260101000000000000')
+        self.assertEqual(state_obj._state_concurrency(chunks), 4)
+        with patch('salt.state.State.call', _call):
+            start = time.time()
+            ret = state_obj.call_chunks(chunks)
+            elapsed = time.time() - start
+        self.assertLess(elapsed, 1.5)
+        tags = dict((ret[tag]['__id__'], tag) for tag in ret)
+        self.assertEqual(sorted(tags), ['a1', 'a2', 'a3', 'b'])
+        self.assertTrue(all(ret[tag]['result'] for tag in ret))
+        self.assertGreaterEqual(ret[tags['b']]['start'], ret[tags['a1']]['end'])
+        self.assertEqual(sorted(ret[tag]['__run_num__'] for tag in ret), [0, 1, 2, 3])
+
+        # prereq needs the chunks to run in order
+        chunks.append(_low('c', prereq=[{'test': 'a1'}]))
+        self.assertEqual(state_obj._state_concurrency(chunks), 1)
+
+    def test_index_high(self):
+        '''
+        Test that find_name and find_sls_ids return the same results with the
+        high data index as without it
+        '''
+        high = OrderedDict([
+            ('vim', OrderedDict([('pkg', ['installed']), ('__sls__', 'editors')])),
+            ('vimrc', OrderedDict([('file', [{'name': '/etc/vimrc'}, 'managed']),
+                                   ('__sls__', 'editors')])),
+            ('nginx', OrderedDict([('service', ['running', {'enable': True}]),
+                                   ('pkg', ['installed']),
+                                   ('__sls__', 'web')])),
+        ])
+        index = salt.state.index_high(high)
+        for name, state in (('vim', 'pkg'), ('/etc/vimrc', 'file'),
+                            ('editors', 'sls'), ('web', 'sls'),
+                            ('missing', 'file')):
+            self.assertEqual(salt.state.find_name(name, state, high, index),
+                             salt.state.find_name(name, state, high))
+        self.assertEqual(salt.state.find_name('/etc/vimrc', 'file', high, index),
+                         [('vimrc', 'file')])
+        high['__exclude__'] = [{'sls': 'other'}]
+        index = salt.state.index_high(high)
+        for sls in ('editors', 'web', 'missing'):
+            self.assertEqual(salt.state.find_sls_ids(sls, high, index),
+                             salt.state.find_sls_ids(sls, high))
+        self.assertEqual(salt.state.find_sls_ids('web', high, index),
+                         [('nginx', 'service'), ('nginx', 'pkg')])
+        self.assertEqual(index['name']['/etc/vimrc'], ('file', 'vimrc'))
+
     def test_verify_onlyif_parse(self):
         low_data = {
             "onlyif": [
@@ -297,6 +400,80 @@ class HighStateTestCase(TestCase, AdaptedConfigurationTestCaseMixin):
         self.assertEqual(state_usage_dict['base']['used'], ['state.a', 'state.b'])
         self.assertEqual(state_usage_dict['base']['unused'], ['state.c'])
 
+    def test_render_state_cache(self):
+        '''
+        Test that the render cache reuses the rendered SLS data until the SLS
+        file, an imported template or a grain or pillar key it reads changes
+        '''
+        def _write(name, contents):
+            with salt.utils.files.fopen(os.path.join(self.state_tree_dir, name), 'w') as fp_:
+                fp_.write(contents)
+
+        _write('map.jinja', "{% set pkgs = ['vim', 'git'] %}")
+        _write('cached.sls', textwrap.dedent('''\
+            {% from 'map.jinja' import pkgs %}
+            {% for pkg in pkgs %}
+            {{ pkg }}:
+              pkg.installed:
+                - name: {{ salt['pillar.get']('prefix:name', '') }}{{ pkg }}
+                - os: {{ grains['os'] }}
+            {% endfor %}
+            '''))
+        _write('uncached.sls', textwrap.dedent('''\
+            uptime:
+              cmd.run:
+                - name: echo {{ salt['cmd.run']('echo uptime') }}
+            '''))
+        opts = self.highstate.state.opts
+        opts['state_render_cache'] = True
+        opts['grains']['os'] = 'Linux'
+        opts['pillar'].update({'prefix': {'name': 'a-'}, 'other': 1})
+
+        def _render(sls):
+            with patch('salt.state.compile_template',
+                       MagicMock(side_effect=salt.state.compile_template)) as compile_mock:
+                high, errors = self.highstate.render_state(sls, 'base', set(), {})
+            self.assertEqual(errors, [])
+            return high, compile_mock.called
+
+        high, rendered = _render('cached')
+        self.assertTrue(rendered)
+        self.assertIn('git', high)
+        self.assertIn({'name': 'a-vim'}, high['vim']['pkg'])
+        cached, rendered = _render('cached')
+        self.assertFalse(rendered)
+        self.assertEqual(list(cached), list(high))
+        self.assertIn({'name': 'a-vim'}, cached['vim']['pkg'])
+
+        # Keys which the SLS file doesn't read don't matter
+        opts['pillar']['other'] = 2
+        opts['grains']['kernel'] = 'Linux'
+        cached, rendered = _render('cached')
+        self.assertFalse(rendered)
+        self.assertEqual(list(cached), list(high))
+        self.assertIn({'name': 'a-vim'}, cached['vim']['pkg'])
+
+        opts['pillar']['prefix']['name'] = 'b-'
+        high, rendered = _render('cached')
+        self.assertTrue(rendered)
+        self.assertIn({'name': 'b-vim'}, high['vim']['pkg'])
+        self.assertFalse(_render('cached')[1])
+
+        opts['grains']['os'] = 'FreeBSD'
+        self.assertTrue(_render('cached')[1])
+        self.assertFalse(_render('cached')[1])
+
+        _write('map.jinja', "{% set pkgs = ['vim'] %}")
+        high, rendered = _render('cached')
+        self.assertTrue(rendered)
+        self.assertNotIn('git', high)
+
+        # Calling cmd.run could render something else each time
+        with patch.dict(self.highstate.state.functions,
+                        {'cmd.run': MagicMock(return_value='up')}):
+            self.assertTrue(_render('uncached')[1])
+            self.assertTrue(_render('uncached')[1])
+
     def test_find_sls_ids_with_exclude(self):
         '''
         See https://github.com/saltstack/salt/issues/47182
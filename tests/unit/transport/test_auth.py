@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+# Import python libs
+from __future__ import absolute_import, print_function, unicode_literals
+import os
+import shutil
+import tempfile
+import time
+
+# Import Salt Testing libs
+from tests.support.runtests import RUNTIME_VARS
+from tests.support.mock import MagicMock, patch
+from tests.support.unit import TestCase
+
+# Import Salt libs
+import salt.crypt
+import salt.utils.files
+from salt.transport.mixins.auth import AESReqServerMixin, AuthSlots
+
+
+class AuthSlotsTestCase(TestCase):
+    '''
+    Test limiting the sign ins handled at the same time
+    '''
+    def test_acquire_release(self):
+        slots = AuthSlots(2)
+        first = slots.acquire()
+        second = slots.acquire()
+        self.assertEqual(set([first, second]), set([0, 1]))
+        self.assertIsNone(slots.acquire())
+        slots.release(first)
+        self.assertEqual(slots.acquire(), first)
+
+    def test_acquire_stale(self):
+        slots = AuthSlots(1, timeout=60)
+        self.assertEqual(slots.acquire(), 0)
+        self.assertIsNone(slots.acquire())
+        # The worker holding the slot died without releasing it
+        slots.slots[0] = time.time() - 61
+        self.assertEqual(slots.acquire(), 0)
+
+
+class AESReqServerMixinTestCase(TestCase):
+    '''
+    Test the master side of the sign ins
+    '''
+    def setUp(self):
+        self.pki_dir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.addCleanup(shutil.rmtree, self.pki_dir, ignore_errors=True)
+        self.server = AESReqServerMixin()
+        self.server.opts = {'auth_max_workers': 1,
+                            'auth_retry_after': 5,
+                            'pki_dir': self.pki_dir}
+        self.server.pub_keys = {}
+
+    def test_auth_busy(self):
+        self.server.auth_slots = AuthSlots(1)
+        slot = self.server.auth_slots.acquire()
+        sign_in = MagicMock(return_value={'enc': 'pub'})
+        with patch.object(self.server, '_sign_in', sign_in):
+            ret = self.server._auth({'id': 'minion'})
+            self.assertEqual(ret, {'enc': 'clear',
+                                   'load': {'ret': 'retry',
+                                            'retry_after': 5}})
+            sign_in.assert_not_called()
+            self.server.auth_slots.release(slot)
+            self.assertEqual(self.server._auth({'id': 'minion'}), {'enc': 'pub'})
+        # The sign in gave its slot back
+        self.assertIsNotNone(self.server.auth_slots.acquire())
+
+    def test_get_pub_key_cached(self):
+        pubfn = os.path.join(self.pki_dir, 'minion')
+        with salt.utils.files.fopen(pubfn, 'w') as fp_:
+            fp_.write('key one')
+        get_rsa_pub_key = MagicMock(side_effect=['parsed one', 'parsed two'])
+        with patch('salt.crypt.get_rsa_pub_key', get_rsa_pub_key):
+            self.assertEqual(self.server._get_pub_key(pubfn), 'parsed one')
+            self.assertEqual(self.server._get_pub_key(pubfn), 'parsed one')
+            self.assertEqual(get_rsa_pub_key.call_count, 1)
+            with salt.utils.files.fopen(pubfn, 'w') as fp_:
+                fp_.write('key number two')
+            self.assertEqual(self.server._read_pub_key(pubfn)['pub'], 'key number two')
+            self.assertEqual(self.server._get_pub_key(pubfn), 'parsed two')
+
+
+class AuthRetryAfterTestCase(TestCase):
+    '''
+    Test the minion side of the sign ins the master turns away
+    '''
+    def setUp(self):
+        self.auth = object.__new__(salt.crypt.SAuth)
+        self.auth._retry_after = None
+
+    def test_busy(self):
+        self.assertFalse(self.auth._busy({'ret': True}))
+        self.assertFalse(self.auth._busy({'ret': 'retry'}))
+        self.assertIsNone(self.auth._retry_wait())
+        self.assertTrue(self.auth._busy({'ret': 'retry', 'retry_after': 5}))
+        wait = self.auth._retry_wait()
+        self.assertTrue(5 <= wait <= 10)
+        # The hint is only used for the next sign in
+        self.assertIsNone(self.auth._retry_wait())
+
+    def test_sign_in_busy(self):
+        self.auth.opts = {'master_uri': 'tcp://127.0.0.1:4506',
+                          'pki_dir': '/tmp',
+                          'rejected_retry': False}
+        self.auth.mpub = 'minion_master.pub'
+        self.auth.minion_sign_in_payload = MagicMock(return_value={'cmd': '_auth'})
+        channel = MagicMock()
+        channel.send.return_value = {'enc': 'clear',
+                                     'load': {'ret': 'retry', 'retry_after': 3}}
+        self.assertEqual(self.auth.sign_in(channel=channel), 'retry')
+        self.assertEqual(self.auth._retry_after, 3)
@@ -266,3 +266,22 @@ class IPCMessagePubSubCase(salt.ext.tornado.testing.AsyncTestCase):
         ret2 = client2.read_sync()
         self.assertEqual(ret1, 'TEST')
         self.assertEqual(ret2, 'TEST')
+
+    def test_tag_filters(self):
+        client1 = self.sub_channel
+        client2 = self._get_sub_channel()
+        client2.set_tag_filters([['evt', 'startswith'], ['^x.z$', 'regex']])
+
+        # Wait for the publisher to get the filters
+        while not self.pub_channel.tag_filters:
+            self.io_loop.run_sync(lambda: salt.ext.tornado.gen.sleep(0.01))
+
+        self.pub_channel.publish('other', tag='other')
+        self.pub_channel.publish('evt1', tag='evt1')
+        self.pub_channel.publish('xyz', tag='xyz')
+        self.pub_channel.publish('untagged')
+        self.assertEqual([client1.read_sync() for _ in range(4)],
+                         ['other', 'evt1', 'xyz', 'untagged'])
+        self.assertEqual([client2.read_sync() for _ in range(3)],
+                         ['evt1', 'xyz', 'untagged'])
+        self.assertIsNone(client2.read_sync(timeout=0.1))
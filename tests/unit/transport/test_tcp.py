@@ -15,6 +15,7 @@ import salt.ext.tornado.concurrent
 from salt.ext.tornado.testing import AsyncTestCase, gen_test
 
 import salt.config
+import salt.crypt
 from salt.ext import six
 import salt.utils.platform
 import salt.utils.process
@@ -22,7 +23,9 @@ import salt.transport.server
 import salt.transport.client
 import salt.exceptions
 from salt.ext.six.moves import range
-from salt.transport.tcp import SaltMessageClientPool, SaltMessageClient, TCPPubServerChannel
+from salt.transport.tcp import (
+    SaltMessageClientPool, SaltMessageClient, TCPPubServerChannel, PubServer, Subscriber
+)
 
 # Import Salt Testing libs
 from tests.support.unit import TestCase, skipIf
@@ -149,6 +152,43 @@ class AESReqTestCases(BaseTCPReqCase, ReqChannelMixin):
                 ret = self.channel.send(msg)
 
 
+@skipIf(salt.utils.platform.is_darwin(), 'hanging test suite on MacOS')
+@skipIf(not salt.crypt.HAS_AESGCM, 'cryptography is not installed')
+class AESGCMReqTestCases(AESReqTestCases):
+    '''
+    Run the encrypted req channel tests with AES-GCM negotiated at sign in
+    '''
+    @classmethod
+    def setUpClass(cls):
+        super(AESGCMReqTestCases, cls).setUpClass()
+        cls.master_config['aes_gcm'] = True
+        cls.minion_config['aes_gcm'] = True
+
+    def test_aead_negotiated(self):
+        self.channel.send({'foo': 'bar'})
+        self.assertTrue(self.channel.auth.aead)
+
+
+@skipIf(salt.utils.platform.is_darwin(), 'hanging test suite on MacOS')
+class CompressedReqTestCases(AESReqTestCases):
+    '''
+    Run the encrypted req channel tests with compression agreed on at sign in
+    '''
+    @classmethod
+    def setUpClass(cls):
+        super(CompressedReqTestCases, cls).setUpClass()
+        cls.master_config['payload_compression'] = 'zlib'
+        cls.minion_config['payload_compression_threshold'] = 100
+
+    def test_compress_negotiated(self):
+        msg = {'foo': 'bar' * 1000}
+        ret = self.channel.send(msg)
+        self.assertEqual(ret['load'], msg)
+        # The request told the master the reply can be compressed
+        self.assertEqual(ret['compress'], 'zlib')
+        self.assertEqual(self.channel.auth.compress, 'zlib')
+
+
 class BaseTCPPubCase(AsyncTestCase, AdaptedConfigurationTestCaseMixin):
     '''
     Test the req server/client pair
@@ -451,3 +491,83 @@ class TCPPubServerChannelTest(TestCase, AdaptedConfigurationTestCaseMixin):
 
         # verify it was correctly calling check_minions
         check_minions.assert_called_with("minion02", tgt_type="list")
+
+    @patch('salt.master.SMaster.secrets')
+    @patch('salt.crypt.Crypticle')
+    @patch('salt.utils.asynchronous.SyncWrapper')
+    def test_publish_filtering_glob(self, sync_wrapper, crypticle, secrets):
+        opts = self.get_temp_config('master')
+        opts["sign_pub_messages"] = False
+        channel = TCPPubServerChannel(opts)
+
+        wrap = MagicMock()
+        crypt = MagicMock()
+        crypt.dumps.return_value = {"test": "value"}
+
+        secrets.return_value = {"aes": {"secret": None}}
+        crypticle.return_value = crypt
+        sync_wrapper.return_value = wrap
+
+        # the glob and pcre targets are matched by the publisher
+        for tgt_type, tgt in (("glob", "web*"), ("pcre", "web[0-9]+")):
+            channel.publish({"test": "value", "tgt_type": tgt_type, "tgt": tgt})
+            payload = wrap.send.call_args[0][0]
+            assert "topic_lst" not in payload
+            self.assertEqual(payload["topic_match"], {"tgt": tgt, "tgt_type": tgt_type})
+
+        # unless they match every minion
+        channel.publish({"test": "value", "tgt_type": "pcre", "tgt": ".*"})
+        payload = wrap.send.call_args[0][0]
+        assert "topic_match" not in payload
+
+        # or the master is a syndic master
+        opts['order_masters'] = True
+        channel.publish({"test": "value", "tgt_type": "glob", "tgt": "web*"})
+        payload = wrap.send.call_args[0][0]
+        assert "topic_match" not in payload
+
+
+class PubServerTest(TestCase, AdaptedConfigurationTestCaseMixin):
+    def setUp(self):
+        opts = self.get_temp_config('master')
+        with patch('salt.master.AESFuncs'):
+            self.pub_server = PubServer(opts, io_loop=MagicMock())
+        self.addCleanup(self.pub_server.close)
+        self.clients = {}
+        for id_ in ('web1', 'web2', 'db1'):
+            client = Subscriber(MagicMock(), ('127.0.0.1', 0))
+            client.id_ = id_
+            self.pub_server.clients.add(client)
+            self.pub_server._add_client_present(client)
+            self.clients[id_] = client
+        # A minion which has not sent its id yet
+        self.anonymous = Subscriber(MagicMock(), ('127.0.0.1', 0))
+        self.pub_server.clients.add(self.anonymous)
+
+    def _published(self, package):
+        package['payload'] = b'payload'
+        self.pub_server.publish_payload(package, None)
+        return sorted(id_ for id_, client in self.clients.items()
+                      if client.stream.write.called)
+
+    def test_publish_payload_glob(self):
+        self.assertEqual(
+            self._published({'topic_match': {'tgt': 'web*', 'tgt_type': 'glob'}}),
+            ['web1', 'web2'])
+        self.anonymous.stream.write.assert_not_called()
+
+    def test_publish_payload_pcre(self):
+        self.assertEqual(
+            self._published({'topic_match': {'tgt': 'db|web2', 'tgt_type': 'pcre'}}),
+            ['db1', 'web2'])
+
+    def test_publish_payload_bad_pcre(self):
+        # The publication goes to every minion, which will report the error
+        self.assertEqual(
+            self._published({'topic_match': {'tgt': 'web(', 'tgt_type': 'pcre'}}),
+            ['db1', 'web1', 'web2'])
+        self.assertTrue(self.anonymous.stream.write.called)
+
+    def test_publish_payload_broadcast(self):
+        self.assertEqual(self._published({}), ['db1', 'web1', 'web2'])
+        self.assertTrue(self.anonymous.stream.write.called)
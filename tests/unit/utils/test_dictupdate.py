@@ -201,6 +201,44 @@ class UtilDictMergeTestCase(TestCase):
         ret = dictupdate.merge_list(mdict1, {'A': ['b', 'c']})
         self.assertEqual({'A': [['B'], ['b', 'c']], 'C': {'D': 'E', 'F': {'I': 'J', 'G': 'H'}}}, ret)
 
+    def test_merge_copy_on_write(self):
+        '''
+        Test that merging without copying all of obj_a gives the same results,
+        leaves the inputs unchanged and shares the values which are not changed
+        '''
+        obj_a = OrderedDict([
+            ('A', 'B'),
+            ('C', OrderedDict([('D', 'E'), ('F', {'G': 'H', 'I': 'J'})])),
+            ('K', {'L': ['M', 'N']}),
+            ('O', ['P']),
+        ])
+        obj_b = {'C': {'D': 'e', 'X': {'Y': 'Z'}}, 'K': {'L': ['N', 'Q']},
+                 'O': 'p', 'R': 'S'}
+        for strategy in ('smart', 'recurse', 'overwrite', 'list', 'none'):
+            for merge_lists in (False, True):
+                expected = dictupdate.merge(
+                    copy.deepcopy(obj_a), copy.deepcopy(obj_b),
+                    strategy=strategy, merge_lists=merge_lists)
+                orig_a = copy.deepcopy(obj_a)
+                orig_b = copy.deepcopy(obj_b)
+                ret = dictupdate.merge(
+                    orig_a, orig_b, strategy=strategy,
+                    merge_lists=merge_lists, copy_on_write=True)
+                self.assertEqual(ret, expected)
+                self.assertEqual(list(ret), list(expected))
+                self.assertIs(type(ret), type(expected))
+                if strategy != 'overwrite':
+                    self.assertEqual(orig_a, obj_a)
+                self.assertEqual(orig_b, obj_b)
+
+        ret = dictupdate.merge_recurse(obj_a, obj_b, copy_on_write=True)
+        self.assertIsNot(ret, obj_a)
+        self.assertIsNot(ret['C'], obj_a['C'])
+        self.assertIs(ret['C']['F'], obj_a['C']['F'])
+        self.assertIs(ret['C']['X'], obj_b['C']['X'])
+        self.assertRaises(TypeError, dictupdate.merge_recurse, obj_a, ['A'],
+                          copy_on_write=True)
+
 
 class UtilDeepDictUpdateTestCase(TestCase):
 
@@ -236,6 +236,28 @@ class TestSaltEvent(TestCase):
             self.assertGotEvent(evt2, {'data': 'foo2'})
             self.assertGotEvent(evt1, {'data': 'foo1'})
 
+    def test_event_tag_filters(self):
+        '''Test the publisher only sends the filtered and subscribed tags'''
+        with eventpublisher_process(self.sock_dir):
+            me = salt.utils.event.MasterEvent(self.sock_dir, listen=True)
+            me.set_tag_filters([('evt1', None)])
+            me.subscribe('e..3$', 'regex')
+            # Give the publisher the time to get the filters
+            time.sleep(1)
+            me.fire_event({'data': 'foo2'}, 'evt2')
+            me.fire_event({'data': 'foo1'}, 'evt1')
+            me.fire_event({'data': 'foo3'}, 'evt3')
+            evt1 = me.get_event(tag='')
+            evt3 = me.get_event(tag='')
+            self.assertGotEvent(evt1, {'data': 'foo1'})
+            self.assertGotEvent(evt3, {'data': 'foo3'})
+
+            me.set_tag_filters(None)
+            time.sleep(1)
+            me.fire_event({'data': 'foo2'}, 'evt2')
+            evt2 = me.get_event(tag='')
+            self.assertGotEvent(evt2, {'data': 'foo2'})
+
     def test_event_multiple_clients(self):
         '''Test event is received by multiple clients'''
         with eventpublisher_process(self.sock_dir):
@@ -2,11 +2,16 @@
 
 # Import python libs
 from __future__ import absolute_import, unicode_literals, print_function
+import os
+import shutil
+import tempfile
 
 # Import Salt Testing libs
+from tests.support.runtests import RUNTIME_VARS
 from tests.support.unit import TestCase
 
 # Import Salt libs
+import salt.utils.files
 import salt.utils.hashutils
 
 
@@ -180,3 +185,14 @@ class HashutilsTestCase(TestCase):
             salt.utils.hashutils.get_hash,
             '/tmp/foo/',
             form='INVALID')
+
+    def test_get_hash_size(self):
+        tmpdir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.addCleanup(shutil.rmtree, tmpdir, ignore_errors=True)
+        path = os.path.join(tmpdir, 'foo')
+        with salt.utils.files.fopen(path, 'wb') as fp_:
+            fp_.write(self.bytes * 2)
+        self.assertEqual(
+            salt.utils.hashutils.get_hash(path, 'sha256', chunk_size=5, size=16),
+            self.bytes_sha256
+        )
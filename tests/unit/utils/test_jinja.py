@@ -31,6 +31,7 @@ from salt.ext.six.moves import builtins
 import salt.utils.json
 from salt.utils.decorators.jinja import JinjaFilter
 from salt.utils.jinja import (
+    SaltBytecodeCache,
     SaltCacheLoader,
     SerializerExtension,
     ensure_sequence_filter,
@@ -339,6 +340,38 @@ class TestGetTemplate(TestCase):
             self.assertEqual(out, 'Hey world !Hi Salt !' + os.linesep)
             self.assertEqual(fc.requests[0]['path'], 'salt://macro')
 
+    def test_bytecode_cache(self):
+        '''
+        The compiled templates are reused until their source changes
+        '''
+        opts = dict(self.local_opts, jinja_bytecode_cache=True)
+        filename = os.path.join(self.template_dir, 'hello_import')
+        with salt.utils.files.fopen(filename) as fp_:
+            source = salt.utils.stringutils.to_unicode(fp_.read())
+        SaltBytecodeCache._memory.clear()
+        self.addCleanup(SaltBytecodeCache._memory.clear)
+
+        def _render(tmplstr):
+            with patch.object(Environment, 'compile',
+                              side_effect=Environment.compile, autospec=True) as compile_mock:
+                out = render_jinja_tmpl(
+                    tmplstr,
+                    dict(opts=opts, saltenv='test', salt=self.local_salt),
+                    tmplpath=filename)
+            return out, compile_mock.call_count
+
+        # The template and the macro it imports are compiled once
+        self.assertEqual(_render(source), ('Hey world !a b !' + os.linesep, 2))
+        self.assertEqual(_render(source), ('Hey world !a b !' + os.linesep, 0))
+        self.assertTrue(os.listdir(os.path.join(self.tempdir, 'jinja')))
+
+        # A new process reads the compiled templates from the cache directory
+        SaltBytecodeCache._memory.clear()
+        self.assertEqual(_render(source), ('Hey world !a b !' + os.linesep, 0))
+
+        self.assertEqual(_render(source.replace('Hey', 'Hi')),
+                         ('Hi world !a b !' + os.linesep, 1))
+
     def test_macro_additional_log_for_generalexc(self):
         '''
         If we failed in a macro because of e.g. a TypeError, get
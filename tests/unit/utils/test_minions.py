@@ -5,7 +5,10 @@ from __future__ import absolute_import, unicode_literals
 import sys
 
 # Import Salt Libs
+import salt.cache
+import salt.utils.data
 import salt.utils.minions
+from salt.exceptions import SaltCacheError
 
 # Import Salt Testing Libs
 from tests.support.unit import TestCase, skipIf
@@ -516,3 +519,215 @@ class NodegroupCompTest(TestCase):
         # If this works, it should also print an error to the console
         ret = salt.utils.minions.nodegroup_comp('group1', referenced_nodegroups)
         self.assertEqual(ret, [])
+
+
+MINION_DATA = {
+    'web1': {'grains': {'os': 'Ubuntu',
+                        'roles': ['web', 'db'],
+                        'ip_interfaces': {'eth0': ['10.0.0.1']},
+                        'colon': 'a:b',
+                        'num': 3},
+             'pillar': {'app': {'port': 80, 'name': 'Web'},
+                        'users': [{'name': 'fred'}]}},
+    'web2': {'grains': {'os': 'Debian',
+                        'roles': ['web'],
+                        'ip_interfaces': {'eth0': ['10.0.0.2']},
+                        'num': 30},
+             'pillar': {'app': {'port': 8080, 'name': 'web'}}},
+    'db1': {'grains': {'os': 'CentOS',
+                       'roles': 'db',
+                       'empty': {},
+                       'ip_interfaces': {'lo': ['127.0.0.1']}},
+            'pillar': {'app': {}}},
+    'nodata': {},
+}
+
+
+def _fetch_many(keys):
+    return dict((item, MINION_DATA[item[0].split('/')[1]]) for item in keys)
+
+
+class MinionDataIndexTestCase(TestCase):
+    '''
+    TestCase for salt.utils.minions.MinionDataIndex
+    '''
+    def setUp(self):
+        self.index = salt.utils.minions.MinionDataIndex()
+        for id_, mdata in MINION_DATA.items():
+            self.index.update(id_, mdata)
+
+    def _expected(self, search_type, expr, exact_match=False):
+        return set(
+            id_ for id_, mdata in MINION_DATA.items()
+            if salt.utils.data.subdict_match(mdata.get(search_type),
+                                             expr,
+                                             exact_match=exact_match)
+        )
+
+    def _assert_matches(self, search_type, expr, exact_match=False):
+        matched, uncertain = self.index.match(search_type,
+                                              expr,
+                                              ':',
+                                              exact_match=exact_match)
+        expected = self._expected(search_type, expr, exact_match=exact_match)
+        # Uncertain minions are resolved against their cached data
+        self.assertEqual(matched - uncertain, expected - uncertain, expr)
+
+    def test_grains_match(self):
+        for expr in ('os:Ubuntu', 'os:ubuntu', 'os:*u*', 'os:Deb?an',
+                     'roles:web', 'roles:db', 'roles:w*', 'num:3', 'num:3*',
+                     'colon:a:b', 'colon:a:*', 'ip_interfaces:eth0',
+                     'ip_interfaces:*', 'ip_interfaces:eth0:10.0.0.*',
+                     'empty:*', 'missing:*', 'os:'):
+            self._assert_matches('grains', expr)
+            self._assert_matches('grains', expr, exact_match=True)
+
+    def test_pillar_match(self):
+        for expr in ('app:port:80', 'app:port:8*', 'app:name:web',
+                     'app:*', 'app:port', 'users:name:fred'):
+            self._assert_matches('pillar', expr)
+            self._assert_matches('pillar', expr, exact_match=True)
+
+    def test_list_of_dicts_uncertain(self):
+        matched, uncertain = self.index.match('pillar', 'users:name:fred', ':')
+        self.assertIn('web1', uncertain)
+
+    def test_unindexable(self):
+        self.assertIsNone(self.index.match('grains', '*:Ubuntu', ':'))
+        self.assertIsNone(self.index.match('grains', 'ip_interfaces:*:10.0.0.1', ':'))
+        self.assertIsNone(self.index.match('mine', 'os:Ubuntu', ':'))
+
+    def test_update_replaces_data(self):
+        self.index.update('web1', {'grains': {'os': 'Fedora'}})
+        matched, _ = self.index.match('grains', 'os:Ubuntu', ':')
+        self.assertEqual(matched, set())
+        matched, _ = self.index.match('grains', 'os:Fedora', ':')
+        self.assertEqual(matched, {'web1'})
+
+    def test_refresh(self):
+        cache = MagicMock()
+        cache.updated.return_value = 1
+        cache.fetch_many.side_effect = _fetch_many
+        index = salt.utils.minions.MinionDataIndex()
+        with patch('time.time', MagicMock(return_value=10)):
+            index.refresh(cache, ['web1', 'web2'])
+        self.assertEqual(sorted(cache.fetch_many.call_args[0][0]),
+                         [('minions/web1', 'data'), ('minions/web2', 'data')])
+        self.assertEqual(index.match('grains', 'roles:web', ':')[0],
+                         {'web1', 'web2'})
+
+        # Unchanged minions are not fetched again, removed ones are dropped
+        index.refresh(cache, ['web1'])
+        self.assertEqual(cache.fetch_many.call_count, 1)
+        self.assertEqual(index.match('grains', 'roles:web', ':')[0], {'web1'})
+
+        # Minions updated since they were indexed are fetched again
+        cache.updated.return_value = 20
+        index.refresh(cache, ['web1'])
+        self.assertEqual(cache.fetch_many.call_args[0][0],
+                         [('minions/web1', 'data')])
+
+        # A failing bulk fetch falls back to fetching the minions one by one
+        cache.updated.return_value = 30
+        cache.fetch_many.side_effect = SaltCacheError
+        cache.fetch.side_effect = lambda bank, key: MINION_DATA[bank.split('/')[1]]
+        index.refresh(cache, ['web1'])
+        self.assertEqual(cache.fetch.call_count, 1)
+        self.assertEqual(index.match('grains', 'roles:web', ':')[0], {'web1'})
+
+    def test_iter_minions_chunks(self):
+        cache = MagicMock()
+        cache.fetch_many.side_effect = lambda keys: dict((item, {'id': item[0]}) for item in keys)
+        ids = ['minion{0}'.format(num) for num in range(600)]
+        with patch.object(salt.cache.Cache, 'FETCH_CHUNK_SIZE', 256):
+            ret = list(salt.utils.minions._iter_minions(cache, ids))
+        self.assertEqual(ret, [(id_, {'id': 'minions/' + id_}) for id_ in ids])
+        self.assertEqual([len(call[0][0]) for call in cache.fetch_many.call_args_list],
+                         [256, 256, 88])
+
+    def test_check_cache_minions(self):
+        opts = {'minion_data_cache': True,
+                'minion_data_cache_index': True,
+                'pki_dir': '/tmp'}
+        ckminions = salt.utils.minions.CkMinions(opts)
+        cache = MagicMock()
+        cache.list.return_value = ['web1', 'web2', 'db1']
+        cache.fetch_many.side_effect = _fetch_many
+        ckminions.cache = cache
+        with patch('salt.utils.minions.minion_data_index',
+                   MagicMock(return_value=self.index)), \
+                patch.object(self.index, 'refresh', MagicMock()):
+            ret = ckminions._check_grain_minions('roles:web', ':', False)
+            self.assertEqual(sorted(ret['minions']), ['web1', 'web2'])
+            # web1 holds a list of dicts at 'users' and is checked against its data
+            ret = ckminions._check_pillar_minions('users:name:fred', ':', False)
+            self.assertEqual(ret['minions'], ['web1'])
+        self.assertEqual(
+            [call[0][0] for call in cache.fetch_many.call_args_list],
+            [[('minions/web1', 'data')]])
+
+
+class CompoundTargetTestCase(TestCase):
+    '''
+    TestCase for compiled compound targets
+    '''
+    def setUp(self):
+        opts = {'minion_data_cache': True,
+                'nodegroups': {'webs': 'L@web1,web2',
+                               'nested': ['N@webs', 'or', 'db1']}}
+        self.ckminions = salt.utils.minions.CkMinions(opts)
+        pki = MagicMock(return_value=['db1', 'web1', 'web2', 'web3'])
+        grains = MagicMock(return_value={'minions': ['web1', 'db1'], 'missing': []})
+        patcher = patch.multiple(self.ckminions,
+                                 _pki_minions=pki,
+                                 _check_grain_minions=grains)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _check(self, expr):
+        return self.ckminions._check_compound_minions(expr, ':', True)['minions']
+
+    def test_compound(self):
+        self.assertEqual(self._check('web*'), ['web1', 'web2', 'web3'])
+        self.assertEqual(self._check('web* and not web2'), ['web1', 'web3'])
+        self.assertEqual(self._check('web* not web2'), ['web1', 'web3'])
+        self.assertEqual(self._check('not web*'), ['db1'])
+        self.assertEqual(self._check('G@os:foo and not L@db1'), ['web1'])
+        self.assertEqual(self._check('db1 or web1 and web2'), ['db1'])
+        self.assertEqual(self._check('( db1 or web1 ) and not ( web1 or web3 )'),
+                         ['db1'])
+        self.assertEqual(self._check(['web1', 'or', 'web3']), ['web1', 'web3'])
+        self.assertEqual(self._check('not ( web1 or web3'), ['db1', 'web2'])
+
+    def test_compound_nodegroups(self):
+        self.assertEqual(self._check('N@webs and not web1'), ['web2'])
+        self.assertEqual(self._check('N@nested'), ['db1', 'web1', 'web2'])
+        self.assertEqual(
+            self.ckminions._check_nodegroup_minions('nested', True)['minions'],
+            ['db1', 'web1', 'web2'])
+
+    def test_compound_missing(self):
+        ret = self.ckminions._check_compound_minions('L@web1,web9', ':', True)
+        self.assertEqual(ret, {'minions': ['web1'], 'missing': ['web9']})
+        ret = self.ckminions._check_compound_minions('web1 or not L@web9', ':', True)
+        self.assertEqual(ret['missing'], [])
+
+    def test_invalid_compound(self):
+        for expr in ('and web1', '( and web1 )', 'web1 )', 'web1 web2',
+                     'web1 and', 'not not web1', 'X@foo'):
+            self.assertEqual(self._check(expr), [], expr)
+
+    def test_compile_cache(self):
+        nodegroups = {'webs': 'L@web1,web2'}
+        compiled = salt.utils.minions.compile_compound('web1 and not N@webs', nodegroups)
+        self.assertIs(
+            salt.utils.minions.compile_compound('web1 and not N@webs', nodegroups),
+            compiled)
+        self.assertEqual(compiled.terms,
+                         [(None, 'web1', None, False),
+                          ('L', 'web1,web2', ':', True)])
+        # A change in the nodegroups compiles the expression again
+        self.assertIsNot(
+            salt.utils.minions.compile_compound('web1 and not N@webs',
+                                                {'webs': 'L@web3'}),
+            compiled)
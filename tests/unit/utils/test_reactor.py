@@ -2,9 +2,12 @@
 
 from __future__ import absolute_import, print_function, unicode_literals
 import codecs
+import fnmatch
 import glob
 import logging
 import os
+import shutil
+import tempfile
 import textwrap
 
 import salt.loader
@@ -12,7 +15,9 @@ import salt.utils.data
 import salt.utils.files
 import salt.utils.reactor as reactor
 import salt.utils.yaml
+from salt.ext import six
 
+from tests.support.runtests import RUNTIME_VARS
 from tests.support.unit import TestCase
 from tests.support.mixins import AdaptedConfigurationTestCaseMixin
 from tests.support.mock import (
@@ -458,6 +463,94 @@ class TestReactor(TestCase, AdaptedConfigurationTestCaseMixin):
                                     )
                                     self.assertEqual(reactions, LOW_CHUNKS[tag])
 
+    def test_list_reactors_globs(self):
+        '''
+        Ensure that the compiled reactor map matches the same reactors, in the
+        same order, as matching each tag against each glob
+        '''
+        react_map = [
+            {'salt/job/*/ret/*': ['/srv/reactor/ret.sls']},
+            {'salt/minion/*/start': '/srv/reactor/start.sls'},
+            {'salt/job/*': ['/srv/reactor/job.sls']},
+            {'salt/auth': ['/srv/reactor/auth.sls']},
+            {'*': ['/srv/reactor/all.sls']},
+            {'salt/beacon/web?/inotify/[ab]*': ['/srv/reactor/beacon.sls']},
+            {'salt/job/*/ret/*': ['/srv/reactor/ret2.sls']},
+        ]
+        tags = [
+            'salt/job/20200101/ret/minion1',
+            'salt/job/20200101/new',
+            'salt/minion/minion1/start',
+            'salt/auth',
+            'salt/beacon/web1/inotify/a/b',
+            'salt/beacon/web10/inotify/a',
+            'salt/',
+            '',
+        ]
+        with patch.dict(self.reactor.opts, {'reactor': react_map}):
+            for tag in tags:
+                expected = []
+                for ropt in react_map:
+                    key, val = next(iter(ropt.items()))
+                    if fnmatch.fnmatch(tag, key):
+                        expected.extend([val] if isinstance(val, six.string_types) else val)
+                self.assertEqual(self.reactor.list_reactors(tag), expected)
+
+    def test_list_reactors_reload(self):
+        '''
+        Ensure that a reactor map file is read again once it changes
+        '''
+        tmp_dir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.addCleanup(shutil.rmtree, tmp_dir, ignore_errors=True)
+        path = os.path.join(tmp_dir, 'reactor.conf')
+        with salt.utils.files.fopen(path, 'w') as fp_:
+            fp_.write('- foo/*:\n  - /srv/reactor/foo.sls\n')
+        with patch.dict(self.reactor.opts, {'reactor': path}):
+            self.assertEqual(self.reactor.list_reactors('foo/bar'), ['/srv/reactor/foo.sls'])
+            with patch.object(salt.utils.yaml, 'safe_load', MagicMock()) as load_mock:
+                self.assertEqual(self.reactor.list_reactors('foo/baz'), ['/srv/reactor/foo.sls'])
+                load_mock.assert_not_called()
+            with salt.utils.files.fopen(path, 'w') as fp_:
+                fp_.write('- bar/*:\n  - /srv/reactor/bar.sls\n')
+            os.utime(path, (0, 0))
+            self.assertEqual(self.reactor.list_reactors('foo/bar'), [])
+            self.assertEqual(self.reactor.list_reactors('bar/foo'), ['/srv/reactor/bar.sls'])
+
+    def test_render_cache(self):
+        '''
+        Ensure that only reaction files which render the same for every event
+        are rendered once
+        '''
+        tmp_dir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.addCleanup(shutil.rmtree, tmp_dir, ignore_errors=True)
+        static = os.path.join(tmp_dir, 'static.sls')
+        dynamic = os.path.join(tmp_dir, 'dynamic.sls')
+        with salt.utils.files.fopen(static, 'w') as fp_:
+            fp_.write(textwrap.dedent('''\
+                {% for name in ['foo', 'bar'] %}
+                clean_{{ name }}:
+                  runner.cache.clear_all:
+                    - tgt: {{ name }}
+                {% endfor %}
+                '''))
+        with salt.utils.files.fopen(dynamic, 'w') as fp_:
+            fp_.write(textwrap.dedent('''\
+                clean:
+                  runner.cache.clear_all:
+                    - tgt: {{ data['id'] }}
+                '''))
+        render = self.reactor.render_template
+        with patch.object(self.reactor, 'render_template', MagicMock(side_effect=render)) as render_mock:
+            for minion in ('foo', 'bar'):
+                ret = self.reactor.render_reaction(static, 'tag', {'id': minion})
+                self.assertEqual(sorted(ret), ['clean_bar', 'clean_foo'])
+            self.assertEqual(render_mock.call_count, 1)
+
+            for minion in ('foo', 'bar'):
+                ret = self.reactor.render_reaction(dynamic, 'tag', {'id': minion})
+                self.assertIn({'tgt': minion}, ret['clean']['runner'])
+            self.assertEqual(render_mock.call_count, 3)
+
 
 class TestReactWrap(TestCase, AdaptedConfigurationTestCaseMixin):
     '''
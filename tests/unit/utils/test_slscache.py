@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+# Import python libs
+from __future__ import absolute_import, unicode_literals, print_function
+
+# Import Salt Testing libs
+from tests.support.unit import TestCase
+
+# Import Salt libs
+import salt.utils.slscache
+from salt.utils.slscache import Uncacheable
+
+
+class SLSCacheAnalyzeTestCase(TestCase):
+    '''
+    Test finding what an SLS template reads
+    '''
+    def test_analyze_keys(self):
+        ret = salt.utils.slscache.analyze(
+            "{% from 'map.jinja' import pkgs %}"
+            "{{ grains['os'] }} {{ grains.kernel }} {{ grains.get('id') }}"
+            "{{ pillar['a']['b'] }} {{ salt['pillar.get']('c:d') }}"
+            "{{ salt.grains.get('e|f', delimiter='|') }} {{ opts['id'] }}"
+            "{{ sls }} {{ tpldir }}"
+        )
+        self.assertEqual(ret['templates'], set(['map.jinja']))
+        self.assertEqual(ret['grains'], set(['os', 'kernel', 'id', 'e']))
+        self.assertEqual(ret['pillar'], set(['a', 'c']))
+        self.assertEqual(ret['opts'], set(['id']))
+        self.assertEqual(ret['functions'], set())
+
+    def test_analyze_all_keys(self):
+        for source in ('{{ pillar }}',
+                       '{% for key in pillar %}{{ key }}{% endfor %}',
+                       '{{ pillar.items() }}',
+                       "{% set key = 'a' %}{{ pillar[key] }}",
+                       "{% set key = 'a' %}{{ salt['pillar.get'](key) }}"):
+            self.assertIn(None, salt.utils.slscache.analyze(source)['pillar'], source)
+
+    def test_analyze_item(self):
+        ret = salt.utils.slscache.analyze(
+            "{{ salt['pillar.item']('a', 'b:c') }} {{ salt.grains.item('os', 'kernel') }}"
+            "{{ salt['pillar.get']('d', 'e') }}"
+        )
+        self.assertEqual(ret['pillar'], set(['a', 'b', 'd']))
+        self.assertEqual(ret['grains'], set(['os', 'kernel']))
+        for source in ("{% set key = 'b' %}{{ salt['pillar.item']('a', key) }}",
+                       "{% set keys = ['a'] %}{{ salt['pillar.item'](*keys) }}"):
+            self.assertIn(None, salt.utils.slscache.analyze(source)['pillar'], source)
+
+    def test_analyze_config_get(self):
+        ret = salt.utils.slscache.analyze("{{ salt['config.get']('ntp:servers') }}")
+        self.assertEqual(ret['grains'], set(['ntp']))
+        self.assertEqual(ret['pillar'], set(['ntp', 'master']))
+        self.assertEqual(ret['opts'], set(['ntp']))
+
+    def test_analyze_pure(self):
+        source = "{{ salt['file.basename']('/etc/motd') }}"
+        self.assertRaises(Uncacheable, salt.utils.slscache.analyze, source)
+        ret = salt.utils.slscache.analyze(source, pure=['file.base*'])
+        self.assertEqual(ret['functions'], set(['file.basename']))
+
+    def test_analyze_uncacheable(self):
+        for source in ("{{ salt['cmd.run']('uptime') }}",
+                       "{{ salt.cmd.run('uptime') }}",
+                       '{{ salt[fun]() }}',
+                       '{% set mods = salt %}',
+                       '{% include name %}',
+                       '{{ None|strftime }}',
+                       '{{ [1, 2]|random }}',
+                       '{{ lipsum() }}',
+                       '{{ rendered_sls }}',
+                       '{% if %}'):
+            self.assertRaises(Uncacheable, salt.utils.slscache.analyze, source)
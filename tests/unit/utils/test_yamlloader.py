@@ -10,12 +10,14 @@ import textwrap
 
 # Import Salt Libs
 from yaml.constructor import ConstructorError
+from yaml.scanner import ScannerError
 from salt.utils.yamlloader import SaltYamlSafeLoader
+import salt.utils.yamlloader
 import salt.utils.files
 from salt.ext import six
 
 # Import Salt Testing Libs
-from tests.support.unit import TestCase
+from tests.support.unit import TestCase, skipIf
 from tests.support.mock import patch, mock_open
 
 # Import 3rd-party libs
@@ -148,3 +150,42 @@ class YamlLoaderTestCase(TestCase):
                   b: {foo: bar, one: 1, list: [1, two, 3]}''')),
             {'foo': {'b': {'foo': 'bar', 'one': 1, 'list': [1, 'two', 3]}}}
         )
+
+    @skipIf(not salt.utils.yamlloader.HAS_LIBYAML, 'libyaml is not available')
+    def test_yaml_libyaml(self):
+        '''
+        Test that the loader backed by libyaml is used when available, and
+        loads the same data as the pure Python loader
+        '''
+        self.assertIs(SaltYamlSafeLoader, salt.utils.yamlloader.SaltYamlSafeCLoader)
+        data = textwrap.dedent('''\
+            p1: &p1
+              v1: alpha
+              v2: 010
+            p2:
+              <<: *p1
+              v2: beta
+            p3: 2019-01-01
+            p4: !!python/unicode uni
+            p5: !!omap [a: 1, b: 2]''')
+        for dictclass in (collections.OrderedDict, dict):
+            ret = []
+            for loader in (salt.utils.yamlloader.SaltYamlSafePyLoader,
+                           salt.utils.yamlloader.SaltYamlSafeCLoader):
+                if dictclass is dict:
+                    ret.append(salt.utils.yamlloader.load(data, Loader=loader))
+                else:
+                    ret.append(loader(data.replace('!!omap', ''), dictclass=dictclass).get_data())
+                    self.assertIsInstance(ret[-1]['p2'], dictclass)
+            self.assertEqual(ret[0], ret[1])
+        self.assertEqual(ret[0]['p5'], [('a', 1), ('b', 2)])
+
+    def test_yaml_error_buffer(self):
+        '''
+        Test that the errors hold the document, to show where the error is
+        '''
+        data = 'p1: alpha\n\tp2: beta\n'
+        with self.assertRaises(ScannerError) as exc:
+            salt.utils.yamlloader.safe_load(data)
+        self.assertEqual(exc.exception.problem_mark.line, 1)
+        self.assertIn('p2: beta', exc.exception.problem_mark.buffer)